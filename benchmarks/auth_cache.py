@@ -0,0 +1,91 @@
+"""Накладные расходы аутентификации на запрос: без кеша и с AuthCache.
+
+База — SQLite в памяти (aiosqlite), Redis — fakeredis; с PostgreSQL по сети
+промах кеша дороже. Запуск из корня репозитория: ``python -m benchmarks.auth_cache``.
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from forkscan.core.config import settings
+from forkscan.infrastructure.database.base import Base
+from forkscan.infrastructure.database.models import Subscription, SubscriptionPlan, User
+from forkscan.services.auth import create_access_token
+from forkscan.services.auth_cache import AuthCache
+
+
+def run(requests: int = 5_000, users: int = 100) -> None:
+    secret = settings.jwt_secret_value
+
+    async def measure(name: str, cache: AuthCache, sessionmaker, tokens) -> None:
+        latencies = []
+        async with sessionmaker() as session:
+            for number in range(requests):
+                started = time.perf_counter()
+                claims = cache.decode(tokens[number % len(tokens)])
+                await cache.user(session, claims["user_id"])
+                latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(
+            f"{name:<10} p50 {statistics.median(latencies) * 1e6:7.0f}us  "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:7.0f}us  "
+            f"claims hits {cache.claims_hits}, user loads {cache.user_loads}"
+        )
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessionmaker() as session:
+            plan = SubscriptionPlan(code="pro", name="Pro", price=10, period_days=30)
+            session.add(plan)
+            for number in range(users):
+                user = User(email=f"user{number}@example.com", hashed_password="-")
+                user.subscriptions.append(
+                    Subscription(
+                        plan=plan, end_date=datetime.now(UTC).replace(tzinfo=None) + timedelta(30)
+                    )
+                )
+                session.add(user)
+            await session.commit()
+
+        tokens = [
+            create_access_token({"user_id": number + 1, "email": f"user{number}@example.com"})
+            for number in range(users)
+        ]
+        client = FakeRedis(server=FakeServer(), decode_responses=True)
+
+        await measure(
+            "no cache", AuthCache(secret, claims_size=0, users_size=0), sessionmaker, tokens
+        )
+        cache = AuthCache(secret)
+        cache.start(client)
+        await asyncio.sleep(0.1)  # подписка на канал
+        await measure("cached", cache, sessionmaker, tokens)
+
+        # Другой воркер меняет пользователя: снимок удаляется из кеша этого воркера
+        other = AuthCache(secret)
+        started = time.perf_counter()
+        await other.invalidate(client, 1)
+        while cache.users.get(1) is not None:
+            await asyncio.sleep(0.0005)
+        print(f"invalidation from another worker: {(time.perf_counter() - started) * 1000:.1f}ms")
+        async with sessionmaker() as session:
+            user = await cache.user(session, 1)
+        print(f"reloaded user {user.id}: plan {user.plan}")
+        await cache.close()
+        await client.aclose()
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()
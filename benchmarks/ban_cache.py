@@ -0,0 +1,69 @@
+"""Пропускная способность проверки входа при потоке уже забаненных клиентов.
+
+Сравнивает SecuritySystem без локального кеша банов и с ним и проверяет, что
+reset_attempts в одном воркере снимает бан в кешах остальных.
+Запуск из корня репозитория: ``python -m benchmarks.ban_cache [redis-url]``;
+без адреса используется fakeredis на loopback TCP.
+"""
+
+import asyncio
+import sys
+import time
+
+from benchmarks.redis_server import run_with_redis
+from forkscan.api.security_system import BanCache, SecuritySystem
+
+
+def address(number: int) -> str:
+    return f"10.1.{number // 256}.{number % 256}"
+
+
+def run(url=None, banned: int = 1000, requests: int = 20_000, workers: int = 2) -> None:
+    async def flood(security: SecuritySystem) -> float:
+        started = time.perf_counter()
+        for number in range(requests):
+            result = await security.check_attempt(address(number % banned))
+            assert result.is_banned
+        return requests / (time.perf_counter() - started)
+
+    async def main(connect) -> None:
+        client = connect()
+        await client.flushdb()
+        # Забанены все клиенты потока
+        for number in range(banned):
+            await client.set(f"ban:{address(number)}", 1, ex=600)
+
+        uncached = SecuritySystem(client, BanCache(0))
+        print(f"without cache: {await flood(uncached):.0f} requests/s")
+
+        # У каждого воркера своё подключение, как у отдельных процессов API
+        systems = [SecuritySystem(connect()) for _ in range(workers)]
+        for security in systems:
+            security.start()
+        await asyncio.sleep(0.1)  # подписка на канал
+        # Первый проход узнаёт баны из Redis, второй отвечается локально
+        filling = await flood(systems[0])
+        print(
+            f"with cache: {filling:.0f} requests/s filling, "
+            f"{await flood(systems[0]):.0f} requests/s warm, {len(systems[0].banned)} cached"
+        )
+
+        identifier = address(1)
+        for security in systems:
+            await security.check_attempt(identifier)
+        await systems[0].reset_attempts(identifier)
+        started = time.perf_counter()
+        while any(security.banned.get(identifier) is not None for security in systems):
+            await asyncio.sleep(0.001)
+        print(f"ban lifted in all workers after {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        for security in systems:
+            await security.close()
+            await security.redis.aclose()
+        await client.aclose()
+
+    run_with_redis(url, main)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
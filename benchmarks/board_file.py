@@ -0,0 +1,126 @@
+"""Замер снимка линии на диске: сборка, запись, открытие через mmap и восстановление.
+
+Восстановление через BoardCheckpointer.restore идёт в отдельном потоке; замер
+показывает и его длительность, и самую долгую паузу цикла событий за это время.
+Запуск из корня репозитория: ``python -m benchmarks.board_file``.
+"""
+
+import asyncio
+import contextlib
+import io
+import random
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import (
+    BookmakerName,
+    EventKey,
+    EventManager,
+    MarketType,
+    SportType,
+    event_id,
+)
+from forkscan.infrastructure.board.file import BoardCheckpointer, BoardFile, write_board_file
+from forkscan.infrastructure.board.layout import encode_board
+
+
+def build_board(events: int, quotes_per_event: int):
+    random.seed(0)
+    manager, store = EventManager(), OddsStore()
+    now = datetime.now(UTC)
+    bookmakers, sports, markets = list(BookmakerName), list(SportType), list(MarketType)
+    for number in range(events):
+        event = SportEvent.create(
+            bookmaker=random.choice(bookmakers),
+            bookmaker_id=str(number),
+            start_time=int((now + timedelta(minutes=random.randint(-60, 7 * 24 * 60))).timestamp()),
+            tournament_name=f"League {number % 500}",
+            team1=f"team{number}a",
+            team2=f"team{number}b",
+            sport_type=random.choice(sports),
+            status=random.choice(["prematch", "live"]),
+        )
+        manager.add_event(event)
+        for _ in range(quotes_per_event):
+            store.update(
+                event_id(event.create_key()),
+                random.choice(markets),
+                random.choice([0.0, 2.5, -1.5]),
+                random.choice(bookmakers),
+                round(random.uniform(1.1, 5.0), 2),
+                now.timestamp(),
+            )
+    manager.freshness.confirm_bookmaker(BookmakerName.FONBET)
+    manager.publish()
+    return manager, store
+
+
+async def restore_with_ticker(path: Path) -> tuple:
+    """Восстановление через BoardCheckpointer и самая долгая пауза цикла событий."""
+    manager, store = EventManager(), OddsStore()
+    longest = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal longest
+        previous = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - previous)
+            previous = now
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    restored = await BoardCheckpointer(manager, store, path).restore()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+    return restored, elapsed, longest
+
+
+def run(events: int = 100_000, quotes_per_event: int = 6) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):  # EventManager печатает удаления
+        manager, store = build_board(events, quotes_per_event)
+    board = manager.snapshot()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "board.snapshot"
+        started = time.perf_counter()
+        tables = encode_board(manager, store, board)
+        encoded = time.perf_counter()
+        size = write_board_file(path, tables)
+        written = time.perf_counter()
+        print(
+            f"{events} events, {len(tables.odds)} quotes: encode {(encoded - started) * 1000:.0f}ms, "
+            f"write {(written - encoded) * 1000:.0f}ms, {size / 2**20:.1f} MiB"
+        )
+
+        key = EventKey.create("team42a", "team42b")
+        started = time.perf_counter()
+        with BoardFile(path) as snapshot:
+            opened = time.perf_counter()
+            same_events = snapshot.get_same_events(key)
+            markets = snapshot.event_markets(event_id(key))
+            looked_up = time.perf_counter()
+        print(
+            f"mmap open {(opened - started) * 1000:.2f}ms, "
+            f"first lookup {(looked_up - opened) * 1000:.2f}ms"
+        )
+        assert same_events == manager.get_same_events(same_events[next(iter(same_events))])
+        assert markets == store.event_markets(event_id(key))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            restored, elapsed, longest = asyncio.run(restore_with_ticker(path))
+        print(
+            f"restore {restored} events: {elapsed * 1000:.0f}ms, "
+            f"longest event loop pause {longest * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,127 @@
+"""Стресс-тест снимков линии: потоки-писатели против asyncio-читателей.
+
+Сравнивает снимки (EventManager.snapshot), блокировку на каждое чтение и обход
+живого словаря без защиты. Запуск из корня репозитория:
+``python -m benchmarks.board_snapshot``.
+"""
+
+import asyncio
+import contextlib
+import io
+import random
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict
+
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventManager, SportType
+
+
+def run(
+    writers: int = 4,
+    readers: int = 8,
+    events: int = 20_000,
+    duration: float = 3.0,
+) -> None:
+    """Потоки-писатели против asyncio-читателей."""
+    now = datetime.now(UTC)
+    bookmakers = list(BookmakerName)
+    sports = list(SportType)
+
+    def make_event(number: int, bookmaker: BookmakerName) -> SportEvent:
+        return SportEvent.create(
+            bookmaker=bookmaker,
+            bookmaker_id=str(number),
+            start_time=int((now + timedelta(minutes=number % 10_000)).timestamp()),
+            tournament_name=f"League {number % 300}",
+            team1=f"team{number}a",
+            team2=f"team{number}b",
+            sport_type=sports[number % len(sports)],
+            status="prematch",
+        )
+
+    def run_mode(mode: str) -> Dict[str, float]:
+        manager = EventManager()
+        for number in range(events):
+            manager.add_event(make_event(number, bookmakers[number % len(bookmakers)]))
+        manager.publish()
+
+        stop = threading.Event()
+        counters = {"writes": 0, "reads": 0, "events_read": 0, "errors": 0}
+        counters_lock = threading.Lock()
+
+        def writer(seed: int) -> None:
+            rng = random.Random(seed)
+            writes = 0
+            while not stop.is_set():
+                # Цикл парсера: пачка изменений и одна публикация версии
+                for _ in range(100):
+                    number = rng.randrange(events * 2)
+                    bookmaker = bookmakers[seed % len(bookmakers)]
+                    if rng.random() < 0.5:
+                        manager.add_event(make_event(number, bookmaker))
+                    else:
+                        manager.remove_event_by_id(bookmaker, str(number))
+                    writes += 1
+                if mode == "snapshot":
+                    manager.publish()
+            with counters_lock:
+                counters["writes"] += writes
+
+        async def reader() -> None:
+            while not stop.is_set():
+                seen = 0
+                try:
+                    if mode == "snapshot":
+                        board = manager.snapshot()
+                        for bookmaker_events in board.get_all_events().values():
+                            seen += len(bookmaker_events)
+                    elif mode == "lock":
+                        with manager._lock:
+                            for bookmaker_events in manager.get_all_events().values():
+                                seen += len(bookmaker_events)
+                    else:
+                        for bookmaker_events in manager.get_all_events().values():
+                            seen += len(bookmaker_events)
+                except RuntimeError:  # dict changed size during iteration
+                    counters["errors"] += 1
+                counters["reads"] += 1
+                counters["events_read"] += seen
+                await asyncio.sleep(0)
+
+        async def read_all() -> None:
+            await asyncio.gather(*(reader() for _ in range(readers)))
+
+        threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(writers)]
+        reader_thread = threading.Thread(target=asyncio.run, args=(read_all(),))
+        for thread in threads + [reader_thread]:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads + [reader_thread]:
+            thread.join()
+
+        if mode == "snapshot":
+            # Опубликованная версия совпадает с живой линией после последней публикации
+            manager.publish()
+            board = manager.snapshot()
+            assert dict(board.get_all_events()) == manager.get_all_events()
+            assert all(
+                dict(board.get_same_events(key)) == bookmaker_events
+                for key, bookmaker_events in manager.get_all_events().items()
+            )
+        return {name: value / duration for name, value in counters.items()}
+
+    for mode in ("snapshot", "lock", "unsafe"):
+        with contextlib.redirect_stdout(io.StringIO()):  # EventManager печатает удаления
+            result = run_mode(mode)
+        print(
+            f"{mode}: {result['writes']:.0f} writes/s, {result['reads']:.0f} board reads/s, "
+            f"{result['events_read'] / 1e6:.1f}M events/s read, "
+            f"{result['errors'] * duration:.0f} iteration errors"
+        )
+
+
+if __name__ == "__main__":
+    run()
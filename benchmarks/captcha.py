@@ -0,0 +1,114 @@
+"""Задержка входа с проверкой CAPTCHA на локальной замене сервиса проверки.
+
+Сравнивает сессию на каждую проверку (как было) с общей сессией и кешем
+проверенных токенов, а также замену, которая не отвечает.
+Запуск из корня репозитория: ``python -m benchmarks.captcha [redis-url]``;
+без адреса используется fakeredis на loopback TCP. Замена работает по HTTP,
+поэтому TLS-рукопожатие новой сессии с настоящим сервисом в замер не входит.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import List
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.redis_server import run_with_redis
+from forkscan.api.security_system import BanCache, SecuritySystem
+from forkscan.core.config import settings
+
+
+async def siteverify(request: web.Request) -> web.Response:
+    form = await request.post()
+    if form["response"] == "hang":
+        await asyncio.sleep(60)
+    return web.json_response({"success": form["response"].startswith("ok")})
+
+
+async def legacy_verify(token: str) -> bool:
+    # Проверка до общей сессии: новое подключение на каждый вызов
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            settings.captcha_verify_url,
+            data={"secret": settings.captcha_secret_key, "response": token},
+        ) as response:
+            return (await response.json()).get("success", False)
+
+
+def run(url=None, logins: int = 300) -> None:
+    async def measure(login, tokens) -> List[float]:
+        latencies = []
+        for number, token in enumerate(tokens):
+            started = time.perf_counter()
+            await login(f"captcha-bench-{number}", token)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def report(name: str, latencies: List[float]) -> None:
+        latencies.sort()
+        print(
+            f"{name:<28} p50 {statistics.median(latencies) * 1000:6.2f}ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f}ms"
+        )
+
+    async def main(connect) -> None:
+        app = web.Application()
+        app.router.add_post("/siteverify", siteverify)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        settings.captcha_verify_url = f"http://127.0.0.1:{port}/siteverify"
+        settings.captcha_secret_key = "benchmark"
+        settings.captcha_required = True
+        settings.captcha_timeout = 0.2
+
+        client = connect()
+        session = aiohttp.ClientSession()
+        security = SecuritySystem(client, BanCache(0), http_session=session)
+
+        async def legacy_login(identifier: str, token: str) -> None:
+            if await legacy_verify(token):
+                await security.check_attempt(identifier)
+
+        async def login(identifier: str, token: str) -> None:
+            await security.handle_login_attempt(identifier, token)
+
+        async def legacy_verify_only(identifier: str, token: str) -> None:
+            await legacy_verify(token)
+
+        async def verify_only(identifier: str, token: str) -> None:
+            await security.verify_captcha(token)
+
+        try:
+            cache_ttl, settings.captcha_cache_ttl = settings.captcha_cache_ttl, 0
+            report(
+                "verify: session per call",
+                await measure(legacy_verify_only, [f"ok-{n}" for n in range(logins)]),
+            )
+            report("verify: shared session", await measure(verify_only, ["ok"] * logins))
+            settings.captcha_cache_ttl = cache_ttl
+            report(
+                "session per verification",
+                await measure(legacy_login, [f"ok-legacy-{n}" for n in range(logins)]),
+            )
+            tokens = [f"ok-{n}" for n in range(logins)]
+            report("shared session", await measure(login, tokens))
+            report("retry, cached token", await measure(login, tokens))
+            report("stand-in not answering", await measure(login, ["hang"] * 5))
+        finally:
+            await session.close()
+            await client.delete(*await client.keys("captcha:*"))
+            await client.delete(*await client.keys("*captcha-bench-*"))
+            await client.aclose()
+            await runner.cleanup()
+
+    run_with_redis(url, main)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
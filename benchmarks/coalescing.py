@@ -0,0 +1,142 @@
+"""Записанный всплеск фреймов Betboom через BetboomParser и UpdateCoalescer.
+
+Фреймы проходят весь путь потокового парсера: FeedReplayer отдаёт запись по
+WebSocket с максимальной скоростью, BetboomParser разбирает protobuf (decode),
+тики склеиваются UpdateCoalescer перед медленным потребителем. Без каталога
+записи всплеск синтезируется и записывается через FeedRecorder.
+
+Запуск из корня репозитория: ``python -m benchmarks.coalescing [каталог записи]``.
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from forkscan.core.odds import OddsStore, OddsTick
+from forkscan.core.types import EventManager
+from forkscan.infrastructure.replay.recorder import FeedRecorder
+from forkscan.infrastructure.replay.replayer import FeedReplayer
+from forkscan.infrastructure.replay.segments import RecordKind, iter_records
+from forkscan.parsers.betboom import BETBOOM_WS_URL, OUTCOME_MARKETS, BetboomParser
+from forkscan.parsers.betboomtest.market_betstats_ws_pb2 import (
+    BetstatsChanged,
+    MainResponse,
+    Outcome,
+)
+from forkscan.services.coalescing import UpdateCoalescer
+
+
+def record_burst(directory: Path, frames: int, matches: int, outcomes_per_frame: int) -> None:
+    """Записывает frames фреймов betstats_changed по matches матчам за одну секунду."""
+    rng = random.Random(0)
+    outcomes = list(OUTCOME_MARKETS)
+    clock = 1_700_000_000.0
+    with FeedRecorder(directory, clock=lambda: clock) as recorder:
+        for number in range(frames):
+            changed = BetstatsChanged()
+            for _ in range(outcomes_per_frame):
+                market_id, outcome_id = rng.choice(outcomes)
+                changed.outcomes.append(
+                    Outcome(
+                        match_id=rng.randrange(matches),
+                        market_id=market_id,
+                        outcome_id=outcome_id,
+                        specifier="total=2.5" if market_id in (18, 19, 20) else "",
+                        odds=1.5 + number % 100 / 100,
+                    )
+                )
+            recorder.record_ws(
+                BETBOOM_WS_URL, MainResponse(betstats_changed=changed).SerializeToString()
+            )
+            clock += 1 / frames
+
+
+def scan_recording(directory: Path) -> Tuple[int, List[str]]:
+    """Число входящих фреймов записи и match_id их исходов: на них подписывается парсер."""
+    frames, matches = 0, set()
+    for record in iter_records(directory, RecordKind.WS_RECV):
+        frames += 1
+        response = MainResponse.FromString(record.payload)
+        if response.WhichOneof("type") == "betstats_changed":
+            matches.update(outcome.match_id for outcome in response.betstats_changed.outcomes)
+        elif response.WhichOneof("type") == "betstats_outcome_changed":
+            matches.add(response.betstats_outcome_changed.match_id)
+    return frames, [str(match_id) for match_id in sorted(matches)]
+
+
+async def replay(directory: Path, consumer_delay: float, window: float) -> None:
+    store = OddsStore()
+    consumed = 0
+
+    async def consumer(batch: List[OddsTick]) -> None:
+        nonlocal consumed
+        consumed += len(batch)
+        for tick in batch:
+            store.apply(tick)
+        await asyncio.sleep(consumer_delay)
+
+    total, matches = scan_recording(directory)
+    coalescer = UpdateCoalescer(consumer, window=window)
+    async with FeedReplayer(directory, speed=None) as replayer:
+        parser = BetboomParser(
+            EventManager(),
+            store,
+            url=replayer.ws_url(BETBOOM_WS_URL),
+            coalescer=coalescer,
+            log_sample_every=0,
+            # Реплеер закрывает соединение в конце записи: повтор всплеска не нужен
+            backoff_initial=3600.0,
+            max_queue=total + 1,
+        )
+        coalescer.start()
+        await parser.start()
+        while not parser.stats()["connections"][0]["connected"]:
+            await asyncio.sleep(0.01)
+        # Реплеер начинает поток после первой подписки; остальные уходят, пока идёт чтение
+        started = time.perf_counter()
+        for match_id in matches:
+            await parser.watch(match_id, f"match:{match_id}")
+        while parser.frames < total or parser.stats()["queue_depth"]:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        await parser.stop()
+        await coalescer.stop()
+
+    stats, coalesced = parser.stats(), coalescer.stats()
+    print(f"frames: {stats['frames']}, elapsed: {elapsed:.3f}s ({total / elapsed:,.0f} frames/s)")
+    print(
+        f"updates: {stats['updates']}, dropped frames: {stats['dropped']}, "
+        f"latency p50/p99: {stats['latency_p50_ms']:.2f}/{stats['latency_p99_ms']:.2f} ms"
+    )
+    print(
+        f"forwarded: {coalesced['forwarded']}, merged: {coalesced['merged']}, "
+        f"batches: {coalesced['batches']}, backpressure waits: {coalesced['backpressure_waits']}"
+    )
+    print(f"consumer saw {consumed} updates instead of {stats['updates']}")
+
+
+def run(
+    directory: Optional[Path] = None,
+    frames: int = 100_000,
+    matches: int = 200,
+    outcomes_per_frame: int = 4,
+    consumer_delay: float = 0.005,
+    window: float = 0.05,
+) -> None:
+    """Воспроизводит запись из directory или синтезированный всплеск из frames фреймов."""
+    if directory is not None:
+        asyncio.run(replay(Path(directory), consumer_delay, window))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        record_burst(Path(tmp), frames, matches, outcomes_per_frame)
+        print(f"recorded {frames} frames in {time.perf_counter() - started:.1f}s")
+        asyncio.run(replay(Path(tmp), consumer_delay, window))
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,90 @@
+"""Запросы EventManager.query по вторичным индексам против полного перебора.
+
+Запуск из корня репозитория: ``python -m benchmarks.event_query``.
+"""
+
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict, List
+
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventKey, EventManager, EventStatus, SportType
+
+
+def make_board(events: int, now: datetime, seed: int = 0) -> EventManager:
+    """Линия из events случайных событий в пределах недели от now."""
+    rng = random.Random(seed)
+    manager = EventManager()
+    sports = list(SportType)
+    for number in range(events):
+        manager.add_event(
+            SportEvent.create(
+                bookmaker=rng.choice(list(BookmakerName)),
+                bookmaker_id=str(number),
+                start_time=int(
+                    (now + timedelta(minutes=rng.randint(-120, 7 * 24 * 60))).timestamp()
+                ),
+                tournament_name=f"League {number % 500}",
+                team1=f"team{number}a",
+                team2=f"team{number}b",
+                sport_type=rng.choice(sports),
+                status=rng.choice(["prematch", "prematch", "prematch", "live"]),
+            )
+        )
+    return manager
+
+
+def scan(manager: EventManager, filters: Dict) -> List[EventKey]:
+    """Тот же отбор, что query, полным перебором get_all_events."""
+    result = []
+    for key, bookmaker_events in manager.get_all_events().items():
+        for event in bookmaker_events.values():
+            if (
+                ("sport" not in filters or event.sport_type == filters["sport"])
+                and ("status" not in filters or event.status == filters["status"])
+                and ("league" not in filters or event.league.lower() == filters["league"])
+                and ("start_from" not in filters or event.start_time >= filters["start_from"])
+                and ("start_to" not in filters or event.start_time < filters["start_to"])
+            ):
+                result.append(key)
+                break
+    return result
+
+
+def query_cases(now: datetime) -> Dict[str, Dict]:
+    return {
+        "live football, next 2h": dict(
+            sport=SportType.FOOTBALL, status=EventStatus.LIVE, start_to=now + timedelta(hours=2)
+        ),
+        "league": dict(league="league 42"),
+        "tennis, next 24h": dict(
+            sport=SportType.TENNIS, start_from=now, start_to=now + timedelta(hours=24)
+        ),
+    }
+
+
+def run(events: int = 100_000, repeats: int = 20) -> None:
+    now = datetime.now(UTC)
+    started = time.perf_counter()
+    manager = make_board(events, now)
+    print(f"{events} events indexed in {time.perf_counter() - started:.2f}s")
+
+    for name, filters in query_cases(now).items():
+        started = time.perf_counter()
+        for _ in range(repeats):
+            indexed = manager.query(**filters)
+        indexed_time = (time.perf_counter() - started) / repeats
+        started = time.perf_counter()
+        for _ in range(repeats):
+            scanned = scan(manager, filters)
+        scan_time = (time.perf_counter() - started) / repeats
+        assert set(indexed) == set(scanned)
+        print(
+            f"{name}: {len(indexed)} results, index {indexed_time * 1000:.2f}ms, "
+            f"scan {scan_time * 1000:.2f}ms ({scan_time / indexed_time:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,101 @@
+"""Выборы лидера на fakeredis с падениями и зависаниями лидера.
+
+Падение — экземпляр исчезает, не отдав аренду. Зависание — продление не
+доходит до Redis, часы процесса стоят, а работа лидера продолжает писать:
+её записи должен отклонить фенсинг. Проверяется, что токены записей в потоке
+не убывают, и замеряется время переключения. Запуск из корня репозитория:
+``python -m benchmarks.leader_failover``.
+"""
+
+import asyncio
+import time
+from typing import Dict, List
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.services.leadership import LeaderElector, LeaderLease, Leadership, LeaseLostError
+
+
+def run(instances: int = 3, ttl: float = 1.0, rounds: int = 3) -> None:
+    async def main() -> None:
+        server = FakeServer()
+        stream = "forkscan:test:writes"
+        rejected = 0
+
+        def make_lead(lease: LeaderLease) -> Leadership:
+            async def lead(token: int) -> None:
+                nonlocal rejected
+                while True:
+                    try:
+                        await lease.xadd(stream, {b"owner": lease.owner, b"token": token}, 10_000)
+                    except LeaseLostError:
+                        rejected += 1
+                        raise
+                    await asyncio.sleep(0.01)
+
+            return lead
+
+        electors: Dict[str, LeaderElector] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def start(owner: str) -> None:
+            lease = LeaderLease(FakeRedis(server=server), "test", owner=owner, ttl=ttl)
+            electors[owner] = LeaderElector(lease, make_lead(lease), retry_interval=0.05)
+            tasks[owner] = asyncio.create_task(electors[owner].run())
+
+        async def hang(*args) -> bool:
+            await asyncio.Event().wait()
+            return False
+
+        async def leader(after: int = 0) -> LeaderElector:
+            # Зависший бывший лидер тоже считает себя лидером: берём новейший токен
+            while True:
+                leaders = [e for e in electors.values() if e.is_leader and e.lease.token > after]
+                if leaders:
+                    return max(leaders, key=lambda e: e.lease.token)
+                await asyncio.sleep(0.005)
+
+        for number in range(instances):
+            start(f"scanner-{number}")
+
+        failovers: List[float] = []
+        current = await leader()
+        for round_number in range(rounds * 2):
+            await asyncio.sleep(0.3)
+            owner, token = current.lease.owner, current.lease.token
+            started = time.monotonic()
+            if round_number % 2 == 0:
+                # Падение: аренда не отдаётся, её освобождает только TTL
+                current.lease._lose()
+                tasks.pop(owner).cancel()
+                del electors[owner]
+                start(f"{owner}-restarted")
+            else:
+                current.lease.renew = hang
+                current.lease._valid_until = float("inf")
+            current = await leader(after=token)
+            failovers.append(time.monotonic() - started)
+
+        await asyncio.sleep(0.3)
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        client = FakeRedis(server=server)
+        tokens = [int(fields[b"token"]) for _, fields in await client.xrange(stream)]
+        await client.aclose()
+        assert tokens == sorted(tokens), "a stale leader wrote after a newer one"
+        assert rejected >= rounds, "stale leaders were not fenced off"
+        print(
+            f"{len(tokens)} fenced writes from {len(set(tokens))} leader terms, "
+            f"failover avg {sum(failovers) / len(failovers) * 1000:.0f}ms "
+            f"max {max(failovers) * 1000:.0f}ms (ttl {ttl * 1000:.0f}ms), "
+            f"stale writes rejected: {rejected}"
+        )
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()
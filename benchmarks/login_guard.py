@@ -0,0 +1,88 @@
+"""Задержка проверки входа: прежняя последовательность команд против Lua-скрипта.
+
+Запуск из корня репозитория: ``python -m benchmarks.login_guard [redis-url]``;
+без адреса используется fakeredis на loopback TCP.
+"""
+
+import logging
+import sys
+import time
+from typing import List
+
+import redis.asyncio as redis
+
+from benchmarks.redis_server import run_with_redis
+from forkscan.api.security_system import BAN_HISTORY_TTL, BanCache, SecuritySystem
+from forkscan.core.config import settings
+
+
+async def legacy_check(client: redis.Redis, identifier: str) -> bool:
+    # Последовательность до скрипта: до семи кругов до Redis на попытку
+    ban_key, rate_key, ban_history_key = SecuritySystem._keys(identifier)
+    if await client.ttl(ban_key) > 0:
+        return False
+    attempts = await client.incr(rate_key)
+    if attempts == 1:
+        await client.expire(rate_key, settings.rate_limit_window)
+    if attempts > settings.rate_limit_max_requests:
+        ban_count = int(await client.get(ban_history_key) or 0)
+        ban_time = settings.initial_ban_time * settings.ban_multiplier**ban_count
+        ban_time = min(int(ban_time), settings.max_ban_time)
+        await client.set(ban_key, 1, ex=ban_time)
+        await client.incr(ban_history_key)
+        await client.expire(ban_history_key, BAN_HISTORY_TTL)
+        await client.get(ban_history_key)
+        return False
+    return True
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return sorted(samples)[min(int(q * len(samples)), len(samples) - 1)] * 1e6
+
+
+def run(url=None, clients: int = 50, rounds: int = 60) -> None:
+    async def measure(client: redis.Redis, check) -> List[float]:
+        await client.flushdb()
+        latencies: List[float] = []
+        # Клиенты ходят по очереди и продолжают после лимита: замеряются и решение
+        # о бане, и попытки под действующим баном
+        for _ in range(rounds):
+            for number in range(clients):
+                started = time.perf_counter()
+                await check(f"10.0.{number // 256}.{number % 256}")
+                latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def main(connect) -> None:
+        client = connect()
+        security = SecuritySystem(client, BanCache(0))  # каждая попытка идёт в Redis
+        security.logger.setLevel(logging.ERROR)  # баны здесь намеренные
+
+        # Отправленные команды: часть задержки, которая растёт с кругом по сети
+        commands = 0
+        execute_command = client.execute_command
+
+        async def counted(*args, **kwargs):
+            nonlocal commands
+            commands += 1
+            return await execute_command(*args, **kwargs)
+
+        client.execute_command = counted
+        for name, check in (
+            ("legacy", lambda identifier: legacy_check(client, identifier)),
+            ("script", security.check_attempt),
+        ):
+            latencies = await measure(client, check)
+            print(
+                f"{name}: {len(latencies)} attempts, "
+                f"{(commands - 1) / len(latencies):.2f} round trips/attempt, "
+                f"p50 {percentile(latencies, 0.5):.0f}us, p99 {percentile(latencies, 0.99):.0f}us"
+            )
+            commands = 0
+        await client.aclose()
+
+    run_with_redis(url, main)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,98 @@
+"""Пропускная способность и p99 смешанной нагрузки: входы (bcrypt) и лёгкие запросы.
+
+Входы приходят с постоянной частотой из ``login_rates``; лёгкие запросы (чтение
+линии) выполняются в цикле ``data_concurrency`` клиентами. Сравниваются bcrypt
+прямо в обработчике и через PasswordHasher.
+Запуск из корня репозитория: ``python -m benchmarks.passwords``.
+"""
+
+import asyncio
+import os
+import time
+
+from forkscan.services.passwords import HasherOverloadedError, PasswordHasher, make_context
+
+
+def p99(values) -> float:
+    values.sort()
+    return values[int(len(values) * 0.99)] * 1000 if values else float("nan")
+
+
+def run(
+    seconds: float = 5.0,
+    login_rates: tuple = (5.0, 20.0),
+    data_concurrency: int = 20,
+    rounds: int = 10,
+) -> None:
+    context = make_context(rounds)
+    stored = context.hash("correct horse")
+    workers = os.cpu_count() or 1
+
+    async def scenario(name: str, verify, logins_per_second: float) -> None:
+        login_latencies, data_latencies = [], []
+        shed = 0
+        deadline = time.perf_counter() + seconds
+
+        async def login():
+            nonlocal shed
+            started = time.perf_counter()
+            try:
+                await verify("correct horse", stored)
+            except HasherOverloadedError:
+                shed += 1
+                return
+            login_latencies.append(time.perf_counter() - started)
+
+        async def data_client():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await asyncio.sleep(0)  # обработчик без тяжёлой работы
+                data_latencies.append(time.perf_counter() - started)
+
+        async def login_source():
+            tasks = []
+            while time.perf_counter() < deadline:
+                tasks.append(asyncio.create_task(login()))
+                await asyncio.sleep(1 / logins_per_second)
+            await asyncio.gather(*tasks)
+
+        started = time.perf_counter()
+        await asyncio.gather(login_source(), *(data_client() for _ in range(data_concurrency)))
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<24} data {len(data_latencies) / elapsed:8.0f} req/s "
+            f"p99 {p99(data_latencies):6.2f}ms max {max(data_latencies) * 1000:6.1f}ms | "
+            f"logins {len(login_latencies) / elapsed:5.1f}/s p99 {p99(login_latencies):7.1f}ms "
+            f"shed {shed}"
+        )
+
+    async def inline(password, hashed):
+        return context.verify(password, hashed)
+
+    async def main():
+        started = time.perf_counter()
+        context.verify("correct horse", stored)
+        print(
+            f"bcrypt rounds={rounds}: {(time.perf_counter() - started) * 1000:.0f}ms per verify, "
+            f"{workers} CPU"
+        )
+        for logins_per_second in login_rates:
+            print(f"{logins_per_second:g} logins/s offered")
+            await scenario("  bcrypt in handler", inline, logins_per_second)
+            hasher = PasswordHasher(context, workers=workers, max_queue=4 * workers)
+            await scenario(
+                f"  pool {workers}+{4 * workers} queue", hasher.verify, logins_per_second
+            )
+            hasher.close()
+
+        # Смена стоимости: старый хеш перехешируется при входе
+        upgraded = PasswordHasher(make_context(rounds + 1), workers=workers)
+        verified, new_hash = await upgraded.verify_and_update("correct horse", stored)
+        print(f"rounds {rounds} -> {rounds + 1}: verified {verified}, rehashed {new_hash[:7]}")
+        upgraded.close()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,87 @@
+"""Задержка запроса к пустому обработчику без RateLimitMiddleware и с ним.
+
+Запуск из корня репозитория: ``python -m benchmarks.rate_limit [redis-url]``;
+без адреса используется fakeredis на loopback TCP, поэтому каждая проверка
+платит круг по сокету, а Lua выполняется эмуляцией медленнее настоящего Redis.
+"""
+
+import statistics
+import sys
+import time
+
+from benchmarks.redis_server import run_with_redis
+from forkscan.api.rate_limit import RateLimitMiddleware
+from forkscan.core.config import RateLimitRule
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def call(app, path: str, client: str) -> int:
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app({"type": "http", "path": path, "client": (client, 40000)}, None, send)
+    return status[0]
+
+
+def run(url=None, requests: int = 2_000, clients: int = 200) -> None:
+    async def measure(app, path: str, client) -> tuple:
+        latencies, codes = [], []
+        for number in range(requests):
+            started = time.perf_counter()
+            codes.append(await call(app, path, client(number)))
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        return (
+            statistics.median(latencies) * 1e6,
+            latencies[int(len(latencies) * 0.99)] * 1e6,
+            codes.count(429),
+        )
+
+    def report(name: str, result: tuple) -> None:
+        p50, p99, rejected = result
+        print(f"{name:<34} p50 {p50:7.0f}us  p99 {p99:7.0f}us  429: {rejected}/{requests}")
+
+    async def main(connect) -> None:
+        client = connect()
+        groups = {
+            "default": RateLimitRule(prefixes=[""], capacity=10**6, refill_rate=10**6),
+            "auth": RateLimitRule(prefixes=["/auth"], capacity=10, refill_rate=0.2),
+        }
+        limited = RateLimitMiddleware(endpoint, groups, redis_client=client, enabled=True)
+        report("no middleware", await measure(endpoint, "/users/me", lambda n: "10.0.0.1"))
+        report(
+            f"allowed, {clients} clients",
+            await measure(limited, "/users/me", lambda n: f"10.0.1.{n % clients}"),
+        )
+        report(
+            "one client flooding /auth", await measure(limited, "/auth/login", lambda n: "10.9.9.9")
+        )
+        print(
+            f"  checks {limited.checked}, rejected by Redis {limited.rejected}, "
+            f"locally {limited.rejected_locally}"
+        )
+
+        # Два воркера делят одно ведро: вместе они пропускают около его ёмкости
+        workers = [
+            RateLimitMiddleware(endpoint, groups, redis_client=client, enabled=True)
+            for _ in range(2)
+        ]
+        allowed = 0
+        for number in range(100):
+            allowed += await call(workers[number % 2], "/auth/login", "10.8.8.8") == 200
+        print(f"two workers, one client, capacity 10: {allowed}/100 allowed")
+        await client.delete(*await client.keys("rate_limit:*"))
+        await client.aclose()
+
+    run_with_redis(url, main)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,36 @@
+"""Redis для замеров: адрес из командной строки или fakeredis на loopback TCP."""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+
+Connect = Callable[[], redis.Redis]
+
+
+def run_with_redis(url: Optional[str], main: Callable[[Connect], Awaitable[None]]) -> None:
+    """Выполняет ``main(connect)`` с Redis по ``url`` или, по умолчанию, с сервером
+    fakeredis на loopback TCP, чтобы каждая команда платила настоящий круг по сокету.
+
+    fakeredis выполняет Lua-скрипты нескольких соединений небезопасно, поэтому
+    замеры с ним отправляют скрипты последовательно.
+    """
+    server = None
+    if url is None:
+        from fakeredis import TcpFakeServer
+
+        server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+
+    def connect() -> redis.Redis:
+        if server is None:
+            return redis.Redis.from_url(url, decode_responses=True)
+        return redis.Redis(host=host, port=port, decode_responses=True)
+
+    try:
+        asyncio.run(main(connect))
+    finally:
+        if server is not None:
+            server.shutdown()
@@ -0,0 +1,47 @@
+"""Время загрузки и пиковый RSS процесса для N включённых букмекеров.
+
+Запуск из корня репозитория: ``python -m benchmarks.registry_startup``.
+Каждый замер идёт в отдельном процессе, чтобы импорты прошлых замеров не
+попадали в следующий. Только Unix (модуль resource).
+"""
+
+import resource
+import subprocess
+import sys
+import time
+from typing import Iterable, List
+
+from forkscan.core.types import BookmakerName
+from forkscan.parsers.registry import ParserRegistry
+
+
+def probe(names: List[str]) -> None:
+    """Загружает парсеры и печатает время старта и пиковый RSS текущего процесса."""
+    started = time.perf_counter()
+    registry = ParserRegistry(BookmakerName[name] for name in names)
+    loaded = registry.enabled_parsers()
+    elapsed = time.perf_counter() - started
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{len(names)}\t{len(loaded)}\t{elapsed * 1000:.1f}\t{rss_kb / 1024:.1f}")
+
+
+def measure(counts: Iterable[int] = (1, 6, 12)) -> None:
+    # Сначала букмекеры с зарегистрированным парсером, чтобы замер отражал реальные импорты
+    available = ParserRegistry().available()
+    members = [
+        bookmaker.name
+        for bookmaker in sorted(BookmakerName, key=lambda b: (b not in available, b.value))
+    ]
+    print("enabled\tloaded\tstartup_ms\tmax_rss_mb")
+    for count in counts:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.registry_startup", "--probe", *members[:count]],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--probe"]:
+        probe(sys.argv[2:])
+    else:
+        measure()
@@ -0,0 +1,101 @@
+"""Задержка репликации линии через Redis под нагрузкой парсеров, на fakeredis.
+
+Одна реплика запускается до сканера, остальные подключаются к работающему.
+Запуск из корня репозитория: ``python -m benchmarks.replication``.
+"""
+
+import asyncio
+import contextlib
+import io
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from typing import List
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventManager, SportType
+from forkscan.services.arbitrage import Fork
+from forkscan.services.lanes import Lane
+from forkscan.services.replication import BoardPublisher, BoardReplica
+
+
+def run(replicas: int = 4, events: int = 20_000, duration: float = 5.0) -> None:
+    now = datetime.now(UTC)
+    bookmakers, sports = list(BookmakerName), list(SportType)
+
+    def make_event(number: int, bookmaker: BookmakerName) -> SportEvent:
+        return SportEvent.create(
+            bookmaker=bookmaker,
+            bookmaker_id=str(number),
+            start_time=int((now + timedelta(minutes=number % 10_000)).timestamp()),
+            tournament_name=f"League {number % 300}",
+            team1=f"team{number}a",
+            team2=f"team{number}b",
+            sport_type=sports[number % len(sports)],
+            status="prematch",
+        )
+
+    manager = EventManager()
+    for number in range(events):
+        manager.add_event(make_event(number, bookmakers[number % len(bookmakers)]))
+    manager.publish()
+
+    async def main() -> List[str]:
+        server = FakeServer()
+        publisher = BoardPublisher(FakeRedis(server=server), manager)
+        late = [BoardReplica(FakeRedis(server=server)) for _ in range(replicas - 1)]
+        early = BoardReplica(FakeRedis(server=server), block=100)
+        tasks = [asyncio.create_task(early.run())]
+        await asyncio.sleep(0.2)
+        tasks.append(asyncio.create_task(publisher.run(0.05)))
+        await asyncio.sleep(0.5)
+        tasks += [asyncio.create_task(replica.run()) for replica in late]
+
+        rng = random.Random(0)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        while loop.time() < deadline:
+            # Цикл парсера: пачка изменений и публикация версии
+            for _ in range(200):
+                number = rng.randrange(events * 2)
+                bookmaker = rng.choice(bookmakers)
+                if rng.random() < 0.5:
+                    manager.add_event(make_event(number, bookmaker))
+                else:
+                    manager.remove_event_by_id(bookmaker, str(number))
+            manager.publish()
+            publisher.submit_forks(Lane.LIVE, [Fork("team1a|team1b", (), 1.0, time.time())])
+            await asyncio.sleep(0.05)
+
+        final = manager.snapshot()
+        while any(r.board.version != final.version for r in [early, *late]):
+            await asyncio.sleep(0.05)
+        while tasks:
+            # fakeredis иногда теряет отмену блокирующего XREAD: отменяем до завершения
+            for task in tasks:
+                task.cancel()
+            _, pending = await asyncio.wait(tasks, timeout=0.5)
+            tasks = list(pending)
+
+        expected = {key: dict(value) for key, value in final.events.items()}
+        lines = [f"published {publisher.published} deltas, final version {final.version}"]
+        for name, replica in [("early", early), *(("late", r) for r in late)]:
+            assert {k: dict(v) for k, v in replica.board.events.items()} == expected
+            stats = replica.stats()
+            lines.append(
+                f"{name} replica: applied {stats['applied']}, resyncs {stats['resyncs']}, "
+                f"lag p50 {stats['lag']['p50_ms']:.1f}ms p99 {stats['lag']['p99_ms']:.1f}ms, "
+                f"forks {len(replica.forks)}"
+            )
+        return lines
+
+    with contextlib.redirect_stdout(io.StringIO()):  # EventManager печатает удаления
+        lines = asyncio.run(main())
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    run()
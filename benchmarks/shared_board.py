@@ -0,0 +1,122 @@
+"""Задержка чтения линии из разделяемой памяти из N процессов-воркеров.
+
+Писатель тем временем публикует линию каждые 50 мс, поэтому замер проверяет и
+повторы чтения seqlock под нагрузкой. Запуск из корня репозитория:
+``python -m benchmarks.shared_board``.
+"""
+
+import multiprocessing
+import random
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict, List
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import (
+    BookmakerName,
+    EventKey,
+    EventManager,
+    MarketType,
+    SportType,
+    event_id,
+)
+from forkscan.infrastructure.board.layout import encode_board
+from forkscan.infrastructure.board.shared import SharedBoardReader, SharedBoardWriter
+
+
+def lookup_worker(name: str, events: int, lookups: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    reader = SharedBoardReader(name)
+    latencies: List[float] = []
+    found = 0
+    for _ in range(lookups):
+        number = rng.randrange(events)
+        key = EventKey.create(f"team{number}a", f"team{number}b")
+        started = time.perf_counter()
+        same_events = reader.get_same_events(key)
+        reader.event_markets(event_id(key))
+        latencies.append(time.perf_counter() - started)
+        found += bool(same_events)
+    reader.close()
+    latencies.sort()
+    return {
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "found": found,
+        "retries": reader.retries,
+    }
+
+
+def build_board(events: int):
+    random.seed(0)
+    manager, store = EventManager(), OddsStore()
+    now = datetime.now(UTC)
+    bookmakers, sports, markets = list(BookmakerName), list(SportType), list(MarketType)
+    for number in range(events):
+        event = SportEvent.create(
+            bookmaker=random.choice(bookmakers),
+            bookmaker_id=str(number),
+            start_time=int((now + timedelta(minutes=random.randint(0, 7 * 24 * 60))).timestamp()),
+            tournament_name=f"League {number % 500}",
+            team1=f"team{number}a",
+            team2=f"team{number}b",
+            sport_type=random.choice(sports),
+            status="prematch",
+        )
+        manager.add_event(event)
+        for _ in range(6):
+            store.update(
+                event_id(event.create_key()),
+                random.choice(markets),
+                0.0,
+                random.choice(bookmakers),
+                2.0,
+                now.timestamp(),
+            )
+    manager.publish()
+    return manager, store
+
+
+def run(workers: tuple = (1, 2, 4, 8), events: int = 100_000, lookups: int = 5_000) -> None:
+    manager, store = build_board(events)
+    tables = encode_board(manager, store, manager.snapshot())
+
+    writer = SharedBoardWriter(f"forkscan-bench-{time.time_ns()}", 64 * 2**20)
+    started = time.perf_counter()
+    writer.publish(tables)
+    print(f"publish {events} events: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    stop = threading.Event()
+
+    def republish() -> None:
+        while not stop.is_set():
+            writer.publish(tables)
+            time.sleep(0.05)
+
+    thread = threading.Thread(target=republish)
+    thread.start()
+    context = multiprocessing.get_context("spawn")
+    try:
+        for count in workers:
+            with context.Pool(count) as pool:
+                results = pool.starmap(
+                    lookup_worker,
+                    [(writer.name, events, lookups, seed) for seed in range(count)],
+                )
+            print(
+                f"{count} workers: p50 {max(r['p50_us'] for r in results):.0f}us, "
+                f"p99 {max(r['p99_us'] for r in results):.0f}us, "
+                f"retries {sum(r['retries'] for r in results)}, "
+                f"found {sum(r['found'] for r in results)}/{count * lookups}"
+            )
+    finally:
+        stop.set()
+        thread.join()
+        print(f"generation {writer.generation}")
+        writer.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,6 +1,10 @@
+import aiohttp
 import redis.asyncio as redis
 from fastapi import Depends, Request
 
+from forkscan.core.config import settings
+from forkscan.infrastructure.board.shared import SharedBoardReader
+
 
 async def get_redis_client(request: Request) -> redis.Redis:
     """FastAPI Dependency для получения Redis из app.state."""
@@ -8,3 +12,29 @@ async def get_redis_client(request: Request) -> redis.Redis:
     if not redis_client:
         raise RuntimeError("Redis connection not available!")
     return redis_client
+
+
+async def get_http_session(request: Request) -> aiohttp.ClientSession:
+    """FastAPI Dependency для получения общей HTTP-сессии из app.state."""
+    session = request.app.state.http
+    if session is None or session.closed:
+        raise RuntimeError("HTTP session not available!")
+    return session
+
+
+async def get_shared_board(request: Request) -> SharedBoardReader:
+    """FastAPI Dependency для чтения линии сканера из разделяемой памяти.
+
+    Сегмент создаёт сканер на том же хосте, поэтому он открывается при первом
+    обращении: воркер API может стартовать раньше сканера.
+    """
+    board = request.app.state.shared_board
+    if board is None:
+        if settings.shared_board_name is None:
+            raise RuntimeError("Shared board is disabled!")
+        try:
+            board = SharedBoardReader.from_settings()
+        except FileNotFoundError as error:
+            raise RuntimeError("Shared board not available!") from error
+        request.app.state.shared_board = board
+    return board
@@ -0,0 +1,212 @@
+"""
+Token-bucket rate limiting for all API routes
+"""
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ..core.config import RateLimitRule, settings
+
+logger = logging.getLogger(__name__)
+
+# Refill and take tokens in one atomic step. Time comes from the Redis server,
+# so buckets shared by all workers do not depend on their clocks.
+# KEYS: bucket hash; ARGV: capacity, refill rate (tokens/second), cost
+# Returns {allowed, tokens left * 1000, retry after in ms}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    allowed = 1
+    tokens = tokens - cost
+else
+    retry_after = math.ceil((cost - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+-- A bucket left alone until full is the same as a missing one
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, math.floor(tokens * 1000), retry_after}
+"""
+
+Identify = Callable[[dict], str]
+
+
+def client_ip(scope: dict) -> str:
+    """Default identity: the client address of the connection"""
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+@dataclass
+class _LocalBucket:
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware limiting requests per (route group, identity) with token buckets
+
+    The shared bucket lives in Redis and is updated by one Lua script per
+    request. Each worker also keeps a local copy of every bucket it uses: a
+    worker's own requests can only drain the shared bucket further, so when the
+    local bucket is empty, or Redis recently answered with Retry-After, the
+    request is rejected without a round trip. If Redis is unavailable the
+    request is let through.
+    """
+
+    def __init__(
+        self,
+        app,
+        groups: Optional[Dict[str, RateLimitRule]] = None,
+        identify: Identify = client_ip,
+        redis_client: Optional[redis.Redis] = None,
+        max_local_buckets: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Args:
+            app: Wrapped ASGI application
+            groups: Route groups by name, settings.rate_limit_groups by default
+            identify: Returns the identity a request is counted against
+            redis_client: Redis client, app.state.redis of the application by default
+            max_local_buckets: Local bucket copies kept per worker
+            enabled: Turns limiting on or off, settings.rate_limit_enabled by default
+        """
+        self.app = app
+        groups = groups if groups is not None else settings.rate_limit_groups
+        # The longest matching prefix wins
+        self.prefixes: List[Tuple[str, str, RateLimitRule]] = sorted(
+            ((prefix, name, rule) for name, rule in groups.items() for prefix in rule.prefixes),
+            key=lambda entry: len(entry[0]),
+            reverse=True,
+        )
+        self.identify = identify
+        self.redis = redis_client
+        self.max_local_buckets = (
+            max_local_buckets
+            if max_local_buckets is not None
+            else settings.rate_limit_local_buckets
+        )
+        self.enabled = enabled if enabled is not None else settings.rate_limit_enabled
+        self._local: Dict[Tuple[str, str], _LocalBucket] = {}
+        self._script = None
+
+        self.checked = 0
+        self.rejected_locally = 0
+        self.rejected = 0
+
+    def match(self, path: str) -> Optional[Tuple[str, RateLimitRule]]:
+        """Route group of a path"""
+        for prefix, name, rule in self.prefixes:
+            if path.startswith(prefix):
+                return name, rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        group = self.match(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        name, rule = group
+        retry_after = await self._take(name, rule, self.identify(scope), scope)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+        else:
+            await self._reject(send, retry_after)
+
+    async def _take(
+        self, name: str, rule: RateLimitRule, identity: str, scope: dict
+    ) -> Optional[float]:
+        """Take a token; returns None if allowed, otherwise seconds to retry after"""
+        self.checked += 1
+        now = time.monotonic()
+        local = self._local_bucket((name, identity), rule, now)
+        if local.blocked_until > now:
+            self.rejected_locally += 1
+            return local.blocked_until - now
+        if local.tokens < 1:
+            self.rejected_locally += 1
+            return (1 - local.tokens) / rule.refill_rate
+        local.tokens -= 1
+
+        client = self._redis(scope)
+        if client is None:
+            return None
+        try:
+            allowed, _, retry_after_ms = await self._script(
+                keys=[f"rate_limit:{name}:{identity}"],
+                args=[rule.capacity, rule.refill_rate, 1],
+                client=client,
+            )
+        except redis.RedisError as e:
+            # Fail open: the local bucket still stops a single worker's flood
+            logger.warning(f"Rate limit check failed, letting the request through: {str(e)}")
+            return None
+        if allowed:
+            return None
+        local.blocked_until = time.monotonic() + retry_after_ms / 1000
+        self.rejected += 1
+        return retry_after_ms / 1000
+
+    def _local_bucket(self, key: Tuple[str, str], rule: RateLimitRule, now: float) -> _LocalBucket:
+        bucket = self._local.pop(key, None)
+        if bucket is None:
+            if len(self._local) >= self.max_local_buckets:
+                # Least recently used first: buckets are re-inserted on every request
+                del self._local[next(iter(self._local))]
+            bucket = _LocalBucket(tokens=rule.capacity, updated=now)
+        else:
+            bucket.tokens = min(
+                rule.capacity, bucket.tokens + (now - bucket.updated) * rule.refill_rate
+            )
+            bucket.updated = now
+        self._local[key] = bucket
+        return bucket
+
+    def _redis(self, scope: dict) -> Optional[redis.Redis]:
+        if self.redis is None:
+            # The client is created in the lifespan, after the middleware stack is built
+            app = scope.get("app")
+            self.redis = getattr(app.state, "redis", None) if app is not None else None
+        if self.redis is not None and self._script is None:
+            self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self.redis
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
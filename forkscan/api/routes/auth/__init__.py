@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from .current_user import get_current_user, invalidate_user, user_not_found
 from .login import router as login_router
 from .logout import router as logout_router
 from .refresh import router as refresh_router
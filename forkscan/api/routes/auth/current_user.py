@@ -0,0 +1,57 @@
+from typing import Optional
+
+import redis.asyncio as redis
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from forkscan.infrastructure.database.session import get_db
+from forkscan.services.auth_cache import AuthCache, CurrentUser, InvalidTokenError
+
+bearer = HTTPBearer(auto_error=False)
+# Подписка на инвалидации запускается в lifespan приложения
+auth_cache = AuthCache.from_settings()
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def user_not_found() -> HTTPException:
+    """401 for a token whose user no longer exists, e.g. deleted while cached"""
+    return _unauthorized("User not found")
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    session: AsyncSession = Depends(get_db),
+) -> CurrentUser:
+    """
+    Authenticated user of the request
+
+    Args:
+        credentials: Bearer access token
+        session: Database session, used only when the user is not cached
+
+    Returns:
+        CurrentUser snapshot; load the row into the session to modify the user
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid or expired, or the user is gone
+    """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = auth_cache.decode(credentials.credentials)
+    except InvalidTokenError:
+        raise _unauthorized("Invalid or expired token")
+
+    user = await auth_cache.user(session, claims["user_id"])
+    if user is None:
+        raise user_not_found()
+    return user
+
+
+async def invalidate_user(redis_client: redis.Redis, *user_ids: int):
+    """Drop cached users in every API worker after changing them in the database"""
+    await auth_cache.invalidate(redis_client, *user_ids)
@@ -1,11 +1,11 @@
 from datetime import UTC, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
-from forkscan.api.routes.auth.utils import pwd_context
+from forkscan.api.routes.auth.utils import verify_password
 from forkscan.api.schemas.models import UserLogin
 from forkscan.api.security_system import get_security_system
 from forkscan.core.config import settings
@@ -20,7 +20,6 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/login")
 async def login(
     data: UserLogin,
-    captcha_response: str = Form(...),
     session: AsyncSession = Depends(get_db),
     request: Request = None,
     security=Depends(get_security_system),
@@ -29,8 +28,7 @@ async def login(
     User login endpoint with security checks
 
     Args:
-        data: Login credentials
-        captcha_response: CAPTCHA verification token
+        data: Login credentials and CAPTCHA verification token
         session: Database session
         request: FastAPI request object
         security: Security system instance
@@ -45,7 +43,7 @@ async def login(
     ip = request.client.host
 
     # Проверяем безопасность
-    security_result = await security.handle_login_attempt(ip, captcha_response)
+    security_result = await security.handle_login_attempt(ip, data.captcha_response)
 
     if not security_result.success:
         error_detail = {
@@ -62,9 +60,15 @@ async def login(
         user = res.scalar_one_or_none()
 
         # Проверяем учетные данные
-        if not user or not pwd_context.verify(data.password, user.hashed_password):
+        verified, new_hash = (
+            await verify_password(data.password, user.hashed_password) if user else (False, None)
+        )
+        if not verified:
             # При неудачной попытке НЕ сбрасываем security_result
             raise HTTPException(status_code=400, detail="Invalid email or password")
+        if new_hash is not None:
+            # Стоимость bcrypt изменилась: сохраняем новый хеш вместе с refresh token
+            user.hashed_password = new_hash
 
         # При успешном входе сбрасываем все ограничения
         await security.reset_attempts(ip)
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from forkscan.api.deps import get_redis_client
-from forkscan.api.routes.auth.utils import get_ban_time_interval, pwd_context
+from forkscan.api.routes.auth.utils import get_ban_time_interval, hash_password
 from forkscan.api.schemas.models import UserRegister, UserResponse
 from forkscan.core.config import settings
 from forkscan.infrastructure.database.models import User
@@ -30,8 +30,8 @@ async def register(
     if attempts == 1:
         await redis_client.expire(key, 86400)  # 24 часа
 
-    min_attempts = settings.MIN_REGISTER_ATTEMPTS
-    max_attempts = settings.MAX_REGISTER_ATTEMPTS
+    min_attempts = settings.register_min_attempts
+    max_attempts = settings.register_max_attempts
 
     if attempts > max_attempts:
         ban_time = get_ban_time_interval(attempts, min_attempts)
@@ -67,7 +67,7 @@ async def register(
     my_promo_code = generate_promo_code()
 
     # Хешируем пароль
-    hashed_pw = pwd_context.hash(data.password)
+    hashed_pw = await hash_password(data.password)
 
     user = User(
         email=str(data.email),
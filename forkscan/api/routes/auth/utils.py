@@ -1,14 +1,49 @@
-from passlib.context import CryptContext
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
 
 from forkscan.core.config import settings
+from forkscan.services.passwords import HasherOverloadedError, PasswordHasher
+
+# bcrypt выполняется в пуле потоков, а не в event loop
+password_hasher = PasswordHasher.from_settings()
+pwd_context = password_hasher.context
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def hash_password(password: str) -> str:
+    """Хеширует пароль; при переполненной очереди хеширования — 503."""
+    try:
+        return await password_hasher.hash(password)
+    except HasherOverloadedError:
+        raise _overloaded()
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Проверяет пароль; при переполненной очереди хеширования — 503.
+
+    Returns:
+        Tuple[bool, Optional[str]]: совпал ли пароль и новый хеш, если
+        сохранённый сделан с другой стоимостью bcrypt.
+    """
+    try:
+        return await password_hasher.verify_and_update(password, hashed)
+    except HasherOverloadedError:
+        raise _overloaded()
 
 
 def get_ban_time(
     fails: int,
-    max_attempts: int = settings.max_failed_attempts,
-    min_attempts: int = settings.min_attempts_for_ban,
+    max_attempts: int = settings.rate_limit_max_requests,
+    min_attempts: int = settings.ban_threshold,
     initial_ban: int = settings.initial_ban_time,
     max_ban: int = settings.max_ban_time,
     multiplier: int = settings.ban_multiplier,
@@ -1,18 +1,20 @@
 from datetime import UTC, datetime, timedelta
 
+import redis.asyncio as redis
 from fastapi import APIRouter, Depends, HTTPException
 from jose import jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from forkscan.api.deps import get_redis_client
+from forkscan.api.routes.auth import invalidate_user
+from forkscan.api.routes.auth.utils import hash_password
 from forkscan.api.schemas.reset_password import ResetPasswordConfirm, ResetPasswordRequest
 from forkscan.core.config import settings
 from forkscan.infrastructure.database.models import User
 from forkscan.infrastructure.database.session import get_db
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 # 1. Запрос на сброс пароля
@@ -44,7 +46,11 @@ async def forgot_password(data: ResetPasswordRequest, session: AsyncSession = De
 
 # 2. Подтверждение сброса пароля
 @router.post("/reset-password")
-async def reset_password(data: ResetPasswordConfirm, session: AsyncSession = Depends(get_db)):
+async def reset_password(
+    data: ResetPasswordConfirm,
+    session: AsyncSession = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
     # Валидация токена
     try:
         payload = jwt.decode(
@@ -62,7 +68,8 @@ async def reset_password(data: ResetPasswordConfirm, session: AsyncSession = Dep
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
 
-    user.hashed_password = pwd_context.hash(data.new_password)
+    user.hashed_password = await hash_password(data.new_password)
     await session.commit()
+    await invalidate_user(redis_client, user.id)
 
     return {"msg": "Пароль успешно изменён"}
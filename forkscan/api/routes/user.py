@@ -1,11 +1,14 @@
 # api/routes/user.py
+import redis.asyncio as redis
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from forkscan.api.routes.auth import get_current_user
+from forkscan.api.deps import get_redis_client
+from forkscan.api.routes.auth import get_current_user, invalidate_user, user_not_found
 from forkscan.api.schemas.models import PromoCodeUpdate, UserOut
 from forkscan.domain.repositories.user_repository import UserRepository
 from forkscan.infrastructure.database.session import get_db
+from forkscan.services.auth_cache import CurrentUser
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -14,15 +17,24 @@ router = APIRouter(prefix="/users", tags=["users"])
 async def update_promo_code(
     body: PromoCodeUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
+    redis_client: redis.Redis = Depends(get_redis_client),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     repo = UserRepository(db)
     # Проверяем, не занят ли промокод
     existing = await repo.get_by_promo_code(body.new_promo_code)
     if existing:
         raise HTTPException(status_code=400, detail="Promo code already taken")
-    # Меняем промокод
-    current_user.promo_code = body.new_promo_code
-    await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    # Меняем промокод: current_user — снимок из кеша, строку возвращает сам UPDATE
+    user = await repo.update_promo_code(current_user.id, body.new_promo_code)
+    await invalidate_user(redis_client, current_user.id)
+    if user is None:
+        # Пользователь удалён, пока его снимок был в кеше
+        raise user_not_found()
+    return UserOut(
+        id=user.id,
+        email=user.email,
+        promo_code=user.promo_code,
+        referrer_id=user.referrer_id,
+        plan=current_user.plan,
+    )
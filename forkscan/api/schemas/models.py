@@ -18,6 +18,7 @@ class UserRegister(BaseModel):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+    captcha_response: str | None = None
 
 
 class UserResponse(BaseModel):
@@ -27,5 +28,13 @@ class UserResponse(BaseModel):
     referrer_id: int | None = None
 
 
+class UserOut(BaseModel):
+    id: int
+    email: str
+    promo_code: str | None = None
+    referrer_id: int | None = None
+    plan: str | None = None
+
+
 class PromoCodeUpdate(BaseModel):
     new_promo_code: constr(min_length=4, max_length=10)
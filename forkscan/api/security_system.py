@@ -4,8 +4,13 @@ Created: 2025-05-21
 Author: acmasok
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import math
+import time
+from typing import Dict, List, Optional
 
 import aiohttp
 import redis.asyncio as redis
@@ -13,7 +18,52 @@ from fastapi import Depends
 from pydantic import BaseModel
 
 from ..core.config import settings
-from .deps import get_redis_client
+from .deps import get_http_session, get_redis_client
+
+# Ban history is kept for 30 days
+BAN_HISTORY_TTL = 60 * 60 * 24 * 30
+
+# Whole rate-limit/ban decision in one round trip.
+# KEYS: ban, rate, ban_history
+# ARGV: rate_limit_window, rate_limit_max_requests, initial_ban_time, ban_multiplier,
+#       ban_threshold, max_ban_time, ban history TTL
+# Returns {status, ban_time, attempts, ban_count, ban_ms}: status 0 - allowed,
+# 1 - already banned, 2 - banned by this attempt; ban_ms - exact remaining ban
+LOGIN_ATTEMPT_SCRIPT = """
+local ban_time = redis.call('TTL', KEYS[1])
+if ban_time > 0 then
+    return {1, ban_time, 0, 0, redis.call('PTTL', KEYS[1])}
+end
+
+local attempts = redis.call('INCR', KEYS[2])
+-- TTL -1: the window was never set, e.g. the counter was created by an older client
+if attempts == 1 or redis.call('TTL', KEYS[2]) == -1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+if attempts <= tonumber(ARGV[2]) then
+    return {0, 0, attempts, 0, 0}
+end
+
+-- Escalating ban: doubles with every previous ban, grows with excess attempts
+local ban_count = tonumber(redis.call('GET', KEYS[3]) or '0')
+ban_time = tonumber(ARGV[3])
+if ban_count > 0 then
+    ban_time = ban_time * tonumber(ARGV[4]) ^ ban_count
+end
+local attempts_multiplier = attempts / tonumber(ARGV[5])
+if attempts_multiplier > 1 then
+    ban_time = ban_time * attempts_multiplier
+end
+ban_time = math.max(1, math.min(math.floor(ban_time), tonumber(ARGV[6])))
+
+redis.call('SET', KEYS[1], 1, 'EX', ban_time)
+ban_count = redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], ARGV[7])
+return {2, ban_time, attempts, ban_count, ban_time * 1000}
+"""
+
+# reset_attempts announces lifted bans here so every worker drops them from its BanCache
+BAN_INVALIDATION_CHANNEL = "security:unban"
 
 
 class LoginAttemptResult(BaseModel):
@@ -26,63 +76,112 @@ class LoginAttemptResult(BaseModel):
     remaining_attempts: Optional[int] = None
 
 
-class SecuritySystem:
-    """Main security system implementation"""
+class BanCache:
+    """
+    Banned identifiers known to this worker, kept until their ban expires
 
-    def __init__(self, redis_client: redis.Redis):
-        """
-        Initialize security system
+    Lets repeated attempts from a banned client be rejected without a Redis
+    round trip. Entries come from the ban decision with its exact remaining
+    time; lifted bans are removed through BAN_INVALIDATION_CHANNEL.
+    """
 
+    def __init__(self, max_size: int = 100_000):
+        """
         Args:
-            redis_client: Redis client instance
+            max_size: Maximum number of cached identifiers, 0 disables the cache
         """
-        self.redis = redis_client
-        self.logger = logging.getLogger(__name__)
+        self.max_size = max_size
+        self._expires: Dict[str, float] = {}  # identifier -> time.monotonic() deadline
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def get(self, identifier: str) -> Optional[float]:
+        """Remaining ban in seconds, or None if the identifier is not known to be banned"""
+        expires = self._expires.get(identifier)
+        if expires is None:
+            return None
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            del self._expires[identifier]
+            return None
+        return remaining
+
+    def add(self, identifier: str, ban_seconds: float):
+        """Remember a ban reported by Redis"""
+        if self.max_size <= 0 or ban_seconds <= 0:
+            return
+        if len(self._expires) >= self.max_size and identifier not in self._expires:
+            self._evict()
+        self._expires[identifier] = time.monotonic() + ban_seconds
+
+    def discard(self, *identifiers: str):
+        for identifier in identifiers:
+            self._expires.pop(identifier, None)
+
+    def clear(self):
+        self._expires.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = [identifier for identifier, expires in self._expires.items() if expires <= now]
+        for identifier in expired:
+            del self._expires[identifier]
+        # Still full: drop the oldest entries, they are only a shortcut for Redis
+        while len(self._expires) >= self.max_size:
+            del self._expires[next(iter(self._expires))]
 
-    async def _get_ban_history(self, identifier: str) -> int:
-        """Get number of previous bans for identifier"""
-        ban_history_key = f"ban_history:{identifier}"
-        ban_count = await self.redis.get(ban_history_key)
-        return int(ban_count) if ban_count else 0
 
-    async def _increment_ban_history(self, identifier: str):
-        """Increment ban counter and set expiration"""
-        ban_history_key = f"ban_history:{identifier}"
-        await self.redis.incr(ban_history_key)
-        # Store ban history for 30 days
-        await self.redis.expire(ban_history_key, 60 * 60 * 24 * 30)
+class SecuritySystem:
+    """Main security system implementation"""
 
-    async def _calculate_ban_time(self, identifier: str, current_attempts: int) -> int:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        ban_cache: Optional[BanCache] = None,
+        http_session: Optional[aiohttp.ClientSession] = None,
+    ):
         """
-        Calculate ban duration based on history and current attempts
+        Initialize security system
 
         Args:
-            identifier: User identifier (IP or email)
-            current_attempts: Number of current attempts
-
-        Returns:
-            Ban duration in seconds
+            redis_client: Redis client instance
+            ban_cache: Local cache of banned identifiers, sized from settings by default
+            http_session: Shared pooled session for CAPTCHA verification; by default
+                the instance creates its own and closes it in close()
         """
-        ban_count = await self._get_ban_history(identifier)
-
-        # Base ban time
-        ban_time = settings.initial_ban_time
+        self.redis = redis_client
+        self._http = http_session
+        self._own_http = http_session is None
+        self._captcha_timeout = aiohttp.ClientTimeout(total=settings.captcha_timeout)
+        self.logger = logging.getLogger(__name__)
+        self.banned = ban_cache if ban_cache is not None else BanCache(settings.ban_cache_size)
+        self._invalidation_task: Optional[asyncio.Task] = None
+        # EVALSHA with a fallback to EVAL when the script cache was flushed
+        self._login_attempt = redis_client.register_script(LOGIN_ATTEMPT_SCRIPT)
 
-        # Increase based on ban history
-        if ban_count > 0:
-            ban_time *= settings.ban_multiplier**ban_count
+    @staticmethod
+    def _keys(identifier: str) -> List[str]:
+        return [f"ban:{identifier}", f"rate:{identifier}", f"ban_history:{identifier}"]
 
-        # Additional increase for excessive attempts
-        attempts_multiplier = current_attempts / settings.ban_threshold
-        if attempts_multiplier > 1:
-            ban_time *= attempts_multiplier
+    @staticmethod
+    def _captcha_key(captcha_response: str) -> str:
+        return "captcha:" + hashlib.sha256(captcha_response.encode()).hexdigest()
 
-        return min(int(ban_time), settings.max_ban_time)
+    def _get_http(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession()
+            self._own_http = True
+        return self._http
 
     async def verify_captcha(self, captcha_response: str) -> bool:
         """
         Verify CAPTCHA response with Google reCAPTCHA
 
+        A successful verification is remembered in Redis by token hash for
+        captcha_cache_ttl seconds: the provider accepts a token only once, so a
+        retried login with the same token would otherwise fail.
+
         Args:
             captcha_response: CAPTCHA response token
 
@@ -93,14 +192,25 @@ class SecuritySystem:
             self.logger.error("CAPTCHA secret key not configured")
             return False
 
+        key = self._captcha_key(captcha_response)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://www.google.com/recaptcha/api/siteverify",
-                    data={"secret": settings.captcha_secret_key, "response": captcha_response},
-                ) as response:
-                    result = await response.json()
-                    return result.get("success", False)
+            if settings.captcha_cache_ttl and await self.redis.exists(key):
+                return True
+            async with self._get_http().post(
+                settings.captcha_verify_url,
+                data={"secret": settings.captcha_secret_key, "response": captcha_response},
+                timeout=self._captcha_timeout,
+            ) as response:
+                result = await response.json(content_type=None)
+            success = result.get("success", False) is True
+            if success and settings.captcha_cache_ttl:
+                await self.redis.set(key, 1, ex=settings.captcha_cache_ttl)
+            return success
+        except asyncio.TimeoutError:
+            self.logger.error(
+                f"CAPTCHA verification timed out after {settings.captcha_timeout} seconds"
+            )
+            return False
         except Exception as e:
             self.logger.error(f"CAPTCHA verification error: {str(e)}")
             return False
@@ -119,6 +229,11 @@ class SecuritySystem:
             LoginAttemptResult with attempt status
         """
         try:
+            # A known ban is answered locally, before the CAPTCHA and Redis round trips
+            cached = self._cached_ban(identifier)
+            if cached is not None:
+                return cached
+
             # Check CAPTCHA if required
             if settings.captcha_required:
                 if not captcha_response:
@@ -131,71 +246,133 @@ class SecuritySystem:
                         success=False, message="CAPTCHA verification failed. Please try again."
                     )
 
-            # Check current ban
-            ban_key = f"ban:{identifier}"
-            ban_time = await self.redis.ttl(ban_key)
-
-            if ban_time > 0:
-                return LoginAttemptResult(
-                    success=False,
-                    is_banned=True,
-                    ban_time=ban_time,
-                    message=f"Access temporarily blocked. Please try again in {ban_time} seconds.",
-                )
-
-            # Check rate limit
-            rate_key = f"rate:{identifier}"
-            attempts = await self.redis.incr(rate_key)
-
-            # Set TTL on first attempt
-            if attempts == 1:
-                await self.redis.expire(rate_key, settings.rate_limit_window)
-
-            # Check if limit exceeded
-            if attempts > settings.rate_limit_max_requests:
-                ban_time = await self._calculate_ban_time(identifier, attempts)
-                await self.redis.setex(ban_key, ban_time, 1)
-                await self._increment_ban_history(identifier)
-
-                self.logger.warning(
-                    f"Security violation: Ban applied to {identifier} "
-                    f"Duration: {ban_time}s, Attempts: {attempts}, "
-                    f"Previous bans: {await self._get_ban_history(identifier)}"
-                )
-
-                return LoginAttemptResult(
-                    success=False,
-                    is_banned=True,
-                    ban_time=ban_time,
-                    message=f"Too many attempts. Access blocked for {ban_time} seconds.",
-                )
-
-            remaining_attempts = settings.rate_limit_max_requests - attempts
-
-            return LoginAttemptResult(
-                success=True,
-                message="Security checks passed",
-                remaining_attempts=remaining_attempts,
-            )
+            return await self.check_attempt(identifier)
 
         except Exception as e:
             self.logger.error(f"Security check error for {identifier}: {str(e)}")
             return LoginAttemptResult(success=False, message="Security check error occurred")
 
-    async def reset_attempts(self, identifier: str):
+    async def check_attempt(self, identifier: str) -> LoginAttemptResult:
+        """
+        Count an attempt and apply the ban decision in a single Redis round trip
+
+        Args:
+            identifier: User identifier (IP or email)
+
+        Returns:
+            LoginAttemptResult with attempt status
+        """
+        cached = self._cached_ban(identifier)
+        if cached is not None:
+            return cached
+
+        status, ban_time, attempts, ban_count, ban_ms = await self._login_attempt(
+            keys=self._keys(identifier),
+            args=[
+                settings.rate_limit_window,
+                settings.rate_limit_max_requests,
+                settings.initial_ban_time,
+                settings.ban_multiplier,
+                settings.ban_threshold,
+                settings.max_ban_time,
+                BAN_HISTORY_TTL,
+            ],
+        )
+
+        if status != 0:
+            self.banned.add(identifier, ban_ms / 1000)
+
+        if status == 1:
+            return LoginAttemptResult(
+                success=False,
+                is_banned=True,
+                ban_time=ban_time,
+                message=f"Access temporarily blocked. Please try again in {ban_time} seconds.",
+            )
+
+        if status == 2:
+            self.logger.warning(
+                f"Security violation: Ban applied to {identifier} "
+                f"Duration: {ban_time}s, Attempts: {attempts}, "
+                f"Previous bans: {ban_count}"
+            )
+            return LoginAttemptResult(
+                success=False,
+                is_banned=True,
+                ban_time=ban_time,
+                message=f"Too many attempts. Access blocked for {ban_time} seconds.",
+            )
+
+        return LoginAttemptResult(
+            success=True,
+            message="Security checks passed",
+            remaining_attempts=settings.rate_limit_max_requests - attempts,
+        )
+
+    def _cached_ban(self, identifier: str) -> Optional[LoginAttemptResult]:
+        # Without the listener a ban lifted by another worker would stay cached
+        if self._invalidation_task is None:
+            return None
+        remaining = self.banned.get(identifier)
+        if remaining is None:
+            return None
+        ban_time = math.ceil(remaining)
+        return LoginAttemptResult(
+            success=False,
+            is_banned=True,
+            ban_time=ban_time,
+            message=f"Access temporarily blocked. Please try again in {ban_time} seconds.",
+        )
+
+    def start(self):
+        """Start listening for bans lifted by other workers"""
+        if self._invalidation_task is None:
+            self._invalidation_task = asyncio.create_task(self._listen_invalidations())
+
+    async def close(self):
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            await asyncio.gather(self._invalidation_task, return_exceptions=True)
+            self._invalidation_task = None
+        if self._own_http and self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def _listen_invalidations(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(BAN_INVALIDATION_CHANNEL)
+                    # Messages published while unsubscribed are lost: start from an empty cache
+                    self.banned.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.banned.discard(*json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Ban invalidation listener error: {str(e)}")
+                self.banned.clear()
+                await asyncio.sleep(1)
+
+    async def reset_attempts(self, *identifiers: str):
         """
         Reset attempt counters after successful authentication
 
         Args:
-            identifier: User identifier to reset
+            identifiers: User identifiers to reset, all in one DEL
         """
         try:
-            keys = [f"rate:{identifier}", f"ban:{identifier}"]
-            await self.redis.delete(*keys)
-            self.logger.info(f"Reset security attempts for {identifier}")
+            keys = [key for identifier in identifiers for key in self._keys(identifier)[:2]]
+            self.banned.discard(*identifiers)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(BAN_INVALIDATION_CHANNEL, json.dumps(identifiers))
+                await pipe.execute()
+            self.logger.info(f"Reset security attempts for {', '.join(identifiers)}")
 
         except Exception as e:
-            self.logger.error(f"Error resetting attempts for {identifier}: {str(e)}")
+            self.logger.error(f"Error resetting attempts for {identifiers}: {str(e)}")
 
     async def get_security_status(self, identifier: str) -> dict:
         """
@@ -208,13 +385,12 @@ class SecuritySystem:
             Dict with current security status
         """
         try:
-            rate_key = f"rate:{identifier}"
-            ban_key = f"ban:{identifier}"
-            ban_history_key = f"ban_history:{identifier}"
-
-            attempts = await self.redis.get(rate_key)
-            ban_time = await self.redis.ttl(ban_key)
-            ban_count = await self.redis.get(ban_history_key)
+            ban_key, rate_key, ban_history_key = self._keys(identifier)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(rate_key)
+                pipe.ttl(ban_key)
+                pipe.get(ban_history_key)
+                attempts, ban_time, ban_count = await pipe.execute()
 
             return {
                 "current_attempts": int(attempts) if attempts else 0,
@@ -236,17 +412,27 @@ class SecuritySystemDependency:
 
     _instance = None
 
-    def __init__(self, redis_client: redis.Redis):
-        self.security_system = SecuritySystem(redis_client)
+    def __init__(self, redis_client: redis.Redis, http_session: aiohttp.ClientSession):
+        self.security_system = SecuritySystem(redis_client, http_session=http_session)
+        self.security_system.start()
 
     @classmethod
     async def get_instance(
-        cls, redis_client: redis.Redis = Depends(get_redis_client)
+        cls,
+        redis_client: redis.Redis = Depends(get_redis_client),
+        http_session: aiohttp.ClientSession = Depends(get_http_session),
     ) -> SecuritySystem:
         if cls._instance is None:
-            cls._instance = cls(redis_client)
+            cls._instance = cls(redis_client, http_session)
         return cls._instance.security_system
 
+    @classmethod
+    async def close(cls):
+        """Stop the instance's background tasks on application shutdown"""
+        if cls._instance is not None:
+            await cls._instance.security_system.close()
+            cls._instance = None
+
 
 # FastAPI dependency
 get_security_system = SecuritySystemDependency.get_instance
@@ -1,12 +1,29 @@
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import Field, PostgresDsn, RedisDsn, SecretStr
+from pydantic import BaseModel, Field, PostgresDsn, RedisDsn, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from forkscan.core.types import BookmakerName
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
+class RateLimitRule(BaseModel):
+    """
+    Token bucket of a route group.
+
+    Attributes:
+        prefixes: Path prefixes of the group; the longest matching prefix wins
+        capacity: Burst size in requests
+        refill_rate: Requests per second the bucket refills with
+    """
+
+    prefixes: List[str]
+    capacity: int = Field(gt=0)
+    refill_rate: float = Field(gt=0)
+
+
 class Settings(BaseSettings):
     """
     Application configuration.
@@ -15,11 +32,51 @@ class Settings(BaseSettings):
         env: Environment (dev/prod)
         debug: Debug mode
         api_prefix: API endpoints prefix
+        ban_cache_size: Banned identifiers each API worker remembers locally
+        register_max_attempts: Registrations from one IP within 24 hours before 429
+        register_min_attempts: Registrations from one IP after which the ban steps are counted
+        rate_limit_enabled: Token-bucket rate limiting of all routes
+        rate_limit_groups: Route groups limited per client with their own token buckets
+        rate_limit_local_buckets: Token buckets each API worker mirrors locally
+        captcha_verify_url: CAPTCHA verification endpoint
+        captcha_timeout: Time budget of one CAPTCHA verification in seconds
+        captcha_cache_ttl: How long a verified CAPTCHA token is accepted again in seconds
+        http_pool_size: Connections of the API's shared HTTP session
+        http_timeout: Default timeout of the API's shared HTTP session in seconds
+        password_hash_rounds: bcrypt cost; hashes with another cost are rehashed on login
+        password_hash_workers: Threads hashing passwords in each API worker
+        password_hash_queue: Password hashing calls allowed to wait before requests get 503
         database_url: PostgreSQL connection URL
         redis_url: Redis connection URL
         jwt_secret: JWT tokens secret key
         jwt_expires: JWT token lifetime in minutes
+        auth_claims_cache_size: Access tokens whose verified claims each API worker keeps
+        auth_user_cache_size: Authenticated users each API worker keeps
+        auth_user_cache_ttl: How long a cached authenticated user is used in seconds
         update_delay: Data update delay in seconds
+        enabled_bookmakers: Bookmakers whose parsers this worker runs
+        live_arbitrage_interval: Fork search interval for live events in seconds
+        prematch_arbitrage_interval: Fork search interval for prematch events in seconds
+        live_max_data_age: Maximum age of confirmed bookmaker data for live forks in seconds
+        prematch_max_data_age: Maximum age of confirmed bookmaker data for prematch forks in seconds
+        coalesce_window: Window streaming odds updates are coalesced in before the store; 0 - off
+        odds_archive_path: Directory streaming odds ticks are archived to for backtests; None - off
+        board_snapshot_path: File the event board is checkpointed to for warm restarts
+        board_snapshot_interval: Board checkpoint interval in seconds
+        shared_board_name: Shared memory segment the board is published to; None - off
+        shared_board_capacity: Size of one shared board slot in bytes
+        shared_board_interval: Shared board publication interval in seconds
+        board_stream: Prefix of the Redis streams board deltas go through, one per scanner group
+        board_forks_stream: Prefix of the Redis streams detected forks are replicated through
+        board_redis_snapshot_key: Prefix of the Redis hashes holding the latest full board snapshots
+        board_groups: Scanner groups whose boards API workers replicate; defaults to scanner_group
+        board_stream_maxlen: Approximate length the replication streams are trimmed to
+        board_publish_interval: Board replication interval in seconds
+        board_redis_snapshot_interval: Interval between full board snapshots in Redis in seconds
+        scanner_group: Bookmaker group this scanner competes to lead; defaults to enabled_bookmakers
+        leader_election: Run the scanner only while it holds its group's leader lease
+        leader_lease_ttl: Scanner leader lease TTL in seconds
+        leader_retry_interval: Interval between lease acquisition attempts of a standby in seconds
         free_tier_max_profit: Maximum profit for free tier in %
     """
 
@@ -38,9 +95,59 @@ class Settings(BaseSettings):
     initial_ban_time: int = Field(default=900, description="Initial ban duration (seconds)")
     max_ban_time: int = Field(default=3600, description="Maximum ban duration (seconds)")
     ban_multiplier: float = Field(default=2.0, description="Multiplier for increasing ban time")
+    ban_cache_size: int = Field(
+        default=100_000, ge=0, description="Banned identifiers cached in each worker (0 - off)"
+    )
+    register_max_attempts: int = Field(
+        default=5, gt=0, description="Registrations from one IP within 24 hours before 429"
+    )
+    register_min_attempts: int = Field(
+        default=5, ge=0, description="Registrations after which the ban steps are counted"
+    )
+    rate_limit_enabled: bool = Field(default=True, description="Rate limit all routes")
+    rate_limit_groups: Dict[str, RateLimitRule] = Field(
+        default={
+            "default": RateLimitRule(prefixes=[""], capacity=60, refill_rate=10.0),
+            "auth": RateLimitRule(prefixes=["/auth"], capacity=10, refill_rate=0.2),
+            "register": RateLimitRule(
+                prefixes=["/auth/auth/register"], capacity=3, refill_rate=1 / 60
+            ),
+        },
+        description="Token buckets per route group and client",
+    )
+    rate_limit_local_buckets: int = Field(
+        default=100_000, gt=0, description="Token buckets mirrored in each worker"
+    )
     captcha_required: bool = Field(default=True, description="Require CAPTCHA verification")
     captcha_site_key: Optional[str] = Field(default=None, description="reCAPTCHA site key")
     captcha_secret_key: Optional[str] = Field(default=None, description="reCAPTCHA secret key")
+    captcha_verify_url: str = Field(
+        default="https://www.google.com/recaptcha/api/siteverify",
+        description="CAPTCHA verification endpoint",
+    )
+    captcha_timeout: float = Field(
+        default=3.0, gt=0, description="Time budget of one CAPTCHA verification (seconds)"
+    )
+    captcha_cache_ttl: int = Field(
+        default=120,
+        ge=0,
+        description="Verified CAPTCHA tokens are accepted again (seconds, 0 - off)",
+    )
+
+    # Password hashing
+    password_hash_rounds: int = Field(default=12, ge=4, le=31, description="bcrypt cost")
+    password_hash_workers: int = Field(
+        default=2, gt=0, description="Threads hashing passwords in each worker"
+    )
+    password_hash_queue: int = Field(
+        default=16, ge=0, description="Password hashing calls waiting before 503"
+    )
+
+    # Outgoing HTTP
+    http_pool_size: int = Field(default=100, gt=0, description="Shared HTTP session connections")
+    http_timeout: float = Field(
+        default=10.0, gt=0, description="Shared HTTP session default timeout (seconds)"
+    )
 
     # Database
     database_url: PostgresDsn = Field(
@@ -59,12 +166,111 @@ class Settings(BaseSettings):
         default=20, description="JWT refresh token expiration in days"
     )
     jwt_algorithm: str = Field(default="HS256", description="JWT algorithm")
+    auth_claims_cache_size: int = Field(
+        default=100_000, ge=0, description="Verified access tokens cached in each worker (0 - off)"
+    )
+    auth_user_cache_size: int = Field(
+        default=100_000, ge=0, description="Authenticated users cached in each worker (0 - off)"
+    )
+    auth_user_cache_ttl: float = Field(
+        default=30.0, ge=0, description="Cached authenticated user lifetime (seconds)"
+    )
 
     # Service settings
     update_delay: int = Field(default=10, ge=5, description="Update delay in seconds")
     free_tier_max_profit: float = Field(
         default=0.5, ge=0, le=100, description="Free tier max profit %"
     )
+    enabled_bookmakers: List[BookmakerName] = Field(
+        default=[BookmakerName.FONBET], description="BookmakerName members whose parsers are loaded"
+    )
+
+    # Live / prematch lanes
+    live_arbitrage_interval: float = Field(
+        default=0.2, gt=0, description="Fork search interval for live events (seconds)"
+    )
+    prematch_arbitrage_interval: float = Field(
+        default=5.0, gt=0, description="Fork search interval for prematch events (seconds)"
+    )
+    live_max_data_age: float = Field(
+        default=5.0,
+        gt=0,
+        description="Maximum age of confirmed bookmaker data for live forks (seconds)",
+    )
+    prematch_max_data_age: float = Field(
+        default=120.0,
+        gt=0,
+        description="Maximum age of confirmed bookmaker data for prematch forks (seconds)",
+    )
+
+    # Streaming odds
+    coalesce_window: float = Field(
+        default=0.1, ge=0, description="Streaming odds coalescing window (seconds, 0 - off)"
+    )
+
+    # Odds archive
+    odds_archive_path: Optional[Path] = Field(
+        default=None, description="Directory odds ticks are archived to for backtests (None - off)"
+    )
+
+    # Warm restart
+    board_snapshot_path: Path = Field(
+        default=BASE_DIR / "data" / "board.snapshot",
+        description="File the event board is checkpointed to for warm restarts",
+    )
+    board_snapshot_interval: float = Field(
+        default=30.0, gt=0, description="Board checkpoint interval (seconds)"
+    )
+
+    # Shared-memory board
+    shared_board_name: Optional[str] = Field(
+        default=None, description="Shared memory segment the board is published to (None - off)"
+    )
+    shared_board_capacity: int = Field(
+        default=256 * 2**20, gt=0, description="Size of one shared board slot (bytes)"
+    )
+    shared_board_interval: float = Field(
+        default=1.0, gt=0, description="Shared board publication interval (seconds)"
+    )
+
+    # Board replication through Redis
+    board_stream: str = Field(
+        default="forkscan:board",
+        description="Prefix of the Redis streams board deltas are replicated through",
+    )
+    board_forks_stream: str = Field(
+        default="forkscan:forks",
+        description="Prefix of the Redis streams detected forks are replicated through",
+    )
+    board_redis_snapshot_key: str = Field(
+        default="forkscan:board:snapshot",
+        description="Prefix of the Redis hashes holding the latest full board snapshots",
+    )
+    board_groups: List[str] = Field(
+        default=[], description="Scanner groups replicated by API workers (default: scanner group)"
+    )
+    board_stream_maxlen: int = Field(
+        default=100_000, gt=0, description="Approximate length of the replication streams"
+    )
+    board_publish_interval: float = Field(
+        default=0.1, gt=0, description="Board replication interval (seconds)"
+    )
+    board_redis_snapshot_interval: float = Field(
+        default=30.0, gt=0, description="Interval between full board snapshots in Redis (seconds)"
+    )
+
+    # Scanner leader election
+    scanner_group: Optional[str] = Field(
+        default=None,
+        description="Bookmaker group this scanner competes to lead (default: enabled bookmakers)",
+    )
+    leader_election: bool = Field(
+        default=False, description="Scan only while holding the scanner group's leader lease"
+    )
+    leader_lease_ttl: float = Field(default=5.0, gt=0, description="Leader lease TTL (seconds)")
+    leader_retry_interval: float = Field(
+        default=0.5, gt=0, description="Interval between lease acquisition attempts (seconds)"
+    )
 
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),
@@ -73,9 +279,34 @@ class Settings(BaseSettings):
         extra="allow",
     )
 
+    @field_validator("enabled_bookmakers", mode="before")
+    @classmethod
+    def _bookmakers_by_name(cls, value):
+        """Bookmakers are configured by member name, case-insensitive: ["FONBET", "betboom"]"""
+        if not isinstance(value, (list, tuple, set)):
+            return value
+        bookmakers = []
+        for name in value:
+            if isinstance(name, BookmakerName):
+                bookmakers.append(name)
+                continue
+            try:
+                bookmakers.append(BookmakerName[str(name).strip().upper()])
+            except KeyError:
+                known = ", ".join(member.name for member in BookmakerName)
+                raise ValueError(f"Unknown bookmaker {name!r}, expected one of: {known}") from None
+        return bookmakers
+
     @property
     def jwt_secret_value(self) -> str:
         return self.jwt_secret.get_secret_value()
 
+    @property
+    def scanner_group_name(self) -> str:
+        """scanner_group or the enabled bookmakers joined by '+', e.g. FONBET+WINLINE"""
+        return self.scanner_group or "+".join(
+            sorted(bookmaker.name for bookmaker in self.enabled_bookmakers)
+        )
+
 
 settings = Settings()
@@ -0,0 +1,107 @@
+import heapq
+import itertools
+import math
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TimerWheel(Generic[K]):
+    """Колесо таймеров для массового переназначения сроков.
+
+    Ближние сроки (до ``slots * resolution`` секунд вперёд) лежат в слотах колеса,
+    дальние — в куче и переносятся в колесо по мере приближения. Переназначение
+    срока — O(1), ``advance`` обходит только пройденные слоты и истёкшие ключи,
+    а не все активные.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512, start: float = 0.0):
+        """
+        Args:
+            resolution (float): длина слота, секунды; точность срабатывания.
+            slots (int): число слотов колеса.
+            start (float): текущее время (UNIX timestamp) при создании.
+        """
+        self.resolution = resolution
+        self._slots: List[Dict[K, float]] = [{} for _ in range(slots)]
+        self._tick = self._to_tick(start)
+        # ключ -> (срок, тик слота или None, если ключ в куче)
+        self._deadlines: Dict[K, Tuple[float, Optional[int]]] = {}
+        self._overflow: List[Tuple[int, int, float, K]] = []
+        self._counter = itertools.count()
+
+    def _to_tick(self, ts: float) -> int:
+        return math.floor(ts / self.resolution)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._deadlines
+
+    def deadline(self, key: K) -> Optional[float]:
+        entry = self._deadlines.get(key)
+        return entry[0] if entry is not None else None
+
+    def schedule(self, key: K, deadline: float) -> None:
+        """Назначает или переназначает срок ключа."""
+        # Срабатывание не раньше срока; просроченный срок — на ближайшем advance
+        tick = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        entry = self._deadlines.get(key)
+        if entry is not None:
+            if entry[0] == deadline:
+                return
+            if entry[1] == tick:
+                self._slots[tick % len(self._slots)][key] = deadline
+                self._deadlines[key] = (deadline, tick)
+                return
+            self._unlink(key, entry)
+
+        if tick - self._tick < len(self._slots):
+            self._slots[tick % len(self._slots)][key] = deadline
+            self._deadlines[key] = (deadline, tick)
+        else:
+            # Запись в куче устаревает при переназначении и пропускается при извлечении
+            heapq.heappush(self._overflow, (tick, next(self._counter), deadline, key))
+            self._deadlines[key] = (deadline, None)
+
+    def cancel(self, key: K) -> None:
+        entry = self._deadlines.pop(key, None)
+        if entry is not None and entry[1] is not None:
+            self._slots[entry[1] % len(self._slots)].pop(key, None)
+
+    def _unlink(self, key: K, entry: Tuple[float, Optional[int]]) -> None:
+        if entry[1] is not None:
+            self._slots[entry[1] % len(self._slots)].pop(key, None)
+        del self._deadlines[key]
+
+    def advance(self, now: float) -> List[K]:
+        """Сдвигает колесо до момента now и возвращает ключи с истёкшим сроком."""
+        target = self._to_tick(now)
+        expired: List[K] = []
+        if target <= self._tick:
+            return expired
+
+        # При большом скачке времени каждый слот достаточно обойти один раз
+        first = max(self._tick + 1, target - len(self._slots) + 1)
+        for tick in range(first, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if slot:
+                expired.extend(slot)
+                for key in slot:
+                    del self._deadlines[key]
+                slot.clear()
+        self._tick = target
+
+        horizon = self._tick + len(self._slots)
+        while self._overflow and self._overflow[0][0] < horizon:
+            tick, _, deadline, key = heapq.heappop(self._overflow)
+            if self._deadlines.get(key) != (deadline, None):
+                continue  # срок переназначен
+            if tick <= self._tick:
+                del self._deadlines[key]
+                expired.append(key)
+            else:
+                self._slots[tick % len(self._slots)][key] = deadline
+                self._deadlines[key] = (deadline, tick)
+        return expired
@@ -0,0 +1,138 @@
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+if TYPE_CHECKING:  # core.types импортирует этот модуль
+    from forkscan.core.types import BookmakerName
+
+
+class FreshnessTracker:
+    """Когда данные букмекеров в последний раз подтверждались фидом.
+
+    Для букмекера хранится время последнего успешного ответа фида (цикла опроса
+    или фрейма потока), для пары (событие, букмекер) — время, когда событие
+    последний раз было в полном ответе. Обновление на каждом цикле — запись
+    в словарь; EventManager.add_event отмечает события сам.
+
+    Событие, попавшее в последний полный цикл (``begin_cycle``), подтверждается
+    каждым следующим ответом фида: 304, неизменное тело или фрейм потока значат,
+    что данные актуальны, просто не поменялись. Событие, пропавшее из полного
+    ответа, остаётся со временем, когда его видели в последний раз.
+    """
+
+    def __init__(self) -> None:
+        self._bookmakers: Dict["BookmakerName", float] = {}
+        self._cycles: Dict["BookmakerName", float] = {}
+        self._events: Dict[str, Dict["BookmakerName", float]] = {}
+
+    def begin_cycle(self, bookmaker: "BookmakerName", ts: Optional[float] = None) -> float:
+        """Начало разбора полного ответа фида; возвращает метку цикла."""
+        started = time.time() if ts is None else ts
+        self._cycles[bookmaker] = started
+        return started
+
+    def confirm_bookmaker(self, bookmaker: "BookmakerName", ts: Optional[float] = None) -> None:
+        """Фид букмекера ответил успешно."""
+        self._bookmakers[bookmaker] = time.time() if ts is None else ts
+
+    def confirm_event(
+        self, event: str, bookmaker: "BookmakerName", ts: Optional[float] = None
+    ) -> None:
+        """Событие (core.types.event_id) присутствовало в ответе букмекера."""
+        self._events.setdefault(event, {})[bookmaker] = time.time() if ts is None else ts
+
+    def forget(self, event: str, bookmaker: "BookmakerName") -> None:
+        """Событие пропало из линии букмекера."""
+        bookmakers = self._events.get(event)
+        if bookmakers is not None:
+            bookmakers.pop(bookmaker, None)
+            if not bookmakers:
+                del self._events[event]
+
+    def event_confirmed(self, event: str, bookmaker: "BookmakerName") -> Optional[float]:
+        """Когда событие последний раз было в ответе букмекера, без учёта ответов фида"""
+        return self._events.get(event, {}).get(bookmaker)
+
+    def feeds(self) -> Dict["BookmakerName", Tuple[Optional[float], Optional[float]]]:
+        """Состояние фидов: букмекер -> (последний успешный ответ, начало последнего цикла)"""
+        return {
+            bookmaker: (self._bookmakers.get(bookmaker), self._cycles.get(bookmaker))
+            for bookmaker in self._bookmakers.keys() | self._cycles.keys()
+        }
+
+    def restore_feed(
+        self,
+        bookmaker: "BookmakerName",
+        confirmed: Optional[float],
+        cycle: Optional[float],
+    ) -> None:
+        """Восстанавливает состояние фида, например из снимка линии после рестарта."""
+        if confirmed is not None:
+            self._bookmakers[bookmaker] = confirmed
+        if cycle is not None:
+            self._cycles[bookmaker] = cycle
+
+    def last_confirmed(
+        self, bookmaker: "BookmakerName", event: Optional[str] = None
+    ) -> Optional[float]:
+        """Время последнего подтверждения букмекера или его данных по событию.
+
+        Returns:
+            UNIX timestamp или None, если данных не было.
+        """
+        feed = self._bookmakers.get(bookmaker)
+        if event is None:
+            return feed
+        confirmed = self._events.get(event, {}).get(bookmaker)
+        if confirmed is None or feed is None:
+            return confirmed
+        # Событие из последнего полного ответа подтверждается каждым ответом фида
+        if confirmed >= self._cycles.get(bookmaker, 0.0):
+            return max(confirmed, feed)
+        return confirmed
+
+    def age(
+        self,
+        bookmaker: "BookmakerName",
+        event: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> Optional[float]:
+        """Возраст данных в секундах; None, если данных не было."""
+        confirmed = self.last_confirmed(bookmaker, event)
+        if confirmed is None:
+            return None
+        return (time.time() if now is None else now) - confirmed
+
+    def is_fresh(
+        self,
+        bookmaker: "BookmakerName",
+        max_age: float,
+        event: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> bool:
+        age = self.age(bookmaker, event, now)
+        return age is not None and age <= max_age
+
+    def fresh_bookmakers(
+        self, event: str, max_age: float, now: Optional[float] = None
+    ) -> Set["BookmakerName"]:
+        """Букмекеры, данные которых по событию подтверждены не позже max_age секунд назад."""
+        now = time.time() if now is None else now
+        return {
+            bookmaker
+            for bookmaker in self._events.get(event, {})
+            if self.is_fresh(bookmaker, max_age, event, now)
+        }
+
+    def stale_bookmakers(self, max_age: float, now: Optional[float] = None) -> Set["BookmakerName"]:
+        """Букмекеры, фид которых не подтверждался дольше max_age секунд."""
+        now = time.time() if now is None else now
+        return {
+            bookmaker
+            for bookmaker, confirmed in self._bookmakers.items()
+            if now - confirmed > max_age
+        }
+
+    def lag(self, now: Optional[float] = None) -> Dict["BookmakerName", float]:
+        """Метрика: отставание данных каждого букмекера, секунды."""
+        now = time.time() if now is None else now
+        return {bookmaker: now - confirmed for bookmaker, confirmed in self._bookmakers.items()}
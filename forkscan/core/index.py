@@ -0,0 +1,167 @@
+import bisect
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:  # core.types импортирует этот модуль
+    from forkscan.core.types import BaseSportEvent, BookmakerName, EventKey, EventStatus, SportType
+
+# Запись индекса — событие конкретного букмекера: статус и лига у букмекеров могут различаться
+Entry = Tuple["EventKey", "BookmakerName"]
+
+
+def _normalize_league(league: str) -> str:
+    return " ".join(league.lower().split())
+
+
+class EventIndex:
+    """Вторичные индексы событий EventManager.
+
+    Поддерживаются при добавлении и удалении событий: по виду спорта, статусу,
+    лиге и отсортированные по времени начала — общий и отдельный для каждого
+    вида спорта (самый частый запрос — «вид спорта на ближайшие N часов»).
+    ``query`` пересекает фильтры, перебирая самый узкий из них, поэтому стоимость
+    запроса пропорциональна размеру наименьшего подходящего множества, а не всей линии.
+
+    Внутри записи пронумерованы: множества целых чисел хешируются и пересекаются
+    на C, без вызова __hash__ у EventKey и перечислений.
+    """
+
+    def __init__(self) -> None:
+        self._sport: Dict["SportType", Set[int]] = {}
+        self._status: Dict["EventStatus", Set[int]] = {}
+        self._league: Dict[str, Set[int]] = {}
+        # (время начала, номер записи) в порядке возрастания
+        self._start: List[Tuple[float, int]] = []
+        self._sport_start: Dict["SportType", List[Tuple[float, int]]] = {}
+        self._ids: Dict[Entry, int] = {}
+        self._entries: Dict[int, Entry] = {}
+        self._attrs: Dict[int, Tuple["SportType", "EventStatus", str, float]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, event_key: "EventKey", event: "BaseSportEvent") -> None:
+        """Индексирует событие букмекера; повторное добавление обновляет индексы."""
+        entry = (event_key, event.bookmaker)
+        attrs = (
+            event.sport_type,
+            event.status,
+            _normalize_league(event.league),
+            event.start_time.timestamp(),
+        )
+        number = self._ids.get(entry)
+        if number is not None:
+            if self._attrs[number] == attrs:
+                return
+            self._unlink(number)
+        else:
+            number = self._next_id
+            self._next_id += 1
+            self._ids[entry] = number
+            self._entries[number] = entry
+
+        self._attrs[number] = attrs
+        sport, status, league, start = attrs
+        self._sport.setdefault(sport, set()).add(number)
+        self._status.setdefault(status, set()).add(number)
+        self._league.setdefault(league, set()).add(number)
+        bisect.insort(self._start, (start, number))
+        bisect.insort(self._sport_start.setdefault(sport, []), (start, number))
+
+    def remove(self, event_key: "EventKey", bookmaker: "BookmakerName") -> None:
+        number = self._ids.pop((event_key, bookmaker), None)
+        if number is not None:
+            self._unlink(number)
+            del self._entries[number]
+            del self._attrs[number]
+
+    def _unlink(self, number: int) -> None:
+        sport, status, league, start = self._attrs[number]
+        for index, value in ((self._sport, sport), (self._status, status), (self._league, league)):
+            numbers = index[value]
+            numbers.discard(number)
+            if not numbers:
+                del index[value]
+        for timeline in (self._start, self._sport_start[sport]):
+            position = bisect.bisect_left(timeline, (start, number))
+            if position < len(timeline) and timeline[position] == (start, number):
+                del timeline[position]
+        if not self._sport_start[sport]:
+            del self._sport_start[sport]
+
+    def query(
+        self,
+        sport: Optional["SportType"] = None,
+        status: Optional["EventStatus"] = None,
+        league: Optional[str] = None,
+        start_from: Optional[float] = None,
+        start_to: Optional[float] = None,
+    ) -> List["EventKey"]:
+        """
+        События, у которых хотя бы один букмекер подходит под все фильтры
+
+        Args:
+            sport: Вид спорта
+            status: Статус события
+            league: Лига (без учёта регистра и лишних пробелов)
+            start_from: Начало не раньше (UNIX timestamp)
+            start_to: Начало раньше (UNIX timestamp)
+
+        Returns:
+            Ключи событий в порядке времени начала
+        """
+        timeline = self._start
+        if sport is not None:
+            timeline = self._sport_start.get(sport, [])
+            if not timeline:
+                return []
+
+        candidates: List[Set[int]] = []
+        for index, value in (
+            (self._status, status),
+            (self._league, None if league is None else _normalize_league(league)),
+        ):
+            if value is not None:
+                numbers = index.get(value)
+                if not numbers:
+                    return []
+                candidates.append(numbers)
+        candidates.sort(key=len)
+
+        low, high = 0, len(timeline)
+        if start_from is not None:
+            low = bisect.bisect_left(timeline, (start_from,))
+        if start_to is not None:
+            high = bisect.bisect_left(timeline, (start_to,))
+
+        matches: List[Tuple[float, int]]
+        if not candidates:
+            matches = timeline[low:high]
+        elif high - low <= len(candidates[0]):
+            # Диапазон по времени уже множеств: пересекаем его с ними и сохраняем порядок
+            window = timeline[low:high]
+            numbers = {number for _, number in window}.intersection(*candidates)
+            matches = [item for item in window if item[1] in numbers]
+        else:
+            # Самое узкое множество меньше диапазона: пересекаем множества,
+            # вид спорта и время начала проверяем у оставшихся
+            numbers = candidates[0].intersection(*candidates[1:])
+            if sport is not None:
+                numbers &= self._sport[sport]
+            attrs = self._attrs
+            matches = sorted(
+                (attrs[number][3], number)
+                for number in numbers
+                if (start_from is None or attrs[number][3] >= start_from)
+                and (start_to is None or attrs[number][3] < start_to)
+            )
+
+        result: List["EventKey"] = []
+        # Сравниваем кортежи команд: их хеш считается на C, в отличие от EventKey.__hash__
+        seen: Set[Tuple[str, str]] = set()
+        for _, number in matches:
+            event_key = self._entries[number][0]
+            if event_key.teams not in seen:
+                seen.add(event_key.teams)
+                result.append(event_key)
+        return result
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, Tuple
+
+from forkscan.core.types import BookmakerName, MarketType
+
+
+@dataclass(frozen=True, slots=True)
+class OddsTick:
+    """Нормализованный коэффициент букмекера на момент времени."""
+
+    event: str  # см. event_id()
+    market: MarketType  # в порядке команд ключа события, см. orient()
+    line: float  # значение тотала/форы, 0.0 для рынков без линии
+    bookmaker: BookmakerName
+    price: float
+    ts: float  # UNIX timestamp
+
+
+@dataclass(slots=True)
+class Quote:
+    """Последний известный коэффициент букмекера."""
+
+    price: float
+    ts: float
+
+
+MarketLine = Tuple[MarketType, float]
+
+# Рынки, привязанные к команде, и соответствующие рынки другой команды
+MIRRORED_MARKETS: Dict[MarketType, MarketType] = {
+    first: second
+    for pair in (
+        (MarketType.WIN_1, MarketType.WIN_2),
+        (MarketType.DOUBLE_1X, MarketType.DOUBLE_X2),
+        (MarketType.HANDICAP_1, MarketType.HANDICAP_2),
+        (MarketType.TEAM_1_TOTAL_OVER, MarketType.TEAM_2_TOTAL_OVER),
+        (MarketType.TEAM_1_TOTAL_UNDER, MarketType.TEAM_2_TOTAL_UNDER),
+        (MarketType.PERIOD_1_WIN_1, MarketType.PERIOD_1_WIN_2),
+    )
+    for first, second in (pair, pair[::-1])
+}
+
+
+def orient(market: MarketType, line: float, reversed_teams: bool) -> MarketLine:
+    """Рынок и линия котировки в порядке команд ключа события (EventKey.teams).
+
+    Линия форы в хранилище — фора той команды, на которую ставка: П1 с форой h
+    закрывается П2 с форой -h. Поэтому при обратном порядке команд меняется
+    только рынок: фора h первой команды букмекера — фора h второй команды ключа.
+
+    Args:
+        market (MarketType): рынок в ориентации букмекера.
+        line (float): линия рынка.
+        reversed_teams (bool): у букмекера команды в обратном порядке (EventKey.is_reversed).
+    """
+    if not reversed_teams:
+        return market, line
+    return MIRRORED_MARKETS.get(market, market), line
+
+
+class OddsStore:
+    """Хранилище последних коэффициентов: событие -> (рынок, линия) -> букмекер -> Quote."""
+
+    def __init__(self) -> None:
+        self._events: Dict[str, Dict[MarketLine, Dict[BookmakerName, Quote]]] = {}
+
+    def update(
+        self,
+        event: str,
+        market: MarketType,
+        line: float,
+        bookmaker: BookmakerName,
+        price: float,
+        ts: float,
+    ) -> None:
+        """Записывает коэффициент; более старые данные не перетирают свежие."""
+        quotes = self._events.setdefault(event, {}).setdefault((market, line), {})
+        quote = quotes.get(bookmaker)
+        if quote is None:
+            quotes[bookmaker] = Quote(price, ts)
+        elif ts >= quote.ts:
+            quote.price = price
+            quote.ts = ts
+
+    def apply(self, tick: OddsTick) -> None:
+        self.update(tick.event, tick.market, tick.line, tick.bookmaker, tick.price, tick.ts)
+
+    def event_markets(self, event: str) -> Dict[MarketLine, Dict[BookmakerName, Quote]]:
+        """Все рынки события с котировками букмекеров."""
+        return self._events.get(event, {})
+
+    def events(self) -> Iterator[str]:
+        return iter(self._events)
+
+    def remove_event(self, event: str) -> None:
+        self._events.pop(event, None)
+
+    def remove_bookmaker(self, event: str, bookmaker: BookmakerName) -> None:
+        """Удаляет котировки букмекера по событию, например когда событие пропало из линии."""
+        markets = self._events.get(event)
+        if not markets:
+            return
+        for key in list(markets):
+            quotes = markets[key]
+            quotes.pop(bookmaker, None)
+            if not quotes:
+                del markets[key]
+        if not markets:
+            del self._events[event]
+
+    def __len__(self) -> int:
+        return len(self._events)
@@ -0,0 +1,41 @@
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, Optional
+
+if TYPE_CHECKING:  # core.types импортирует этот модуль
+    from forkscan.core.types import BaseSportEvent, BookmakerName, EventKey
+
+BoardEvents = Mapping["EventKey", Mapping["BookmakerName", "BaseSportEvent"]]
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """Неизменяемая версия линии EventManager.
+
+    Версию строит EventManager.publish под блокировкой записи и подменяет
+    ссылку одним присваиванием. Читатель берёт ссылку без блокировок и может
+    сколько угодно обходить её, пока парсеры меняют следующую версию: словари
+    снимка доступны только для чтения и больше не изменяются.
+    """
+
+    version: int = 0
+    created_at: float = field(default_factory=time.time)  # UNIX timestamp
+    events: BoardEvents = field(default_factory=lambda: MappingProxyType({}))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def get_event(
+        self, event_key: "EventKey", bookmaker: "BookmakerName"
+    ) -> Optional["BaseSportEvent"]:
+        """Получает событие по ключу и букмекеру"""
+        return self.events.get(event_key, {}).get(bookmaker)
+
+    def get_same_events(self, event_key: "EventKey") -> Mapping["BookmakerName", "BaseSportEvent"]:
+        """Получает одно и то же событие у разных букмекеров"""
+        return self.events.get(event_key, MappingProxyType({}))
+
+    def get_all_events(self) -> BoardEvents:
+        """Получает все события версии"""
+        return self.events
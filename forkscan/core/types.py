@@ -1,11 +1,30 @@
 import re
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timezone
 from enum import Enum, auto
-from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 from unicodedata import normalize
 
+from forkscan.core.expiry import TimerWheel
+from forkscan.core.freshness import FreshnessTracker
+from forkscan.core.index import EventIndex
+from forkscan.core.snapshot import BoardSnapshot
+
 
 class BookmakerName(Enum):
     """Поддерживаемые букмекеры."""
@@ -62,6 +81,15 @@ class EventKey:
 
         return cls(tuple(normalized_teams))
 
+    def is_reversed(self, team1: str) -> bool:
+        """Первая команда букмекера — вторая в ключе.
+
+        Ключ упорядочен по названиям, а рынки П1/П2, форы и индивидуальные
+        тоталы букмекер ориентирует по своей первой команде; такие котировки
+        нужно перевести в порядок ключа (core.odds.orient).
+        """
+        return self._normalize_team_name(team1) != self.teams[0]
+
     @staticmethod
     def _normalize_team_name(name: str) -> str:
         """Нормализует название команды/игрока"""
@@ -120,6 +148,15 @@ class EventKey:
         return name
 
 
+def event_id(key: EventKey) -> str:
+    """Строковый идентификатор события для хранения вне EventManager."""
+    return "|".join(key.teams)
+
+
+# Получатель публикаций EventManager: новая версия и ключи, изменившиеся с прошлой
+BoardListener = Callable[[BoardSnapshot, Set[EventKey]], None]
+
+
 @dataclass
 class EventNormalizer(Generic[T], ABC):
     """Абстрактный класс для нормализации данных от разных букмекеров"""
@@ -231,55 +268,269 @@ class FootballEvent(BaseSportEvent):
 
 @dataclass
 class EventManager:
-    """Менеджер для управления событиями"""
+    """Менеджер для управления событиями
+
+    Каждое добавление события продлевает его срок: событие, которое букмекер
+    не присылал ``expiry_grace`` секунд, удаляется в ``expire_events``. Событие,
+    начавшееся больше ``max_event_duration`` секунд назад, удаляется, даже если
+    фид продолжает его присылать.
+
+    Изменения идут под блокировкой записи; потоки-читатели обходят не ``events``,
+    а неизменяемый снимок ``snapshot()``, который парсер публикует в конце
+    цикла (``publish``). Новая версия копирует только внешний словарь и записи
+    изменившихся событий.
+    """
 
     events: Dict[EventKey, Dict[BookmakerName, BaseSportEvent]] = field(default_factory=dict)
     normalizers: Dict[BookmakerName, Dict[SportType, EventNormalizer]] = field(default_factory=dict)
-
-    def add_event(self, event: BaseSportEvent) -> BaseSportEvent:
-        """Добавляет событие в менеджер"""
+    freshness: FreshnessTracker = field(default_factory=FreshnessTracker)
+    index: EventIndex = field(default_factory=EventIndex, repr=False)
+    expiry_grace: float = 60.0
+    max_event_duration: float = 6 * 3600.0
+    # (букмекер, ID у букмекера) -> ключ события
+    _keys: Dict[Tuple[BookmakerName, str], EventKey] = field(default_factory=dict, repr=False)
+    _expiry: TimerWheel = field(
+        default_factory=lambda: TimerWheel(start=datetime.now(UTC).timestamp()), repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _snapshot: BoardSnapshot = field(default_factory=BoardSnapshot, repr=False)
+    # словарь за MappingProxyType последнего снимка: dict.copy не пересчитывает хеши ключей
+    _published: Dict[EventKey, Mapping[BookmakerName, BaseSportEvent]] = field(
+        default_factory=dict, repr=False
+    )
+    # ключи событий, изменившихся после последней публикации
+    _changed: Set[EventKey] = field(default_factory=set, repr=False)
+    _listeners: List[BoardListener] = field(default_factory=list, repr=False)
+
+    def add_event(
+        self,
+        event: BaseSportEvent,
+        grace: Optional[float] = None,
+        event_key: Optional[EventKey] = None,
+    ) -> BaseSportEvent:
+        """
+        Добавляет событие в менеджер и отмечает, что букмекер его подтвердил
+
+        Args:
+            event: Событие букмекера
+            grace: Через сколько секунд без повторного добавления удалить событие,
+                по умолчанию expiry_grace; math.inf — только по времени начала
+            event_key: Уже вычисленный ключ события (например, из снимка линии),
+                чтобы не нормализовать названия команд повторно
+        """
         try:
-            event_key = event.create_key()
-            if event_key not in self.events:
-                self.events[event_key] = {}
-            self.events[event_key][event.bookmaker] = event
+            now = datetime.now(UTC).timestamp()
+            purge_at = event.start_time.timestamp() + self.max_event_duration
+            if purge_at <= now:
+                # Давно начавшиеся события не принимаем, даже если фид их ещё присылает
+                return event
+            if event_key is None:
+                event_key = event.create_key()
+            id_key = (event.bookmaker, event.bookmaker_id)
+            with self._lock:
+                previous_key = self._keys.get(id_key)
+                if previous_key is not None and previous_key != event_key:
+                    # Букмекер переименовал команды: старая запись больше не актуальна
+                    self._discard(previous_key, event.bookmaker)
+                bookmaker_events = self.events.setdefault(event_key, {})
+                if bookmaker_events.get(event.bookmaker) != event:
+                    self._changed.add(event_key)
+                bookmaker_events[event.bookmaker] = event
+                self._keys[id_key] = event_key
+                self.index.add(event_key, event)
+                self.freshness.confirm_event(event_id(event_key), event.bookmaker, now)
+                self._expiry.schedule(
+                    id_key, min(now + (self.expiry_grace if grace is None else grace), purge_at)
+                )
             return event
         except ValueError as e:
             print(f"Failed to add event: {e}")
             print(f"Event data: {event}")
             raise
 
+    def extend_events(
+        self,
+        bookmaker: BookmakerName,
+        bookmaker_ids: Iterable[str],
+        grace: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Продлевает срок событий букмекера так же, как повторное добавление
+
+        Нужен, когда фид ответил, что линия не изменилась (304 или то же тело):
+        события последнего полного ответа по-прежнему в линии, но не разбирались.
+
+        Args:
+            bookmaker: Букмекер
+            bookmaker_ids: ID событий у букмекера
+            grace: Новый срок в секундах, по умолчанию expiry_grace
+            now: Текущее время (UNIX timestamp)
+
+        Returns:
+            Число продлённых событий
+        """
+        now = datetime.now(UTC).timestamp() if now is None else now
+        grace = self.expiry_grace if grace is None else grace
+        extended = 0
+        with self._lock:
+            for bookmaker_id in bookmaker_ids:
+                id_key = (bookmaker, bookmaker_id)
+                event_key = self._keys.get(id_key)
+                event = self.get_event(event_key, bookmaker) if event_key is not None else None
+                if event is None:
+                    continue
+                purge_at = event.start_time.timestamp() + self.max_event_duration
+                self._expiry.schedule(id_key, min(now + grace, purge_at))
+                extended += 1
+        return extended
+
     def get_event(self, event_key: EventKey, bookmaker: BookmakerName) -> Optional[BaseSportEvent]:
         """Получает событие по ключу и букмекеру"""
         return self.events.get(event_key, {}).get(bookmaker)
 
+    def get_event_by_id(
+        self, bookmaker: BookmakerName, bookmaker_id: str
+    ) -> Optional[BaseSportEvent]:
+        """Получает событие по ID букмекера"""
+        event_key = self._keys.get((bookmaker, bookmaker_id))
+        return self.get_event(event_key, bookmaker) if event_key is not None else None
+
+    def expiry_deadline(self, bookmaker: BookmakerName, bookmaker_id: str) -> Optional[float]:
+        """Когда событие будет удалено без повторного добавления (UNIX timestamp)"""
+        return self._expiry.deadline((bookmaker, bookmaker_id))
+
     def get_same_events(self, event: BaseSportEvent) -> Dict[BookmakerName, BaseSportEvent]:
         """Получает одно и то же событие у разных букмекеров"""
         event_key = event.create_key()
         return self.events.get(event_key, {})
 
     def get_all_events(self) -> Dict[EventKey, Dict[BookmakerName, BaseSportEvent]]:
-        """Получает все события"""
+        """Получает все события
+
+        Живой словарь: обходить его можно только из потока, который меняет
+        менеджер. Остальным — snapshot().
+        """
         return self.events
 
+    def snapshot(self) -> BoardSnapshot:
+        """Последняя опубликованная версия линии; без блокировок"""
+        return self._snapshot
+
+    def add_listener(self, listener: BoardListener) -> None:
+        """Подписывает на публикации, например для репликации линии.
+
+        Подписчик вызывается под блокировкой записи и должен только запоминать
+        версию и ключи, не выполняя долгой работы.
+        """
+        self._listeners.append(listener)
+
+    def publish(self) -> BoardSnapshot:
+        """
+        Публикует изменения с прошлой публикации новой версией снимка
+
+        Returns:
+            Текущая версия; если изменений не было — прежняя
+        """
+        with self._lock:
+            previous = self._snapshot
+            if not self._changed:
+                return previous
+            changed, self._changed = self._changed, set()
+            events = self._published.copy()
+            for event_key in changed:
+                bookmaker_events = self.events.get(event_key)
+                if bookmaker_events is None:
+                    events.pop(event_key, None)
+                else:
+                    events[event_key] = MappingProxyType(dict(bookmaker_events))
+            # Присваивание ссылки атомарно: читатель видит либо старую, либо новую версию
+            self._published = events
+            self._snapshot = BoardSnapshot(previous.version + 1, events=MappingProxyType(events))
+            # Под блокировкой: подписчики видят версии по порядку и без пропусков
+            for listener in self._listeners:
+                listener(self._snapshot, changed)
+            return self._snapshot
+
+    def query(
+        self,
+        sport: Optional[SportType] = None,
+        status: Optional[EventStatus] = None,
+        league: Optional[str] = None,
+        start_from: Optional[datetime] = None,
+        start_to: Optional[datetime] = None,
+    ) -> Dict[EventKey, Dict[BookmakerName, BaseSportEvent]]:
+        """
+        Получает события по фильтрам через вторичные индексы
+
+        Событие подходит, если хотя бы у одного букмекера совпадают все фильтры.
+        Например, live-футбол на ближайшие два часа:
+        ``query(SportType.FOOTBALL, EventStatus.LIVE, start_to=now + timedelta(hours=2))``
+
+        Args:
+            sport: Вид спорта
+            status: Статус события
+            league: Лига (без учёта регистра)
+            start_from: Начало не раньше
+            start_to: Начало раньше
+
+        Returns:
+            События в порядке времени начала, в том же виде, что get_all_events
+        """
+        with self._lock:
+            keys = self.index.query(
+                sport,
+                status,
+                league,
+                start_from.timestamp() if start_from is not None else None,
+                start_to.timestamp() if start_to is not None else None,
+            )
+            # Копии: результат можно обходить, пока парсеры меняют линию
+            return {key: dict(self.events[key]) for key in keys}
+
+    def _discard(self, event_key: EventKey, bookmaker: BookmakerName) -> None:
+        bookmaker_events = self.events.get(event_key)
+        if bookmaker_events is None or bookmaker not in bookmaker_events:
+            return
+        self.freshness.forget(event_id(event_key), bookmaker)
+        self.index.remove(event_key, bookmaker)
+        self._changed.add(event_key)
+        if len(bookmaker_events) == 1:
+            # Если это единственное событие для данного ключа, удаляем весь ключ
+            print("Пропало событие", bookmaker_events)
+            del self.events[event_key]
+        else:
+            # Иначе удаляем только событие конкретного букмекера
+            del bookmaker_events[bookmaker]
+
     def remove_event_by_id(self, bookmaker: BookmakerName, bookmaker_id: str) -> None:
         """Удаляет событие по ID букмекера"""
-        # Находим все ключи событий
-        keys_to_remove = []
-        for event_key, bookmaker_events in self.events.items():
-            if (
-                bookmaker in bookmaker_events
-                and bookmaker_events[bookmaker].bookmaker_id == bookmaker_id
+        with self._lock:
+            event_key = self._keys.pop((bookmaker, bookmaker_id), None)
+            self._expiry.cancel((bookmaker, bookmaker_id))
+            if event_key is not None:
+                self._discard(event_key, bookmaker)
+
+    def expire_events(self, now: Optional[float] = None) -> List[BaseSportEvent]:
+        """
+        Удаляет события с истёкшим сроком
+
+        Стоимость пропорциональна числу истёкших событий, а не всех активных,
+        поэтому вызывать можно после каждого цикла любого парсера.
+
+        Returns:
+            Удалённые события
+        """
+        expired = []
+        with self._lock:
+            for bookmaker, bookmaker_id in self._expiry.advance(
+                datetime.now(UTC).timestamp() if now is None else now
             ):
-                if len(bookmaker_events) == 1:
-                    # Если это единственное событие для данного ключа,
-                    # помечаем весь ключ на удаление
-                    keys_to_remove.append(event_key)
-                else:
-                    # Иначе удаляем только событие конкретного букмекера
-                    del bookmaker_events[bookmaker]
-
-        # Удаляем помеченные ключи
-        for key in keys_to_remove:
-            print("Пропало событие", self.events[key])
-            del self.events[key]
+                event_key = self._keys.pop((bookmaker, bookmaker_id), None)
+                if event_key is None:
+                    continue
+                event = self.get_event(event_key, bookmaker)
+                if event is not None:
+                    expired.append(event)
+                self._discard(event_key, bookmaker)
+        return expired
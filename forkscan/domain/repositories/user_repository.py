@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from forkscan.infrastructure.database.models import User
 
@@ -19,6 +19,15 @@ class UserRepository:
         result = await self.session.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+    async def update_promo_code(self, user_id: int, promo_code: str):
+        """Меняет промокод одним UPDATE ... RETURNING; None, если пользователя нет."""
+        result = await self.session.execute(
+            update(User).where(User.id == user_id).values(promo_code=promo_code).returning(User)
+        )
+        user = result.scalar_one_or_none()
+        await self.session.commit()
+        return user
+
     async def create(
         self, email: str, hashed_password: str, promo_code: str, referrer_id: int = None
     ):
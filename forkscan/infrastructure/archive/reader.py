@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from forkscan.core.odds import OddsTick
+from forkscan.core.types import BookmakerName, MarketType
+from forkscan.infrastructure.archive.segment import SegmentFile
+from forkscan.infrastructure.archive.writer import load_manifest
+
+
+@dataclass
+class TickBatch:
+    """Пачка тиков в виде колонок NumPy.
+
+    Колонка event содержит индексы в event_names; market и bookmaker —
+    значения MarketType и BookmakerName.
+    """
+
+    ts: np.ndarray  # float64, UNIX timestamp
+    event: np.ndarray  # uint32
+    market: np.ndarray  # uint8
+    line: np.ndarray  # float32
+    bookmaker: np.ndarray  # uint8
+    price: np.ndarray  # float64
+    event_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def ticks(self) -> Iterator[OddsTick]:
+        """Разворачивает пачку обратно в объекты OddsTick."""
+        for ts, event, market, line, bookmaker, price in zip(
+            self.ts.tolist(),
+            self.event.tolist(),
+            self.market.tolist(),
+            self.line.tolist(),
+            self.bookmaker.tolist(),
+            self.price.tolist(),
+        ):
+            yield OddsTick(
+                event=self.event_names[event],
+                market=MarketType(market),
+                line=line,
+                bookmaker=BookmakerName(bookmaker),
+                price=price,
+                ts=ts,
+            )
+
+
+class OddsArchiveReader:
+    """Чтение архива тиков по диапазону времени и событиям.
+
+    Сегменты вне диапазона отбрасываются по manifest.json без открытия файла,
+    внутри сегмента распаковываются только блоки, попадающие в диапазон
+    времени и содержащие запрошенные события.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Сегменты, пересекающиеся с полуинтервалом [start, end)."""
+        return [
+            segment
+            for segment in load_manifest(self.directory)
+            if (start is None or segment["ts_max"] >= start)
+            and (end is None or segment["ts_min"] < end)
+        ]
+
+    def time_range(self) -> Optional[tuple[float, float]]:
+        """Минимальная и максимальная метка времени в архиве."""
+        segments = load_manifest(self.directory)
+        if not segments:
+            return None
+        return min(s["ts_min"] for s in segments), max(s["ts_max"] for s in segments)
+
+    def scan(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        events: Optional[Iterable[str]] = None,
+        bookmakers: Optional[Iterable[BookmakerName]] = None,
+    ) -> Iterator[TickBatch]:
+        """Возвращает тики в порядке времени пачками по блоку сегмента.
+
+        Args:
+            start (float, optional): начало диапазона (включительно).
+            end (float, optional): конец диапазона (не включительно).
+            events (Iterable[str], optional): только указанные события.
+            bookmakers (Iterable[BookmakerName], optional): только указанные букмекеры.
+
+        Yields:
+            TickBatch: непустая пачка тиков.
+        """
+        wanted_events = set(events) if events is not None else None
+        wanted_bookmakers = (
+            np.array([b.value for b in bookmakers], dtype=np.uint8)
+            if bookmakers is not None
+            else None
+        )
+
+        for segment in self.segments(start, end):
+            with SegmentFile(self.directory / segment["file"]) as file:
+                index = file.index
+                if wanted_events is None:
+                    codes = None
+                    block_numbers = range(len(index.blocks))
+                else:
+                    codes = np.array(
+                        [c for c, name in enumerate(index.event_names) if name in wanted_events],
+                        dtype=np.uint32,
+                    )
+                    block_numbers = sorted(
+                        {n for code in codes.tolist() for n in index.blocks_for_event(code)}
+                    )
+
+                for number in block_numbers:
+                    block = index.blocks[number]
+                    if (start is not None and block.ts_max < start) or (
+                        end is not None and block.ts_min >= end
+                    ):
+                        continue
+                    columns = file.read_block(number)
+                    ts = columns["ts"] / 1e6
+
+                    mask = np.ones(len(ts), dtype=bool)
+                    if start is not None:
+                        mask &= ts >= start
+                    if end is not None:
+                        mask &= ts < end
+                    if codes is not None:
+                        mask &= np.isin(columns["event"], codes)
+                    if wanted_bookmakers is not None:
+                        mask &= np.isin(columns["bookmaker"], wanted_bookmakers)
+                    if not mask.any():
+                        continue
+
+                    yield TickBatch(
+                        ts=ts[mask],
+                        event=columns["event"][mask],
+                        market=columns["market"][mask],
+                        line=columns["line"][mask],
+                        bookmaker=columns["bookmaker"][mask],
+                        price=columns["price"][mask],
+                        event_names=index.event_names,
+                    )
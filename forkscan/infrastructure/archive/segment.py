@@ -0,0 +1,195 @@
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"FSODDS01"
+SEGMENT_SUFFIX = ".oda"
+_FOOTER = struct.Struct("<Q8s")  # длина индекса, MAGIC
+
+# Колонки сегмента и их тип на диске. Время хранится в микросекундах
+# и кодируется разностями, поэтому сжимается почти до нуля при частых тиках.
+COLUMNS: Dict[str, np.dtype] = {
+    "ts": np.dtype("<i8"),
+    "event": np.dtype("<u4"),
+    "market": np.dtype("u1"),
+    "line": np.dtype("<f4"),
+    "bookmaker": np.dtype("u1"),
+    "price": np.dtype("<f8"),
+}
+
+
+@dataclass
+class BlockInfo:
+    """Индекс блока строк: диапазон времени, события и смещения колонок."""
+
+    rows: int
+    ts_min: float
+    ts_max: float
+    events: List[int]  # коды событий, встречающихся в блоке
+    columns: Dict[str, List[int]]  # колонка -> [смещение, длина] сжатых данных
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "ts_min": self.ts_min,
+            "ts_max": self.ts_max,
+            "events": self.events,
+            "columns": self.columns,
+        }
+
+
+@dataclass
+class SegmentIndex:
+    """Индекс сегмента, хранится в конце файла."""
+
+    rows: int
+    ts_min: float
+    ts_max: float
+    event_names: List[str]
+    blocks: List[BlockInfo]
+    _event_blocks: Optional[Dict[int, List[int]]] = field(default=None, repr=False)
+
+    def blocks_for_event(self, code: int) -> List[int]:
+        """Номера блоков, содержащих событие с указанным кодом."""
+        if self._event_blocks is None:
+            self._event_blocks = {}
+            for number, block in enumerate(self.blocks):
+                for event_code in block.events:
+                    self._event_blocks.setdefault(event_code, []).append(number)
+        return self._event_blocks.get(code, [])
+
+    def to_bytes(self) -> bytes:
+        data = {
+            "rows": self.rows,
+            "ts_min": self.ts_min,
+            "ts_max": self.ts_max,
+            "event_names": self.event_names,
+            "blocks": [block.to_dict() for block in self.blocks],
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "SegmentIndex":
+        data = json.loads(zlib.decompress(raw))
+        return cls(
+            rows=data["rows"],
+            ts_min=data["ts_min"],
+            ts_max=data["ts_max"],
+            event_names=data["event_names"],
+            blocks=[BlockInfo(**block) for block in data["blocks"]],
+        )
+
+
+def _encode_column(name: str, values: np.ndarray, level: int) -> bytes:
+    values = values.astype(COLUMNS[name], copy=False)
+    if name == "ts":
+        values = np.diff(values, prepend=np.int64(0))
+    return zlib.compress(values.tobytes(), level)
+
+
+def _decode_column(name: str, raw: bytes) -> np.ndarray:
+    values = np.frombuffer(zlib.decompress(raw), dtype=COLUMNS[name])
+    if name == "ts":
+        values = np.cumsum(values)
+    return values
+
+
+def write_segment(
+    path: Path,
+    columns: Dict[str, np.ndarray],
+    event_names: Sequence[str],
+    block_rows: int,
+    level: int = 6,
+) -> SegmentIndex:
+    """Атомарно записывает отсортированные по времени колонки в файл сегмента.
+
+    Args:
+        path (Path): итоговый путь сегмента.
+        columns (dict): колонки из COLUMNS; ts — в микросекундах.
+        event_names (Sequence[str]): таблица строк для колонки event.
+        block_rows (int): число строк в блоке.
+        level (int): уровень сжатия zlib.
+
+    Returns:
+        SegmentIndex: индекс записанного сегмента.
+    """
+    rows = len(columns["ts"])
+    blocks: List[BlockInfo] = []
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        offset = len(MAGIC)
+        for start in range(0, rows, block_rows):
+            stop = min(start + block_rows, rows)
+            ts = columns["ts"][start:stop]
+            block_columns: Dict[str, List[int]] = {}
+            for name in COLUMNS:
+                raw = _encode_column(name, columns[name][start:stop], level)
+                file.write(raw)
+                block_columns[name] = [offset, len(raw)]
+                offset += len(raw)
+            blocks.append(
+                BlockInfo(
+                    rows=stop - start,
+                    ts_min=int(ts[0]) / 1e6,
+                    ts_max=int(ts[-1]) / 1e6,
+                    events=np.unique(columns["event"][start:stop]).tolist(),
+                    columns=block_columns,
+                )
+            )
+
+        index = SegmentIndex(
+            rows=rows,
+            ts_min=blocks[0].ts_min if blocks else 0.0,
+            ts_max=blocks[-1].ts_max if blocks else 0.0,
+            event_names=list(event_names),
+            blocks=blocks,
+        )
+        raw_index = index.to_bytes()
+        file.write(raw_index)
+        file.write(_FOOTER.pack(len(raw_index), MAGIC))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, path)
+    return index
+
+
+class SegmentFile:
+    """Файл сегмента, открытый на чтение. Блоки читаются и распаковываются по запросу."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: BinaryIO = open(path, "rb")
+        self._file.seek(-_FOOTER.size, os.SEEK_END)
+        index_len, magic = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an odds archive segment")
+        self._file.seek(-_FOOTER.size - index_len, os.SEEK_END)
+        self.index = SegmentIndex.from_bytes(self._file.read(index_len))
+
+    def read_block(self, number: int, names: Iterable[str] = COLUMNS) -> Dict[str, np.ndarray]:
+        """Распаковывает выбранные колонки одного блока."""
+        block = self.index.blocks[number]
+        result = {}
+        for name in names:
+            offset, length = block.columns[name]
+            self._file.seek(offset)
+            result[name] = _decode_column(name, self._file.read(length))
+        return result
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SegmentFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,108 @@
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from forkscan.core.odds import OddsTick
+from forkscan.infrastructure.archive.segment import SEGMENT_SUFFIX, write_segment
+
+MANIFEST_NAME = "manifest.json"
+
+
+def load_manifest(directory: Path) -> List[Dict]:
+    """Читает список сегментов архива в порядке записи."""
+    path = Path(directory) / MANIFEST_NAME
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class OddsArchiveWriter:
+    """Дописывает тики коэффициентов в архив сжатых колоночных сегментов.
+
+    Тики буферизуются в памяти и сбрасываются в новый сегмент, когда буфер
+    выходит за ``segment_span`` секунд или ``max_segment_rows`` строк.
+    Уже записанные сегменты не меняются; список сегментов с их диапазонами
+    времени лежит в manifest.json и обновляется атомарно.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_span: float = 3600.0,
+        max_segment_rows: int = 2_000_000,
+        block_rows: int = 16_384,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_span = segment_span
+        self.max_segment_rows = max_segment_rows
+        self.block_rows = block_rows
+        self._manifest = load_manifest(self.directory)
+        self._buffer: List[OddsTick] = []
+        self._buffer_start = math.inf
+
+    def append(self, tick: OddsTick) -> None:
+        """Добавляет тик в архив."""
+        if self._buffer and (
+            tick.ts - self._buffer_start >= self.segment_span
+            or len(self._buffer) >= self.max_segment_rows
+        ):
+            self.flush()
+        self._buffer.append(tick)
+        self._buffer_start = min(self._buffer_start, tick.ts)
+
+    def extend(self, ticks: Iterable[OddsTick]) -> None:
+        for tick in ticks:
+            self.append(tick)
+
+    def flush(self) -> None:
+        """Записывает накопленные тики отдельным сегментом."""
+        if not self._buffer:
+            return
+        ticks = sorted(self._buffer, key=lambda t: t.ts)
+        self._buffer = []
+        self._buffer_start = math.inf
+
+        event_codes: Dict[str, int] = {}
+        columns = {
+            "ts": np.fromiter((round(t.ts * 1e6) for t in ticks), np.int64, len(ticks)),
+            "event": np.fromiter(
+                (event_codes.setdefault(t.event, len(event_codes)) for t in ticks),
+                np.uint32,
+                len(ticks),
+            ),
+            "market": np.fromiter((t.market.value for t in ticks), np.uint8, len(ticks)),
+            "line": np.fromiter((t.line for t in ticks), np.float32, len(ticks)),
+            "bookmaker": np.fromiter((t.bookmaker.value for t in ticks), np.uint8, len(ticks)),
+            "price": np.fromiter((t.price for t in ticks), np.float64, len(ticks)),
+        }
+
+        name = f"{len(self._manifest):08d}-{int(ticks[0].ts)}{SEGMENT_SUFFIX}"
+        index = write_segment(self.directory / name, columns, list(event_codes), self.block_rows)
+        self._manifest.append(
+            {"file": name, "rows": index.rows, "ts_min": index.ts_min, "ts_max": index.ts_max}
+        )
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        path = self.directory / MANIFEST_NAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self._manifest, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "OddsArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
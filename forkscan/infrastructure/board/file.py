@@ -0,0 +1,171 @@
+import asyncio
+import gc
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.snapshot import BoardSnapshot
+from forkscan.core.types import EventManager
+from forkscan.infrastructure.board.layout import BoardTables, BoardView, encode_board
+
+logger = logging.getLogger(__name__)
+
+
+def write_board_file(path: Path, tables: BoardTables) -> int:
+    """Атомарно записывает снимок линии в файл.
+
+    Снимок пишется во временный файл рядом и подменяет прежний через os.replace:
+    читатель видит либо старый снимок, либо новый целиком.
+
+    Returns:
+        int: размер файла в байтах.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    size = 0
+    with open(tmp_path, "wb") as file:
+        for part in tables.parts():
+            file.write(part)
+            size += len(part)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    return size
+
+
+class BoardFile(BoardView):
+    """Снимок линии, отображённый в память (mmap) только на чтение.
+
+    Открытие не читает файл: страницы подгружает ОС по мере обращения,
+    поэтому поиск по снимку доступен сразу после старта.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        super().__init__(self._mmap)
+
+    def close(self) -> None:
+        # Массивы numpy держат ссылку на буфер; mmap закрывается, когда их не останется
+        del self.events, self.odds, self.feeds, self.strings
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "BoardFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class BoardCheckpointer:
+    """Периодически сохраняет линию на диск и восстанавливает её при старте.
+
+    Версия линии публикуется в цикле событий, а снимок из неё собирается и
+    пишется в отдельном потоке: котировки копируются словарями целиком
+    (см. encode_board), поэтому цикл событий с парсерами не блокируется.
+    """
+
+    def __init__(
+        self,
+        manager: EventManager,
+        store: Optional[OddsStore],
+        path: Path,
+        interval: float = 30.0,
+    ):
+        """
+        Args:
+            manager (EventManager): менеджер событий.
+            store (OddsStore, optional): хранилище коэффициентов.
+            path (Path): файл снимка.
+            interval (float): период сохранения, секунды.
+        """
+        self.manager = manager
+        self.store = store
+        self.path = Path(path)
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(
+        cls, manager: EventManager, store: Optional[OddsStore] = None
+    ) -> "BoardCheckpointer":
+        from forkscan.core.config import settings
+
+        return cls(manager, store, settings.board_snapshot_path, settings.board_snapshot_interval)
+
+    async def restore(self) -> int:
+        """Загружает последний снимок, если он есть; возвращает число событий.
+
+        Перенос снимка в менеджер и хранилище занимает секунды на сотнях тысяч
+        событий, поэтому идёт в отдельном потоке, а версия линии публикуется уже
+        в цикле событий. Вызывать до запуска парсеров: хранилище коэффициентов
+        не рассчитано на запись из двух потоков.
+        """
+        if not self.path.exists():
+            return 0
+        started = time.perf_counter()
+        # Загрузка создаёт миллионы объектов и раз за разом запускает полную сборку
+        # мусора, а она держит GIL сотни миллисекунд. Циклических ссылок загрузка
+        # не создаёт, поэтому сборщик на это время выключается, а загруженное
+        # замораживается (gc.freeze), чтобы его не обходила и следующая сборка
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with BoardFile(self.path) as board:
+                restored = await asyncio.to_thread(board.restore_into, self.manager, self.store)
+                age = time.time() - board.created_at
+            self.manager.publish()
+        except (OSError, ValueError) as error:
+            logger.error("Failed to restore board from %s: %s", self.path, error)
+            return 0
+        finally:
+            gc.freeze()
+            if collecting:
+                gc.enable()
+        logger.info(
+            "Restored %d events from %s (%.0fs old) in %.0fms",
+            restored,
+            self.path,
+            age,
+            (time.perf_counter() - started) * 1000,
+        )
+        return restored
+
+    async def checkpoint(self) -> int:
+        """Сохраняет текущую линию; возвращает размер снимка в байтах."""
+        board = self.manager.publish()
+        return await asyncio.to_thread(self._write, board)
+
+    def _write(self, board: BoardSnapshot) -> int:
+        return write_board_file(self.path, encode_board(self.manager, self.store, board))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Останавливает цикл и сохраняет линию напоследок."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.checkpoint()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error("Failed to checkpoint board: %s", error, exc_info=True)
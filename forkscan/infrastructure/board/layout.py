@@ -0,0 +1,426 @@
+import bisect
+import math
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from forkscan.core.odds import MarketLine, OddsStore, Quote
+from forkscan.core.snapshot import BoardSnapshot
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import (
+    BookmakerName,
+    EventKey,
+    EventManager,
+    EventStatus,
+    MarketType,
+    SportType,
+    event_id,
+)
+
+MAGIC = b"FSBOARD1"
+# MAGIC, версия линии, время снимка, число событий, котировок, фидов, строк, длина данных строк
+HEADER = struct.Struct("<8sQdQQQQQ")
+
+# Строки (команды, лиги, ID у букмекеров) лежат в отсортированной таблице строк,
+# записи ссылаются на них номерами: сравнение номеров = сравнение строк.
+# Ключ события — номер первой команды ключа << 32 | номер второй. Отсутствующее время — NaN.
+EVENT_DTYPE = np.dtype(
+    {
+        "names": [
+            "key",
+            "bookmaker_id",
+            "league",
+            "event_name",
+            "team1",
+            "team2",
+            "bookmaker",
+            "sport",
+            "status",
+            "start",
+            "deadline",
+            "confirmed",
+        ],
+        "formats": ["<u8"] + ["<u4"] * 5 + ["u1"] * 3 + ["<f8"] * 3,
+        "offsets": [0, 8, 12, 16, 20, 24, 28, 29, 30, 32, 40, 48],
+        "itemsize": 56,
+    }
+)
+ODDS_DTYPE = np.dtype(
+    {
+        "names": ["event", "market", "bookmaker", "line", "price", "ts"],
+        "formats": ["<u4", "u1", "u1", "<f8", "<f8", "<f8"],
+        "offsets": [0, 4, 5, 8, 16, 24],
+        "itemsize": 32,
+    }
+)
+FEED_DTYPE = np.dtype(
+    {
+        "names": ["bookmaker", "confirmed", "cycle"],
+        "formats": ["u1", "<f8", "<f8"],
+        "offsets": [0, 8, 16],
+        "itemsize": 24,
+    }
+)
+STRING_OFFSET_DTYPE = np.dtype("<u8")
+
+STATUSES = list(EventStatus)  # код статуса — позиция в перечислении
+_STATUS_CODES = {status.value: code for code, status in enumerate(STATUSES)}
+_BOOKMAKERS = {bookmaker.value: bookmaker for bookmaker in BookmakerName}
+_SPORTS = {sport.value: sport for sport in SportType}
+_MARKETS = {market.value: market for market in MarketType}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _time(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+def _teams(key: int, strings) -> Tuple[str, str]:
+    return strings[key >> 32], strings[key & 0xFFFFFFFF]
+
+
+def _rows(table: np.ndarray, chunk: int = 10_000) -> Iterator[tuple]:
+    """Записи таблицы кортежами; tolist() по частям не держит GIL на всю таблицу."""
+    for start in range(0, len(table), chunk):
+        yield from table[start : start + chunk].tolist()
+
+
+@dataclass
+class BoardTables:
+    """Линия в виде таблиц фиксированного формата, готовых к записи в файл или память.
+
+    Формат: заголовок HEADER, затем с выравниванием по 8 байт записи событий
+    (отсортированы по ключу события и букмекеру), котировок (по событию), фидов,
+    смещения строк и данные строк в UTF-8.
+    """
+
+    version: int
+    created_at: float
+    events: np.ndarray
+    odds: np.ndarray
+    feeds: np.ndarray
+    string_offsets: np.ndarray
+    string_data: bytes
+
+    @classmethod
+    def empty(cls) -> "BoardTables":
+        return cls(
+            version=0,
+            created_at=0.0,
+            events=np.zeros(0, EVENT_DTYPE),
+            odds=np.zeros(0, ODDS_DTYPE),
+            feeds=np.zeros(0, FEED_DTYPE),
+            string_offsets=np.zeros(1, STRING_OFFSET_DTYPE),
+            string_data=b"",
+        )
+
+    def parts(self) -> Iterator[bytes]:
+        """Части снимка по порядку, включая выравнивание."""
+        yield HEADER.pack(
+            MAGIC,
+            self.version,
+            self.created_at,
+            len(self.events),
+            len(self.odds),
+            len(self.feeds),
+            len(self.string_offsets) - 1,
+            len(self.string_data),
+        )
+        offset = HEADER.size
+        for part in (
+            self.events.tobytes(),
+            self.odds.tobytes(),
+            self.feeds.tobytes(),
+            self.string_offsets.tobytes(),
+            self.string_data,
+        ):
+            yield part
+            offset += len(part)
+            padding = _align(offset) - offset
+            if padding:
+                yield bytes(padding)
+                offset += padding
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(part) for part in self.parts())
+
+
+def encode_board(
+    manager: EventManager,
+    store: Optional[OddsStore] = None,
+    board: Optional[BoardSnapshot] = None,
+) -> BoardTables:
+    """
+    Собирает снимок линии: события, ключи, сроки, свежесть и котировки
+
+    События берутся из неизменяемой версии линии, котировки копируются
+    словарями за один вызов, поэтому вызывать можно из другого потока
+    параллельно с парсерами. Версию публикуют в цикле событий и передают сюда:
+    слушатели manager.publish() не должны срабатывать в чужом потоке.
+
+    Args:
+        manager (EventManager): менеджер событий.
+        store (OddsStore, optional): хранилище коэффициентов.
+        board (BoardSnapshot, optional): версия линии; по умолчанию последняя
+            опубликованная (manager.snapshot()).
+
+    Returns:
+        BoardTables: таблицы снимка.
+    """
+    if board is None:
+        board = manager.snapshot()
+    freshness = manager.freshness
+
+    # Перечисления читаются через _value_: свойство value и Enum.__hash__ написаны
+    # на Python и на сотнях тысяч записей занимают большую часть времени
+    entries = [
+        (event_key, event)
+        for event_key, bookmaker_events in board.events.items()
+        for event in bookmaker_events.values()
+    ]
+    # list(...) копирует словарь за один вызов C, поэтому хранилище можно
+    # читать из другого потока, пока его меняет цикл событий
+    store_events = list(store.events()) if store is not None else []
+
+    names = set(store_events)
+    for event_key, event in entries:
+        names.update(event_key.teams)
+        names.update((event.bookmaker_id, event.league, event.event_name, event.team1, event.team2))
+    strings = sorted(names)
+    codes = {name: code for code, name in enumerate(strings)}
+    encoded = [name.encode("utf-8") for name in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=STRING_OFFSET_DTYPE)
+    np.cumsum([len(name) for name in encoded], out=string_offsets[1:])
+
+    events = np.array(
+        [
+            (
+                codes[event_key.teams[0]] << 32 | codes[event_key.teams[1]],
+                codes[event.bookmaker_id],
+                codes[event.league],
+                codes[event.event_name],
+                codes[event.team1],
+                codes[event.team2],
+                event.bookmaker._value_,
+                event.sport_type._value_,
+                _STATUS_CODES[event.status._value_],
+                event.start_time.timestamp(),
+                _time(manager.expiry_deadline(event.bookmaker, event.bookmaker_id)),
+                _time(freshness.event_confirmed(event_id(event_key), event.bookmaker)),
+            )
+            for event_key, event in entries
+        ],
+        dtype=EVENT_DTYPE,
+    )
+    events = events[np.lexsort((events["bookmaker"], events["key"]))]
+    odds_rows = []
+    for event in store_events:
+        code = codes[event]
+        for (market, line), bookmaker_quotes in list(store.event_markets(event).items()):
+            for bookmaker, quote in list(bookmaker_quotes.items()):
+                odds_rows.append(
+                    (code, market._value_, bookmaker._value_, line, quote.price, quote.ts)
+                )
+    odds = np.array(odds_rows, dtype=ODDS_DTYPE)
+    odds = odds[np.argsort(odds["event"], kind="stable")]
+    feeds = np.array(
+        [
+            (bookmaker._value_, _time(confirmed), _time(cycle))
+            for bookmaker, (confirmed, cycle) in freshness.feeds().items()
+        ],
+        dtype=FEED_DTYPE,
+    )
+    return BoardTables(
+        version=board.version,
+        created_at=time.time(),
+        events=events,
+        odds=odds,
+        feeds=feeds,
+        string_offsets=string_offsets,
+        string_data=b"".join(encoded),
+    )
+
+
+class _StringTable:
+    """Таблица строк снимка как последовательность: строки декодируются по запросу."""
+
+    def __init__(self, offsets: np.ndarray, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, code: int) -> str:
+        start, stop = int(self._offsets[code]), int(self._offsets[code + 1])
+        return str(self._data[start:stop], "utf-8")
+
+    def code(self, name: str) -> Optional[int]:
+        """Номер строки в таблице; таблица отсортирована, поиск двоичный."""
+        code = bisect.bisect_left(self, name)
+        return code if code < len(self) and self[code] == name else None
+
+    def decode_all(self) -> List[str]:
+        data = bytes(self._data)
+        offsets = self._offsets.tolist()
+        return [str(data[offsets[i] : offsets[i + 1]], "utf-8") for i in range(len(self))]
+
+
+class BoardView:
+    """Снимок линии поверх буфера (mmap, разделяемая память) без копирования.
+
+    Таблицы — массивы numpy, смотрящие прямо в буфер. Поиск события и котировок
+    работает сразу после открытия, без разбора всего снимка; ``restore_into``
+    переносит снимок в EventManager и OddsStore.
+    """
+
+    def __init__(self, buffer: Buffer):
+        (
+            magic,
+            self.version,
+            self.created_at,
+            events,
+            odds,
+            feeds,
+            strings,
+            data_len,
+        ) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Buffer does not contain a board snapshot")
+
+        offset = HEADER.size
+        tables = []
+        for dtype, count in (
+            (EVENT_DTYPE, events),
+            (ODDS_DTYPE, odds),
+            (FEED_DTYPE, feeds),
+            (STRING_OFFSET_DTYPE, strings + 1),
+        ):
+            tables.append(np.frombuffer(buffer, dtype, count, offset))
+            offset = _align(offset + count * dtype.itemsize)
+        self.events, self.odds, self.feeds, string_offsets = tables
+        self.strings = _StringTable(string_offsets, memoryview(buffer)[offset : offset + data_len])
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _event(self, row: tuple, strings) -> SportEvent:
+        _, bookmaker_id, league, event_name, team1, team2, bookmaker, sport, status, start = row[
+            :10
+        ]
+        return SportEvent(
+            bookmaker_id=strings[bookmaker_id],
+            start_time=datetime.fromtimestamp(start, timezone.utc),
+            sport_type=_SPORTS[sport],
+            event_name=strings[event_name],
+            league=strings[league],
+            status=STATUSES[status],
+            bookmaker=_BOOKMAKERS[bookmaker],
+            team1=strings[team1],
+            team2=strings[team2],
+        )
+
+    def get_same_events(self, event_key: EventKey) -> Dict[BookmakerName, SportEvent]:
+        """Событие у разных букмекеров, как EventManager.get_same_events"""
+        key1, key2 = (self.strings.code(team) for team in event_key.teams)
+        if key1 is None or key2 is None:
+            return {}
+        # Двоичный поиск прямо по колонке в буфере: без копирования и подготовки
+        keys = self.events["key"]
+        code = key1 << 32 | key2
+        start, stop = bisect.bisect_left(keys, code), bisect.bisect_right(keys, code)
+        events = (self._event(row, self.strings) for row in self.events[start:stop].tolist())
+        return {event.bookmaker: event for event in events}
+
+    def event_markets(self, event: str) -> Dict[MarketLine, Dict[BookmakerName, Quote]]:
+        """Котировки события, как OddsStore.event_markets"""
+        code = self.strings.code(event)
+        if code is None:
+            return {}
+        column = self.odds["event"]
+        start, stop = bisect.bisect_left(column, code), bisect.bisect_right(column, code)
+        markets: Dict[MarketLine, Dict[BookmakerName, Quote]] = {}
+        for _, market, bookmaker, line, price, ts in self.odds[start:stop].tolist():
+            markets.setdefault((_MARKETS[market], line), {})[_BOOKMAKERS[bookmaker]] = Quote(
+                price, ts
+            )
+        return markets
+
+    def iter_events(self) -> Iterator[Tuple[EventKey, SportEvent]]:
+        """Все события снимка с ключами в порядке ключей"""
+        strings = self.strings.decode_all()
+        for row in self.events.tolist():
+            yield EventKey(_teams(row[0], strings)), self._event(row, strings)
+
+    def restore_into(
+        self,
+        manager: EventManager,
+        store: Optional[OddsStore] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Переносит снимок в менеджер событий и хранилище коэффициентов
+
+        Сроки событий и время подтверждения данных сохраняются: восстановленные
+        данные остаются «несвежими» для ArbitrageEngine, пока парсер их не подтвердит,
+        а пропавшие из линии события удалятся по прежнему сроку. Версию линии
+        публикует вызывающий (manager.publish()).
+
+        Args:
+            manager (EventManager): менеджер, куда добавляются события.
+            store (OddsStore, optional): хранилище, куда добавляются котировки.
+            now (float, optional): текущее время (UNIX timestamp).
+
+        Returns:
+            int: число восстановленных событий.
+        """
+        now = time.time() if now is None else now
+        strings = self.strings.decode_all()
+        freshness = manager.freshness
+        restored = 0
+        # В порядке начала: индекс времени начала тогда растёт дописыванием в конец
+        events = self.events[np.argsort(self.events["start"], kind="stable")]
+        for row in _rows(events):
+            deadline, confirmed = row[10], row[11]
+            if deadline <= now:
+                continue  # срок истёк, пока сервис был остановлен
+            sport_event = self._event(row, strings)
+            bookmaker = sport_event.bookmaker
+            event_key = EventKey(_teams(row[0], strings))
+            manager.add_event(
+                sport_event,
+                grace=None if math.isnan(deadline) else deadline - now,
+                event_key=event_key,
+            )
+            if manager.get_event_by_id(bookmaker, sport_event.bookmaker_id) is None:
+                continue  # событие давно началось
+            # add_event отметил событие подтверждённым сейчас; возвращаем время из снимка
+            event = event_id(event_key)
+            if math.isnan(confirmed):
+                freshness.forget(event, bookmaker)
+            else:
+                freshness.confirm_event(event, bookmaker, confirmed)
+            restored += 1
+
+        for bookmaker, confirmed, cycle in self.feeds.tolist():
+            freshness.restore_feed(
+                _BOOKMAKERS[bookmaker],
+                None if math.isnan(confirmed) else confirmed,
+                None if math.isnan(cycle) else cycle,
+            )
+        if store is not None:
+            for event, market, bookmaker, line, price, ts in _rows(self.odds):
+                store.update(
+                    strings[event], _MARKETS[market], line, _BOOKMAKERS[bookmaker], price, ts
+                )
+        return restored
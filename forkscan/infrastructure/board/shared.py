@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import struct
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional, TypeVar
+
+from forkscan.core.odds import MarketLine, OddsStore, Quote
+from forkscan.core.snapshot import BoardSnapshot
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventKey, EventManager
+from forkscan.infrastructure.board.layout import BoardTables, BoardView, encode_board
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FSSHMBD1"
+# MAGIC, поколение, размер слота
+CONTROL = struct.Struct("<8sQQ")
+SLOTS_OFFSET = 64  # слоты начинаются с новой кеш-линии
+
+T = TypeVar("T")
+
+_EMPTY = b"".join(BoardTables.empty().parts())
+
+
+class SharedBoardWriter:
+    """Единственный писатель линии в разделяемую память.
+
+    Сегмент — управляющий заголовок и два слота в формате снимка линии
+    (layout.BoardTables). Публикация пишет в слот, который не читают, и дважды
+    увеличивает счётчик поколений: нечётное значение — идёт запись, чётное 2k —
+    завершено k публикаций, последняя лежит в слоте k % 2.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        """
+        Args:
+            name (str): имя сегмента разделяемой памяти.
+            capacity (int): размер слота в байтах; снимок больше слота не публикуется.
+        """
+        self.capacity = (capacity + 63) & ~63
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=SLOTS_OFFSET + 2 * self.capacity
+        )
+        self.generation = 0
+        CONTROL.pack_into(self._shm.buf, 0, MAGIC, self.generation, self.capacity)
+
+    @classmethod
+    def from_settings(cls) -> "SharedBoardWriter":
+        from forkscan.core.config import settings
+
+        return cls(settings.shared_board_name, settings.shared_board_capacity)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _set_generation(self, generation: int) -> None:
+        self.generation = generation
+        struct.pack_into("<Q", self._shm.buf, 8, generation)
+
+    def publish(self, tables: BoardTables) -> int:
+        """Публикует снимок линии; возвращает новое поколение."""
+        parts = list(tables.parts())
+        size = sum(len(part) for part in parts)
+        if size > self.capacity:
+            raise ValueError(
+                f"Board snapshot of {size} bytes exceeds shared slot of {self.capacity} bytes"
+            )
+        # Пишем в слот следующей публикации: читатели сейчас работают с другим
+        offset = SLOTS_OFFSET + (self.generation // 2 + 1) % 2 * self.capacity
+        # Порядок записей сохраняется на x86 и в CPython без переупорядочивания
+        # компилятором: поколение меняется до и после записи слота
+        self._set_generation(self.generation + 1)
+        buffer = self._shm.buf
+        for part in parts:
+            buffer[offset : offset + len(part)] = part
+            offset += len(part)
+        self._set_generation(self.generation + 1)
+        return self.generation
+
+    def publish_board(
+        self,
+        manager: EventManager,
+        store: Optional[OddsStore] = None,
+        board: Optional[BoardSnapshot] = None,
+    ) -> int:
+        """Собирает и публикует снимок версии board (см. encode_board)."""
+        return self.publish(encode_board(manager, store, board))
+
+    async def run(
+        self, manager: EventManager, store: Optional[OddsStore] = None, interval: float = 1.0
+    ) -> None:
+        """Публикует линию каждые interval секунд.
+
+        Версия линии публикуется в цикле событий, снимок из неё собирается и
+        пишется в отдельном потоке.
+        """
+        while True:
+            try:
+                board = manager.publish()
+                await asyncio.to_thread(self.publish_board, manager, store, board)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error("Failed to publish shared board: %s", error, exc_info=True)
+            await asyncio.sleep(interval)
+
+    def close(self, unlink: bool = True) -> None:
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class SharedBoardReader:
+    """Читатель линии из разделяемой памяти (воркеры API).
+
+    Чтение без блокировок по схеме seqlock: читатель запоминает поколение,
+    разбирает последний завершённый слот и проверяет, что писатель не начал
+    его перезаписывать. Слот перезаписывается только через публикацию, поэтому
+    повтор нужен, лишь если за время чтения прошло две публикации.
+    Функция чтения должна вернуть готовые объекты, а не массивы поверх буфера.
+    """
+
+    def __init__(self, name: str, max_retries: int = 100):
+        # track=False: сегментом владеет писатель, читатель не должен удалять его при выходе
+        self._shm = shared_memory.SharedMemory(name=name, track=False)
+        magic, _, self.capacity = CONTROL.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory segment {name} does not contain a board")
+        self.max_retries = max_retries
+        self.retries = 0
+        self._view: Optional[BoardView] = None
+        self._view_publication = -1
+
+    @classmethod
+    def from_settings(cls) -> "SharedBoardReader":
+        from forkscan.core.config import settings
+
+        return cls(settings.shared_board_name)
+
+    @property
+    def generation(self) -> int:
+        return struct.unpack_from("<Q", self._shm.buf, 8)[0]
+
+    def _board(self, publication: int) -> BoardView:
+        if self._view_publication != publication:
+            if publication == 0:
+                self._view = BoardView(_EMPTY)
+            else:
+                offset = SLOTS_OFFSET + (publication % 2) * self.capacity
+                self._view = BoardView(self._shm.buf[offset : offset + self.capacity])
+            self._view_publication = publication
+        return self._view
+
+    def read(self, reader: Callable[[BoardView], T]) -> T:
+        """
+        Согласованное чтение последней опубликованной линии
+
+        Args:
+            reader (Callable[[BoardView], T]): функция чтения снимка.
+
+        Returns:
+            T: результат reader для версии, не изменившейся за время чтения.
+        """
+        for _ in range(self.max_retries):
+            publication = self.generation // 2
+            try:
+                result = reader(self._board(publication))
+            except (ValueError, IndexError, KeyError, UnicodeDecodeError):
+                # Разорванные данные: повторяем, только если слот действительно перезаписан
+                if self.generation < 2 * publication + 3:
+                    raise
+                result = None
+            # Слот публикации k перезаписывается публикацией k + 2, её запись — поколение 2k + 3
+            if self.generation < 2 * publication + 3:
+                return result
+            self.retries += 1
+            self._view_publication = -1
+        raise RuntimeError(f"Shared board changed during {self.max_retries} consecutive reads")
+
+    def version(self) -> int:
+        return self.read(lambda board: board.version)
+
+    def get_same_events(self, event_key: EventKey) -> Dict[BookmakerName, SportEvent]:
+        return self.read(lambda board: board.get_same_events(event_key))
+
+    def event_markets(self, event: str) -> Dict[MarketLine, Dict[BookmakerName, Quote]]:
+        return self.read(lambda board: board.event_markets(event))
+
+    def close(self) -> None:
+        self._view = None
+        self._view_publication = -1
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # массивы numpy из пользовательского кода ещё держат буфер
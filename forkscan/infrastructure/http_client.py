@@ -0,0 +1,21 @@
+import aiohttp
+
+from forkscan.core.config import settings
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Создаёт общую HTTP-сессию API с пулом соединений.
+
+    Соединения (и TLS-сессии) переиспользуются между запросами, поэтому
+    сессия создаётся один раз в lifespan приложения.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=settings.http_pool_size),
+        timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+    )
+
+
+async def close_http_session(session: aiohttp.ClientSession) -> None:
+    """Закрывает общую HTTP-сессию и её соединения."""
+    if session is not None:
+        await session.close()
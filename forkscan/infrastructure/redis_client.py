@@ -3,11 +3,16 @@ import redis.asyncio as redis
 from forkscan.core.config import settings
 
 
-async def get_redis() -> redis.Redis:
-    """Создаёт и возвращает подключение к Redis."""
+async def get_redis(decode_responses: bool = True) -> redis.Redis:
+    """Создаёт и возвращает подключение к Redis.
+
+    Args:
+        decode_responses (bool): декодировать ответы в str; False — для бинарных
+            данных (снимки и дельты линии).
+    """
     return redis.Redis.from_url(
         str(settings.redis_url),
-        decode_responses=True,
+        decode_responses=decode_responses,
         encoding="utf-8",
     )
 
@@ -0,0 +1,120 @@
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional
+
+from forkscan.infrastructure.replay.segments import (
+    SEGMENT_SUFFIX,
+    FeedRecord,
+    RecordKind,
+    SegmentWriter,
+    list_segments,
+)
+
+# Заголовки ответа, которые нужны реплееру, чтобы отдать тело как есть
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+def _next_segment_number(directory: Path) -> int:
+    """Номер следующего сегмента: после наибольшего из уже записанных.
+
+    Число сегментов для этого не годится: если старые сегменты удалены,
+    новый получил бы имя ещё существующего и перезаписал его.
+    """
+    numbers = [
+        int(path.name[: -len(SEGMENT_SUFFIX)])
+        for path in list_segments(directory)
+        if path.name[: -len(SEGMENT_SUFFIX)].isdigit()
+    ]
+    return max(numbers, default=-1) + 1
+
+
+class FeedRecorder:
+    """Записывает сырые HTTP-ответы и WebSocket-фреймы в сжатые сегменты.
+
+    Сегмент закрывается и начинается новый, когда превышен лимит записей
+    или несжатых байт, поэтому уже закрытые сегменты можно читать во время записи.
+    Методы потокобезопасны: синхронные парсеры и asyncio-клиенты могут
+    писать в один рекордер.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_max_records: int = 10_000,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_records = segment_max_records
+        self.segment_max_bytes = segment_max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writer: Optional[SegmentWriter] = None
+        self._next_segment = _next_segment_number(self.directory)
+
+    def record_http(
+        self,
+        url: str,
+        body: bytes,
+        status: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Сохраняет тело HTTP-ответа вместе со статусом и важными заголовками."""
+        kept: Dict[str, str] = {}
+        for name, value in (headers or {}).items():
+            if name.lower() in _KEPT_HEADERS:
+                kept[name.lower()] = value
+        self._write(
+            FeedRecord(
+                ts=self._clock(),
+                kind=RecordKind.HTTP,
+                channel=url,
+                payload=body,
+                meta={"status": status, "headers": kept},
+            )
+        )
+
+    def record_ws(self, url: str, frame: bytes | str, outgoing: bool = False) -> None:
+        """Сохраняет WebSocket-фрейм; текстовые фреймы помечаются в meta."""
+        meta = {}
+        if isinstance(frame, str):
+            frame = frame.encode("utf-8")
+            meta["text"] = True
+        self._write(
+            FeedRecord(
+                ts=self._clock(),
+                kind=RecordKind.WS_SEND if outgoing else RecordKind.WS_RECV,
+                channel=url,
+                payload=bytes(frame),
+                meta=meta,
+            )
+        )
+
+    def _write(self, record: FeedRecord) -> None:
+        with self._lock:
+            if self._writer is None:
+                path = self.directory / f"{self._next_segment:06d}{SEGMENT_SUFFIX}"
+                self._writer = SegmentWriter(path)
+                self._next_segment += 1
+            self._writer.write(record)
+            if (
+                self._writer.records >= self.segment_max_records
+                or self._writer.raw_bytes >= self.segment_max_bytes
+            ):
+                self._writer.close()
+                self._writer = None
+
+    def close(self) -> None:
+        """Закрывает текущий сегмент."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def __enter__(self) -> "FeedRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import bisect
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from websockets.asyncio.server import Server, ServerConnection, serve
+
+from forkscan.infrastructure.replay.segments import FeedRecord, RecordKind, iter_records
+
+logger = logging.getLogger(__name__)
+
+
+def _channel_key(url: str) -> str:
+    """Ключ канала: путь и query исходного URL без схемы и хоста."""
+    parts = urlsplit(url)
+    return f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or "/"
+
+
+class FeedReplayer:
+    """Отдаёт записанный фид через локальные HTTP- и WebSocket-серверы.
+
+    Время воспроизведения считается от первой записи каталога:
+    при ``speed=1`` фид идёт в реальном темпе, при ``speed=N`` — в N раз быстрее,
+    при ``speed=None`` — максимально быстро. В режиме максимальной скорости каждый
+    HTTP-запрос к каналу получает следующий записанный ответ, а WebSocket-фреймы
+    отправляются без пауз.
+
+    Пример:
+        replayer = FeedReplayer(Path("records/fonbet"), speed=10)
+        await replayer.start()
+        parser = FonbetParser(manager, url=replayer.http_url(FONBET_URL))
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        speed: Optional[float] = 1.0,
+        host: str = "127.0.0.1",
+        http_port: int = 0,
+        ws_port: int = 0,
+        first_request_timeout: float = 5.0,
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed must be positive or None, got {speed}")
+        self.directory = Path(directory)
+        self.speed = speed
+        self.host = host
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.first_request_timeout = first_request_timeout
+
+        self._http: Dict[str, List[FeedRecord]] = defaultdict(list)
+        self._http_ts: Dict[str, List[float]] = {}
+        self._http_cursor: Dict[str, int] = defaultdict(int)
+        self._ws: Dict[str, List[FeedRecord]] = defaultdict(list)
+        self._origin_ts = 0.0
+        self._started_at = 0.0
+
+        self._runner: Optional[web.AppRunner] = None
+        self._ws_server: Optional[Server] = None
+        self.http_requests = 0
+        self.ws_frames_sent = 0
+
+    def _load(self) -> None:
+        first_ts: Optional[float] = None
+        for record in iter_records(self.directory):
+            if first_ts is None or record.ts < first_ts:
+                first_ts = record.ts
+            if record.kind == RecordKind.HTTP:
+                self._http[_channel_key(record.channel)].append(record)
+            elif record.kind == RecordKind.WS_RECV:
+                self._ws[_channel_key(record.channel)].append(record)
+        for records in (*self._http.values(), *self._ws.values()):
+            records.sort(key=lambda r: r.ts)
+        self._http_ts = {key: [r.ts for r in records] for key, records in self._http.items()}
+        self._origin_ts = first_ts or 0.0
+
+    async def start(self) -> None:
+        """Загружает записи и поднимает серверы."""
+        self._load()
+        logger.info(
+            "Loaded %d HTTP and %d WebSocket channels from %s",
+            len(self._http),
+            len(self._ws),
+            self.directory,
+        )
+
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self._handle_http)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.http_port)
+        await site.start()
+        self.http_port = self._runner.addresses[0][1]
+
+        self._ws_server = await serve(
+            self._handle_ws, self.host, self.ws_port, subprotocols=["protobuf"]
+        )
+        self.ws_port = next(iter(self._ws_server.sockets)).getsockname()[1]
+        self._started_at = asyncio.get_running_loop().time()
+
+    async def stop(self) -> None:
+        """Останавливает серверы."""
+        if self._ws_server is not None:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+            self._ws_server = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FeedReplayer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def http_url(self, original_url: str) -> str:
+        """Переводит исходный URL букмекера в адрес локального HTTP-сервера."""
+        return f"http://{self.host}:{self.http_port}{_channel_key(original_url)}"
+
+    def ws_url(self, original_url: str) -> str:
+        """Переводит исходный WebSocket URL в адрес локального WS-сервера."""
+        return f"ws://{self.host}:{self.ws_port}{_channel_key(original_url)}"
+
+    def _replay_ts(self) -> float:
+        """Текущее время воспроизведения в шкале записанных меток."""
+        elapsed = asyncio.get_running_loop().time() - self._started_at
+        return self._origin_ts + elapsed * self.speed
+
+    async def _handle_http(self, request: web.Request) -> web.Response:
+        key = request.path_qs
+        records = self._http.get(key)
+        if not records:
+            return web.Response(status=404, text=f"No recording for {key}")
+
+        if self.speed is None:
+            index = min(self._http_cursor[key], len(records) - 1)
+            self._http_cursor[key] += 1
+        else:
+            index = max(bisect.bisect_right(self._http_ts[key], self._replay_ts()) - 1, 0)
+
+        record = records[index]
+        self.http_requests += 1
+        return web.Response(
+            status=record.meta.get("status", 200),
+            body=record.payload,
+            headers=record.meta.get("headers", {}),
+        )
+
+    async def _handle_ws(self, connection: ServerConnection) -> None:
+        key = _channel_key(connection.request.path)
+        records = self._ws.get(key, [])
+        # Поток начинаем после первого запроса клиента (обычно это подписка),
+        # дальнейшие запросы читаем и игнорируем, чтобы не копился буфер
+        try:
+            await asyncio.wait_for(connection.recv(), timeout=self.first_request_timeout)
+        except TimeoutError:
+            pass
+        drain = asyncio.create_task(self._drain(connection))
+        try:
+            for record in records:
+                if self.speed is not None:
+                    delay = (record.ts - self._replay_ts()) / self.speed
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                payload = record.payload
+                await connection.send(
+                    payload.decode("utf-8") if record.meta.get("text") else payload
+                )
+                self.ws_frames_sent += 1
+            await connection.close()
+        finally:
+            drain.cancel()
+
+    @staticmethod
+    async def _drain(connection: ServerConnection) -> None:
+        async for _ in connection:
+            pass
+
+
+def main() -> None:
+    """Точка входа: поднимает реплеер для каталога записи."""
+    parser = argparse.ArgumentParser(description="Replay a recorded bookmaker feed")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="0 = as fast as possible")
+    parser.add_argument("--http-port", type=int, default=8081)
+    parser.add_argument("--ws-port", type=int, default=8082)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        replayer = FeedReplayer(
+            args.directory,
+            speed=args.speed or None,
+            http_port=args.http_port,
+            ws_port=args.ws_port,
+        )
+        async with replayer:
+            logger.info(
+                "Serving HTTP on :%d, WebSocket on :%d", replayer.http_port, replayer.ws_port
+            )
+            await asyncio.Future()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
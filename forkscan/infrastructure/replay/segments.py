@@ -0,0 +1,100 @@
+import gzip
+import json
+import struct
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+# ts (float64), kind (uint8), длина канала (uint16), длина meta (uint16), длина payload (uint32)
+_HEADER = struct.Struct("<dBHHI")
+SEGMENT_SUFFIX = ".seg.gz"
+
+
+class RecordKind(IntEnum):
+    """Тип записанного сообщения."""
+
+    HTTP = 1  # тело HTTP-ответа
+    WS_RECV = 2  # фрейм, полученный от сервера
+    WS_SEND = 3  # фрейм, отправленный клиентом
+
+
+@dataclass(frozen=True)
+class FeedRecord:
+    """Одна запись фида: сырой ответ или фрейм с меткой времени."""
+
+    ts: float
+    kind: RecordKind
+    channel: str  # исходный URL запроса / WebSocket-сервера
+    payload: bytes
+    meta: Dict[str, Any] = field(default_factory=dict)  # статус и заголовки HTTP-ответа
+
+
+class SegmentWriter:
+    """Пишет записи в один сжатый файл-сегмент."""
+
+    def __init__(self, path: Path, compresslevel: int = 6):
+        self.path = path
+        self.records = 0
+        self.raw_bytes = 0
+        self._file: BinaryIO = gzip.open(path, "wb", compresslevel=compresslevel)
+
+    def write(self, record: FeedRecord) -> None:
+        channel = record.channel.encode("utf-8")
+        meta = (
+            json.dumps(record.meta, separators=(",", ":")).encode("utf-8") if record.meta else b""
+        )
+        header = _HEADER.pack(
+            record.ts, int(record.kind), len(channel), len(meta), len(record.payload)
+        )
+        self._file.write(header)
+        self._file.write(channel)
+        self._file.write(meta)
+        self._file.write(record.payload)
+        self.records += 1
+        self.raw_bytes += len(header) + len(channel) + len(meta) + len(record.payload)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_segment(path: Path) -> Iterator[FeedRecord]:
+    """Последовательно читает записи из файла-сегмента."""
+    with gzip.open(path, "rb") as file:
+        while True:
+            header = file.read(_HEADER.size)
+            if not header:
+                return
+            if len(header) < _HEADER.size:
+                raise ValueError(f"Truncated record header in segment {path}")
+            ts, kind, channel_len, meta_len, payload_len = _HEADER.unpack(header)
+            channel = file.read(channel_len).decode("utf-8")
+            meta_raw = file.read(meta_len)
+            payload = file.read(payload_len)
+            if len(payload) < payload_len:
+                raise ValueError(f"Truncated record payload in segment {path}")
+            yield FeedRecord(
+                ts=ts,
+                kind=RecordKind(kind),
+                channel=channel,
+                payload=payload,
+                meta=json.loads(meta_raw) if meta_raw else {},
+            )
+
+
+def list_segments(directory: Path) -> List[Path]:
+    """Возвращает сегменты каталога в порядке записи."""
+    return sorted(Path(directory).glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def iter_records(directory: Path, kind: Optional[RecordKind] = None) -> Iterator[FeedRecord]:
+    """Читает все записи каталога записи по порядку сегментов.
+
+    Args:
+        directory (Path): каталог с сегментами.
+        kind (RecordKind, optional): вернуть только записи указанного типа.
+    """
+    for path in list_segments(directory):
+        for record in read_segment(path):
+            if kind is None or record.kind == kind:
+                yield record
@@ -1,11 +1,19 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from forkscan.api.rate_limit import RateLimitMiddleware
 from forkscan.api.routes.auth import router as auth_router
+from forkscan.api.routes.auth.current_user import auth_cache
+from forkscan.api.routes.auth.utils import password_hasher
 from forkscan.api.routes.promocode import router as promocode_router
+from forkscan.api.security_system import SecuritySystemDependency
+from forkscan.core.config import settings
+from forkscan.infrastructure.http_client import close_http_session, get_http_session
 from forkscan.infrastructure.redis_client import close_redis, get_redis
+from forkscan.services.replication import BoardReplica
 
 
 @asynccontextmanager
@@ -13,12 +21,39 @@ async def lifespan(app: FastAPI):
     # Подключаемся к Redis при старте приложения
     redis_client = await get_redis()
     app.state.redis = redis_client  # Сохраняем в app.state
+    # Общий пул HTTP-соединений (проверка CAPTCHA): без TLS-рукопожатия на каждый запрос
+    app.state.http = await get_http_session()
+    # Пользователи кешируются, только пока воркер получает их инвалидации
+    auth_cache.start(redis_client)
+    # Локальные копии линий сканеров по группам: обработчики читают
+    # app.state.boards[группа].board без Redis
+    board_redis = await get_redis(decode_responses=False)
+    app.state.boards = {
+        group: BoardReplica.from_settings(board_redis, group)
+        for group in settings.board_groups or [settings.scanner_group_name]
+    }
+    board_tasks = [asyncio.create_task(replica.run()) for replica in app.state.boards.values()]
+    # Линия сканера на этом хосте в разделяемой памяти (settings.shared_board_name);
+    # открывается при первом обращении, см. deps.get_shared_board
+    app.state.shared_board = None
     yield
     # Закрываем соединение при остановке
+    await SecuritySystemDependency.close()
+    await auth_cache.close()
+    for task in board_tasks:
+        task.cancel()
+    await asyncio.gather(*board_tasks, return_exceptions=True)
+    if app.state.shared_board is not None:
+        app.state.shared_board.close()
+    await close_http_session(app.state.http)
+    password_hasher.close()
+    await close_redis(board_redis)
     await close_redis(redis_client)
 
 
 app = FastAPI(lifespan=lifespan)
+# Добавлен до CORS, чтобы ответы 429 тоже получали CORS-заголовки
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8000"],  # разрешён только твой локальный фронт
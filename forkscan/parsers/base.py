@@ -1,19 +1,31 @@
+import asyncio
+import logging
+import math
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Set, Type
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import requests
+from websockets.asyncio.client import ClientConnection
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
 
+from forkscan.core.odds import OddsStore, OddsTick, orient
+from forkscan.core.sport_types import SportEvent
 from forkscan.core.types import (
     BaseSportEvent,
-    BasketballEvent,
     BookmakerName,
-    EsportsEvent,
     EventManager,
-    FootballEvent,
-    HockeyEvent,
-    TableTennisEvent,
-    TennisEvent,
+    MarketType,
+    SportType,
+    event_id,
 )
+from forkscan.infrastructure.archive.writer import OddsArchiveWriter
+from forkscan.infrastructure.replay.recorder import FeedRecorder
+from forkscan.services.coalescing import UpdateCoalescer
+
+logger = logging.getLogger(__name__)
 
 
 class BaseBookmakerParser(ABC):
@@ -31,14 +43,14 @@ class BaseBookmakerParser(ABC):
         }
         self.active_events: Set[str] = set()
 
-        # Маппинг для создания правильного типа события
-        self.event_creators = {
-            "football": (FootballEvent, self._create_sport_event),
-            "hockey": (HockeyEvent, self._create_sport_event),
-            "tennis": (TennisEvent, self._create_sport_event),
-            "basketball": (BasketballEvent, self._create_sport_event),
-            "table-tennis": (TableTennisEvent, self._create_sport_event),
-            "esports": (EsportsEvent, self._create_sport_event),
+        # Вид спорта букмекера -> наш SportType для универсального SportEvent
+        self.sport_types = {
+            "football": SportType.FOOTBALL,
+            "hockey": SportType.HOCKEY,
+            "tennis": SportType.TENNIS,
+            "basketball": SportType.BASKETBALL,
+            "table-tennis": SportType.TABLETENNIS,
+            "esports": SportType.ESPORTS,
         }
 
     @property
@@ -54,7 +66,7 @@ class BaseBookmakerParser(ABC):
         pass
 
     def _create_sport_event(
-        self, event: Dict, tournament_name: str, event_class: Type[BaseSportEvent]
+        self, event: Dict, tournament_name: str, sport_type: SportType
     ) -> Optional[BaseSportEvent]:
         """
         Базовый метод создания спортивного события
@@ -62,26 +74,27 @@ class BaseBookmakerParser(ABC):
         Args:
             event: Словарь с данными события
             tournament_name: Название турнира
-            event_class: Класс создаваемого события
+            sport_type: Вид спорта события
 
         Returns:
             Объект события если создание успешно, None если произошла ошибка
         """
         try:
-            return event_class.create(
+            return SportEvent.create(
                 bookmaker=self.bookmaker_name,
                 bookmaker_id=self._get_event_id(event),
                 start_time=self._get_start_time(event),
                 tournament_name=tournament_name,
                 team1=self._get_team1(event),
                 team2=self._get_team2(event),
+                sport_type=sport_type,
                 status=self._get_event_status(event),
             )
         except KeyError as e:
             print(f"Missing required field in event data: {e}")
             return None
         except Exception as e:
-            print(f"Error creating {event_class.__name__}: {e}")
+            print(f"Error creating {sport_type.name} event: {e}")
             return None
 
     @abstractmethod
@@ -161,9 +174,10 @@ class BaseBookmakerParser(ABC):
         event_id = self._get_event_id(event)
         new_event_ids.add(event_id)
 
-        if sport_name in self.event_creators:
-            event_class, creator = self.event_creators[sport_name]
-            sport_event = creator(event, sport_data["name_thournirer"], event_class)
+        if sport_name in self.sport_types:
+            sport_event = self._create_sport_event(
+                event, sport_data["name_thournirer"], self.sport_types[sport_name]
+            )
             if sport_event:
                 self.manager.add_event(sport_event)
         else:
@@ -171,15 +185,18 @@ class BaseBookmakerParser(ABC):
 
     def _update_events(self, new_event_ids: Set[str]) -> None:
         """
-        Обновляет список активных событий и удаляет завершенные
+        Обновляет список активных событий
+
+        Пропавшие события удаляет EventManager, если букмекер не присылал их
+        дольше expiry_grace: одиночный неполный ответ не сбрасывает линию.
+        Изменения цикла публикуются читателям одной версией снимка.
 
         Args:
             new_event_ids: Множество ID новых событий
         """
-        finished_events = self.active_events - new_event_ids
-        for event_id in finished_events:
-            self.manager.remove_event_by_id(self.bookmaker_name, event_id)
         self.active_events = new_event_ids
+        self.manager.expire_events()
+        self.manager.publish()
 
     def parse(self) -> None:
         """Основной метод парсинга"""
@@ -201,3 +218,456 @@ class BaseBookmakerParser(ABC):
             print(f"Error fetching data from {self.bookmaker_name}: {e}")
         except Exception as e:
             print(f"Unexpected error processing {self.bookmaker_name} data: {e}")
+
+
+# Сырой фрейм push-фида: бинарный (protobuf и т.п.) или текстовый (JSON)
+Frame = Union[bytes, str]
+
+# Обновление коэффициента из фрейма: (ID события у букмекера, рынок, линия, коэффициент)
+StreamUpdate = Tuple[str, MarketType, float, float]
+
+
+class _StreamConnection:
+    """Одно WebSocket-соединение push-фида, обслуживающее группу подписок.
+
+    Живёт в собственной задаче: подключается, переподписывает все свои события,
+    читает фреймы и при обрыве или потере heartbeat переподключается
+    с экспоненциальной задержкой.
+    """
+
+    def __init__(self, parser: "StreamingBookmakerParser", number: int):
+        self.parser = parser
+        self.number = number
+        self.subscriptions: Set[str] = set()
+        self.ws: Optional[ClientConnection] = None
+        self.task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+        self.last_frame_at = 0.0
+
+    async def _send(self, raw: Frame) -> None:
+        if self.ws is None:
+            return  # подписка уйдёт при следующем подключении
+        try:
+            await self.ws.send(raw)
+        except ConnectionClosed:
+            return  # цикл чтения заметит обрыв и переподключится
+        if self.parser.recorder is not None:
+            self.parser.recorder.record_ws(self.parser.url, raw, outgoing=True)
+
+    async def subscribe(self, bookmaker_id: str) -> None:
+        self.subscriptions.add(bookmaker_id)
+        await self._send(self.parser.subscribe_request(bookmaker_id))
+
+    async def unsubscribe(self, bookmaker_id: str) -> None:
+        self.subscriptions.discard(bookmaker_id)
+        raw = self.parser.unsubscribe_request(bookmaker_id)
+        if raw is not None:
+            await self._send(raw)
+
+    async def run(self) -> None:
+        parser = self.parser
+        delay = parser.backoff_initial
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                async with await parser.connect() as ws:
+                    self.ws = ws
+                    self.last_frame_at = loop.time()
+                    logger.info(
+                        "%s connection #%d up, resubscribing %d events",
+                        parser.bookmaker_name.name,
+                        self.number,
+                        len(self.subscriptions),
+                    )
+                    for bookmaker_id in list(self.subscriptions):
+                        await self.subscribe(bookmaker_id)
+                    delay = parser.backoff_initial
+                    await self._read(ws)
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionClosed, InvalidHandshake, OSError, TimeoutError) as error:
+                logger.warning(
+                    "%s connection #%d lost: %s", parser.bookmaker_name.name, self.number, error
+                )
+            except Exception:
+                # Ошибка в connect() или хуках наследника не должна молча завершать соединение
+                logger.error(
+                    "%s connection #%d failed, reconnecting",
+                    parser.bookmaker_name.name,
+                    self.number,
+                    exc_info=True,
+                )
+            finally:
+                self.ws = None
+
+            self.reconnects += 1
+            # Полная задержка со случайным разбросом, чтобы соединения не переподключались разом
+            await asyncio.sleep(random.uniform(0, delay))
+            delay = min(delay * 2, parser.backoff_max)
+
+    async def _read(self, ws: ClientConnection) -> None:
+        """Читает фреймы, пока сокет жив.
+
+        Отсутствие любых фреймов (включая серверные ping) дольше heartbeat_timeout
+        означает мёртвый сокет.
+        """
+        parser = self.parser
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                frame = await asyncio.wait_for(ws.recv(), timeout=parser.heartbeat_timeout)
+            except TimeoutError:
+                logger.warning(
+                    "%s connection #%d: no heartbeat for %.1fs, reconnecting",
+                    parser.bookmaker_name.name,
+                    self.number,
+                    parser.heartbeat_timeout,
+                )
+                return
+            self.last_frame_at = loop.time()
+            if parser.recorder is not None:
+                parser.recorder.record_ws(parser.url, frame)
+            parser.confirm_feed()
+            parser.submit(frame)
+
+
+class StreamingBookmakerParser(ABC):
+    """Базовый класс для push-фидов букмекеров (WebSocket).
+
+    В отличие от BaseBookmakerParser, данные не опрашиваются, а приходят фреймами.
+    Наследник реализует хуки:
+
+    - ``connect`` — открывает WebSocket с нужными заголовками и подпротоколом;
+    - ``subscribe_request`` / ``unsubscribe_request`` — фреймы подписки на событие;
+    - ``decode`` — разбор фрейма в обновления коэффициентов;
+    - ``apply`` — по умолчанию переводит обновление в OddsTick и отдаёт в хранилище.
+
+    Базовый класс ведёт пул соединений с переподключением и переподпиской,
+    разбирает фреймы в отдельной задаче (чтение сокетов не ждёт разбора; при
+    переполнении очереди отбрасываются самые старые фреймы) и связывает
+    подписки с событиями EventManager.
+
+    Пример:
+        parser = BetboomParser(manager, store)
+        await parser.start()
+        await parser.track_event(event)
+    """
+
+    def __init__(
+        self,
+        event_manager: EventManager,
+        store: Optional[OddsStore] = None,
+        connections: int = 1,
+        heartbeat_timeout: float = 30.0,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        coalescer: Optional[UpdateCoalescer] = None,
+        recorder: Optional[FeedRecorder] = None,
+        archive: Optional[OddsArchiveWriter] = None,
+    ):
+        """
+        Args:
+            event_manager (EventManager): менеджер событий.
+            store (OddsStore, optional): хранилище коэффициентов, по умолчанию своё.
+            connections (int): размер пула соединений.
+            heartbeat_timeout (float): сколько секунд без фреймов считать сокет мёртвым.
+            backoff_initial (float): начальная задержка переподключения, секунды.
+            backoff_max (float): максимальная задержка переподключения, секунды.
+            max_queue (int): максимальная глубина очереди фреймов.
+            batch_size (int): сколько фреймов разбирать за один проход.
+            coalescer (UpdateCoalescer, optional): склейка обновлений; если задана,
+                тики идут в неё, а разбор ждёт, пока она не разгрузится.
+            recorder (FeedRecorder, optional): запись фреймов для replay.
+            archive (OddsArchiveWriter, optional): архив тиков для бэктестов; в него
+                попадает каждое обновление, до склейки.
+        """
+        if connections < 1:
+            raise ValueError("At least one connection is required")
+        self.manager = event_manager
+        self.store = store if store is not None else OddsStore()
+        self.coalescer = coalescer
+        self.sink = coalescer.submit if coalescer is not None else self.store.apply
+        self.heartbeat_timeout = heartbeat_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.batch_size = batch_size
+        self.recorder = recorder
+        self.archive = archive
+
+        # ID события у букмекера -> идентификатор события в OddsStore (core.types.event_id)
+        self.active_events: Dict[str, str] = {}
+        # События, у которых команды букмекера идут в обратном порядке относительно ключа
+        self._reversed: Set[str] = set()
+        self._connections: List[_StreamConnection] = [
+            _StreamConnection(self, number) for number in range(connections)
+        ]
+        self._subscription_connection: Dict[str, _StreamConnection] = {}
+
+        self._queue: Deque[Tuple[float, Frame]] = deque(maxlen=max_queue)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._latencies: Deque[float] = deque(maxlen=10_000)
+
+        self.frames = 0
+        self.dropped = 0
+        self.decode_errors = 0
+        self.apply_errors = 0
+        self.updates = 0
+        self.unknown_events = 0
+        self.max_queue_depth = 0
+
+    @property
+    @abstractmethod
+    def bookmaker_name(self) -> BookmakerName:
+        """Имя букмекера"""
+        pass
+
+    @property
+    @abstractmethod
+    def url(self) -> str:
+        """URL WebSocket-сервера букмекера"""
+        pass
+
+    @abstractmethod
+    async def connect(self) -> ClientConnection:
+        """Открывает WebSocket-соединение с сервером букмекера"""
+        pass
+
+    @abstractmethod
+    def subscribe_request(self, bookmaker_id: str) -> Frame:
+        """Фрейм подписки на обновления события"""
+        pass
+
+    def unsubscribe_request(self, bookmaker_id: str) -> Optional[Frame]:
+        """
+        Фрейм отмены подписки на событие
+
+        Returns:
+            Фрейм или None, если протокол не умеет отписываться
+            (обновления неотслеживаемых событий просто отбрасываются)
+        """
+        return None
+
+    @abstractmethod
+    def decode(self, frame: Frame) -> Iterable[StreamUpdate]:
+        """
+        Разбирает фрейм сервера
+
+        Args:
+            frame: Сырой фрейм
+
+        Returns:
+            Обновления коэффициентов; служебные фреймы дают пустой результат
+
+        Raises:
+            Exception: фрейм не удалось разобрать (учитывается в decode_errors)
+        """
+        pass
+
+    def apply(self, bookmaker_id: str, market: MarketType, line: float, price: float) -> None:
+        """Передаёт обновление коэффициента отслеживаемого события в хранилище
+
+        Рынок переводится в порядок команд ключа события (core.odds.orient).
+        Если задан архив, тик дописывается и в него.
+        """
+        event = self.active_events.get(bookmaker_id)
+        if event is None:
+            self.unknown_events += 1
+            return
+        market, line = orient(market, line, bookmaker_id in self._reversed)
+        tick = OddsTick(
+            event=event,
+            market=market,
+            line=line,
+            bookmaker=self.bookmaker_name,
+            price=price,
+            ts=time.time(),
+        )
+        if self.archive is not None:
+            self.archive.append(tick)
+        self.sink(tick)
+        self.updates += 1
+
+    async def start(self) -> None:
+        """Запускает соединения пула и задачу разбора фреймов"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        for connection in self._connections:
+            if connection.task is None:
+                connection.task = asyncio.create_task(connection.run())
+
+    async def stop(self) -> None:
+        """Закрывает соединения и останавливает разбор; очередь фреймов отбрасывается"""
+        tasks = [c.task for c in self._connections if c.task is not None]
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for connection in self._connections:
+            connection.task = None
+        self._worker = None
+        # Фреймы остановленного потока устарели: после перезапуска они затёрли бы свежие
+        self._queue.clear()
+        self._wakeup.clear()
+
+    async def watch(self, bookmaker_id: str, event: str, reversed_teams: bool = False) -> None:
+        """
+        Подписывается на событие через наименее загруженное соединение
+
+        Args:
+            bookmaker_id: ID события у букмекера
+            event: Идентификатор события в OddsStore
+            reversed_teams: Команды у букмекера в обратном порядке относительно ключа события
+        """
+        self.active_events[bookmaker_id] = event
+        if reversed_teams:
+            self._reversed.add(bookmaker_id)
+        else:
+            self._reversed.discard(bookmaker_id)
+        if bookmaker_id in self._subscription_connection:
+            return
+        connection = min(self._connections, key=lambda c: len(c.subscriptions))
+        self._subscription_connection[bookmaker_id] = connection
+        await connection.subscribe(bookmaker_id)
+
+    async def unwatch(self, bookmaker_id: str) -> None:
+        """Отписывается от события и убирает его коэффициенты из хранилища"""
+        event = self.active_events.pop(bookmaker_id, None)
+        self._reversed.discard(bookmaker_id)
+        connection = self._subscription_connection.pop(bookmaker_id, None)
+        if connection is not None:
+            await connection.unsubscribe(bookmaker_id)
+        if event is not None:
+            self.store.remove_bookmaker(event, self.bookmaker_name)
+
+    async def track_event(self, event: BaseSportEvent) -> None:
+        """Добавляет событие в EventManager и подписывается на его коэффициенты
+
+        Срок события не истекает без повторного добавления: подпиской управляют
+        untrack_event и sync_events; удаление по времени начала действует.
+        """
+        self.manager.add_event(event, grace=math.inf)
+        key = event.create_key()
+        await self.watch(event.bookmaker_id, event_id(key), key.is_reversed(event.team1))
+
+    async def untrack_event(self, bookmaker_id: str) -> None:
+        """Отписывается от события и удаляет его из EventManager"""
+        await self.unwatch(bookmaker_id)
+        self.manager.remove_event_by_id(self.bookmaker_name, bookmaker_id)
+
+    async def sync_events(self, events: Iterable[BaseSportEvent]) -> None:
+        """
+        Приводит подписки к актуальному списку событий из линии букмекера
+
+        Args:
+            events: Все текущие события букмекера; пропавшие удаляются
+        """
+        new_event_ids: Set[str] = set()
+        for event in events:
+            new_event_ids.add(event.bookmaker_id)
+            await self.track_event(event)
+        for bookmaker_id in set(self.active_events) - new_event_ids:
+            await self.untrack_event(bookmaker_id)
+        # События, удалённые менеджером по времени начала, больше не слушаем
+        self.manager.expire_events()
+        for bookmaker_id in list(self.active_events):
+            if self.manager.get_event_by_id(self.bookmaker_name, bookmaker_id) is None:
+                await self.unwatch(bookmaker_id)
+        self.manager.publish()
+
+    def confirm_feed(self) -> None:
+        """Отмечает поток живым, если живы все соединения пула
+
+        Фреймы (включая heartbeat) подтверждают все отслеживаемые события: отсутствие
+        обновлений значит, что коэффициенты не менялись. Пока хотя бы одно соединение
+        переподключается, часть подписок не получает данные, и подтверждение не идёт.
+        """
+        if all(connection.ws is not None for connection in self._connections):
+            self.manager.freshness.confirm_bookmaker(self.bookmaker_name)
+
+    def submit(self, frame: Frame) -> None:
+        """Кладёт фрейм в очередь разбора, не блокируя цикл чтения сокета"""
+        self.frames += 1
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append((time.perf_counter(), frame))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                for _ in range(min(self.batch_size, len(self._queue))):
+                    received_at, frame = self._queue.popleft()
+                    self._process(frame)
+                    self._latencies.append(time.perf_counter() - received_at)
+                if self.coalescer is not None:
+                    # Backpressure: пока потребитель не забрал пачку, фреймы копятся
+                    # в очереди и при переполнении вытесняются самые старые
+                    try:
+                        await self.coalescer.wait_for_capacity()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        logger.error(
+                            "%s coalescer backpressure failed",
+                            self.bookmaker_name.name,
+                            exc_info=True,
+                        )
+                # Отдаём управление циклу, чтобы чтение сокетов не простаивало
+                await asyncio.sleep(0)
+
+    def _process(self, frame: Frame) -> None:
+        try:
+            updates = list(self.decode(frame))
+        except Exception:
+            self.decode_errors += 1
+            logger.error("Failed to decode %s frame", self.bookmaker_name.name, exc_info=True)
+            return
+        for bookmaker_id, market, line, price in updates:
+            try:
+                self.apply(bookmaker_id, market, line, price)
+            except Exception:
+                # Ошибка хранилища или потребителя теряет одно обновление, а не весь поток
+                self.apply_errors += 1
+                logger.error(
+                    "Failed to apply %s update for %s",
+                    self.bookmaker_name.name,
+                    bookmaker_id,
+                    exc_info=True,
+                )
+
+    def stats(self) -> Dict[str, object]:
+        """Счётчики, глубина очереди, задержка разбора (мс) и состояние соединений"""
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "decode_errors": self.decode_errors,
+            "apply_errors": self.apply_errors,
+            "updates": self.updates,
+            "unknown_events": self.unknown_events,
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "latency_p50_ms": percentile(0.5),
+            "latency_p99_ms": percentile(0.99),
+            "connections": [
+                {
+                    "subscriptions": len(connection.subscriptions),
+                    "reconnects": connection.reconnects,
+                    "connected": connection.ws is not None,
+                }
+                for connection in self._connections
+            ],
+        }
@@ -1,100 +1,205 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 
 import websockets
+from websockets.asyncio.client import ClientConnection
 
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from forkscan.parsers.base import Frame, StreamingBookmakerParser, StreamUpdate
 from forkscan.parsers.betboomtest.market_betstats_ws_pb2 import (
     MainRequest,
     MainResponse,
-    PingRequest,
     SubscribeRequest,
+    UnsubscribeRequest,
 )
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+BETBOOM_WS_URL = "wss://ru-ws.sporthub.bet:444/api/tree_ws/v1"
+
+# Обязательно указываем протокол, который «ждёт» сервер
+HEADERS = {
+    "Origin": "https://betboom.ru",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+}
+SUBPROTOCOLS = ["protobuf"]
+
+# Betboom (sporthub) использует идентификаторы рынков и исходов Betradar:
+# (market_id, outcome_id) -> MarketType; линия берётся из specifier вида "total=2.5"
+OUTCOME_MARKETS: Dict[Tuple[int, int], MarketType] = {
+    (1, 1): MarketType.WIN_1,
+    (1, 2): MarketType.DRAW,
+    (1, 3): MarketType.WIN_2,
+    (10, 9): MarketType.DOUBLE_1X,
+    (10, 10): MarketType.DOUBLE_12,
+    (10, 11): MarketType.DOUBLE_X2,
+    (16, 1714): MarketType.HANDICAP_1,
+    (16, 1715): MarketType.HANDICAP_2,
+    (18, 12): MarketType.TOTAL_OVER,
+    (18, 13): MarketType.TOTAL_UNDER,
+    (19, 12): MarketType.TEAM_1_TOTAL_OVER,
+    (19, 13): MarketType.TEAM_1_TOTAL_UNDER,
+    (20, 12): MarketType.TEAM_2_TOTAL_OVER,
+    (20, 13): MarketType.TEAM_2_TOTAL_UNDER,
+    (60, 1): MarketType.PERIOD_1_WIN_1,
+    (60, 2): MarketType.PERIOD_1_DRAW,
+    (60, 3): MarketType.PERIOD_1_WIN_2,
+    (186, 4): MarketType.WIN_1,
+    (186, 5): MarketType.WIN_2,
+}
+
+# Исходы, для которых specifier задаёт линию соперника: в рынке 16 "hcp" — фора хозяев,
+# а в хранилище линия форы — фора команды, на которую ставка
+OPPONENT_LINE_OUTCOMES = frozenset({(16, 1715)})
+
+
+def _parse_line(specifier: str) -> float:
+    """Линия из specifier Betradar: "total=2.5", "hcp=-1.5"; пустой — рынок без линии."""
+    if not specifier:
+        return 0.0
+    _, _, value = specifier.partition("=")
+    return float(value.split("|", 1)[0])
+
+
+def translate_outcome(outcome) -> Optional[Tuple[int, MarketType, float, float]]:
+    """Переводит изменение исхода в (match_id, рынок, линия, коэффициент).
+
+    Returns:
+        None для неизвестных рынков и закрытых исходов (коэффициент <= 1).
+    """
+    key = (outcome.market_id, outcome.outcome_id)
+    market = OUTCOME_MARKETS.get(key)
+    if market is None or outcome.odds <= 1.0:
+        return None
+    line = _parse_line(outcome.specifier)
+    if key in OPPONENT_LINE_OUTCOMES:
+        line = 0.0 - line  # не -line: фора 0 не должна стать -0.0
+    return outcome.match_id, market, line, outcome.odds
+
+
+class BetboomParser(StreamingBookmakerParser):
+    """Потоковые коэффициенты Betboom (protobuf поверх WebSocket).
+
+    Подписка идёт на match_id Betboom, он же bookmaker_id события.
+    Сервер присылает изменения исходов по Betradar-идентификаторам рынков,
+    они переводятся в MarketType через OUTCOME_MARKETS.
+
+    Пример:
+        parser = BetboomParser(manager, store, uid_prefix="IFqWW", connections=4)
+        await parser.start()
+        await parser.track_event(event)
+    """
 
-async def subscribe_match_market(
-    url: str, match_id: int, uid: str, token: Optional[str] = None
-) -> None:
-    """Подключается по WebSocket и подписывается на обновления рынка.
+    def __init__(
+        self,
+        event_manager: EventManager,
+        store: Optional[OddsStore] = None,
+        url: str = BETBOOM_WS_URL,
+        uid_prefix: str = "forkscan",
+        log_sample_every: int = 1000,
+        **kwargs,
+    ):
+        """
+        Args:
+            event_manager (EventManager): менеджер событий.
+            store (OddsStore, optional): хранилище коэффициентов.
+            url (str): URL WebSocket-сервера.
+            uid_prefix (str): префикс идентификаторов подписок.
+            log_sample_every (int): логировать содержимое каждого N-го фрейма (DEBUG).
+            **kwargs: параметры StreamingBookmakerParser (connections, coalescer, ...).
+        """
+        super().__init__(event_manager, store, **kwargs)
+        self._url = url
+        self.uid_prefix = uid_prefix
+        self.log_sample_every = log_sample_every
+        self.decoded = 0
+
+    @property
+    def bookmaker_name(self) -> BookmakerName:
+        return BookmakerName.BETBOOM
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    def subscription_uid(self, bookmaker_id: str) -> str:
+        """Идентификатор подписки матча; по нему же отменяется подписка."""
+        return f"{self.uid_prefix}-{bookmaker_id}"
+
+    async def connect(self) -> ClientConnection:
+        return await websockets.connect(
+            self.url,
+            additional_headers=HEADERS,
+            subprotocols=SUBPROTOCOLS,
+            open_timeout=self.heartbeat_timeout,
+        )
 
-    Args:
-        url (str): URL WebSocket-сервера.
-        match_id (int): Идентификатор матча.
-        uid (str): Уникальный идентификатор подписки.
-        token (str, optional): Если сервер требует токен — можно расширить
-            MainRequest.SubscribeRequest, добавив поле token.
-    """
-    # Обязательно указываем протокол, который «ждёт» сервер
-    headers = {
-        "Origin": "https://betboom.ru",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-    }
-    async with websockets.connect(
-        url,
-        additional_headers=headers,
-        subprotocols=["protobuf"],  # <-- ключевая правка!
-    ) as ws:
-        logger.info("Connected to %s, negotiated subprotocol=%r", url, ws.subprotocol)
-
-        # 1) Сформируем protobuf-запрос на подписку
-        req = MainRequest(
+    def subscribe_request(self, bookmaker_id: str) -> Frame:
+        request = MainRequest(
             subscribe_match_market=SubscribeRequest(
-                match_id=match_id,
-                uid=uid,
+                match_id=int(bookmaker_id), uid=self.subscription_uid(bookmaker_id)
             )
         )
-        raw = req.SerializeToString()
-        logger.debug("Sending %d-byte SubscribeRequest", len(raw))
-        await ws.send(raw)
-
-        # 2) Запускаем приём и разбор
-        async for frame in ws:
-            # Сервер шлёт только бинарные фреймы
-            if not isinstance(frame, (bytes, bytearray)):
-                logger.warning("Unexpected text frame: %r", frame)
-                continue
-
-            logger.debug("Received %d-byte frame", len(frame))
-            resp = MainResponse()
-            try:
-                resp.ParseFromString(frame)
-            except Exception as error:
-                logger.error("Failed to parse MainResponse: %s", error, exc_info=True)
-                continue
-
-            message_type = resp.WhichOneof("type")
-            if message_type is None:
-                logger.warning("Response without type: %r", resp)
-                continue
-
-            # Обработка
+        return request.SerializeToString()
+
+    def unsubscribe_request(self, bookmaker_id: str) -> Optional[Frame]:
+        request = MainRequest(
+            unsubscribe=UnsubscribeRequest(uid=self.subscription_uid(bookmaker_id))
+        )
+        return request.SerializeToString()
+
+    def decode(self, frame: Frame) -> Iterator[StreamUpdate]:
+        # Сервер шлёт только бинарные фреймы
+        if not isinstance(frame, (bytes, bytearray)):
+            logger.warning("Unexpected text frame: %r", frame)
+            return
+        resp = MainResponse()
+        resp.ParseFromString(frame)
+
+        self.decoded += 1
+        message_type = resp.WhichOneof("type")
+        if self.log_sample_every and self.decoded % self.log_sample_every == 0:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sampled frame (%s): %r", message_type, resp)
+
+        if message_type == "betstats_outcome_changed":
+            outcomes = [resp.betstats_outcome_changed]
+        elif message_type == "betstats_changed":
+            outcomes = resp.betstats_changed.outcomes
+        else:
             if message_type == "subscribe_match_market":
                 info = resp.subscribe_match_market
-                logger.info("Subscribed: code=%d, status=%r", info.code, info.status)
-            elif message_type == "betstats_changed":
-                stats = resp.betstats_changed
-                logger.info("Betstats changed: %r", stats)
-            elif message_type == "betstats_outcome_changed":
-                outcome = resp.betstats_outcome_changed
-                logger.info("Outcome changed: %r", outcome)
-            elif message_type == "ping":
-                ping = resp.ping
-                logger.debug("PING (server heartbeat): uuid=%r", ping.uuid)
-            else:
-                payload = getattr(resp, message_type)
-                logger.info("Other message (%s): %r", message_type, payload)
+                if info.code != 0:
+                    logger.warning(
+                        "Subscription rejected: code=%d, status=%r", info.code, info.status
+                    )
+            return
+
+        for outcome in outcomes:
+            translated = translate_outcome(outcome)
+            if translated is not None:
+                match_id, market, line, price = translated
+                yield str(match_id), market, line, price
 
 
 def main() -> None:
-    """Точка входа: URL, match_id, uid."""
-    url = "wss://ru-ws.sporthub.bet:444/api/tree_ws/v1"
+    """Точка входа: подписка на один матч с логированием каждого фрейма."""
     match_id = 1981261
     uid = "IFqWW-829cff75"
 
-    asyncio.run(subscribe_match_market(url, match_id, uid))
+    logging.basicConfig(level=logging.DEBUG)
+
+    async def run() -> None:
+        parser = BetboomParser(EventManager(), uid_prefix=uid, log_sample_every=1)
+        await parser.start()
+        await parser.watch(str(match_id), str(match_id))
+        while True:
+            await asyncio.sleep(10)
+            logger.info("Stats: %s", parser.stats())
+
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
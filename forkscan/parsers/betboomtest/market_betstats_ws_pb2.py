@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: market_betstats_ws.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'market_betstats_ws.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18market_betstats_ws.proto\x12\x1c\x62\x62.mobile.market_betstats_ws\"\x1a\n\x0bPingRequest\x12\x0b\n\x03uid\x18\x01 \x01(\t\"!\n\x12UnsubscribeRequest\x12\x0b\n\x03uid\x18\x01 \x01(\t\"1\n\x10SubscribeRequest\x12\x10\n\x08match_id\x18\x01 \x01(\x03\x12\x0b\n\x03uid\x18\x02 \x01(\t\"\xeb\x01\n\x0bMainRequest\x12\x39\n\x04ping\x18\x01 \x01(\x0b\x32).bb.mobile.market_betstats_ws.PingRequestH\x00\x12G\n\x0bunsubscribe\x18\x02 \x01(\x0b\x32\x30.bb.mobile.market_betstats_ws.UnsubscribeRequestH\x00\x12P\n\x16subscribe_match_market\x18\x03 \x01(\x0b\x32..bb.mobile.market_betstats_ws.SubscribeRequestH\x00\x42\x06\n\x04type\"\x18\n\x05\x45rror\x12\x0f\n\x07message\x18\x01 \x01(\t\"m\n\x0cPingResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x32\n\x05\x65rror\x18\x03 \x01(\x0b\x32#.bb.mobile.market_betstats_ws.Error\x12\x0b\n\x03uid\x18\x04 \x01(\t\"t\n\x13UnsubscribeResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x32\n\x05\x65rror\x18\x03 \x01(\x0b\x32#.bb.mobile.market_betstats_ws.Error\x12\x0b\n\x03uid\x18\x04 \x01(\t\"r\n\x11SubscribeResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x32\n\x05\x65rror\x18\x03 \x01(\x0b\x32#.bb.mobile.market_betstats_ws.Error\x12\x0b\n\x03uid\x18\x04 \x01(\t\"c\n\x07Outcome\x12\x10\n\x08match_id\x18\x01 \x01(\x03\x12\x11\n\tmarket_id\x18\x02 \x01(\x05\x12\x12\n\noutcome_id\x18\x03 \x01(\x05\x12\x11\n\tspecifier\x18\x04 \x01(\t\x12\x0c\n\x04odds\x18\x05 \x01(\x01\"J\n\x0f\x42\x65tstatsChanged\x12\x37\n\x08outcomes\x18\x01 \x03(\x0b\x32%.bb.mobile.market_betstats_ws.Outcome\"\xbb\x03\n\x0cMainResponse\x12\x34\n\x05\x65rror\x18\x01 \x01(\x0b\x32#.bb.mobile.market_betstats_ws.ErrorH\x00\x12:\n\x04ping\x18\x02 \x01(\x0b\x32*.bb.mobile.market_betstats_ws.PingResponseH\x00\x12H\n\x0bunsubscribe\x18\x03 \x01(\x0b\x32\x31.bb.mobile.market_betstats_ws.UnsubscribeResponseH\x00\x12Q\n\x16subscribe_match_market\x18\x04 \x01(\x0b\x32/.bb.mobile.market_betstats_ws.SubscribeResponseH\x00\x12I\n\x10\x62\x65tstats_changed\x18\x05 \x01(\x0b\x32-.bb.mobile.market_betstats_ws.BetstatsChangedH\x00\x12I\n\x18\x62\x65tstats_outcome_changed\x18\x06 \x01(\x0b\x32%.bb.mobile.market_betstats_ws.OutcomeH\x00\x42\x06\n\x04typeb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'market_betstats_ws_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_PINGREQUEST']._serialized_start=58
+  _globals['_PINGREQUEST']._serialized_end=84
+  _globals['_UNSUBSCRIBEREQUEST']._serialized_start=86
+  _globals['_UNSUBSCRIBEREQUEST']._serialized_end=119
+  _globals['_SUBSCRIBEREQUEST']._serialized_start=121
+  _globals['_SUBSCRIBEREQUEST']._serialized_end=170
+  _globals['_MAINREQUEST']._serialized_start=173
+  _globals['_MAINREQUEST']._serialized_end=408
+  _globals['_ERROR']._serialized_start=410
+  _globals['_ERROR']._serialized_end=434
+  _globals['_PINGRESPONSE']._serialized_start=436
+  _globals['_PINGRESPONSE']._serialized_end=545
+  _globals['_UNSUBSCRIBERESPONSE']._serialized_start=547
+  _globals['_UNSUBSCRIBERESPONSE']._serialized_end=663
+  _globals['_SUBSCRIBERESPONSE']._serialized_start=665
+  _globals['_SUBSCRIBERESPONSE']._serialized_end=779
+  _globals['_OUTCOME']._serialized_start=781
+  _globals['_OUTCOME']._serialized_end=880
+  _globals['_BETSTATSCHANGED']._serialized_start=882
+  _globals['_BETSTATSCHANGED']._serialized_end=956
+  _globals['_MAINRESPONSE']._serialized_start=959
+  _globals['_MAINRESPONSE']._serialized_end=1402
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,363 @@
+import asyncio
+import hashlib
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+
+from forkscan.infrastructure.replay.recorder import FeedRecorder
+
+try:  # brotli — необязательная зависимость, без неё просим только gzip/deflate
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def _decode_body(raw: bytes, encoding: str) -> bytes:
+    """Распаковывает тело ответа по заголовку Content-Encoding."""
+    encoding = encoding.strip().lower()
+    if not encoding or encoding == "identity":
+        return raw
+    if encoding == "gzip":
+        return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:  # некоторые серверы шлют raw deflate без заголовка zlib
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(raw)
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+@dataclass
+class FetchResult:
+    """Результат опроса фида."""
+
+    status: int
+    body: Optional[bytes]  # распакованное тело; None, если данные не изменились
+    changed: bool
+    wire_bytes: int  # байт тела, реально переданных по сети
+
+
+@dataclass
+class FetchStats:
+    """Счётчики опроса для оценки экономии трафика и CPU."""
+
+    requests: int = 0
+    not_modified: int = 0  # ответы 304
+    unchanged: int = 0  # 200 с тем же телом, что и в прошлый раз
+    changed: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    full_wire_bytes: int = 0  # сетевые байты ответов с полным телом
+    parses: int = 0
+    parse_cpu: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def record_parse(self, cpu_seconds: float) -> None:
+        """Учитывает CPU, потраченный на разбор изменившегося ответа."""
+        self.parses += 1
+        self.parse_cpu += cpu_seconds
+
+    def report(self) -> Dict[str, float]:
+        """Оценка экономии в пересчёте на час опроса.
+
+        Экономия трафика — это сжатие полных ответов плюс тела, которые
+        не пришлось передавать благодаря 304. Экономия CPU — средняя стоимость
+        разбора, умноженная на число пропущенных разборов (304 и то же тело).
+        """
+        hours = max(time.monotonic() - self.started_at, 1e-9) / 3600
+        full_responses = self.changed + self.unchanged
+        avg_full_wire = self.full_wire_bytes / full_responses if full_responses else 0.0
+        avg_decoded = self.decoded_bytes / full_responses if full_responses else 0.0
+        avg_parse = self.parse_cpu / self.parses if self.parses else 0.0
+        skipped = self.not_modified + self.unchanged
+
+        compression_saved = self.decoded_bytes - self.full_wire_bytes
+        not_modified_saved = self.not_modified * avg_decoded
+        return {
+            "requests_per_hour": self.requests / hours,
+            "wire_bytes_per_hour": self.wire_bytes / hours,
+            "bytes_saved_per_hour": (compression_saved + not_modified_saved) / hours,
+            "avg_full_response_wire_bytes": avg_full_wire,
+            "parses_skipped_per_hour": skipped / hours,
+            "cpu_seconds_saved_per_hour": skipped * avg_parse / hours,
+        }
+
+
+@dataclass
+class _Validators:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[bytes] = None
+
+
+class FeedFetcher:
+    """Асинхронный опрос фидов букмекеров с условными и сжатыми запросами.
+
+    Запрос отправляется с Accept-Encoding и, если сервер прислал ETag или
+    Last-Modified, с If-None-Match / If-Modified-Since. Ответ 304 или 200 с тем же
+    хешем тела возвращается как ``changed=False``, и парсер пропускает разбор.
+    """
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        timeout: float = 5.0,
+        recorder: Optional[FeedRecorder] = None,
+    ):
+        """
+        Args:
+            session (aiohttp.ClientSession, optional): общая сессия; должна быть создана
+                с ``auto_decompress=False``, по умолчанию создаётся своя.
+            timeout (float): общий таймаут запроса, секунды.
+            recorder (FeedRecorder, optional): запись распакованных ответов для replay.
+        """
+        self._session = session
+        self._own_session = session is None
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.recorder = recorder
+        self.stats = FetchStats()
+        self._validators: Dict[str, _Validators] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            # Распаковываем сами, чтобы считать реально переданные байты
+            self._session = aiohttp.ClientSession(auto_decompress=False)
+        return self._session
+
+    async def fetch(self, url: str, key: Optional[str] = None) -> FetchResult:
+        """Запрашивает URL и сообщает, изменились ли данные с прошлого опроса.
+
+        Args:
+            url (str): адрес запроса.
+            key (str, optional): ключ фида для валидаторов, если один фид
+                доступен по нескольким адресам (зеркала); по умолчанию сам URL.
+
+        Raises:
+            aiohttp.ClientError: ошибка соединения или HTTP-статус >= 400.
+            asyncio.TimeoutError: превышен таймаут.
+        """
+        validators = self._validators.setdefault(key or url, _Validators())
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+
+        async with self._get_session().get(url, headers=headers, timeout=self.timeout) as response:
+            raw = await response.read()
+            self.stats.requests += 1
+            self.stats.wire_bytes += len(raw)
+
+            if response.status == 304:
+                self.stats.not_modified += 1
+                return FetchResult(status=304, body=None, changed=False, wire_bytes=len(raw))
+            response.raise_for_status()
+
+            body = _decode_body(raw, response.headers.get("Content-Encoding", ""))
+            self.stats.full_wire_bytes += len(raw)
+            self.stats.decoded_bytes += len(body)
+            validators.etag = response.headers.get("ETag")
+            validators.last_modified = response.headers.get("Last-Modified")
+            if self.recorder is not None:
+                self.recorder.record_http(url, body, response.status, response.headers)
+
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if body_hash == validators.body_hash:
+            self.stats.unchanged += 1
+            return FetchResult(
+                status=response.status, body=None, changed=False, wire_bytes=len(raw)
+            )
+        validators.body_hash = body_hash
+        self.stats.changed += 1
+        return FetchResult(status=response.status, body=body, changed=True, wire_bytes=len(raw))
+
+    async def fetch_mirrored(self, pool: "MirrorPool") -> FetchResult:
+        """Запрашивает фид через лучшее доступное зеркало, при ошибке — через следующее.
+
+        Raises:
+            aiohttp.ClientError: ни одно зеркало не ответило.
+            asyncio.TimeoutError: последнее опрошенное зеркало не ответило вовремя.
+        """
+        last_error: Optional[BaseException] = None
+        for host in pool.candidates():
+            started = time.monotonic()
+            try:
+                result = await self.fetch(host.url, key=pool.key)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                pool.record_failure(host, time.monotonic() - started)
+                logger.warning("Mirror %s failed: %r", host.url, error)
+                last_error = error
+                continue
+            pool.record_success(host, time.monotonic() - started)
+            return result
+        raise last_error or aiohttp.ClientError("No mirrors configured")
+
+    async def probe(self, url: str, timeout: float) -> bool:
+        """Проверка доступности зеркала: True, если сервер ответил статусом < 400."""
+        try:
+            async with self._get_session().get(
+                url,
+                headers={"Accept-Encoding": ACCEPT_ENCODING},
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                return response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    def reset(self, url: str) -> None:
+        """Забывает валидаторы URL (или ключа фида): следующий опрос вернёт полное тело."""
+        self._validators.pop(url, None)
+
+    async def close(self) -> None:
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"  # зеркало в работе
+    OPEN = "open"  # зеркало исключено после серии ошибок
+    HALF_OPEN = "half_open"  # идёт пробный запрос
+
+
+@dataclass
+class HostState:
+    """Состояние одного зеркала фида."""
+
+    url: str
+    state: CircuitState = CircuitState.CLOSED
+    latency: Optional[float] = None  # экспоненциальное среднее времени ответа, секунды
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+
+class MirrorPool:
+    """Зеркала одного фида букмекера с выбором по задержке и circuit breaker.
+
+    Запросы идут на рабочее зеркало с наименьшей средней задержкой (ещё не
+    опрошенные пробуются первыми). После ``failure_threshold`` ошибок подряд
+    зеркало размыкается и перестаёт получать запросы; через ``reset_timeout``
+    фоновая задача ``run_probes`` шлёт на него пробный запрос и по результату
+    возвращает в работу или размыкает снова. Если разомкнуты все зеркала,
+    запросы идут на них в порядке давности размыкания.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        probe_timeout: float = 2.0,
+        latency_alpha: float = 0.3,
+    ):
+        """
+        Args:
+            urls (Sequence[str]): адреса зеркал, первый считается основным.
+            failure_threshold (int): ошибок подряд до размыкания.
+            reset_timeout (float): через сколько секунд пробовать разомкнутое зеркало.
+            probe_timeout (float): таймаут пробного запроса, секунды.
+            latency_alpha (float): вес нового замера в среднем времени ответа.
+        """
+        if not urls:
+            raise ValueError("At least one mirror URL is required")
+        self.hosts: List[HostState] = [HostState(url) for url in dict.fromkeys(urls)]
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.latency_alpha = latency_alpha
+
+    @property
+    def key(self) -> str:
+        """Ключ фида для условных запросов: общий для всех зеркал."""
+        return self.hosts[0].url
+
+    def candidates(self) -> List[HostState]:
+        """Зеркала в порядке попыток для очередного запроса."""
+        closed = [host for host in self.hosts if host.state is CircuitState.CLOSED]
+        if closed:
+            return sorted(closed, key=lambda h: -1.0 if h.latency is None else h.latency)
+        return sorted(self.hosts, key=lambda h: h.opened_at)
+
+    def _observe(self, host: HostState, latency: float) -> None:
+        if host.latency is None:
+            host.latency = latency
+        else:
+            host.latency += self.latency_alpha * (latency - host.latency)
+
+    def record_success(self, host: HostState, latency: float) -> None:
+        host.requests += 1
+        host.consecutive_failures = 0
+        self._observe(host, latency)
+        if host.state is not CircuitState.CLOSED:
+            logger.info("Mirror %s is back", host.url)
+            host.state = CircuitState.CLOSED
+
+    def record_failure(self, host: HostState, latency: Optional[float] = None) -> None:
+        """Учитывает ошибку; время до ошибки (например, таймаут) входит в среднюю задержку."""
+        host.requests += 1
+        host.failures += 1
+        host.consecutive_failures += 1
+        if latency is not None:
+            self._observe(host, latency)
+        if host.state is CircuitState.HALF_OPEN or (
+            host.state is CircuitState.CLOSED
+            and host.consecutive_failures >= self.failure_threshold
+        ):
+            logger.warning(
+                "Mirror %s is down after %d failures", host.url, host.consecutive_failures
+            )
+            host.state = CircuitState.OPEN
+            host.opened_at = time.monotonic()
+        elif host.state is CircuitState.OPEN:
+            host.opened_at = time.monotonic()
+
+    async def probe_due(self, fetcher: FeedFetcher) -> None:
+        """Пробует разомкнутые зеркала, у которых истёк reset_timeout."""
+        now = time.monotonic()
+        due = [
+            host
+            for host in self.hosts
+            if host.state is CircuitState.OPEN and now - host.opened_at >= self.reset_timeout
+        ]
+        for host in due:
+            host.state = CircuitState.HALF_OPEN
+
+        async def probe(host: HostState) -> None:
+            started = time.monotonic()
+            if await fetcher.probe(host.url, self.probe_timeout):
+                self.record_success(host, time.monotonic() - started)
+            else:
+                self.record_failure(host)
+
+        await asyncio.gather(*(probe(host) for host in due))
+
+    async def run_probes(self, fetcher: FeedFetcher, interval: float = 5.0) -> None:
+        """Фоновая проверка разомкнутых зеркал; запускать отдельной задачей."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.probe_due(fetcher)
+
+    def stats(self) -> List[Dict[str, object]]:
+        return [
+            {
+                "url": host.url,
+                "state": host.state.value,
+                "latency_ms": host.latency * 1000 if host.latency is not None else None,
+                "requests": host.requests,
+                "failures": host.failures,
+            }
+            for host in self.hosts
+        ]
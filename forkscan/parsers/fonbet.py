@@ -1,15 +1,35 @@
-from typing import Dict, Optional, Set
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Sequence, Set
 
+import aiohttp
 import requests
 
 from forkscan.core.sport_types import SportEvent
 from forkscan.core.types import BookmakerName, EventManager, SportType
+from forkscan.infrastructure.replay.recorder import FeedRecorder
+from forkscan.parsers.fetch import FeedFetcher, MirrorPool
+
+logger = logging.getLogger(__name__)
+
+FONBET_URL = "https://line-lb11.bk6bba-resources.com/ma/events/list?lang=ru&version=52043578381&scopeMarket=1600"
 
 
 class FonbetParser:
-    def __init__(self, event_manager: EventManager):
+    def __init__(
+        self,
+        event_manager: EventManager,
+        url: str = FONBET_URL,
+        recorder: Optional[FeedRecorder] = None,
+        mirrors: Optional[Sequence[str]] = None,
+    ):
         self.manager = event_manager
-        self.url = "https://line-lb11.bk6bba-resources.com/ma/events/list?lang=ru&version=52043578381&scopeMarket=1600"
+        self.url = url
+        # Зеркала фида; основной URL всегда первый
+        self.mirrors = MirrorPool([url, *(mirrors or ())])
+        self.recorder = recorder  # если задан, сырые ответы пишутся для последующего replay
         self.support_sports = {
             "football": SportType.FOOTBALL,
             "hockey": SportType.HOCKEY,
@@ -19,7 +39,6 @@ class FonbetParser:
             "esports": SportType.ESPORTS,
         }
         self.active_events: Set[str] = set()
-        self.missing_events_counter: Dict[str, int] = {}
         self.known_factors = {
             # 921: "П1", 922: "X", 923: "П2", 924: "Тотал Больше", ...
         }
@@ -131,89 +150,142 @@ class FonbetParser:
         self.manager.add_event(event)
 
     def _update_events(self, new_event_ids: Set[str]) -> None:
-        # Добавляем новые события в активные
-        self.active_events |= new_event_ids
-
-        # Найти события, которых нет в новых данных
-        finished = self.active_events - new_event_ids
-
-        # Увеличиваем счётчик для пропавших событий
-        for event_id in finished:
-            self.missing_events_counter[event_id] = self.missing_events_counter.get(event_id, 0) + 1
-            # Удаляем событие, если оно пропало N раз подряд
-            if self.missing_events_counter[event_id] >= 100:
-                print(f"Delete: {event_id}")
-                self.manager.remove_event_by_id(BookmakerName.FONBET, event_id)
-                self.missing_events_counter.pop(event_id)
-                self.active_events.discard(event_id)
-
-        # Если событие снова появилось — сбрасываем счетчик
-        for event_id in new_event_ids:
-            if event_id in self.missing_events_counter:
-                self.missing_events_counter.pop(event_id)
+        """Запоминает активные события и публикует версию линии
 
-    def _fetch_data(self) -> tuple[list, list, list]:
-        """Получает данные от API Fonbet"""
-        response = requests.get(self.url, timeout=5).json()
+        Пропавшие события удаляет EventManager по истечении срока.
+        """
+        self.active_events = new_event_ids
+        self.manager.expire_events()
+        self.manager.publish()
+
+    @staticmethod
+    def _unpack_response(response: dict) -> tuple[list, list, list]:
+        """Достаёт из ответа API списки событий, видов спорта и коэффициентов"""
         return (
             response.get("events", []),
             response.get("sports", []),
             response.get("customFactors", []),
         )
 
-    def _decode_custom_factors(self, custom_factors_info, event_data, name_sport) -> None:
+    def _fetch_data(self) -> tuple[list, list, list]:
+        """Получает данные от API Fonbet через лучшее доступное зеркало"""
+        last_error: Optional[requests.RequestException] = None
+        for host in self.mirrors.candidates():
+            started = time.monotonic()
+            try:
+                raw_response = requests.get(host.url, timeout=5)
+                raw_response.raise_for_status()
+            except requests.RequestException as e:
+                self.mirrors.record_failure(host, time.monotonic() - started)
+                last_error = e
+                continue
+            self.mirrors.record_success(host, time.monotonic() - started)
+            if self.recorder is not None:
+                self.recorder.record_http(
+                    host.url, raw_response.content, raw_response.status_code, raw_response.headers
+                )
+            return self._unpack_response(raw_response.json())
+        raise last_error
+
+    def _decode_custom_factors(
+        self, custom_factors_info: list, event_to_sport: Dict[str, str]
+    ) -> None:
         """
-        Для поддерживаемых видов спорта выводит id коэффициентов, которые не распознаны.
+        Для событий поддерживаемых видов спорта логирует id нераспознанных коэффициентов.
+
+        Args:
+            custom_factors_info: Список customFactors из ответа API
+            event_to_sport: ID события -> вид спорта, только поддерживаемые события
         """
-        print("custom_factors_info", custom_factors_info)
-        print("event_data", event_data)
-        print("name_sport", name_sport)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         for factor_group in custom_factors_info:
             event_id = str(factor_group["e"])
-            print("event_id", event_id)
-            if event_id in event_to_sport:
-                print("event_id213213", event_id)
-                sport_name = event_to_sport[event_id]
-                for factor in factor_group.get("factors", []):
-                    factor_id = factor.get("f")
-                    print("factor_id", factor_id)
-                    if factor_id not in self.known_factors:
-                        print(f"[{sport_name}] Unknown factor_id for event {event_id}: {factor_id}")
+            sport_name = event_to_sport.get(event_id)
+            if sport_name is None:
+                continue
+            for factor in factor_group.get("factors", []):
+                factor_id = factor.get("f")
+                if factor_id not in self.known_factors:
+                    logger.debug(
+                        "[%s] Unknown factor_id for event %s: %s", sport_name, event_id, factor_id
+                    )
+
+    def _process_data(
+        self, events_info: list, sports_info: list, custom_factors_info: list
+    ) -> None:
+        """Обновляет события менеджера по разобранному ответу API"""
+        self.manager.freshness.begin_cycle(BookmakerName.FONBET)
+        parent_dict = self._process_sports_info(sports_info)
+
+        # Собираем реальные активные ID из пришедших событий, а не из customFactors
+        new_event_ids: Set[str] = set()
+        event_to_sport: Dict[str, str] = {}
+        for event in events_info:
+            if not self._is_valid_event(event):
+                continue
+
+            evt_id = str(event["id"])
+            sport_data = parent_dict.get(event.get("sportId", 0), {})
+            if sport_data.get("name_sport") not in self.support_sports:
+                continue
+
+            new_event_ids.add(evt_id)
+            event_to_sport[evt_id] = sport_data["name_sport"]
+            self._process_single_event(event, sport_data)
+        self._decode_custom_factors(custom_factors_info, event_to_sport)
+        self._update_events(new_event_ids)
+        self.manager.freshness.confirm_bookmaker(BookmakerName.FONBET)
 
     def parse(self) -> None:
         """Основной метод парсинга"""
         try:
-            events_info, sports_info, custom_factors_info = self._fetch_data()
-            parent_dict = self._process_sports_info(sports_info)
-
-            # Собираем реальные активные ID из пришедших событий, а не из customFactors
-            new_event_ids: Set[str] = set()
-            for event in events_info:
-                if not self._is_valid_event(event):
-                    continue
+            self._process_data(*self._fetch_data())
+        except requests.RequestException as e:
+            print(f"Error fetching data from Fonbet: {e}")
+        except Exception as e:
+            print(f"Unexpected error processing Fonbet data: {e}")
 
-                evt_id = str(event["id"])
-                sport_data = parent_dict.get(event.get("sportId", 0), {})
-                if sport_data.get("name_sport") not in self.support_sports:
-                    continue
+    async def parse_async(self, fetcher: FeedFetcher) -> bool:
+        """
+        Асинхронный цикл парсинга через FeedFetcher
 
-                new_event_ids.add(evt_id)
+        Если сервер ответил 304 или прислал то же тело, разбор пропускается целиком.
 
-                self._decode_custom_factors(custom_factors_info, event, sport_data["name_sport"])
-                self._process_single_event(event, sport_data)
-            self._update_events(new_event_ids)
+        Args:
+            fetcher: Общий FeedFetcher с условными и сжатыми запросами
 
-        except requests.RequestException as e:
+        Returns:
+            True если данные изменились и были разобраны
+        """
+        try:
+            result = await fetcher.fetch_mirrored(self.mirrors)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching data from Fonbet: {e}")
+            return False
+        if not result.changed:
+            # Данные не изменились, но фид жив: события прошлого цикла подтверждены
+            # и не должны истечь, пока их не разбирали заново
+            self.manager.freshness.confirm_bookmaker(BookmakerName.FONBET)
+            self.manager.extend_events(BookmakerName.FONBET, self.active_events)
+            return False
+
+        started = time.process_time()
+        try:
+            self._process_data(*self._unpack_response(json.loads(result.body)))
         except Exception as e:
             print(f"Unexpected error processing Fonbet data: {e}")
+            # Без сброса то же тело будет считаться неизменным и не разберётся повторно
+            fetcher.reset(self.mirrors.key)
+            return False
+        fetcher.stats.record_parse(time.process_time() - started)
+        return True
 
 
 # Пример использования:
 if __name__ == "__main__":
     manager = EventManager()
     fonbet = FonbetParser(manager)
-    import time
 
     while True:
         fonbet.parse()
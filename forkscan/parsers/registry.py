@@ -0,0 +1,107 @@
+import argparse
+import importlib
+import logging
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterable, Optional, Set
+
+from forkscan.core.types import BookmakerName
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "forkscan.parsers"
+
+# Парсеры из самого пакета. Нужны, когда forkscan запущен из исходников без установки
+# и entry points не зарегистрированы; сторонние пакеты могут их переопределить.
+BUILTIN_PARSERS: Dict[BookmakerName, str] = {
+    BookmakerName.FONBET: "forkscan.parsers.fonbet:FonbetParser",
+}
+
+
+def _load_object(spec: str) -> Any:
+    """Импортирует объект по строке вида 'package.module:ClassName'."""
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+class ParserRegistry:
+    """Реестр парсеров букмекеров с ленивым импортом.
+
+    При создании читаются только метаданные entry points группы
+    ``forkscan.parsers`` (имя точки — имя члена BookmakerName, значение —
+    'module:Class'). Модуль парсера импортируется при первом обращении к нему,
+    поэтому процесс с двумя включёнными букмекерами не загружает остальные.
+    """
+
+    def __init__(self, enabled: Optional[Iterable[BookmakerName]] = None):
+        self._specs: Dict[BookmakerName, str] = dict(BUILTIN_PARSERS)
+        self._specs.update(self._discover())
+        self._loaded: Dict[BookmakerName, type] = {}
+        self.enabled: Set[BookmakerName] = set(enabled) if enabled is not None else set()
+
+    @staticmethod
+    def _discover() -> Dict[BookmakerName, str]:
+        specs: Dict[BookmakerName, str] = {}
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                bookmaker = BookmakerName[entry_point.name.upper()]
+            except KeyError:
+                logger.warning("Unknown bookmaker in parser entry point: %s", entry_point.name)
+                continue
+            specs[bookmaker] = entry_point.value
+        return specs
+
+    @classmethod
+    def from_settings(cls) -> "ParserRegistry":
+        """Реестр с букмекерами из settings.enabled_bookmakers."""
+        from forkscan.core.config import settings
+
+        return cls(settings.enabled_bookmakers)
+
+    def available(self) -> Set[BookmakerName]:
+        """Букмекеры, для которых зарегистрирован парсер."""
+        return set(self._specs)
+
+    def spec(self, bookmaker: BookmakerName) -> Optional[str]:
+        """Строка 'module:Class' парсера без импорта модуля."""
+        return self._specs.get(bookmaker)
+
+    def get(self, bookmaker: BookmakerName) -> type:
+        """Возвращает класс парсера, импортируя его модуль при первом обращении."""
+        parser_class = self._loaded.get(bookmaker)
+        if parser_class is None:
+            spec = self._specs.get(bookmaker)
+            if spec is None:
+                raise KeyError(f"No parser registered for {bookmaker.name}")
+            parser_class = _load_object(spec)
+            self._loaded[bookmaker] = parser_class
+        return parser_class
+
+    def enabled_parsers(self) -> Dict[BookmakerName, type]:
+        """Классы парсеров включённых букмекеров; незарегистрированные пропускаются."""
+        result = {}
+        for bookmaker in sorted(self.enabled, key=lambda b: b.value):
+            if bookmaker not in self._specs:
+                logger.warning("Bookmaker %s is enabled but has no parser", bookmaker.name)
+                continue
+            result[bookmaker] = self.get(bookmaker)
+        return result
+
+    def create_enabled(self, *args: Any, **kwargs: Any) -> Dict[BookmakerName, Any]:
+        """Создаёт экземпляры парсеров включённых букмекеров с общими аргументами."""
+        return {
+            bookmaker: parser_class(*args, **kwargs)
+            for bookmaker, parser_class in self.enabled_parsers().items()
+        }
+
+
+def main() -> None:
+    """Печатает зарегистрированные парсеры без их импорта."""
+    argparse.ArgumentParser(description="Bookmaker parser registry").parse_args()
+    registry = ParserRegistry()
+    for bookmaker in sorted(registry.available(), key=lambda b: b.value):
+        print(f"{bookmaker.name}\t{registry.spec(bookmaker)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+
+from forkscan.core.config import settings
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager
+from forkscan.infrastructure.archive.writer import OddsArchiveWriter
+from forkscan.infrastructure.board.file import BoardCheckpointer
+from forkscan.infrastructure.board.shared import SharedBoardWriter
+from forkscan.infrastructure.redis_client import close_redis, get_redis
+from forkscan.parsers.base import StreamingBookmakerParser
+from forkscan.parsers.fetch import FeedFetcher
+from forkscan.parsers.registry import ParserRegistry
+from forkscan.services.arbitrage import Fork
+from forkscan.services.coalescing import UpdateCoalescer, store_consumer
+from forkscan.services.lanes import Lane, LaneArbitrage, LaneScheduler
+from forkscan.services.leadership import LeaderElector, LeaderLease
+from forkscan.services.notification import NotificationDispatcher, Sender
+from forkscan.services.replication import BoardPublisher, BoardReplica
+
+logger = logging.getLogger(__name__)
+
+
+async def log_fork(lane: Lane, fork: Fork) -> None:
+    """Отправитель уведомлений по умолчанию: вилка пишется в лог."""
+    bookmakers = ", ".join(sorted(bookmaker.name for bookmaker in fork.bookmakers))
+    logger.info("%s fork %s: %.2f%% (%s)", lane.value, fork.event, fork.profit, bookmakers)
+
+
+class Scanner:
+    """Работа сканера: парсеры включённых букмекеров, поиск вилок по полосам и уведомления.
+
+    Опрашиваемые парсеры (parse_async) регистрируются в LaneScheduler задачей
+    live-полосы: фид отдаёт live и прематч одним ответом. Потоковые парсеры
+    (StreamingBookmakerParser) пишут котировки в общий OddsStore сами или, если
+    задан ``coalescer``, через него: склейка работает, пока работает сканер.
+    Найденные вилки уходят в NotificationDispatcher и, если задан ``publisher``,
+    в поток вилок группы. Тики потоковых парсеров пишутся в ``archive``, если он задан;
+    при остановке сканера архив сбрасывает буфер в сегмент. Линию, если задан
+    ``checkpointer``, run() восстанавливает из снимка до запуска парсеров, а пока
+    сканер работает, она периодически сохраняется на диск и, если задан
+    ``shared_board``, публикуется в разделяемую память для воркеров API.
+    """
+
+    def __init__(
+        self,
+        manager: EventManager,
+        store: OddsStore,
+        parsers: Dict[BookmakerName, Any],
+        send: Sender = log_fork,
+        poll_interval: float = 10.0,
+        archive: Optional[OddsArchiveWriter] = None,
+        coalescer: Optional[UpdateCoalescer] = None,
+        checkpointer: Optional[BoardCheckpointer] = None,
+        shared_board: Optional[SharedBoardWriter] = None,
+        shared_board_interval: float = 1.0,
+    ):
+        """
+        Args:
+            manager (EventManager): линия сканера.
+            store (OddsStore): котировки, общие для парсеров и поиска вилок.
+            parsers (Dict[BookmakerName, Any]): экземпляры парсеров.
+            send (Callable): корутина доставки одного уведомления о вилке.
+            poll_interval (float): период опроса фидов, секунды.
+            archive (OddsArchiveWriter, optional): архив тиков, общий для потоковых парсеров.
+            coalescer (UpdateCoalescer, optional): склейка тиков потоковых парсеров.
+            checkpointer (BoardCheckpointer, optional): снимки линии для тёплого рестарта.
+            shared_board (SharedBoardWriter, optional): линия в разделяемой памяти;
+                сегмент удаляется при остановке сканера.
+            shared_board_interval (float): период публикации в разделяемую память, секунды.
+        """
+        self.manager = manager
+        self.store = store
+        self.parsers = parsers
+        self.poll_interval = poll_interval
+        self.archive = archive
+        self.coalescer = coalescer
+        self.checkpointer = checkpointer
+        self.shared_board = shared_board
+        self.shared_board_interval = shared_board_interval
+        self.scheduler = LaneScheduler()
+        self.notifications = NotificationDispatcher(send)
+        self.fetcher = FeedFetcher()
+        self.arbitrage = LaneArbitrage.from_settings(manager, store, self.scheduler, self._on_forks)
+        # Публикатор линии группы, когда сканер работает лидером (run_elected)
+        self.publisher: Optional[BoardPublisher] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_settings(cls, send: Sender = log_fork) -> "Scanner":
+        """Сканер с парсерами из settings.enabled_bookmakers."""
+        manager, store = EventManager(), OddsStore()
+        archive = None
+        if settings.odds_archive_path is not None:
+            archive = OddsArchiveWriter(settings.odds_archive_path)
+        coalescer = None
+        if settings.coalesce_window > 0:
+            coalescer = UpdateCoalescer(store_consumer(store), window=settings.coalesce_window)
+        shared_board = None
+        if settings.shared_board_name is not None:
+            shared_board = SharedBoardWriter.from_settings()
+        parsers = {}
+        for bookmaker, parser_class in ParserRegistry.from_settings().enabled_parsers().items():
+            if issubclass(parser_class, StreamingBookmakerParser):
+                parsers[bookmaker] = parser_class(
+                    manager, store, coalescer=coalescer, archive=archive
+                )
+            else:
+                parsers[bookmaker] = parser_class(manager)
+        return cls(
+            manager,
+            store,
+            parsers,
+            send,
+            poll_interval=settings.update_delay,
+            archive=archive,
+            coalescer=coalescer,
+            checkpointer=BoardCheckpointer.from_settings(manager, store),
+            shared_board=shared_board,
+            shared_board_interval=settings.shared_board_interval,
+        )
+
+    async def start(self) -> None:
+        if self.coalescer is not None:
+            self.coalescer.start()
+        for bookmaker, parser in self.parsers.items():
+            if isinstance(parser, StreamingBookmakerParser):
+                await parser.start()
+            elif hasattr(parser, "parse_async"):
+                self.scheduler.add_job(
+                    Lane.LIVE, f"{bookmaker.name} poll", self._poll_job(parser), self.poll_interval
+                )
+                mirrors = getattr(parser, "mirrors", None)
+                if mirrors is not None:
+                    self._tasks.append(asyncio.create_task(mirrors.run_probes(self.fetcher)))
+            else:
+                logger.warning("Parser of %s can not be run by the scanner", bookmaker.name)
+        self.notifications.start()
+        self.scheduler.start()
+        if self.checkpointer is not None:
+            self.checkpointer.start()
+        if self.shared_board is not None:
+            self._tasks.append(
+                asyncio.create_task(
+                    self.shared_board.run(self.manager, self.store, self.shared_board_interval)
+                )
+            )
+        logger.info("Scanner started: %s", ", ".join(b.name for b in self.parsers) or "no parsers")
+
+    def _on_forks(self, lane: Lane, forks: List[Fork]) -> None:
+        self.notifications.submit(lane, forks)
+        if self.publisher is not None:
+            self.publisher.submit_forks(lane, forks)
+
+    def _poll_job(self, parser: Any):
+        async def poll() -> None:
+            await parser.parse_async(self.fetcher)
+
+        return poll
+
+    async def stop(self) -> None:
+        await self.scheduler.stop()
+        await self.notifications.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for parser in self.parsers.values():
+            if isinstance(parser, StreamingBookmakerParser):
+                await parser.stop()
+        if self.coalescer is not None:
+            # Склеенный остаток попадает в хранилище до остановки
+            await self.coalescer.stop()
+        if self.archive is not None:
+            # Последний сегмент сжимается и пишется на диск вне цикла событий
+            await asyncio.to_thread(self.archive.flush)
+        if self.checkpointer is not None:
+            # Последний снимок — после остатка склейки, чтобы рестарт начался с него
+            await self.checkpointer.stop()
+        if self.shared_board is not None:
+            # Публикация остановлена вместе с задачами: сегмент удаляется,
+            # следующий сканер создаёт его заново
+            self.shared_board.close()
+            self.shared_board = None
+        await self.fetcher.close()
+
+    async def run(self, stats_interval: Optional[float] = 60.0) -> None:
+        """Работает до отмены.
+
+        Раз в stats_interval секунд пишет в лог метрики полос, уведомлений
+        и отставание данных букмекеров (FreshnessTracker.lag).
+        """
+        if self.checkpointer is not None:
+            await self.checkpointer.restore()
+        await self.start()
+        try:
+            while True:
+                await asyncio.sleep(stats_interval or 3600)
+                if stats_interval:
+                    lag = {
+                        bookmaker.name: round(seconds, 1)
+                        for bookmaker, seconds in self.manager.freshness.lag().items()
+                    }
+                    logger.info(
+                        "Lanes: %s, notifications: %s, feed lag: %s",
+                        self.scheduler.stats(),
+                        self.notifications.stats(),
+                        lag,
+                    )
+        finally:
+            await self.stop()
+
+
+async def run_elected(
+    redis_client: redis.Redis, make_scanner: Callable[[], Scanner] = Scanner.from_settings
+) -> None:
+    """Сканер группы settings.scanner_group_name, работающий только лидером группы.
+
+    В резерве экземпляр держит реплику линии группы (BoardReplica). Став
+    лидером, он создаёт новый сканер, переносит в него реплику и публикует
+    линию и вилки через BoardPublisher с фенсингом. При потере аренды сканер
+    останавливается; следующий срок начинается с нового сканера.
+
+    Args:
+        redis_client (redis.Redis): подключение без decode_responses.
+        make_scanner (Callable[[], Scanner]): создаёт сканер на срок лидерства.
+    """
+    lease = LeaderLease.from_settings(redis_client)
+    replica = BoardReplica.from_settings(redis_client, lease.group)
+
+    async def lead(token: int) -> None:
+        scanner = make_scanner()
+        restored = replica.restore_into(scanner.manager)
+        logger.info("Leading %s with %d events from the replica", lease.group, restored)
+        if not restored and scanner.checkpointer is not None:
+            # Реплика пуста (группа только запускается): начинаем с последнего снимка
+            await scanner.checkpointer.restore()
+        scanner.publisher = BoardPublisher.from_settings(redis_client, scanner.manager, lease)
+        await scanner.start()
+        try:
+            # LeaseLostError из публикатора завершает срок: аренду забрал другой экземпляр
+            await scanner.publisher.run(settings.board_publish_interval)
+        finally:
+            await scanner.stop()
+
+    replica_task = asyncio.create_task(replica.run())
+    try:
+        await LeaderElector.from_settings(lease, lead).run()
+    finally:
+        replica_task.cancel()
+        await asyncio.gather(replica_task, return_exceptions=True)
+
+
+async def _run() -> None:
+    if not settings.leader_election:
+        await Scanner.from_settings().run()
+        return
+    redis_client = await get_redis(decode_responses=False)
+    try:
+        await run_elected(redis_client)
+    finally:
+        await close_redis(redis_client)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.DEBUG if settings.debug else logging.INFO)
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass  # остановка по Ctrl+C; сканер и выборы уже остановлены
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from forkscan.core.freshness import FreshnessTracker
+from forkscan.core.odds import MarketLine, OddsStore, Quote
+from forkscan.core.types import BookmakerName, MarketType, SportType
+
+# Группы взаимоисключающих исходов, вместе покрывающих все варианты.
+# Каждый исход задан рынком и множителем линии относительно первого исхода группы:
+# фора первой команды h закрывается форой второй команды -h.
+OutcomeGroup = Tuple[Tuple[MarketType, float], ...]
+
+THREE_WAY_GROUPS: Tuple[OutcomeGroup, ...] = (
+    ((MarketType.WIN_1, 1.0), (MarketType.DRAW, 1.0), (MarketType.WIN_2, 1.0)),
+    ((MarketType.DOUBLE_1X, 1.0), (MarketType.WIN_2, 1.0)),
+    ((MarketType.DOUBLE_X2, 1.0), (MarketType.WIN_1, 1.0)),
+    ((MarketType.DOUBLE_12, 1.0), (MarketType.DRAW, 1.0)),
+    (
+        (MarketType.PERIOD_1_WIN_1, 1.0),
+        (MarketType.PERIOD_1_DRAW, 1.0),
+        (MarketType.PERIOD_1_WIN_2, 1.0),
+    ),
+    ((MarketType.TOTAL_OVER, 1.0), (MarketType.TOTAL_UNDER, 1.0)),
+    ((MarketType.HANDICAP_1, 1.0), (MarketType.HANDICAP_2, -1.0)),
+    ((MarketType.TEAM_1_TOTAL_OVER, 1.0), (MarketType.TEAM_1_TOTAL_UNDER, 1.0)),
+    ((MarketType.TEAM_2_TOTAL_OVER, 1.0), (MarketType.TEAM_2_TOTAL_UNDER, 1.0)),
+)
+
+# Для видов спорта без ничьей (теннис, киберспорт и т.п.) победы П1 и П2 покрывают все исходы
+TWO_WAY_GROUPS: Tuple[OutcomeGroup, ...] = (((MarketType.WIN_1, 1.0), (MarketType.WIN_2, 1.0)),)
+
+# Виды спорта, в которых матч не заканчивается ничьей
+TWO_WAY_SPORTS: FrozenSet[SportType] = frozenset(
+    {SportType.TENNIS, SportType.TABLETENNIS, SportType.ESPORTS}
+)
+
+
+def _index_by_anchor(groups: Iterable[OutcomeGroup]) -> Dict[MarketType, List[OutcomeGroup]]:
+    """Группы по рынку первого исхода: каждую группу проверяем один раз на линию."""
+    result: Dict[MarketType, List[OutcomeGroup]] = {}
+    for group in groups:
+        result.setdefault(group[0][0], []).append(group)
+    return result
+
+
+_THREE_WAY_BY_ANCHOR = _index_by_anchor(THREE_WAY_GROUPS)
+_ALL_BY_ANCHOR = _index_by_anchor(THREE_WAY_GROUPS + TWO_WAY_GROUPS)
+
+
+@dataclass(frozen=True)
+class ForkLeg:
+    """Одна ставка вилки."""
+
+    market: MarketType
+    line: float
+    bookmaker: BookmakerName
+    price: float
+    stake: float  # доля от общей суммы ставки
+    quoted_at: float
+
+
+@dataclass(frozen=True)
+class Fork:
+    """Найденная вилка по событию."""
+
+    event: str
+    legs: Tuple[ForkLeg, ...]
+    profit: float  # гарантированная прибыль в % от суммы ставок
+    detected_at: float
+
+    @property
+    def key(self) -> Tuple[str, Tuple[MarketLine, ...]]:
+        """Идентичность вилки без учёта букмекеров и цен — для отслеживания времени жизни."""
+        return self.event, tuple((leg.market, leg.line) for leg in self.legs)
+
+    @property
+    def bookmakers(self) -> FrozenSet[BookmakerName]:
+        return frozenset(leg.bookmaker for leg in self.legs)
+
+
+class ArbitrageEngine:
+    """Поиск вилок по текущим котировкам OddsStore.
+
+    Для каждого исхода группы берётся лучший коэффициент среди разрешённых
+    букмекеров с достаточно свежими данными; группа даёт вилку, если
+    сумма обратных коэффициентов меньше единицы.
+
+    Свежесть проверяется двумя способами: ``max_staleness`` ограничивает возраст
+    самой котировки (последнего изменения цены), ``max_data_age`` — время с
+    последнего подтверждения данных букмекера фидом по FreshnessTracker. Второе
+    отсекает замёрзшие коэффициенты упавшего фида, не трогая котировки, которые
+    давно не менялись, но подтверждаются каждым циклом.
+    """
+
+    def __init__(
+        self,
+        min_profit: float = 0.0,
+        max_staleness: Optional[float] = None,
+        bookmakers: Optional[Iterable[BookmakerName]] = None,
+        freshness: Optional[FreshnessTracker] = None,
+        max_data_age: Optional[float] = None,
+    ):
+        """
+        Args:
+            min_profit (float): минимальная прибыль вилки в процентах.
+            max_staleness (float, optional): максимальный возраст котировки в секундах.
+            bookmakers (Iterable[BookmakerName], optional): учитываемые букмекеры,
+                по умолчанию все.
+            freshness (FreshnessTracker, optional): подтверждения данных букмекеров,
+                обычно EventManager.freshness.
+            max_data_age (float, optional): максимальный возраст подтверждения
+                данных букмекера по событию, секунды; действует вместе с freshness.
+        """
+        self.min_profit = min_profit
+        self.max_staleness = max_staleness
+        self.bookmakers = frozenset(bookmakers) if bookmakers is not None else None
+        self.freshness = freshness
+        self.max_data_age = max_data_age
+
+    def _best_quote(
+        self,
+        quotes: Dict[BookmakerName, Quote],
+        now: float,
+        fresh: Optional[Set[BookmakerName]] = None,
+    ) -> Optional[Tuple[BookmakerName, Quote]]:
+        best: Optional[Tuple[BookmakerName, Quote]] = None
+        for bookmaker, quote in quotes.items():
+            if self.bookmakers is not None and bookmaker not in self.bookmakers:
+                continue
+            if fresh is not None and bookmaker not in fresh:
+                continue
+            if self.max_staleness is not None and now - quote.ts > self.max_staleness:
+                continue
+            if best is None or quote.price > best[1].price:
+                best = (bookmaker, quote)
+        return best
+
+    def find_event_forks(
+        self, store: OddsStore, event: str, now: float, two_way: bool = False
+    ) -> List[Fork]:
+        """Ищет вилки по одному событию.
+
+        Args:
+            store (OddsStore): хранилище котировок.
+            event (str): идентификатор события.
+            now (float): текущее время для проверки свежести котировок.
+            two_way (bool): в виде спорта нет ничьей, П1 и П2 образуют вилку.
+
+        Returns:
+            List[Fork]: вилки с прибылью не ниже min_profit.
+        """
+        fresh: Optional[Set[BookmakerName]] = None
+        if self.freshness is not None and self.max_data_age is not None:
+            fresh = self.freshness.fresh_bookmakers(event, self.max_data_age, now)
+            if len(fresh) < 2:
+                return []  # вилке нужны хотя бы два букмекера со свежими данными
+
+        markets = store.event_markets(event)
+        groups_by_anchor = _ALL_BY_ANCHOR if two_way else _THREE_WAY_BY_ANCHOR
+        forks: List[Fork] = []
+
+        for (market, line), anchor_quotes in markets.items():
+            for group in groups_by_anchor.get(market, ()):
+                best: List[Tuple[MarketType, float, BookmakerName, Quote]] = []
+                for leg_market, multiplier in group:
+                    leg_line = line * multiplier
+                    quotes = (
+                        anchor_quotes
+                        if leg_market == market
+                        else markets.get((leg_market, leg_line))
+                    )
+                    choice = self._best_quote(quotes, now, fresh) if quotes else None
+                    if choice is None:
+                        break
+                    best.append((leg_market, leg_line, choice[0], choice[1]))
+                else:
+                    fork = self._make_fork(event, best, now)
+                    if fork is not None:
+                        forks.append(fork)
+        return forks
+
+    def _make_fork(
+        self,
+        event: str,
+        best: List[Tuple[MarketType, float, BookmakerName, Quote]],
+        now: float,
+    ) -> Optional[Fork]:
+        inverse_sum = sum(1.0 / quote.price for _, _, _, quote in best)
+        if inverse_sum >= 1.0:
+            return None
+        # Все исходы у одного букмекера — это ошибка в линии, а не вилка
+        if len({bookmaker for _, _, bookmaker, _ in best}) < 2:
+            return None
+        profit = (1.0 / inverse_sum - 1.0) * 100
+        if profit < self.min_profit:
+            return None
+        legs = tuple(
+            ForkLeg(
+                market=market,
+                line=line,
+                bookmaker=bookmaker,
+                price=quote.price,
+                stake=(1.0 / quote.price) / inverse_sum,
+                quoted_at=quote.ts,
+            )
+            for market, line, bookmaker, quote in best
+        )
+        return Fork(event=event, legs=legs, profit=profit, detected_at=now)
+
+    def find_forks(
+        self,
+        store: OddsStore,
+        now: float,
+        two_way_events: Optional[FrozenSet[str]] = None,
+        events: Optional[Iterable[str]] = None,
+    ) -> List[Fork]:
+        """Ищет вилки по всем событиям хранилища.
+
+        Args:
+            store (OddsStore): хранилище котировок.
+            now (float): текущее время.
+            two_way_events (FrozenSet[str], optional): события видов спорта без ничьей.
+            events (Iterable[str], optional): проверять только эти события
+                (например, одну полосу обработки), по умолчанию все.
+        """
+        forks: List[Fork] = []
+        for event in store.events() if events is None else events:
+            two_way = two_way_events is not None and event in two_way_events
+            forks.extend(self.find_event_forks(store, event, now, two_way))
+        return forks
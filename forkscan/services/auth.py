@@ -3,14 +3,15 @@ import uuid
 from datetime import UTC, datetime, timedelta
 
 from jose import jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from forkscan.core.config import settings
 from forkscan.infrastructure.database.models import RefreshToken, User
+from forkscan.services.passwords import make_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Синхронные помощники; обработчики API хешируют через PasswordHasher
+pwd_context = make_context(settings.password_hash_rounds)
 
 
 def generate_promo_code(length=6):
@@ -0,0 +1,253 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import redis.asyncio as redis
+from jose import JWTError, jwt
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from forkscan.infrastructure.database.models import Subscription, SubscriptionPlan, User
+
+logger = logging.getLogger(__name__)
+
+# Канал, через который воркеры API узнают об изменённых пользователях
+USER_INVALIDATION_CHANNEL = "auth:user_changed"
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class InvalidTokenError(Exception):
+    """Access token не прошёл проверку: подпись, срок действия или тип."""
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Пользователь запроса: строка users и действующая подписка.
+
+    Неизменяемый снимок, который можно хранить между запросами; для изменения
+    пользователя строку нужно загрузить в сессию запроса.
+    """
+
+    id: int
+    email: str
+    promo_code: Optional[str]
+    referrer_id: Optional[int]
+    plan: Optional[str] = None  # код действующего тарифа
+    subscribed_until: Optional[datetime] = None
+
+
+class _ExpiringCache(Generic[K, V]):
+    """Ограниченный словарь, записи которого живут до своего срока."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: Dict[K, Tuple[V, float]] = {}  # ключ -> (значение, срок по time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def put(self, key: K, value: V, ttl: float) -> None:
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        if len(self._entries) >= self.max_size and key not in self._entries:
+            self._evict()
+        self._entries[key] = (value, time.monotonic() + ttl)
+
+    def discard(self, *keys: K) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+        # Всё ещё полон: удаляем самые старые записи
+        while len(self._entries) >= self.max_size:
+            del self._entries[next(iter(self._entries))]
+
+
+async def load_user(session: AsyncSession, user_id: int) -> Optional[CurrentUser]:
+    """Загружает пользователя и его действующую подписку одним запросом."""
+    active = and_(
+        Subscription.user_id == User.id,
+        Subscription.is_active.is_(True),
+        or_(Subscription.end_date.is_(None), Subscription.end_date > func.now()),
+    )
+    res = await session.execute(
+        select(User, SubscriptionPlan.code, Subscription.end_date)
+        .outerjoin(Subscription, active)
+        .outerjoin(SubscriptionPlan, SubscriptionPlan.id == Subscription.plan_id)
+        .where(User.id == user_id)
+        # Бессрочная подписка первой, затем самая длинная
+        .order_by(Subscription.end_date.is_(None).desc(), Subscription.end_date.desc())
+        .limit(1)
+    )
+    row = res.first()
+    if row is None:
+        return None
+    user, plan, subscribed_until = row
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        promo_code=user.promo_code,
+        referrer_id=user.referrer_id,
+        plan=plan,
+        subscribed_until=subscribed_until,
+    )
+
+
+class AuthCache:
+    """Кеш проверки access token и пользователя запроса в воркере API.
+
+    Claims токена хранятся по SHA-256 токена до его ``exp``: подписанный токен
+    не меняется, поэтому повторная проверка подписи ничего не даёт. Снимок
+    пользователя хранится ``user_ttl`` секунд; изменения пользователя (сброс
+    пароля, смена промокода) рассылаются всем воркерам через
+    USER_INVALIDATION_CHANNEL. Пока подписка на канал не работает, пользователь
+    каждый раз читается из базы.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        algorithm: str = "HS256",
+        claims_size: int = 100_000,
+        users_size: int = 100_000,
+        user_ttl: float = 30.0,
+    ):
+        """
+        Args:
+            secret (str): ключ подписи JWT.
+            algorithm (str): алгоритм подписи JWT.
+            claims_size (int): токенов в кеше claims, 0 — кеш выключен.
+            users_size (int): пользователей в кеше, 0 — кеш выключен.
+            user_ttl (float): время жизни снимка пользователя, секунды.
+        """
+        self.secret = secret
+        self.algorithm = algorithm
+        self.user_ttl = user_ttl
+        self.claims = _ExpiringCache[bytes, dict](claims_size)
+        self.users = _ExpiringCache[int, CurrentUser](users_size)
+        self._redis: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        # Растёт при каждой инвалидации: загруженная до неё строка не кешируется
+        self._invalidations = 0
+
+        self.claims_hits = 0
+        self.user_hits = 0
+        self.user_loads = 0
+
+    @classmethod
+    def from_settings(cls) -> "AuthCache":
+        from forkscan.core.config import settings
+
+        return cls(
+            settings.jwt_secret_value,
+            settings.jwt_algorithm,
+            claims_size=settings.auth_claims_cache_size,
+            users_size=settings.auth_user_cache_size,
+            user_ttl=settings.auth_user_cache_ttl,
+        )
+
+    def decode(self, token: str) -> dict:
+        """Claims access token'а.
+
+        Raises:
+            InvalidTokenError: подпись неверна, срок истёк, это не access token
+                или в нём нет user_id.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.claims.get(key)
+        if claims is not None:
+            self.claims_hits += 1
+            return claims
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+        # Refresh token подписан тем же ключом, но для запросов не годится
+        if claims.get("type") is not None or not isinstance(claims.get("user_id"), int):
+            raise InvalidTokenError("Not an access token")
+        self.claims.put(key, claims, claims.get("exp", 0) - time.time())
+        return claims
+
+    async def user(self, session: AsyncSession, user_id: int) -> Optional[CurrentUser]:
+        """Снимок пользователя из кеша или из базы; None, если пользователя нет."""
+        listening = self._task is not None
+        if listening:
+            user = self.users.get(user_id)
+            if user is not None:
+                self.user_hits += 1
+                return user
+        invalidations = self._invalidations
+        user = await load_user(session, user_id)
+        self.user_loads += 1
+        if user is not None and listening and invalidations == self._invalidations:
+            self.users.put(user_id, user, self.user_ttl)
+        return user
+
+    def forget(self, *user_ids: int) -> None:
+        """Удаляет пользователей из кеша этого воркера."""
+        self._invalidations += 1
+        self.users.discard(*user_ids)
+
+    async def invalidate(self, redis_client: redis.Redis, *user_ids: int) -> None:
+        """Удаляет пользователей из кешей всех воркеров после изменения в базе."""
+        self.forget(*user_ids)
+        try:
+            await redis_client.publish(USER_INVALIDATION_CHANNEL, json.dumps(user_ids))
+        except Exception as e:
+            # Остальные воркеры увидят изменение не позже чем через user_ttl
+            logger.error(f"Failed to publish user invalidation for {user_ids}: {str(e)}")
+
+    def start(self, redis_client: redis.Redis) -> None:
+        """Подписывается на инвалидации; до этого пользователи не кешируются."""
+        if self._task is None:
+            self._redis = redis_client
+            self._task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.users.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+                    # Сообщения, пришедшие без подписки, потеряны: начинаем с пустого кеша
+                    self._invalidations += 1
+                    self.users.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.forget(*json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User invalidation listener error: {str(e)}")
+                self._invalidations += 1
+                self.users.clear()
+                await asyncio.sleep(1)
@@ -0,0 +1,238 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, MarketType
+from forkscan.infrastructure.archive.reader import OddsArchiveReader
+from forkscan.services.arbitrage import ArbitrageEngine, Fork
+
+_MARKETS = {market.value: market for market in MarketType}
+_BOOKMAKERS = {bookmaker.value: bookmaker for bookmaker in BookmakerName}
+
+# Границы корзин гистограммы времени жизни вилок, секунды
+LIFETIME_BUCKETS: Tuple[float, ...] = (1, 5, 15, 30, 60, 300, 900, math.inf)
+
+# Прогрев окна, если не задан ни warmup, ни max_staleness
+DEFAULT_WARMUP = 600.0
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    """Параметры прогона, совпадают с параметрами ArbitrageEngine."""
+
+    min_profit: float = 0.0
+    max_staleness: Optional[float] = 60.0
+    bookmakers: Optional[FrozenSet[BookmakerName]] = None
+    two_way_events: Optional[FrozenSet[str]] = None
+    # Как часто (в секундах модельного времени) перепроверять открытые вилки,
+    # чтобы закрывать их по устареванию котировок без новых тиков
+    sweep_interval: float = 1.0
+    # Сколько секунд истории до начала окна прогреть без учёта вилок
+    warmup: Optional[float] = None
+
+    def engine(self) -> ArbitrageEngine:
+        return ArbitrageEngine(
+            min_profit=self.min_profit,
+            max_staleness=self.max_staleness,
+            bookmakers=self.bookmakers,
+        )
+
+
+@dataclass
+class BacktestResult:
+    """Агрегированные результаты прогона. Результаты окон складываются через merge()."""
+
+    ticks: int = 0
+    forks_opened: int = 0
+    forks_closed: int = 0
+    forks_censored: int = 0  # вилки, открытые на конец окна
+    total_lifetime: float = 0.0  # суммарное время жизни закрытых вилок, секунды
+    theoretical_profit: float = 0.0  # сумма лучшей прибыли по вилкам, % от ставки
+    lifetime_histogram: List[int] = field(default_factory=lambda: [0] * len(LIFETIME_BUCKETS))
+    by_bookmakers: Dict[FrozenSet[BookmakerName], int] = field(default_factory=dict)
+
+    @property
+    def mean_lifetime(self) -> float:
+        return self.total_lifetime / self.forks_closed if self.forks_closed else 0.0
+
+    def merge(self, other: "BacktestResult") -> "BacktestResult":
+        self.ticks += other.ticks
+        self.forks_opened += other.forks_opened
+        self.forks_closed += other.forks_closed
+        self.forks_censored += other.forks_censored
+        self.total_lifetime += other.total_lifetime
+        self.theoretical_profit += other.theoretical_profit
+        self.lifetime_histogram = [
+            a + b for a, b in zip(self.lifetime_histogram, other.lifetime_histogram)
+        ]
+        for bookmakers, count in other.by_bookmakers.items():
+            self.by_bookmakers[bookmakers] = self.by_bookmakers.get(bookmakers, 0) + count
+        return self
+
+
+@dataclass
+class _OpenFork:
+    opened_at: float
+    best_profit: float
+    counted: bool  # False для вилок, открытых ещё в период прогрева
+
+
+class _ForkTracker:
+    """Отслеживает появление и исчезновение вилок по событиям."""
+
+    def __init__(self, result: BacktestResult):
+        self.result = result
+        self.open: Dict[tuple, _OpenFork] = {}
+        self.open_by_event: Dict[str, set] = {}
+
+    def update_event(self, event: str, forks: List[Fork], now: float, counting: bool) -> None:
+        current = {fork.key: fork for fork in forks}
+        previous = self.open_by_event.get(event, set())
+
+        for key in previous - current.keys():
+            self._close(key, now)
+
+        for key, fork in current.items():
+            state = self.open.get(key)
+            if state is None:
+                self.open[key] = _OpenFork(now, fork.profit, counting)
+                if counting:
+                    self.result.forks_opened += 1
+                    self.result.by_bookmakers[fork.bookmakers] = (
+                        self.result.by_bookmakers.get(fork.bookmakers, 0) + 1
+                    )
+            elif fork.profit > state.best_profit:
+                state.best_profit = fork.profit
+
+        if current:
+            self.open_by_event[event] = set(current)
+        else:
+            self.open_by_event.pop(event, None)
+
+    def _close(self, key: tuple, now: float) -> None:
+        state = self.open.pop(key)
+        if not state.counted:
+            return
+        lifetime = now - state.opened_at
+        self.result.forks_closed += 1
+        self.result.total_lifetime += lifetime
+        self.result.theoretical_profit += state.best_profit
+        for number, bound in enumerate(LIFETIME_BUCKETS):
+            if lifetime < bound:
+                self.result.lifetime_histogram[number] += 1
+                break
+
+    def finish(self) -> None:
+        for state in self.open.values():
+            if state.counted:
+                self.result.forks_censored += 1
+                self.result.theoretical_profit += state.best_profit
+
+
+def run_window(directory: Path, start: float, end: float, params: BacktestParams) -> BacktestResult:
+    """Прогоняет ArbitrageEngine по тикам архива в полуинтервале [start, end).
+
+    Перед окном прогревается хранилище котировок (по умолчанию на max_staleness
+    секунд или DEFAULT_WARMUP); вилки, уже открытые после прогрева, не учитываются —
+    их считает предыдущее окно как незакрытые.
+    """
+    engine = params.engine()
+    store = OddsStore()
+    result = BacktestResult()
+    tracker = _ForkTracker(result)
+    two_way_events = params.two_way_events or frozenset()
+
+    warmup = (
+        params.warmup if params.warmup is not None else (params.max_staleness or DEFAULT_WARMUP)
+    )
+    next_sweep = start
+
+    reader = OddsArchiveReader(directory)
+    for batch in reader.scan(start - warmup, end, bookmakers=params.bookmakers):
+        names = batch.event_names
+        for ts, event_code, market, line, bookmaker, price in zip(
+            batch.ts.tolist(),
+            batch.event.tolist(),
+            batch.market.tolist(),
+            batch.line.tolist(),
+            batch.bookmaker.tolist(),
+            batch.price.tolist(),
+        ):
+            event = names[event_code]
+            store.update(event, _MARKETS[market], line, _BOOKMAKERS[bookmaker], price, ts)
+            counting = ts >= start
+            if counting:
+                result.ticks += 1
+
+            if ts >= next_sweep and tracker.open_by_event:
+                for open_event in list(tracker.open_by_event):
+                    if open_event != event:
+                        forks = engine.find_event_forks(
+                            store, open_event, ts, open_event in two_way_events
+                        )
+                        tracker.update_event(open_event, forks, ts, counting)
+                next_sweep = ts + params.sweep_interval
+
+            forks = engine.find_event_forks(store, event, ts, event in two_way_events)
+            tracker.update_event(event, forks, ts, counting)
+
+    tracker.finish()
+    return result
+
+
+def split_range(start: float, end: float, chunk: float) -> List[Tuple[float, float]]:
+    """Делит диапазон времени на окна не длиннее chunk секунд."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + chunk, end)))
+        start += chunk
+    return windows
+
+
+def run_backtest(
+    directory: Path,
+    params: BacktestParams,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    chunk: float = 3600.0,
+    workers: Optional[int] = None,
+) -> BacktestResult:
+    """Параллельный бэктест по архиву тиков.
+
+    Args:
+        directory (Path): каталог архива OddsArchiveWriter.
+        params (BacktestParams): параметры поиска вилок.
+        start (float, optional): начало диапазона, по умолчанию начало архива.
+        end (float, optional): конец диапазона, по умолчанию конец архива.
+        chunk (float): длина окна одного процесса, секунды.
+        workers (int, optional): число процессов, по умолчанию os.cpu_count().
+
+    Returns:
+        BacktestResult: результаты, сложенные по всем окнам.
+    """
+    time_range = OddsArchiveReader(directory).time_range()
+    if time_range is None:
+        return BacktestResult()
+    start = time_range[0] if start is None else start
+    # Конец полуинтервала: последний тик архива должен попасть в окно
+    end = math.nextafter(time_range[1], math.inf) if end is None else end
+
+    windows = split_range(start, end, chunk)
+    result = BacktestResult()
+    if workers == 1 or len(windows) == 1:
+        for window_start, window_end in windows:
+            result.merge(run_window(directory, window_start, window_end, params))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_window, directory, window_start, window_end, params)
+            for window_start, window_end in windows
+        ]
+        for future in futures:
+            result.merge(future.result())
+    return result
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from forkscan.core.odds import OddsStore, OddsTick
+from forkscan.core.types import BookmakerName, MarketType
+
+logger = logging.getLogger(__name__)
+
+UpdateKey = Tuple[str, MarketType, float, BookmakerName]
+BatchConsumer = Callable[[List[OddsTick]], Awaitable[None]]
+
+
+def store_consumer(store: OddsStore) -> BatchConsumer:
+    """Потребитель, записывающий склеенную пачку в хранилище котировок."""
+
+    async def consume(batch: List[OddsTick]) -> None:
+        for tick in batch:
+            store.apply(tick)
+
+    return consume
+
+
+class UpdateCoalescer:
+    """Склейка потоковых обновлений коэффициентов перед матчингом и поиском вилок.
+
+    Внутри окна ``window`` для каждого исхода (событие, рынок, линия, букмекер)
+    хранится только последний тик. Раз в окно накопленное передаётся потребителю
+    одной пачкой; пока потребитель обрабатывает пачку, новые тики продолжают
+    склеиваться, поэтому отстающий потребитель получает реже, но не больше данных.
+    Если различных исходов в ожидании больше ``max_pending``, ``wait_for_capacity``
+    задерживает производителя до следующей отправки.
+    """
+
+    def __init__(self, consumer: BatchConsumer, window: float = 0.1, max_pending: int = 50_000):
+        """
+        Args:
+            consumer (Callable): асинхронный обработчик пачки тиков.
+            window (float): окно склейки, секунды.
+            max_pending (int): порог числа исходов в ожидании для backpressure.
+        """
+        self.consumer = consumer
+        self.window = window
+        self.max_pending = max_pending
+        self._pending: Dict[UpdateKey, OddsTick] = {}
+        self._has_pending = asyncio.Event()
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.merged = 0
+        self.forwarded = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+
+    def submit(self, tick: OddsTick) -> None:
+        """Добавляет тик; предыдущий тик того же исхода в окне заменяется."""
+        key = (tick.event, tick.market, tick.line, tick.bookmaker)
+        previous = self._pending.get(key)
+        self.submitted += 1
+        if previous is not None:
+            self.merged += 1
+            if tick.ts < previous.ts:
+                return
+        self._pending[key] = tick
+        self._has_pending.set()
+        if len(self._pending) >= self.max_pending:
+            self._capacity.clear()
+
+    async def wait_for_capacity(self) -> None:
+        """Ждёт, пока потребитель не заберёт накопленное, если ожидающих исходов слишком много."""
+        if not self._capacity.is_set():
+            self.backpressure_waits += 1
+            await self._capacity.wait()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, flush: bool = True) -> None:
+        """Останавливает отправку; по умолчанию отдаёт потребителю остаток."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if flush:
+            await self._flush()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_pending.wait()
+            started = loop.time()
+            await self._flush()
+            # Окно отсчитывается от начала отправки: медленный потребитель не сдвигает его дальше
+            await asyncio.sleep(max(0.0, self.window - (loop.time() - started)))
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            self._has_pending.clear()
+            return
+        batch = list(self._pending.values())
+        self._pending = {}
+        self._has_pending.clear()
+        self._capacity.set()
+        self.forwarded += len(batch)
+        self.batches += 1
+        try:
+            await self.consumer(batch)
+        except Exception as error:
+            logger.error("Coalesced batch consumer failed: %s", error, exc_info=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "submitted": self.submitted,
+            "merged": self.merged,
+            "forwarded": self.forwarded,
+            "batches": self.batches,
+            "pending": len(self._pending),
+            "backpressure_waits": self.backpressure_waits,
+        }
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, FrozenSet, List, Optional, Set
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.snapshot import BoardSnapshot
+from forkscan.core.types import EventManager, EventStatus, event_id
+from forkscan.services.arbitrage import TWO_WAY_SPORTS, ArbitrageEngine, Fork
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(Enum):
+    """Полоса обработки: live-коэффициенты устаревают за секунды, прематч — за минуты."""
+
+    LIVE = "live"
+    PREMATCH = "prematch"
+
+
+class LatencyStats:
+    """Скользящее окно замеров задержки с перцентилями."""
+
+    def __init__(self, size: int = 10_000):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        """Перцентиль q (0..1) в миллисекундах."""
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        return samples[min(int(q * len(samples)), len(samples) - 1)] * 1000
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+        }
+
+
+@dataclass
+class LaneMetrics:
+    """Метрики полосы: длительность проходов, возраст данных при обнаружении вилки."""
+
+    runs: int = 0
+    failures: int = 0
+    deferred: int = 0  # сколько раз прематч уступал live
+    forks: int = 0
+    run_time: LatencyStats = field(default_factory=LatencyStats)
+    # от последнего тика, замкнувшего вилку, до её обнаружения
+    detection: LatencyStats = field(default_factory=LatencyStats)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "deferred": self.deferred,
+            "forks": self.forks,
+            "run_time": self.run_time.summary(),
+            "detection": self.detection.summary(),
+        }
+
+
+def classify_events(board: BoardSnapshot) -> Dict[Lane, Set[str]]:
+    """Раскладывает события версии линии по полосам.
+
+    Событие идёт в live, если хотя бы один букмекер считает его live или оно
+    уже началось. Идентификаторы — как в OddsStore (core.types.event_id).
+    Берётся опубликованная версия (EventManager.snapshot): проходы идут
+    параллельно с парсерами.
+    """
+    lanes: Dict[Lane, Set[str]] = {Lane.LIVE: set(), Lane.PREMATCH: set()}
+    for key, bookmaker_events in board.get_all_events().items():
+        live = any(
+            event.status == EventStatus.LIVE or event.is_started
+            for event in bookmaker_events.values()
+        )
+        lanes[Lane.LIVE if live else Lane.PREMATCH].add(event_id(key))
+    return lanes
+
+
+def two_way_events(board: BoardSnapshot) -> FrozenSet[str]:
+    """События видов спорта без ничьей (arbitrage.TWO_WAY_SPORTS) в версии линии.
+
+    Событие считается двухисходным, только если так его видят все букмекеры:
+    ключ события строится по командам, и совпадение из разных видов спорта
+    не должно давать вилку П1/П2 там, где возможна ничья.
+    """
+    return frozenset(
+        event_id(key)
+        for key, bookmaker_events in board.get_all_events().items()
+        if all(event.sport_type in TWO_WAY_SPORTS for event in bookmaker_events.values())
+    )
+
+
+Job = Callable[[], Awaitable[None]]
+
+
+class LaneScheduler:
+    """Периодические задачи с приоритетом live над прематчем.
+
+    Каждая задача крутится в своём цикле с заданным интервалом. Перед запуском
+    задачи прематча и в её контрольных точках (``checkpoint``) планировщик ждёт,
+    пока не завершатся все выполняющиеся live-задачи, поэтому под нагрузкой
+    прематч откладывается, а live идёт с заданной частотой.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[Lane, LaneMetrics] = {lane: LaneMetrics() for lane in Lane}
+        self._jobs: List[tuple] = []
+        self._tasks: List[asyncio.Task] = []
+        self._live_running = 0
+        self._live_idle = asyncio.Event()
+        self._live_idle.set()
+
+    def add_job(self, lane: Lane, name: str, job: Job, interval: float) -> None:
+        """
+        Args:
+            lane (Lane): полоса задачи.
+            name (str): имя для логов.
+            job (Callable): корутина одного прохода (опрос фида, поиск вилок, ...).
+            interval (float): пауза между запусками, секунды.
+        """
+        self._jobs.append((lane, name, job, interval))
+        if self._tasks:
+            self._tasks.append(asyncio.create_task(self._loop(lane, name, job, interval)))
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(*job)) for job in self._jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def checkpoint(self, lane: Lane) -> None:
+        """Точка уступки внутри длинного прохода: прематч ждёт, пока live свободен."""
+        await asyncio.sleep(0)
+        if lane is Lane.PREMATCH and not self._live_idle.is_set():
+            self.metrics[lane].deferred += 1
+            await self._live_idle.wait()
+
+    async def _loop(self, lane: Lane, name: str, job: Job, interval: float) -> None:
+        metrics = self.metrics[lane]
+        while True:
+            if lane is Lane.LIVE:
+                # Live занимает полосу ещё до уступки: прематч, которому тоже пора, ждёт его
+                self._live_running += 1
+                self._live_idle.clear()
+            try:
+                await self.checkpoint(lane)
+                started = time.perf_counter()
+                await job()
+                metrics.runs += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                metrics.failures += 1
+                logger.error("%s job %s failed: %s", lane.value, name, error, exc_info=True)
+            finally:
+                if lane is Lane.LIVE:
+                    self._live_running -= 1
+                    if not self._live_running:
+                        self._live_idle.set()
+            elapsed = time.perf_counter() - started
+            metrics.run_time.add(elapsed)
+            # Интервал отсчитывается от начала прохода: медленный проход не сдвигает расписание
+            await asyncio.sleep(max(0.0, interval - elapsed))
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {lane.value: metrics.summary() for lane, metrics in self.metrics.items()}
+
+
+ForkHandler = Callable[[Lane, List[Fork]], None]
+
+
+class LaneArbitrage:
+    """Поиск вилок отдельными проходами по live и прематч-событиям.
+
+    Для каждой полосы свой ArbitrageEngine (у live жёстче требование к свежести).
+    Проход прематча идёт порциями с контрольными точками планировщика,
+    чтобы не задерживать live.
+    """
+
+    def __init__(
+        self,
+        manager: EventManager,
+        store: OddsStore,
+        engines: Dict[Lane, ArbitrageEngine],
+        scheduler: LaneScheduler,
+        on_forks: ForkHandler,
+        two_way_events: Optional[FrozenSet[str]] = None,
+        chunk_size: int = 200,
+    ):
+        """
+        Args:
+            manager (EventManager): источник статусов событий.
+            store (OddsStore): хранилище котировок.
+            engines (Dict[Lane, ArbitrageEngine]): движок для каждой полосы.
+            scheduler (LaneScheduler): планировщик, метрики которого пополняются.
+            on_forks (Callable[[Lane, List[Fork]], None]): получатель найденных вилок,
+                например NotificationDispatcher.submit.
+            two_way_events (FrozenSet[str], optional): события видов спорта без ничьей;
+                по умолчанию определяются по виду спорта на каждом проходе.
+            chunk_size (int): число событий между контрольными точками прематча.
+        """
+        self.manager = manager
+        self.store = store
+        self.engines = engines
+        self.scheduler = scheduler
+        self.on_forks = on_forks
+        self.two_way_events = two_way_events
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_settings(
+        cls,
+        manager: EventManager,
+        store: OddsStore,
+        scheduler: LaneScheduler,
+        on_forks: ForkHandler,
+        min_profit: float = 0.0,
+        two_way_events: Optional[FrozenSet[str]] = None,
+    ) -> "LaneArbitrage":
+        """Движки и интервалы полос из settings; проходы сразу регистрируются в планировщике."""
+        from forkscan.core.config import settings
+
+        arbitrage = cls(
+            manager,
+            store,
+            engines={
+                Lane.LIVE: ArbitrageEngine(
+                    min_profit,
+                    freshness=manager.freshness,
+                    max_data_age=settings.live_max_data_age,
+                ),
+                Lane.PREMATCH: ArbitrageEngine(
+                    min_profit,
+                    freshness=manager.freshness,
+                    max_data_age=settings.prematch_max_data_age,
+                ),
+            },
+            scheduler=scheduler,
+            on_forks=on_forks,
+            two_way_events=two_way_events,
+        )
+        arbitrage.schedule(
+            {
+                Lane.LIVE: settings.live_arbitrage_interval,
+                Lane.PREMATCH: settings.prematch_arbitrage_interval,
+            }
+        )
+        return arbitrage
+
+    def schedule(self, intervals: Dict[Lane, float]) -> None:
+        """Регистрирует проходы полос в планировщике с заданными интервалами."""
+        for lane, interval in intervals.items():
+            self.scheduler.add_job(lane, "arbitrage", self._job(lane), interval)
+
+    def _job(self, lane: Lane) -> Job:
+        async def run() -> None:
+            await self.run_pass(lane)
+
+        return run
+
+    async def run_pass(self, lane: Lane) -> List[Fork]:
+        """Один проход поиска вилок по событиям полосы."""
+        engine = self.engines[lane]
+        metrics = self.scheduler.metrics[lane]
+        board = self.manager.snapshot()
+        events = list(classify_events(board)[lane])
+        two_way = self.two_way_events
+        if two_way is None:
+            two_way = two_way_events(board)
+        forks: List[Fork] = []
+        for start in range(0, len(events), self.chunk_size):
+            if start:
+                await self.scheduler.checkpoint(lane)
+            now = time.time()
+            chunk = events[start : start + self.chunk_size]
+            forks.extend(engine.find_forks(self.store, now, two_way, chunk))
+
+        for fork in forks:
+            metrics.detection.add(fork.detected_at - max(leg.quoted_at for leg in fork.legs))
+        metrics.forks += len(forks)
+        if forks:
+            self.on_forks(lane, forks)
+        return forks
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, List, Mapping, Optional, Union
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Захват: ключ аренды ставится только если его нет, токен — следующий номер счётчика.
+# Значение аренды "токен:владелец", чтобы продление и освобождение сверяли и то и другое.
+_ACQUIRE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return false
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], token .. ':' .. ARGV[1], 'PX', ARGV[2])
+return token
+"""
+
+_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Запись с фенсингом: принимается, только если токен писателя — последний выданный.
+# Лидер, проспавший потерю аренды (пауза GC, сетевой разрыв), получит отказ,
+# как только следующий лидер захватит аренду.
+_FENCED_XADD = """
+if tonumber(redis.call('GET', KEYS[1])) ~= tonumber(ARGV[1]) then
+    return redis.error_reply('FENCED stale leader token ' .. ARGV[1])
+end
+return redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', unpack(ARGV, 3))
+"""
+
+_FENCED_HSET = """
+if tonumber(redis.call('GET', KEYS[1])) ~= tonumber(ARGV[1]) then
+    return redis.error_reply('FENCED stale leader token ' .. ARGV[1])
+end
+return redis.call('HSET', KEYS[2], unpack(ARGV, 2))
+"""
+
+Field = Union[str, bytes, int, float]
+
+
+class LeaseLostError(Exception):
+    """Аренда лидера потеряна: запись отклонена токеном фенсинга."""
+
+
+class LeaderLease:
+    """Аренда роли лидера группы букмекеров в Redis с токенами фенсинга.
+
+    Аренда — ключ с TTL (SET NX PX), который лидер продлевает, пока жив. При
+    каждом захвате счётчик группы выдаёт новый токен; записи лидера в Redis
+    проверяют его в Lua-скрипте, поэтому бывший лидер не может ничего записать
+    после того, как аренду захватил другой экземпляр.
+
+    Лидер считает себя лидером только до локального срока: TTL, отсчитанного от
+    отправки последнего успешного захвата или продления, за вычетом запаса на
+    расхождение часов. Так он перестаёт работать раньше, чем Redis отдаст аренду.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        group: str,
+        owner: Optional[str] = None,
+        ttl: float = 5.0,
+        drift: float = 0.1,
+    ):
+        """
+        Args:
+            redis_client (redis.Redis): подключение к Redis.
+            group (str): группа букмекеров; у каждой группы свой лидер.
+            owner (str, optional): имя экземпляра; по умолчанию хост и PID.
+            ttl (float): срок аренды, секунды.
+            drift (float): доля TTL, на которую локальный срок короче серверного.
+        """
+        self.redis = redis_client
+        self.group = group
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.ttl = ttl
+        self.drift = drift
+        self.key = f"forkscan:leader:{group}"
+        self.fence_key = f"{self.key}:fence"
+
+        self.token: Optional[int] = None
+        self._value: Optional[str] = None
+        self._valid_until = 0.0
+
+        self._acquire = redis_client.register_script(_ACQUIRE)
+        self._renew = redis_client.register_script(_RENEW)
+        self._release = redis_client.register_script(_RELEASE)
+        self._fenced_xadd = redis_client.register_script(_FENCED_XADD)
+        self._fenced_hset = redis_client.register_script(_FENCED_HSET)
+
+    @classmethod
+    def from_settings(cls, redis_client: redis.Redis) -> "LeaderLease":
+        """Аренда группы settings.scanner_group, по умолчанию — включённых букмекеров."""
+        from forkscan.core.config import settings
+
+        return cls(redis_client, settings.scanner_group_name, ttl=settings.leader_lease_ttl)
+
+    @property
+    def is_leader(self) -> bool:
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def _extend(self, started: float) -> None:
+        self._valid_until = started + self.ttl * (1 - self.drift)
+
+    async def acquire(self) -> bool:
+        """Пытается захватить свободную аренду; при успехе выдаётся новый токен."""
+        started = time.monotonic()
+        token = await self._acquire(
+            keys=[self.key, self.fence_key], args=[self.owner, int(self.ttl * 1000)]
+        )
+        if token is None:
+            return False
+        self.token = int(token)
+        self._value = f"{self.token}:{self.owner}"
+        self._extend(started)
+        return True
+
+    async def renew(self) -> bool:
+        """Продлевает аренду; False, если она истекла или принадлежит другому."""
+        if self.token is None:
+            return False
+        started = time.monotonic()
+        if await self._renew(keys=[self.key], args=[self._value, int(self.ttl * 1000)]):
+            self._extend(started)
+            return True
+        self._lose()
+        return False
+
+    async def release(self) -> None:
+        """Отдаёт аренду сразу, не дожидаясь TTL: плановое переключение без простоя."""
+        if self.token is not None:
+            value = self._value
+            self._lose()
+            await self._release(keys=[self.key], args=[value])
+
+    def _lose(self) -> None:
+        self.token = None
+        self._value = None
+        self._valid_until = 0.0
+
+    def _check_token(self) -> int:
+        if self.token is None:
+            raise LeaseLostError(f"Not a leader of group {self.group}")
+        return self.token
+
+    async def xadd(self, stream: str, fields: Mapping[bytes, Field], maxlen: int) -> bytes:
+        """XADD с проверкой токена фенсинга; LeaseLostError, если токен устарел."""
+        args: List[Field] = [self._check_token(), maxlen]
+        for name, value in fields.items():
+            args += [name, value]
+        return await self._fenced(self._fenced_xadd, [self.fence_key, stream], args)
+
+    async def hset(self, key: str, mapping: Mapping[bytes, Field]) -> int:
+        """HSET с проверкой токена фенсинга; LeaseLostError, если токен устарел."""
+        args: List[Field] = [self._check_token()]
+        for name, value in mapping.items():
+            args += [name, value]
+        return await self._fenced(self._fenced_hset, [self.fence_key, key], args)
+
+    async def _fenced(self, script, keys: List[str], args: List[Field]):
+        try:
+            return await script(keys=keys, args=args)
+        except redis.ResponseError as error:
+            if "FENCED" not in str(error):
+                raise
+            self._lose()
+            raise LeaseLostError(str(error)) from None
+
+
+Leadership = Callable[[int], Awaitable[None]]
+
+
+class LeaderElector:
+    """Запускает работу лидера (парсеры и поиск вилок), пока аренда за этим экземпляром.
+
+    Резервные экземпляры пытаются захватить аренду каждые ``retry_interval``
+    секунд, поэтому после падения лидера работа возобновляется не позже чем
+    через TTL + retry_interval. Пока экземпляр в резерве, он держит тёплую
+    реплику линии (BoardReplica) и при захвате начинает с неё, а не с пустой линии.
+    """
+
+    def __init__(
+        self,
+        lease: LeaderLease,
+        lead: Leadership,
+        renew_interval: Optional[float] = None,
+        retry_interval: float = 0.5,
+    ):
+        """
+        Args:
+            lease (LeaderLease): аренда группы.
+            lead (Callable[[int], Awaitable[None]]): корутина работы лидера, получает
+                токен фенсинга; отменяется при потере аренды.
+            renew_interval (float, optional): период продления; по умолчанию TTL / 3.
+            retry_interval (float): период попыток захвата в резерве, секунды.
+        """
+        self.lease = lease
+        self.lead = lead
+        self.renew_interval = renew_interval if renew_interval is not None else lease.ttl / 3
+        self.retry_interval = retry_interval
+        self.terms = 0  # сколько раз экземпляр становился лидером
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, lease: LeaderLease, lead: Leadership) -> "LeaderElector":
+        from forkscan.core.config import settings
+
+        return cls(lease, lead, retry_interval=settings.leader_retry_interval)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._task is not None and not self._task.done() and self.lease.is_leader
+
+    async def run(self) -> None:
+        """Цикл выборов; при отмене работа лидера останавливается и аренда отдаётся."""
+        try:
+            while True:
+                if self._task is None:
+                    await self._try_acquire()
+                else:
+                    await self._keep()
+                await asyncio.sleep(self.renew_interval if self._task else self.retry_interval)
+        finally:
+            await self._step_down()
+            try:
+                await self.lease.release()
+            except Exception as error:
+                logger.warning("Failed to release %s lease: %s", self.lease.group, error)
+
+    async def _try_acquire(self) -> None:
+        try:
+            acquired = await self.lease.acquire()
+        except redis.RedisError as error:
+            logger.warning("Leader election for %s failed: %s", self.lease.group, error)
+            return
+        if acquired:
+            self.terms += 1
+            logger.info(
+                "%s became leader of %s with token %d",
+                self.lease.owner,
+                self.lease.group,
+                self.lease.token,
+            )
+            self._task = asyncio.create_task(self.lead(self.lease.token))
+
+    async def _keep(self) -> None:
+        if self._task.done():
+            # Работа лидера завершилась сама (ошибка): отдаём аренду другим экземплярам
+            error = None if self._task.cancelled() else self._task.exception()
+            if isinstance(error, LeaseLostError):
+                logger.warning(
+                    "%s was fenced off %s: %s", self.lease.owner, self.lease.group, error
+                )
+            elif error is not None:
+                logger.error("Leader work of %s failed", self.lease.group, exc_info=error)
+            self._task = None
+            await self.lease.release()
+            return
+        try:
+            renewed = await asyncio.wait_for(self.lease.renew(), self.renew_interval)
+        except (redis.RedisError, asyncio.TimeoutError) as error:
+            logger.warning("Failed to renew %s lease: %r", self.lease.group, error)
+            renewed = self.lease.is_leader  # Redis недоступен: работаем до локального срока
+        if not renewed or not self.lease.is_leader:
+            logger.warning("%s lost leadership of %s", self.lease.owner, self.lease.group)
+            self.lease._lose()
+            await self._step_down()
+
+    async def _step_down(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
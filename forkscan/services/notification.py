@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from forkscan.services.arbitrage import Fork
+from forkscan.services.lanes import Lane, LatencyStats
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[Lane, Fork], Awaitable[None]]
+
+# Меньше — раньше: live-вилки всегда обгоняют прематч в очереди отправки
+LANE_PRIORITY: Dict[Lane, int] = {Lane.LIVE: 0, Lane.PREMATCH: 1}
+
+
+class NotificationDispatcher:
+    """Очередь уведомлений о вилках с приоритетом live.
+
+    Вилка, уже отправленная не позже ``resend_interval`` секунд назад, повторно
+    не ставится в очередь. Прематч-уведомления сверх ``max_prematch_pending``
+    отбрасываются; live принимаются всегда.
+    """
+
+    def __init__(
+        self,
+        send: Sender,
+        workers: int = 1,
+        max_prematch_pending: int = 1000,
+        resend_interval: float = 60.0,
+    ):
+        """
+        Args:
+            send (Callable): корутина доставки одного уведомления.
+            workers (int): число параллельных отправителей.
+            max_prematch_pending (int): предел прематч-уведомлений в очереди.
+            resend_interval (float): не повторять уведомление о той же вилке, секунды.
+        """
+        self.send = send
+        self.workers = workers
+        self.max_prematch_pending = max_prematch_pending
+        self.resend_interval = resend_interval
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._counter = itertools.count()
+        self._pending: Dict[Lane, int] = {lane: 0 for lane in Lane}
+        self._sent_at: Dict[tuple, float] = {}
+        self._tasks: List[asyncio.Task] = []
+
+        self.sent: Dict[Lane, int] = {lane: 0 for lane in Lane}
+        self.dropped: Dict[Lane, int] = {lane: 0 for lane in Lane}
+        self.failures = 0
+        # от постановки в очередь до завершения доставки
+        self.latency: Dict[Lane, LatencyStats] = {lane: LatencyStats() for lane in Lane}
+
+    def submit(self, lane: Lane, forks: List[Fork]) -> None:
+        """Ставит вилки полосы в очередь, пропуская недавно отправленные."""
+        now = time.monotonic()
+        for fork in forks:
+            sent_at = self._sent_at.get(fork.key)
+            if sent_at is not None and now - sent_at < self.resend_interval:
+                continue
+            if lane is Lane.PREMATCH and self._pending[lane] >= self.max_prematch_pending:
+                self.dropped[lane] += 1
+                continue
+            self._sent_at[fork.key] = now
+            self._pending[lane] += 1
+            self._queue.put_nowait((LANE_PRIORITY[lane], next(self._counter), now, lane, fork))
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, enqueued_at, lane, fork = await self._queue.get()
+            self._pending[lane] -= 1
+            try:
+                await self.send(lane, fork)
+                self.sent[lane] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                self.failures += 1
+                # Неудачная отправка не должна блокировать повтор при следующем проходе
+                self._sent_at.pop(fork.key, None)
+                logger.error("Failed to send fork notification: %s", error, exc_info=True)
+            else:
+                self.latency[lane].add(time.monotonic() - enqueued_at)
+            self._prune(enqueued_at)
+
+    def _prune(self, now: float) -> None:
+        if len(self._sent_at) < 10_000:
+            return
+        self._sent_at = {
+            key: sent_at
+            for key, sent_at in self._sent_at.items()
+            if now - sent_at < self.resend_interval
+        }
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            lane.value: {
+                "pending": self._pending[lane],
+                "sent": self.sent[lane],
+                "dropped": self.dropped[lane],
+                "latency": self.latency[lane].summary(),
+            }
+            for lane in Lane
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+
+class HasherOverloadedError(Exception):
+    """Очередь хеширования паролей заполнена: запрос нужно отклонить (503)."""
+
+
+def make_context(rounds: int) -> CryptContext:
+    """Контекст bcrypt с заданной стоимостью.
+
+    Хеш с любой другой стоимостью считается устаревшим, поэтому после смены
+    ``rounds`` пароли перехешируются при следующем входе (verify_and_update).
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    """Хеширование и проверка паролей вне event loop.
+
+    bcrypt занимает сотни миллисекунд процессора на вызов; в обработчике он
+    останавливает все остальные запросы воркера. Здесь вызовы выполняются в
+    пуле из ``workers`` потоков (bcrypt отпускает GIL на время расчёта), а
+    ожидающих вызовов может быть не больше ``max_queue``: сверх этого
+    HasherOverloadedError сразу, а не очередь, которая растёт быстрее, чем
+    разбирается.
+    """
+
+    def __init__(self, context: CryptContext, workers: int = 2, max_queue: int = 32):
+        """
+        Args:
+            context (CryptContext): схема и стоимость хеширования.
+            workers (int): потоков bcrypt; больше числа ядер смысла нет.
+            max_queue (int): вызовов, ждущих свободного потока.
+        """
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+        self.completed = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls) -> "PasswordHasher":
+        from forkscan.core.config import settings
+
+        return cls(
+            make_context(settings.password_hash_rounds),
+            workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_queue,
+        )
+
+    @property
+    def pending(self) -> int:
+        """Вызовы в работе и в очереди."""
+        return self._pending
+
+    async def _run(self, function, *args):
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HasherOverloadedError(
+                f"{self._pending} password hashing calls pending, limit "
+                f"{self.workers + self.max_queue}"
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Проверяет пароль и, если хеш устарел, возвращает новый.
+
+        Returns:
+            Tuple[bool, Optional[str]]: совпал ли пароль и новый хеш для
+            сохранения (None, если хеш актуален или пароль неверен).
+        """
+        verified, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        if new_hash is not None:
+            self.rehashed += 1
+        return verified, new_hash
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,470 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import UTC, datetime
+from types import MappingProxyType
+from typing import Any, Deque, Dict, List, Mapping, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from forkscan.core.snapshot import BoardSnapshot
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import (
+    BaseSportEvent,
+    BookmakerName,
+    EventKey,
+    EventManager,
+    EventStatus,
+    MarketType,
+    SportType,
+    event_id,
+)
+from forkscan.infrastructure.board.layout import BoardView, encode_board
+from forkscan.services.arbitrage import Fork, ForkLeg
+from forkscan.services.lanes import Lane, LatencyStats
+from forkscan.services.leadership import LeaderLease, LeaseLostError
+
+logger = logging.getLogger(__name__)
+
+
+def _event_to_dict(event: BaseSportEvent) -> Dict[str, Any]:
+    return {
+        "bookmaker": event.bookmaker.name,
+        "id": event.bookmaker_id,
+        "start": event.start_time.timestamp(),
+        "sport": event.sport_type.name,
+        "status": event.status.value,
+        "league": event.league,
+        "name": event.event_name,
+        "team1": event.team1,
+        "team2": event.team2,
+    }
+
+
+def _event_from_dict(data: Dict[str, Any]) -> SportEvent:
+    return SportEvent(
+        bookmaker_id=data["id"],
+        start_time=datetime.fromtimestamp(data["start"], UTC),
+        sport_type=SportType[data["sport"]],
+        event_name=data["name"],
+        league=data["league"],
+        status=EventStatus(data["status"]),
+        bookmaker=BookmakerName[data["bookmaker"]],
+        team1=data["team1"],
+        team2=data["team2"],
+    )
+
+
+def _fork_to_dict(fork: Fork) -> Dict[str, Any]:
+    return {
+        "event": fork.event,
+        "profit": fork.profit,
+        "detected_at": fork.detected_at,
+        "legs": [
+            [leg.market.name, leg.line, leg.bookmaker.name, leg.price, leg.stake, leg.quoted_at]
+            for leg in fork.legs
+        ],
+    }
+
+
+def _fork_from_dict(data: Dict[str, Any]) -> Fork:
+    return Fork(
+        event=data["event"],
+        legs=tuple(
+            ForkLeg(MarketType[market], line, BookmakerName[bookmaker], price, stake, quoted_at)
+            for market, line, bookmaker, price, stake, quoted_at in data["legs"]
+        ),
+        profit=data["profit"],
+        detected_at=data["detected_at"],
+    )
+
+
+def _group_keys(group: str) -> Dict[str, str]:
+    """Ключи Redis линии группы сканера: у каждого лидера свои поток, вилки и снимок."""
+    from forkscan.core.config import settings
+
+    return {
+        "stream": f"{settings.board_stream}:{group}",
+        "forks_stream": f"{settings.board_forks_stream}:{group}",
+        "snapshot_key": f"{settings.board_redis_snapshot_key}:{group}",
+    }
+
+
+def _decode_snapshot(data: bytes) -> Dict[EventKey, Mapping[BookmakerName, BaseSportEvent]]:
+    events: Dict[EventKey, Dict[BookmakerName, BaseSportEvent]] = {}
+    for event_key, event in BoardView(data).iter_events():
+        events.setdefault(event_key, {})[event.bookmaker] = event
+    return {key: MappingProxyType(value) for key, value in events.items()}
+
+
+class BoardPublisher:
+    """Публикует линию сканера в Redis для реплик на других хостах.
+
+    Каждая новая версия EventManager уходит в поток Redis Streams дельтой:
+    события с изменившимися ключами целиком и удалённые ключи. Найденные вилки
+    идут в отдельный поток. Раз в ``snapshot_interval`` секунд полный снимок
+    линии (формат infrastructure.board) кладётся в хеш вместе с ID последней
+    дельты: реплика загружает снимок и дочитывает поток с этого места.
+    Дельты и снимок помечены эпохой запуска: после перезапуска сканера версии
+    начинаются заново, и реплики по смене эпохи перечитывают снимок. Версии
+    линии у каждого сканера свои, поэтому у каждой группы букмекеров свои
+    потоки и снимок (from_settings).
+
+    С арендой лидера (LeaderLease) все записи проверяют токен фенсинга:
+    бывший лидер получает LeaseLostError вместо записи поверх нового.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        manager: EventManager,
+        stream: str = "forkscan:board",
+        forks_stream: str = "forkscan:forks",
+        snapshot_key: str = "forkscan:board:snapshot",
+        maxlen: int = 100_000,
+        snapshot_interval: float = 30.0,
+        lease: Optional[LeaderLease] = None,
+    ):
+        """
+        Args:
+            redis_client (redis.Redis): подключение без decode_responses.
+            manager (EventManager): линия сканера; парсеры публикуют её версии.
+            stream (str): поток дельт линии.
+            forks_stream (str): поток найденных вилок.
+            snapshot_key (str): хеш с последним полным снимком.
+            maxlen (int): примерная длина потоков, старые записи обрезаются.
+            snapshot_interval (float): период записи полного снимка, секунды.
+            lease (LeaderLease, optional): аренда лидера группы для записей с фенсингом.
+        """
+        self.redis = redis_client
+        self.manager = manager
+        self.stream = stream
+        self.forks_stream = forks_stream
+        self.snapshot_key = snapshot_key
+        self.maxlen = maxlen
+        self.snapshot_interval = snapshot_interval
+        self.lease = lease
+        self.published = 0
+        self.epoch = str(time.time_ns())
+
+        # Последняя отправленная версия: до первого снимка — текущая линия целиком
+        self._board = manager.snapshot()
+        self._last_id: Optional[bytes] = None
+        self._snapshot_at: Optional[float] = None
+        # Последняя опубликованная версия и ключи, изменившиеся после отправленной;
+        # меняются вместе в потоке парсера
+        self._latest = self._board
+        self._changed: Set[EventKey] = set()
+        self._lock = threading.Lock()
+        self._forks: List[Tuple[Lane, Fork]] = []
+        manager.add_listener(self._on_publish)
+
+    @classmethod
+    def from_settings(
+        cls,
+        redis_client: redis.Redis,
+        manager: EventManager,
+        lease: Optional[LeaderLease] = None,
+    ) -> "BoardPublisher":
+        """Публикатор группы аренды lease, без неё — settings.scanner_group_name."""
+        from forkscan.core.config import settings
+
+        group = lease.group if lease is not None else settings.scanner_group_name
+        return cls(
+            redis_client,
+            manager,
+            **_group_keys(group),
+            maxlen=settings.board_stream_maxlen,
+            snapshot_interval=settings.board_redis_snapshot_interval,
+            lease=lease,
+        )
+
+    async def _xadd(self, stream: str, fields: Dict[bytes, Any]) -> bytes:
+        if self.lease is not None:
+            return await self.lease.xadd(stream, fields, self.maxlen)
+        return await self.redis.xadd(stream, fields, maxlen=self.maxlen, approximate=True)
+
+    async def _hset(self, key: str, mapping: Dict[bytes, Any]) -> None:
+        if self.lease is not None:
+            await self.lease.hset(key, mapping)
+        else:
+            await self.redis.hset(key, mapping=mapping)
+
+    def _on_publish(self, board: BoardSnapshot, changed: Set[EventKey]) -> None:
+        with self._lock:
+            self._latest = board
+            self._changed.update(changed)
+
+    def submit_forks(self, lane: Lane, forks: List[Fork]) -> None:
+        """Получатель вилок для LaneArbitrage (on_forks); отправляются следующим publish_once."""
+        self._forks.extend((lane, fork) for fork in forks)
+
+    async def publish_once(self) -> None:
+        """Отправляет накопленные изменения линии и вилки; при необходимости — снимок."""
+        if self._snapshot_at is None:
+            # Первым идёт снимок с ID хвоста потока: записи прошлого запуска реплике не нужны
+            tail = await self.redis.xrevrange(self.stream, count=1)
+            self._last_id = tail[0][0] if tail else b"0-0"
+            await self.write_snapshot()
+
+        with self._lock:
+            board, changed, self._changed = self._latest, self._changed, set()
+        if board.version != self._board.version:
+            upserts, deletes = [], []
+            for event_key in changed:
+                bookmaker_events = board.events.get(event_key)
+                if bookmaker_events is None:
+                    deletes.append(list(event_key.teams))
+                else:
+                    upserts.append(
+                        [*event_key.teams, [_event_to_dict(e) for e in bookmaker_events.values()]]
+                    )
+            self._last_id = await self._xadd(
+                self.stream,
+                {
+                    b"e": self.epoch,
+                    b"v": board.version,
+                    b"prev": self._board.version,
+                    b"ts": repr(time.time()),
+                    b"d": json.dumps({"set": upserts, "del": deletes}, separators=(",", ":")),
+                },
+            )
+            self._board = board
+            self.published += 1
+
+        if self._forks:
+            forks, self._forks = self._forks, []
+            by_lane: Dict[Lane, List[Dict[str, Any]]] = {}
+            for lane, fork in forks:
+                by_lane.setdefault(lane, []).append(_fork_to_dict(fork))
+            for lane, payload in by_lane.items():
+                await self._xadd(
+                    self.forks_stream,
+                    {b"lane": lane.value, b"ts": repr(time.time()), b"d": json.dumps(payload)},
+                )
+
+        if time.monotonic() - self._snapshot_at >= self.snapshot_interval:
+            await self.write_snapshot()
+
+    async def write_snapshot(self) -> None:
+        """Записывает полный снимок последней отправленной версии и ID её дельты."""
+        board, last_id = self._board, self._last_id
+        tables = await asyncio.to_thread(encode_board, self.manager, None, board)
+        await self._hset(
+            self.snapshot_key,
+            {
+                b"data": b"".join(tables.parts()),
+                b"epoch": self.epoch,
+                b"version": board.version,
+                b"id": last_id,
+            },
+        )
+        self._snapshot_at = time.monotonic()
+
+    async def run(self, interval: float = 0.1) -> None:
+        while True:
+            try:
+                await self.publish_once()
+            except (asyncio.CancelledError, LeaseLostError):
+                raise  # аренду забрал другой экземпляр: работа лидера завершается
+            except Exception as error:
+                logger.error("Failed to publish board to Redis: %s", error, exc_info=True)
+            await asyncio.sleep(interval)
+
+
+class BoardReplica:
+    """Локальная копия линии сканера в воркере API.
+
+    Загружает снимок из Redis, затем применяет дельты из потока к своему словарю
+    событий. Каждое чтение потока заканчивается новой неизменяемой версией
+    ``board`` (как EventManager.snapshot), так что обработчики API читают линию
+    из памяти, не обращаясь к Redis. Если дельта
+    не продолжает локальную версию (пропуск после обрезки потока, другая эпоха
+    после перезапуска сканера), реплика перечитывает снимок.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream: str = "forkscan:board",
+        forks_stream: str = "forkscan:forks",
+        snapshot_key: str = "forkscan:board:snapshot",
+        max_forks: int = 1000,
+        batch: int = 500,
+        block: int = 1000,
+    ):
+        """
+        Args:
+            redis_client (redis.Redis): подключение без decode_responses.
+            stream (str): поток дельт линии.
+            forks_stream (str): поток найденных вилок.
+            snapshot_key (str): хеш с последним полным снимком.
+            max_forks (int): сколько последних вилок хранить.
+            batch (int): максимум записей за одно чтение потока.
+            block (int): ожидание новых записей, миллисекунды.
+        """
+        self.redis = redis_client
+        self.stream = stream
+        self.forks_stream = forks_stream
+        self.snapshot_key = snapshot_key
+        self.batch = batch
+        self.block = block
+
+        self.board = BoardSnapshot()
+        self.forks: Deque[Tuple[Lane, Fork]] = deque(maxlen=max_forks)
+        # от отправки дельты сканером до применения в реплике
+        self.lag = LatencyStats()
+        self.applied = 0
+        self.resyncs = 0
+
+        self._epoch: Optional[bytes] = None
+        # Линия с применёнными дельтами и её версия; board — их копия на конец чтения
+        self._events: Dict[EventKey, Mapping[BookmakerName, BaseSportEvent]] = {}
+        self._version = 0
+        self._ids: Dict[str, bytes] = {stream: b"0-0", forks_stream: b"$"}
+
+    @classmethod
+    def from_settings(
+        cls, redis_client: redis.Redis, group: Optional[str] = None
+    ) -> "BoardReplica":
+        """Реплика линии группы сканера, по умолчанию — settings.scanner_group_name."""
+        from forkscan.core.config import settings
+
+        return cls(redis_client, **_group_keys(group or settings.scanner_group_name))
+
+    async def load_snapshot(self) -> bool:
+        """Заменяет локальную линию снимком из Redis; False, если снимка ещё нет."""
+        if self._ids[self.forks_stream] == b"$":
+            # Вилки только новые, но "$" в каждом XREAD потеряло бы пришедшие между чтениями
+            tail = await self.redis.xrevrange(self.forks_stream, count=1)
+            self._ids[self.forks_stream] = tail[0][0] if tail else b"0-0"
+        data = await self.redis.hgetall(self.snapshot_key)
+        if not data:
+            # Сканер ещё не запускался: ждём его первую дельту, перед ней он пишет снимок
+            self._epoch = None
+            self._set_board(0, {})
+            self._ids[self.stream] = b"$"
+            return False
+        # Разбор снимка занимает секунды на большой линии: не блокируем цикл событий
+        events = await asyncio.to_thread(_decode_snapshot, data[b"data"])
+        self._set_board(int(data[b"version"]), events)
+        self._epoch = data[b"epoch"]
+        self._ids[self.stream] = data[b"id"]
+        self.resyncs += 1
+        return True
+
+    def restore_into(self, manager: EventManager) -> int:
+        """
+        Переносит реплику в менеджер событий экземпляра, ставшего лидером
+
+        Резервный экземпляр начинает работу с тёплой линией, а не с пустой.
+        Данные реплики не подтверждены парсерами этого экземпляра, поэтому
+        остаются «несвежими» для ArbitrageEngine до первого цикла парсера.
+
+        Args:
+            manager (EventManager): менеджер, куда добавляются события.
+
+        Returns:
+            int: число восстановленных событий.
+        """
+        entries = [
+            (event_key, event)
+            for event_key, bookmaker_events in self.board.events.items()
+            for event in bookmaker_events.values()
+        ]
+        # В порядке начала: индекс времени начала тогда растёт дописыванием в конец
+        entries.sort(key=lambda entry: entry[1].start_time)
+        restored = 0
+        for event_key, event in entries:
+            manager.add_event(event, event_key=event_key)
+            if manager.get_event_by_id(event.bookmaker, event.bookmaker_id) is None:
+                continue  # событие давно началось
+            manager.freshness.forget(event_id(event_key), event.bookmaker)
+            restored += 1
+        manager.publish()
+        return restored
+
+    def _set_board(
+        self, version: int, events: Dict[EventKey, Mapping[BookmakerName, BaseSportEvent]]
+    ) -> None:
+        self._events = events
+        self._version = version
+        self._publish()
+
+    def _publish(self) -> None:
+        # Дельты меняют _events на месте: версии достаётся копия внешнего словаря
+        self.board = BoardSnapshot(self._version, events=MappingProxyType(self._events.copy()))
+
+    def _apply(self, fields: Dict[bytes, bytes]) -> bool:
+        """Применяет дельту к линии; False, если она не продолжает локальную версию."""
+        if fields[b"e"] != self._epoch or int(fields[b"prev"]) != self._version:
+            return False
+        delta = json.loads(fields[b"d"])
+        events = self._events
+        for team1, team2, bookmaker_events in delta["set"]:
+            events[EventKey((team1, team2))] = MappingProxyType(
+                {event.bookmaker: event for event in map(_event_from_dict, bookmaker_events)}
+            )
+        for team1, team2 in delta["del"]:
+            events.pop(EventKey((team1, team2)), None)
+        self._version = int(fields[b"v"])
+        self.lag.add(max(0.0, time.time() - float(fields[b"ts"])))
+        self.applied += 1
+        return True
+
+    async def poll(self) -> int:
+        """Одно чтение потоков; возвращает число применённых записей.
+
+        Все дельты чтения применяются к линии на месте, а новая версия ``board``
+        строится один раз в конце.
+        """
+        response = await self.redis.xread(self._ids, count=self.batch, block=self.block)
+        applied = 0
+        for stream, entries in response or []:
+            stream = stream.decode() if isinstance(stream, bytes) else stream
+            for entry_id, fields in entries:
+                if stream == self.forks_stream:
+                    lane = Lane(fields[b"lane"].decode())
+                    self.forks.extend((lane, _fork_from_dict(f)) for f in json.loads(fields[b"d"]))
+                elif not self._apply(fields):
+                    logger.warning(
+                        "Board delta %s does not follow local version %d, reloading snapshot",
+                        entry_id,
+                        self._version,
+                    )
+                    await self.load_snapshot()
+                    return applied
+                else:
+                    applied += 1
+                self._ids[stream] = entry_id
+        if applied:
+            self._publish()
+        return applied
+
+    async def run(self) -> None:
+        """Держит реплику актуальной; ошибки Redis не останавливают цикл."""
+        loaded = False
+        while True:
+            try:
+                if not loaded:
+                    await self.load_snapshot()
+                    loaded = True
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error("Board replica failed: %s", error, exc_info=True)
+                loaded = False
+                await asyncio.sleep(1.0)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "version": self.board.version,
+            "events": len(self.board),
+            "applied": self.applied,
+            "resyncs": self.resyncs,
+            "lag": self.lag.summary(),
+        }
@@ -0,0 +1,52 @@
+from datetime import UTC, datetime, timedelta
+from typing import Iterable
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventManager, SportType
+from forkscan.parsers.base import Frame, StreamingBookmakerParser, StreamUpdate
+
+
+class FakeStreamParser(StreamingBookmakerParser):
+    """Потоковый парсер без сети: фрейм — готовый список обновлений."""
+
+    def __init__(self, bookmaker: BookmakerName, manager: EventManager, store: OddsStore, **kwargs):
+        super().__init__(manager, store, **kwargs)
+        self._bookmaker = bookmaker
+
+    @property
+    def bookmaker_name(self) -> BookmakerName:
+        return self._bookmaker
+
+    @property
+    def url(self) -> str:
+        return "ws://localhost"
+
+    async def connect(self):
+        raise OSError("offline")
+
+    def subscribe_request(self, bookmaker_id: str) -> Frame:
+        return b""
+
+    def decode(self, frame) -> Iterable[StreamUpdate]:
+        return frame
+
+
+def make_event(
+    bookmaker: BookmakerName,
+    bookmaker_id: str,
+    team1: str,
+    team2: str,
+    sport_type: SportType = SportType.FOOTBALL,
+) -> SportEvent:
+    start = int((datetime.now(UTC) + timedelta(hours=1)).timestamp())
+    return SportEvent.create(
+        bookmaker=bookmaker,
+        bookmaker_id=bookmaker_id,
+        start_time=start,
+        tournament_name="League",
+        team1=team1,
+        team2=team2,
+        sport_type=sport_type,
+        status="prematch",
+    )
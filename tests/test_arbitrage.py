@@ -0,0 +1,78 @@
+import pytest
+
+from forkscan.core.odds import OddsStore, orient
+from forkscan.core.types import BookmakerName, EventKey, EventManager, MarketType
+from forkscan.services.arbitrage import ArbitrageEngine
+from tests.fakes import FakeStreamParser, make_event
+
+
+@pytest.fixture
+def board():
+    manager, store = EventManager(), OddsStore()
+    first = FakeStreamParser(BookmakerName.FONBET, manager, store)
+    second = FakeStreamParser(BookmakerName.WINLINE, manager, store)
+    return manager, store, first, second
+
+
+def test_is_reversed_follows_key_order():
+    key = EventKey.create("Zenit", "Arsenal")
+    assert key.teams == ("arsenal", "zenit")
+    assert key.is_reversed("Zenit")
+    assert not key.is_reversed("Arsenal")
+
+
+def test_orient_swaps_team_markets_and_keeps_lines():
+    assert orient(MarketType.WIN_1, 0.0, True) == (MarketType.WIN_2, 0.0)
+    assert orient(MarketType.HANDICAP_1, -1.5, True) == (MarketType.HANDICAP_2, -1.5)
+    assert orient(MarketType.TEAM_2_TOTAL_UNDER, 1.5, True) == (MarketType.TEAM_1_TOTAL_UNDER, 1.5)
+    assert orient(MarketType.TOTAL_OVER, 2.5, True) == (MarketType.TOTAL_OVER, 2.5)
+    assert orient(MarketType.DRAW, 0.0, True) == (MarketType.DRAW, 0.0)
+    assert orient(MarketType.WIN_1, 0.0, False) == (MarketType.WIN_1, 0.0)
+
+
+async def test_opposite_team_order_gives_no_phantom_fork(board):
+    manager, store, first, second = board
+    await first.track_event(make_event(BookmakerName.FONBET, "f1", "Arsenal", "Zenit"))
+    await second.track_event(make_event(BookmakerName.WINLINE, "w1", "Zenit", "Arsenal"))
+
+    # Обе линии одинаково оценивают матч: Arsenal 2.1, Zenit 1.7. Без учёта порядка команд
+    # П1 Fonbet и П2 Winline (тоже Arsenal) дали бы ложную вилку 2.1 / 2.1
+    first._process([("f1", MarketType.WIN_1, 0.0, 2.1), ("f1", MarketType.WIN_2, 0.0, 1.7)])
+    second._process([("w1", MarketType.WIN_1, 0.0, 1.7), ("w1", MarketType.WIN_2, 0.0, 2.1)])
+
+    engine = ArbitrageEngine()
+    two_way = frozenset(store.events())
+    assert engine.find_forks(store, now=0.0, two_way_events=two_way) == []
+
+    event = next(iter(store.events()))
+    markets = store.event_markets(event)
+    # Котировки Winline переведены в порядок ключа: её П1 (Zenit) — это П2 ключа
+    assert markets[(MarketType.WIN_2, 0.0)][BookmakerName.WINLINE].price == 1.7
+    assert markets[(MarketType.WIN_1, 0.0)][BookmakerName.WINLINE].price == 2.1
+
+
+async def test_opposite_team_order_pairs_real_fork(board):
+    manager, store, first, second = board
+    await first.track_event(make_event(BookmakerName.FONBET, "f1", "Arsenal", "Zenit"))
+    await second.track_event(make_event(BookmakerName.WINLINE, "w1", "Zenit", "Arsenal"))
+
+    # Arsenal -1.5 у Fonbet и Zenit +1.5 у Winline (её первая команда) закрывают друг друга
+    first._process([("f1", MarketType.HANDICAP_1, -1.5, 2.2)])
+    second._process([("w1", MarketType.HANDICAP_1, 1.5, 2.2)])
+
+    forks = ArbitrageEngine().find_forks(store, now=0.0)
+    assert len(forks) == 1
+    legs = {(leg.market, leg.line, leg.bookmaker) for leg in forks[0].legs}
+    assert legs == {
+        (MarketType.HANDICAP_1, -1.5, BookmakerName.FONBET),
+        (MarketType.HANDICAP_2, 1.5, BookmakerName.WINLINE),
+    }
+
+
+async def test_untrack_forgets_orientation(board):
+    manager, store, first, second = board
+    await second.track_event(make_event(BookmakerName.WINLINE, "w1", "Zenit", "Arsenal"))
+    await second.untrack_event("w1")
+    await second.watch("w1", "arsenal|zenit")
+    second._process([("w1", MarketType.WIN_1, 0.0, 2.0)])
+    assert (MarketType.WIN_1, 0.0) in store.event_markets("arsenal|zenit")
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from forkscan.core.odds import OddsStore, OddsTick
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from forkscan.infrastructure.archive.reader import OddsArchiveReader
+from forkscan.infrastructure.archive.segment import SegmentFile
+from forkscan.infrastructure.archive.writer import MANIFEST_NAME, OddsArchiveWriter
+from tests.fakes import FakeStreamParser, make_event
+
+START = 1_700_000_000.0
+EVENTS = ["football:alpha-omega", "football:beta-gamma", "hockey:delta-sigma"]
+
+
+def make_ticks(count: int, step: float = 1.0) -> list:
+    """Тики по кругу событий и букмекеров, по одному в step секунд."""
+    bookmakers = [BookmakerName.FONBET, BookmakerName.BETBOOM]
+    return [
+        OddsTick(
+            event=EVENTS[number % len(EVENTS)],
+            market=MarketType.TOTAL_OVER,
+            line=2.5,
+            bookmaker=bookmakers[number % 2],
+            price=1.5 + number / 1000,
+            ts=START + number * step,
+        )
+        for number in range(count)
+    ]
+
+
+def scanned(reader: OddsArchiveReader, **kwargs) -> list:
+    return [tick for batch in reader.scan(**kwargs) for tick in batch.ticks()]
+
+
+@pytest.fixture
+def read_blocks(monkeypatch):
+    """Номера распакованных блоков: проверка, что чтение не трогает лишние блоки."""
+    numbers = []
+    read_block = SegmentFile.read_block
+
+    def counting(self, number, *args, **kwargs):
+        numbers.append(number)
+        return read_block(self, number, *args, **kwargs)
+
+    monkeypatch.setattr(SegmentFile, "read_block", counting)
+    return numbers
+
+
+def test_written_ticks_are_scanned_back(tmp_path):
+    ticks = make_ticks(100)
+    with OddsArchiveWriter(tmp_path, block_rows=16) as writer:
+        # Порядок записи не важен: сегмент сортируется по времени
+        writer.extend(reversed(ticks))
+
+    reader = OddsArchiveReader(tmp_path)
+    assert scanned(reader) == ticks
+    assert reader.time_range() == (START, START + 99)
+    assert len(reader.segments()) == 1
+
+
+def test_seek_by_event_reads_only_its_blocks(tmp_path, read_blocks):
+    ticks = [tick for tick in make_ticks(60) if tick.event != EVENTS[2]]
+    # Редкое событие встречается только в одном блоке
+    rare = OddsTick(EVENTS[2], MarketType.WIN_1, 0.0, BookmakerName.FONBET, 3.1, START + 10.5)
+    with OddsArchiveWriter(tmp_path, block_rows=8) as writer:
+        writer.extend([*ticks, rare])
+
+    assert scanned(OddsArchiveReader(tmp_path), events=[EVENTS[2]]) == [rare]
+    assert len(read_blocks) == 1
+
+
+def test_scan_by_time_range_and_bookmaker(tmp_path, read_blocks):
+    ticks = make_ticks(100)
+    with OddsArchiveWriter(tmp_path, block_rows=10) as writer:
+        writer.extend(ticks)
+    reader = OddsArchiveReader(tmp_path)
+
+    # Полуинтервал [start, end): распаковываются только блоки с тиками диапазона
+    assert scanned(reader, start=START + 25, end=START + 45) == ticks[25:45]
+    assert read_blocks == [2, 3, 4]
+
+    betboom = scanned(reader, start=START + 25, end=START + 45, bookmakers=[BookmakerName.BETBOOM])
+    assert betboom == [tick for tick in ticks[25:45] if tick.bookmaker is BookmakerName.BETBOOM]
+    assert scanned(reader, events=[EVENTS[0]], start=START + 90) == [
+        tick for tick in ticks[90:] if tick.event == EVENTS[0]
+    ]
+
+
+def test_scan_across_segments(tmp_path):
+    ticks = make_ticks(50, step=10.0)
+    with OddsArchiveWriter(tmp_path, segment_span=100.0, block_rows=4) as writer:
+        writer.extend(ticks[:30])
+    # Новый писатель продолжает тот же архив
+    with OddsArchiveWriter(tmp_path, segment_span=100.0, block_rows=4) as writer:
+        writer.extend(ticks[30:])
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert len(manifest) == 5
+    assert len({segment["file"] for segment in manifest}) == 5
+
+    reader = OddsArchiveReader(tmp_path)
+    assert scanned(reader) == ticks
+    # Диапазон на стыке сегментов: отбрасываются сегменты вне его
+    assert len(reader.segments(START + 150, START + 250)) == 2
+    assert scanned(reader, start=START + 150, end=START + 250) == ticks[15:25]
+    assert scanned(reader, events=[EVENTS[1]], start=START + 250) == [
+        tick for tick in ticks[25:] if tick.event == EVENTS[1]
+    ]
+
+
+def test_empty_archive(tmp_path):
+    reader = OddsArchiveReader(tmp_path)
+    assert reader.time_range() is None
+    assert scanned(reader) == []
+
+
+async def test_streaming_parser_archives_every_update(tmp_path):
+    manager, store = EventManager(), OddsStore()
+    parser = FakeStreamParser(BookmakerName.BETBOOM, manager, store)
+    parser.archive = OddsArchiveWriter(tmp_path)
+    await parser.track_event(make_event(BookmakerName.BETBOOM, "b1", "Arsenal", "Zenit"))
+
+    parser._process([("b1", MarketType.WIN_1, 0.0, 1.9), ("b1", MarketType.WIN_1, 0.0, 2.0)])
+    parser._process([("unknown", MarketType.WIN_1, 0.0, 2.1)])
+    parser.archive.close()
+
+    archived = scanned(OddsArchiveReader(tmp_path))
+    assert [tick.price for tick in archived] == [1.9, 2.0]
+    assert archived[0].event == parser.active_events["b1"]
+    # Хранилище держит последнюю котировку, архив — всю историю
+    assert (
+        store.event_markets(archived[0].event)[(MarketType.WIN_1, 0.0)][BookmakerName.BETBOOM].price
+        == 2.0
+    )
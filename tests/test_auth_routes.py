@@ -0,0 +1,208 @@
+import asyncio
+
+import httpx
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import FastAPI
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from forkscan.api.deps import get_redis_client
+from forkscan.api.routes import promocode, user
+from forkscan.api.routes.auth import current_user
+from forkscan.api.routes.auth import router as auth_router
+from forkscan.api.routes.auth import utils
+from forkscan.api.security_system import BanCache, SecuritySystem, get_security_system
+from forkscan.core.config import settings
+from forkscan.infrastructure.database.base import Base
+from forkscan.infrastructure.database.models import RefreshToken, User
+from forkscan.infrastructure.database.session import get_db
+from forkscan.services.auth import create_refresh_token
+from forkscan.services.auth_cache import USER_INVALIDATION_CHANNEL
+from forkscan.services.passwords import PasswordHasher, make_context
+
+PASSWORD = "correct horse 1"
+
+
+@pytest.fixture
+async def sessionmaker():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def redis_client():
+    client = FakeRedis(server=FakeServer(), decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    hasher = PasswordHasher(make_context(4), workers=1)
+    monkeypatch.setattr(utils, "password_hasher", hasher)
+    yield hasher
+    hasher.close()
+
+
+@pytest.fixture
+async def client(monkeypatch, sessionmaker, redis_client, hasher):
+    monkeypatch.setattr(settings, "captcha_required", False)
+    security = SecuritySystem(redis_client, BanCache(0))
+
+    async def db():
+        async with sessionmaker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/auth")
+    app.include_router(promocode.router, prefix="/promocode")
+    app.include_router(user.router)
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_redis_client] = lambda: redis_client
+    app.dependency_overrides[get_security_system] = lambda: security
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await security.close()
+    await current_user.auth_cache.close()
+
+
+async def register(client, email: str = "user@example.com", **body) -> httpx.Response:
+    return await client.post(
+        "/auth/auth/register", json={"email": email, "password": PASSWORD, **body}
+    )
+
+
+async def login(client, email: str = "user@example.com", password: str = PASSWORD, **body):
+    return await client.post(
+        "/auth/auth/login", json={"email": email, "password": password, **body}
+    )
+
+
+async def access_token(client) -> str:
+    await register(client)
+    response = await login(client)
+    return response.json()["access_token"]
+
+
+async def change_promo_code(client, token: str, promo_code: str) -> httpx.Response:
+    return await client.patch(
+        "/users/change_promocode",
+        json={"new_promo_code": promo_code},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+async def test_register(client, sessionmaker):
+    response = await register(client)
+    assert response.status_code == 200
+    referrer = response.json()
+    assert referrer["email"] == "user@example.com" and referrer["referrer_id"] is None
+
+    assert (await register(client)).status_code == 400  # email занят
+    assert (await register(client, "other@example.com", promokode="nope")).status_code == 400
+    response = await register(client, "other@example.com", promokode=referrer["promo_code"])
+    assert response.json()["referrer_id"] == referrer["id"]
+
+    async with sessionmaker() as session:
+        stored = await session.scalar(select(User).where(User.email == "other@example.com"))
+    assert stored.hashed_password.startswith("$2b$04$")
+
+
+async def test_register_attempts_are_limited(client, monkeypatch):
+    monkeypatch.setattr(settings, "register_max_attempts", 2)
+    monkeypatch.setattr(settings, "register_min_attempts", 2)
+    for number in range(2):
+        assert (await register(client, f"user{number}@example.com")).status_code == 200
+    response = await register(client, "user2@example.com")
+    assert response.status_code == 429
+
+
+async def test_login(client, sessionmaker):
+    await register(client)
+    assert (await login(client, password="wrong horse 1")).status_code == 400
+    assert (await login(client, email="nobody@example.com")).status_code == 400
+
+    response = await login(client)
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert "refresh_token" in response.cookies
+    async with sessionmaker() as session:
+        assert await session.scalar(select(RefreshToken.user_id)) == 1
+
+
+async def test_login_rehashes_password_with_new_cost(client, sessionmaker, monkeypatch):
+    await register(client)
+    upgraded = PasswordHasher(make_context(5), workers=1)
+    monkeypatch.setattr(utils, "password_hasher", upgraded)
+    assert (await login(client)).status_code == 200
+    upgraded.close()
+    async with sessionmaker() as session:
+        stored = await session.scalar(select(User.hashed_password))
+    assert stored.startswith("$2b$05$")
+
+
+async def test_login_requires_captcha(client, monkeypatch):
+    monkeypatch.setattr(settings, "captcha_required", True)
+    await register(client)
+    response = await login(client)
+    assert response.status_code == 400
+    assert "CAPTCHA verification required" in response.json()["detail"]["message"]
+
+
+async def test_login_ban(client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_max_requests", 2)
+    monkeypatch.setattr(settings, "ban_threshold", 2)
+    await register(client)
+    for _ in range(2):
+        assert (await login(client, password="wrong horse 1")).status_code == 400
+    response = await login(client)
+    assert response.status_code == 429
+    assert "blocked" in response.json()["detail"]["message"]
+
+
+async def test_current_user_requires_access_token(client):
+    token = await access_token(client)
+    assert (await client.patch("/users/change_promocode", json={})).status_code == 401
+    assert (await change_promo_code(client, "not-a-token", "abcd")).status_code == 401
+    refresh_token, _, _ = create_refresh_token(1, "user@example.com")
+    assert (await change_promo_code(client, refresh_token, "abcd")).status_code == 401
+
+    response = await change_promo_code(client, token, "abcd")
+    assert response.status_code == 200
+    assert response.json()["promo_code"] == "abcd"
+    assert (await change_promo_code(client, token, "abcd")).status_code == 400  # занят
+
+
+async def test_deleted_user_gets_401(client, sessionmaker, redis_client):
+    cache = current_user.auth_cache
+    token = await access_token(client)
+    # Пользователь кешируется, пока слушается канал инвалидаций
+    cache.start(redis_client)
+    while not (await redis_client.pubsub_numsub(USER_INVALIDATION_CHANNEL))[0][1]:
+        await asyncio.sleep(0.01)
+    async with sessionmaker() as session:
+        assert await cache.user(session, 1) is not None
+
+    hits = cache.user_hits
+    # Удаление в обход API: снимок пользователя остаётся в кеше и проходит проверку токена
+    async with sessionmaker() as session:
+        await session.execute(delete(User))
+        await session.commit()
+    response = await client.patch(
+        "/promocode/promocode/change_promocode",
+        json={"new_promo_code": "abcd"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 401 and response.json()["detail"] == "User not found"
+    assert cache.user_hits == hits + 1
+
+    # Снимок удалён из кеша: дальше запрос отклоняет уже get_current_user
+    loads = cache.user_loads
+    assert (await change_promo_code(client, token, "abce")).status_code == 401
+    assert cache.user_loads == loads + 1
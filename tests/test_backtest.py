@@ -0,0 +1,156 @@
+import pytest
+
+from forkscan.core.odds import OddsTick
+from forkscan.core.types import BookmakerName, MarketType
+from forkscan.infrastructure.archive.writer import OddsArchiveWriter
+from forkscan.services.arbitrage import Fork, ForkLeg
+from forkscan.services.backtest import (
+    BacktestParams,
+    BacktestResult,
+    _ForkTracker,
+    run_backtest,
+    run_window,
+    split_range,
+)
+
+START = 1_700_000_000.0
+FONBET, BETBOOM = BookmakerName.FONBET, BookmakerName.BETBOOM
+
+
+def over(event: str, bookmaker: BookmakerName, price: float, at: float) -> OddsTick:
+    return OddsTick(event, MarketType.TOTAL_OVER, 2.5, bookmaker, price, START + at)
+
+
+def under(event: str, bookmaker: BookmakerName, price: float, at: float) -> OddsTick:
+    return OddsTick(event, MarketType.TOTAL_UNDER, 2.5, bookmaker, price, START + at)
+
+
+def write_archive(directory, ticks) -> None:
+    with OddsArchiveWriter(directory, block_rows=4) as writer:
+        writer.extend(ticks)
+
+
+def make_fork(event: str, profit: float) -> Fork:
+    legs = (
+        ForkLeg(MarketType.TOTAL_OVER, 2.5, FONBET, 2.1, 0.5, START),
+        ForkLeg(MarketType.TOTAL_UNDER, 2.5, BETBOOM, 2.1, 0.5, START),
+    )
+    return Fork(event=event, legs=legs, profit=profit, detected_at=START)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Две вилки: A живёт 10 с (1 -> 11), B — 2 с (20 -> 22)."""
+    write_archive(
+        tmp_path,
+        [
+            over("football:a", FONBET, 2.1, 0),
+            under("football:a", BETBOOM, 2.1, 1),
+            under("football:a", BETBOOM, 2.2, 3),
+            under("football:a", BETBOOM, 1.8, 11),
+            over("football:b", FONBET, 2.05, 19),
+            under("football:b", BETBOOM, 2.05, 20),
+            over("football:b", FONBET, 1.9, 22),
+        ],
+    )
+    return tmp_path
+
+
+def profit(*prices: float) -> float:
+    return (1 / sum(1 / price for price in prices) - 1) * 100
+
+
+def test_tracker_counts_lifetimes_and_best_profit():
+    result = BacktestResult()
+    tracker = _ForkTracker(result)
+    tracker.update_event("a", [make_fork("a", 2.0)], START, counting=True)
+    tracker.update_event("a", [make_fork("a", 4.0)], START + 3, counting=True)
+    tracker.update_event("a", [make_fork("a", 1.0)], START + 5, counting=True)
+    tracker.update_event("a", [], START + 20, counting=True)
+
+    assert (result.forks_opened, result.forks_closed, result.forks_censored) == (1, 1, 0)
+    assert result.total_lifetime == 20
+    assert result.theoretical_profit == 4.0
+    assert result.lifetime_histogram == [0, 0, 0, 1, 0, 0, 0, 0]
+    assert result.by_bookmakers == {frozenset({FONBET, BETBOOM}): 1}
+    assert tracker.open == {} and tracker.open_by_event == {}
+
+
+def test_tracker_ignores_warmup_forks_and_censors_open_ones():
+    result = BacktestResult()
+    tracker = _ForkTracker(result)
+    # Открыта в прогреве: её закрытие не учитывается
+    tracker.update_event("a", [make_fork("a", 2.0)], START, counting=False)
+    tracker.update_event("a", [], START + 5, counting=True)
+    tracker.update_event("b", [make_fork("b", 3.0)], START + 6, counting=True)
+    tracker.finish()
+
+    assert (result.forks_opened, result.forks_closed, result.forks_censored) == (1, 0, 1)
+    assert result.theoretical_profit == 3.0
+    assert result.total_lifetime == 0
+
+
+def test_window_opens_and_closes_forks(archive):
+    result = run_window(archive, START, START + 30, BacktestParams())
+
+    assert result.ticks == 7
+    assert (result.forks_opened, result.forks_closed, result.forks_censored) == (2, 2, 0)
+    assert result.total_lifetime == pytest.approx(12)
+    assert result.mean_lifetime == pytest.approx(6)
+    # 2 с попадает в корзину [1, 5), 10 с — в [5, 15)
+    assert result.lifetime_histogram == [0, 1, 1, 0, 0, 0, 0, 0]
+    assert result.theoretical_profit == pytest.approx(profit(2.1, 2.2) + profit(2.05, 2.05))
+
+
+def test_stale_quotes_close_fork_on_sweep(tmp_path):
+    write_archive(
+        tmp_path,
+        [
+            over("football:a", FONBET, 2.1, 0),
+            under("football:a", BETBOOM, 2.1, 1),
+            # Тик другого события перепроверяет открытую вилку: котировка 0 с старше 5 с
+            over("football:b", FONBET, 1.5, 8),
+        ],
+    )
+    result = run_window(tmp_path, START, START + 10, BacktestParams(max_staleness=5.0))
+
+    assert (result.forks_opened, result.forks_closed) == (1, 1)
+    assert result.total_lifetime == pytest.approx(7)
+
+
+def test_fork_spanning_window_boundary_is_counted_once(archive):
+    whole = run_backtest(archive, BacktestParams(), workers=1)
+    # Вилка A открыта в первом окне и закрыта в третьем
+    split = run_backtest(archive, BacktestParams(), chunk=5.0, workers=1)
+
+    assert whole.forks_opened == split.forks_opened == 2
+    assert (whole.forks_closed, whole.forks_censored) == (2, 0)
+    # Первое окно отдаёт A как незакрытую, следующие видят её в прогреве и не считают
+    assert (split.forks_closed, split.forks_censored) == (1, 1)
+    assert split.ticks == whole.ticks == 7
+    assert split.theoretical_profit == pytest.approx(whole.theoretical_profit)
+    assert split.total_lifetime == pytest.approx(2)
+
+
+def test_process_pool_matches_single_process(tmp_path):
+    ticks = []
+    for number in range(200):
+        event = f"football:event-{number % 7}"
+        bookmaker = (FONBET, BETBOOM)[number % 2]
+        # Цены ходят по кругу, вилки то появляются, то пропадают
+        price = 1.8 + (number * 37 % 11) / 20
+        ticks.append((over if number % 3 else under)(event, bookmaker, price, number * 0.5))
+    write_archive(tmp_path, ticks)
+    params = BacktestParams(max_staleness=20.0)
+
+    single = run_backtest(tmp_path, params, chunk=10.0, workers=1)
+    pooled = run_backtest(tmp_path, params, chunk=10.0, workers=2)
+
+    assert single.forks_opened > 0 and single.forks_closed > 0
+    assert pooled == single
+
+
+def test_empty_archive_and_split_range(tmp_path):
+    assert run_backtest(tmp_path, BacktestParams()) == BacktestResult()
+    assert split_range(0.0, 25.0, 10.0) == [(0.0, 10.0), (10.0, 20.0), (20.0, 25.0)]
+    assert split_range(5.0, 5.0, 10.0) == []
@@ -0,0 +1,72 @@
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from forkscan.parsers.betboom import BetboomParser, translate_outcome
+from forkscan.parsers.betboomtest.market_betstats_ws_pb2 import MainResponse, Outcome
+from forkscan.services.arbitrage import ArbitrageEngine
+from tests.fakes import FakeStreamParser, make_event
+
+
+def handicap_frame(match_id: int, home: tuple, away: tuple) -> bytes:
+    """Фрейм рынка 16 (фора): home/away — (hcp из specifier, коэффициент)."""
+    response = MainResponse()
+    for outcome_id, (hcp, odds) in ((1714, home), (1715, away)):
+        response.betstats_changed.outcomes.append(
+            Outcome(
+                match_id=match_id,
+                market_id=16,
+                outcome_id=outcome_id,
+                specifier=f"hcp={hcp}",
+                odds=odds,
+            )
+        )
+    return response.SerializeToString()
+
+
+def test_away_handicap_line_is_negated():
+    home = translate_outcome(
+        Outcome(match_id=1, market_id=16, outcome_id=1714, specifier="hcp=-1.5", odds=2.0)
+    )
+    away = translate_outcome(
+        Outcome(match_id=1, market_id=16, outcome_id=1715, specifier="hcp=-1.5", odds=1.8)
+    )
+    assert home == (1, MarketType.HANDICAP_1, -1.5, 2.0)
+    assert away == (1, MarketType.HANDICAP_2, 1.5, 1.8)
+    zero = translate_outcome(
+        Outcome(match_id=1, market_id=16, outcome_id=1715, specifier="hcp=0", odds=1.9)
+    )
+    assert str(zero[2]) == "0.0"
+
+
+async def test_betboom_handicap_pairs_with_other_bookmaker():
+    manager, store = EventManager(), OddsStore()
+    betboom = BetboomParser(manager, store)
+    fonbet = FakeStreamParser(BookmakerName.FONBET, manager, store)
+    await betboom.track_event(make_event(BookmakerName.BETBOOM, "77", "Arsenal", "Zenit"))
+    await fonbet.track_event(make_event(BookmakerName.FONBET, "f1", "Arsenal", "Zenit"))
+
+    # Betboom: Arsenal -1.5 и Zenit +1.5 (hcp=-1.5 для обоих исходов); Fonbet: Arsenal -1.5
+    betboom._process(handicap_frame(77, (-1.5, 1.6), (-1.5, 2.3)))
+    fonbet._process([("f1", MarketType.HANDICAP_1, -1.5, 2.1)])
+
+    forks = ArbitrageEngine().find_forks(store, now=0.0)
+    assert len(forks) == 1
+    legs = {(leg.market, leg.line, leg.bookmaker) for leg in forks[0].legs}
+    assert legs == {
+        (MarketType.HANDICAP_1, -1.5, BookmakerName.FONBET),
+        (MarketType.HANDICAP_2, 1.5, BookmakerName.BETBOOM),
+    }
+
+
+async def test_betboom_same_side_handicap_is_not_a_fork():
+    manager, store = EventManager(), OddsStore()
+    betboom = BetboomParser(manager, store)
+    fonbet = FakeStreamParser(BookmakerName.FONBET, manager, store)
+    await betboom.track_event(make_event(BookmakerName.BETBOOM, "77", "Arsenal", "Zenit"))
+    await fonbet.track_event(make_event(BookmakerName.FONBET, "f1", "Arsenal", "Zenit"))
+
+    # hcp=+1.5: Arsenal +1.5 и Zenit -1.5. С сырой линией H2(+1.5) Zenit -1.5 встал бы
+    # в пару к Arsenal -1.5 у Fonbet — обе ставки проигрывают при ничьей
+    betboom._process(handicap_frame(77, (1.5, 1.2), (1.5, 2.3)))
+    fonbet._process([("f1", MarketType.HANDICAP_1, -1.5, 2.1)])
+
+    assert ArbitrageEngine().find_forks(store, now=0.0) == []
@@ -0,0 +1,138 @@
+import asyncio
+from typing import List
+
+import pytest
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from forkscan.parsers.betboom import BetboomParser
+from forkscan.parsers.betboomtest.market_betstats_ws_pb2 import (
+    MainRequest,
+    MainResponse,
+    Outcome,
+    SubscribeResponse,
+)
+from tests.fakes import make_event
+
+
+class StandInServer:
+    """Сервер Betboom: подтверждает подписку и сразу шлёт П1 матча."""
+
+    def __init__(self):
+        self.connections: List[ServerConnection] = []
+        self.requests: List[tuple] = []  # (номер соединения, тип, match_id или uid)
+        self.url = ""
+
+    async def handler(self, ws: ServerConnection) -> None:
+        number = len(self.connections)
+        self.connections.append(ws)
+        try:
+            async for raw in ws:
+                await self.respond(ws, number, raw)
+        except ConnectionClosed:
+            pass  # клиент остановлен или оборвал соединение
+
+    async def respond(self, ws: ServerConnection, number: int, raw: bytes) -> None:
+        request = MainRequest.FromString(raw)
+        kind = request.WhichOneof("type")
+        if kind == "subscribe_match_market":
+            subscribe = request.subscribe_match_market
+            self.requests.append((number, kind, subscribe.match_id))
+            await ws.send(self.ack(subscribe.uid))
+            await ws.send(self.win_1(subscribe.match_id, 1.5 + subscribe.match_id / 100))
+        elif kind == "unsubscribe":
+            self.requests.append((number, kind, request.unsubscribe.uid))
+
+    @staticmethod
+    def ack(uid: str) -> bytes:
+        response = MainResponse(subscribe_match_market=SubscribeResponse(code=0, uid=uid))
+        return response.SerializeToString()
+
+    @staticmethod
+    def win_1(match_id: int, odds: float) -> bytes:
+        outcome = Outcome(match_id=match_id, market_id=1, outcome_id=1, odds=odds)
+        return MainResponse(betstats_outcome_changed=outcome).SerializeToString()
+
+    def subscribed(self, connection: int) -> List[int]:
+        return [
+            match_id
+            for number, kind, match_id in self.requests
+            if number == connection and kind == "subscribe_match_market"
+        ]
+
+
+@pytest.fixture
+async def server():
+    stand_in = StandInServer()
+    async with serve(stand_in.handler, "127.0.0.1", 0, subprotocols=["protobuf"]) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        stand_in.url = f"ws://127.0.0.1:{port}"
+        yield stand_in
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def parser(server):
+    betboom = BetboomParser(
+        EventManager(), OddsStore(), url=server.url, connections=2, backoff_initial=0.01
+    )
+    await betboom.start()
+    yield betboom
+    await betboom.stop()
+
+
+async def track(parser: BetboomParser, *match_ids: int) -> None:
+    for match_id in match_ids:
+        await parser.track_event(
+            make_event(
+                BookmakerName.BETBOOM, str(match_id), f"Alpha {match_id}", f"Omega {match_id}"
+            )
+        )
+
+
+async def test_subscriptions_are_spread_over_connections(server, parser):
+    await wait_for(lambda: len(server.connections) == 2)
+    await track(parser, 11, 12, 13, 14)
+
+    await wait_for(lambda: parser.updates == 4)
+    assert sorted(server.subscribed(0) + server.subscribed(1)) == [11, 12, 13, 14]
+    assert len(server.subscribed(0)) == len(server.subscribed(1)) == 2
+    # Коэффициенты всех матчей дошли до хранилища
+    for event in parser.active_events.values():
+        quotes = parser.store.event_markets(event)[(MarketType.WIN_1, 0.0)]
+        assert BookmakerName.BETBOOM in quotes
+
+
+async def test_reconnect_resubscribes(server, parser):
+    await wait_for(lambda: len(server.connections) == 2)
+    await track(parser, 21, 22)
+    await wait_for(lambda: parser.updates == 2)
+    dropped = next(n for n in range(2) if server.subscribed(n))
+    lost = server.subscribed(dropped)
+
+    await server.connections[dropped].close()
+
+    # Новое соединение получает те же подписки, что были на оборванном
+    await wait_for(lambda: len(server.connections) == 3 and server.subscribed(2) == lost)
+    await wait_for(lambda: parser.updates == 2 + len(lost))
+    assert sum(connection.reconnects for connection in parser._connections) == 1
+
+
+async def test_untrack_unsubscribes(server, parser):
+    await wait_for(lambda: len(server.connections) == 2)
+    await track(parser, 31)
+    await wait_for(lambda: parser.updates == 1)
+    event = parser.active_events["31"]
+
+    await parser.untrack_event("31")
+
+    await wait_for(lambda: any(kind == "unsubscribe" for _, kind, _ in server.requests))
+    assert (MarketType.WIN_1, 0.0) not in parser.store.event_markets(event)
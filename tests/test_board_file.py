@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventKey, EventManager, MarketType, event_id
+from forkscan.infrastructure.board.file import BoardCheckpointer, BoardFile, write_board_file
+from forkscan.infrastructure.board.layout import encode_board
+from tests.fakes import make_event
+
+
+def build_board():
+    manager, store = EventManager(), OddsStore()
+    for number, bookmaker in enumerate((BookmakerName.FONBET, BookmakerName.WINLINE)):
+        manager.add_event(make_event(bookmaker, str(number), "Alpha", "Omega"))
+        store.update(
+            event_id(EventKey.create("Alpha", "Omega")),
+            MarketType.WIN_1,
+            0.0,
+            bookmaker,
+            2.0 + number,
+            time.time(),
+        )
+    manager.add_event(make_event(BookmakerName.FONBET, "7", "Beta", "Gamma"))
+    manager.publish()
+    return manager, store
+
+
+def test_board_file_lookups_match_manager(tmp_path):
+    manager, store = build_board()
+    path = tmp_path / "board.snapshot"
+    write_board_file(path, encode_board(manager, store, manager.snapshot()))
+
+    key = EventKey.create("Alpha", "Omega")
+    with BoardFile(path) as board:
+        assert len(board) == 3
+        same_events = board.get_same_events(key)
+        assert set(same_events) == {BookmakerName.FONBET, BookmakerName.WINLINE}
+        assert same_events == manager.get_same_events(same_events[BookmakerName.FONBET])
+        assert board.event_markets(event_id(key)) == store.event_markets(event_id(key))
+        assert board.get_same_events(EventKey.create("Nobody", "Else")) == {}
+
+
+async def test_checkpoint_publishes_on_loop_thread(tmp_path):
+    manager, store = build_board()
+    threads = []
+    manager.add_listener(lambda board, changed: threads.append(threading.current_thread()))
+    manager.add_event(make_event(BookmakerName.WINLINE, "8", "Beta", "Gamma"))
+
+    checkpointer = BoardCheckpointer(manager, store, tmp_path / "board.snapshot")
+    assert await checkpointer.checkpoint() > 0
+
+    # Неопубликованное событие попало в снимок, а слушатель вызван в цикле событий
+    assert threads == [threading.current_thread()]
+    with BoardFile(checkpointer.path) as board:
+        assert board.version == manager.snapshot().version
+        assert len(board) == 4
+
+
+async def test_restore_round_trip(tmp_path):
+    manager, store = build_board()
+    path = tmp_path / "board.snapshot"
+    await BoardCheckpointer(manager, store, path).checkpoint()
+
+    restored_manager, restored_store = EventManager(), OddsStore()
+    threads = []
+    restored_manager.add_listener(lambda board, changed: threads.append(threading.current_thread()))
+    checkpointer = BoardCheckpointer(restored_manager, restored_store, path)
+    assert await checkpointer.restore() == 3
+
+    assert restored_manager.get_all_events() == manager.get_all_events()
+    assert dict(restored_manager.snapshot().get_all_events()) == manager.get_all_events()
+    event = event_id(EventKey.create("Alpha", "Omega"))
+    assert restored_store.event_markets(event) == store.event_markets(event)
+    assert threads == [threading.current_thread()]
+
+
+async def test_restore_without_snapshot(tmp_path):
+    checkpointer = BoardCheckpointer(EventManager(), None, tmp_path / "missing.snapshot")
+    assert await checkpointer.restore() == 0
+
+
+async def test_restore_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "board.snapshot"
+    path.write_bytes(b"not a board snapshot, just some bytes" * 4)
+    manager = EventManager()
+    assert await BoardCheckpointer(manager, None, path).restore() == 0
+    assert manager.get_all_events() == {}
+
+
+async def test_stop_writes_last_checkpoint(tmp_path):
+    manager, store = build_board()
+    checkpointer = BoardCheckpointer(manager, store, tmp_path / "board.snapshot", interval=3600)
+    checkpointer.start()
+    await asyncio.sleep(0)
+    assert not checkpointer.path.exists()
+    await checkpointer.stop()
+    with BoardFile(checkpointer.path) as board:
+        assert len(board) == 3
@@ -0,0 +1,66 @@
+import asyncio
+from typing import List
+
+from forkscan.core.odds import OddsTick
+from forkscan.core.types import BookmakerName, MarketType
+from forkscan.services.coalescing import UpdateCoalescer
+
+
+def tick(price: float, ts: float, market: MarketType = MarketType.WIN_1) -> OddsTick:
+    return OddsTick("arsenal|zenit", market, 0.0, BookmakerName.BETBOOM, price, ts)
+
+
+class Consumer:
+    def __init__(self, fail_first: bool = False):
+        self.batches: List[List[OddsTick]] = []
+        self.fail_first = fail_first
+
+    async def __call__(self, batch: List[OddsTick]) -> None:
+        self.batches.append(batch)
+        if self.fail_first and len(self.batches) == 1:
+            raise RuntimeError("consumer failed")
+
+
+async def test_window_keeps_latest_tick_per_outcome():
+    consumer = Consumer()
+    coalescer = UpdateCoalescer(consumer, window=60)
+    coalescer.submit(tick(1.8, ts=1.0))
+    coalescer.submit(tick(1.9, ts=2.0))
+    coalescer.submit(tick(1.7, ts=1.5))  # пришёл позже, но старше уже принятого
+    coalescer.submit(tick(2.2, ts=1.0, market=MarketType.WIN_2))
+    await coalescer.stop()
+
+    assert [(t.market, t.price) for t in consumer.batches[0]] == [
+        (MarketType.WIN_1, 1.9),
+        (MarketType.WIN_2, 2.2),
+    ]
+    assert coalescer.stats()["merged"] == 2
+
+
+async def test_backpressure_waits_for_the_consumer():
+    consumer = Consumer()
+    coalescer = UpdateCoalescer(consumer, window=0.01, max_pending=2)
+    coalescer.submit(tick(1.8, ts=1.0))
+    coalescer.submit(tick(2.2, ts=1.0, market=MarketType.WIN_2))
+
+    waiting = asyncio.create_task(coalescer.wait_for_capacity())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    coalescer.start()
+    await asyncio.wait_for(waiting, 1)
+    await coalescer.stop()
+    assert coalescer.backpressure_waits == 1
+    assert len(consumer.batches[0]) == 2
+
+
+async def test_consumer_error_does_not_stop_forwarding():
+    consumer = Consumer(fail_first=True)
+    coalescer = UpdateCoalescer(consumer, window=0.01)
+    coalescer.start()
+    coalescer.submit(tick(1.8, ts=1.0))
+    await asyncio.sleep(0.05)
+    coalescer.submit(tick(1.9, ts=2.0))
+    await asyncio.sleep(0.05)
+    await coalescer.stop()
+    assert [batch[0].price for batch in consumer.batches] == [1.8, 1.9]
@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+
+from forkscan.core.config import Settings
+from forkscan.core.types import BookmakerName
+from forkscan.parsers.registry import ParserRegistry
+
+
+def test_enabled_bookmakers_by_name():
+    configured = Settings(enabled_bookmakers=["betboom", " FONBET"])
+    assert configured.enabled_bookmakers == [BookmakerName.BETBOOM, BookmakerName.FONBET]
+
+
+def test_enabled_bookmakers_rejects_typos():
+    with pytest.raises(ValidationError, match="Unknown bookmaker 'FONBETT'"):
+        Settings(enabled_bookmakers=["FONBETT"])
+
+
+def test_enabled_bookmakers_from_environment(monkeypatch):
+    monkeypatch.setenv("enabled_bookmakers", '["winline", "fonbet"]')
+    assert Settings().enabled_bookmakers == [BookmakerName.WINLINE, BookmakerName.FONBET]
+
+
+def test_registry_uses_configured_bookmakers(monkeypatch):
+    from forkscan.core import config
+
+    monkeypatch.setattr(config, "settings", Settings(enabled_bookmakers=["fonbet", "winline"]))
+    registry = ParserRegistry.from_settings()
+    assert registry.enabled == {BookmakerName.FONBET, BookmakerName.WINLINE}
+    assert set(registry.enabled_parsers()) == {BookmakerName.FONBET}
+
+
+def test_scanner_group_defaults_to_enabled_bookmakers():
+    assert Settings(enabled_bookmakers=["winline", "fonbet"]).scanner_group_name == "FONBET+WINLINE"
+    settings = Settings(scanner_group="main", enabled_bookmakers=["fonbet"])
+    assert settings.scanner_group_name == "main"
@@ -0,0 +1,96 @@
+import random
+from datetime import UTC, datetime, timedelta
+from typing import Dict, List
+
+import pytest
+
+from forkscan.core.sport_types import SportEvent
+from forkscan.core.types import BookmakerName, EventKey, EventManager, EventStatus, SportType
+
+
+def make_board(events: int, now: datetime, seed: int) -> EventManager:
+    rng = random.Random(seed)
+    manager = EventManager()
+    for number in range(events):
+        manager.add_event(
+            SportEvent.create(
+                bookmaker=rng.choice(list(BookmakerName)),
+                bookmaker_id=str(number),
+                start_time=int(
+                    (now + timedelta(minutes=rng.randint(-120, 7 * 24 * 60))).timestamp()
+                ),
+                tournament_name=f"League {number % 500}",
+                team1=f"team{number}a",
+                team2=f"team{number}b",
+                sport_type=rng.choice(list(SportType)),
+                status=rng.choice(["prematch", "prematch", "prematch", "live"]),
+            )
+        )
+    return manager
+
+
+def scan(manager: EventManager, filters: Dict) -> List[EventKey]:
+    """Отбор query полным перебором: эталон для индексов."""
+    result = []
+    for key, bookmaker_events in manager.get_all_events().items():
+        for event in bookmaker_events.values():
+            if (
+                ("sport" not in filters or event.sport_type == filters["sport"])
+                and ("status" not in filters or event.status == filters["status"])
+                and ("league" not in filters or event.league.lower() == filters["league"])
+                and ("start_from" not in filters or event.start_time >= filters["start_from"])
+                and ("start_to" not in filters or event.start_time < filters["start_to"])
+            ):
+                result.append(key)
+                break
+    return result
+
+
+@pytest.fixture(scope="module")
+def now():
+    return datetime.now(UTC)
+
+
+@pytest.fixture(scope="module")
+def board(now):
+    return make_board(3_000, now, seed=1)
+
+
+def test_query_matches_full_scan(board, now):
+    cases = {
+        "live football, next 2h": dict(
+            sport=SportType.FOOTBALL, status=EventStatus.LIVE, start_to=now + timedelta(hours=2)
+        ),
+        "league": dict(league="league 42"),
+        "tennis, next 24h": dict(
+            sport=SportType.TENNIS, start_from=now, start_to=now + timedelta(hours=24)
+        ),
+        "prematch hockey": dict(sport=SportType.HOCKEY, status=EventStatus.PREMATCH),
+    }
+    for name, filters in cases.items():
+        assert set(board.query(**filters)) == set(scan(board, filters)), name
+
+
+def test_query_is_ordered_by_start_time(board, now):
+    result = board.query(sport=SportType.TENNIS, start_from=now)
+    starts = [min(e.start_time for e in events.values()) for events in result.values()]
+    assert starts == sorted(starts)
+
+
+def test_removed_events_leave_the_indexes(now):
+    manager = make_board(200, now, seed=2)
+    league = dict(league="league 7")
+    (key,) = manager.query(**league)
+    (event,) = manager.query(**league)[key].values()
+
+    manager.remove_event_by_id(event.bookmaker, event.bookmaker_id)
+
+    assert manager.query(**league) == {}
+    assert scan(manager, league) == []
+
+
+def test_start_window_excludes_its_end(now):
+    manager = make_board(500, now, seed=3)
+    window = dict(start_from=now, start_to=now + timedelta(hours=6))
+    for events in manager.query(**window).values():
+        assert any(now <= e.start_time < now + timedelta(hours=6) for e in events.values())
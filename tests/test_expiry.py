@@ -0,0 +1,104 @@
+import math
+import time
+
+from forkscan.core.expiry import TimerWheel
+from forkscan.core.types import BookmakerName, EventManager
+from tests.fakes import make_event
+
+FONBET, WINLINE = BookmakerName.FONBET, BookmakerName.WINLINE
+
+
+def test_wheel_fires_at_deadline_not_before():
+    wheel = TimerWheel(resolution=1.0, slots=8, start=100.0)
+    wheel.schedule("a", 102.5)
+    wheel.schedule("b", 104.0)
+    assert wheel.deadline("a") == 102.5 and len(wheel) == 2
+
+    assert wheel.advance(102.9) == []
+    assert wheel.advance(103.0) == ["a"]
+    assert "a" not in wheel and wheel.deadline("a") is None
+    assert wheel.advance(104.0) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_wheel_reschedule_and_cancel():
+    wheel = TimerWheel(resolution=1.0, slots=8, start=0.0)
+    wheel.schedule("a", 2.0)
+    wheel.schedule("b", 2.0)
+    wheel.schedule("a", 5.0)  # продлён
+    wheel.schedule("b", 1.0)  # сокращён
+    wheel.schedule("c", 3.0)
+    wheel.cancel("c")
+    wheel.cancel("missing")
+
+    assert wheel.advance(1.0) == ["b"]
+    assert wheel.advance(4.0) == []
+    assert wheel.advance(5.0) == ["a"]
+
+
+def test_wheel_past_deadline_fires_on_next_advance():
+    wheel = TimerWheel(resolution=1.0, slots=8, start=10.0)
+    wheel.schedule("late", 3.0)
+    assert wheel.advance(10.5) == []  # тот же тик
+    assert wheel.advance(11.0) == ["late"]
+
+
+def test_wheel_moves_far_deadlines_from_overflow():
+    wheel = TimerWheel(resolution=1.0, slots=4, start=0.0)
+    wheel.schedule("far", 10.0)
+    wheel.schedule("moved", 20.0)
+    wheel.schedule("moved", 12.0)  # устаревшая запись в куче пропускается
+    wheel.schedule("near", 2.0)
+
+    assert wheel.advance(2.0) == ["near"]
+    assert wheel.advance(9.0) == []
+    assert wheel.advance(10.0) == ["far"]
+    assert wheel.advance(25.0) == ["moved"]
+    assert len(wheel) == 0
+
+
+def test_wheel_jump_over_many_slots_expires_everything_due():
+    wheel = TimerWheel(resolution=1.0, slots=4, start=0.0)
+    for number in range(10):
+        wheel.schedule(number, 1.0 + number)
+    wheel.schedule("later", 100.0)
+
+    assert sorted(wheel.advance(50.0)) == list(range(10))
+    assert wheel.advance(99.0) == []
+    assert wheel.advance(100.0) == ["later"]
+
+
+def test_expire_events_removes_only_unconfirmed_events():
+    manager = EventManager(expiry_grace=60.0)
+    manager.add_event(make_event(FONBET, "1", "Alpha", "Omega"))
+    manager.add_event(make_event(WINLINE, "2", "Alpha", "Omega"), grace=120.0)
+    manager.add_event(make_event(WINLINE, "3", "Beta", "Gamma"), grace=math.inf)
+    now = time.time()
+
+    assert manager.expire_events(now + 30) == []
+    expired = manager.expire_events(now + 61)
+
+    assert [(event.bookmaker, event.bookmaker_id) for event in expired] == [(FONBET, "1")]
+    assert manager.get_event_by_id(FONBET, "1") is None
+    assert manager.get_event_by_id(WINLINE, "2") is not None
+    assert [event.bookmaker_id for event in manager.expire_events(now + 121)] == ["2"]
+    # Срок без истечения: событие удаляется только по времени начала
+    assert manager.get_event_by_id(WINLINE, "3") is not None
+    assert manager.expiry_deadline(WINLINE, "3") == (
+        manager.get_event_by_id(WINLINE, "3").start_time.timestamp() + manager.max_event_duration
+    )
+
+
+def test_extend_events_keeps_unchanged_events_alive():
+    manager = EventManager(expiry_grace=60.0)
+    manager.add_event(make_event(FONBET, "1", "Alpha", "Omega"))
+    manager.add_event(make_event(FONBET, "2", "Beta", "Gamma"))
+    now = time.time()
+
+    assert manager.extend_events(FONBET, ["1", "missing"], now=now + 50) == 1
+    assert manager.expiry_deadline(FONBET, "1") == now + 110
+    expired = manager.expire_events(now + 61)
+
+    assert [event.bookmaker_id for event in expired] == ["2"]
+    assert manager.get_event_by_id(FONBET, "1") is not None
+    assert manager.expire_events(now + 111)[0].bookmaker_id == "1"
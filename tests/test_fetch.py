@@ -0,0 +1,245 @@
+import asyncio
+import gzip
+import json
+import time
+import zlib
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from forkscan.core.types import BookmakerName, EventManager
+from forkscan.parsers.fetch import CircuitState, FeedFetcher, MirrorPool
+from forkscan.parsers.fonbet import FonbetParser
+from tests.test_fonbet import fonbet_response
+
+
+class Mirror:
+    """Зеркало фида: отдаёт body с ETag или падает с 500, пока down."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.down = False
+        self.requests = 0
+        self.url = ""
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.down:
+            return web.Response(status=500)
+        etag = f'"{hash(self.body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(body=self.body, headers={"ETag": etag})
+
+
+@pytest.fixture
+async def mirrors():
+    body = json.dumps(fonbet_response([])).encode()
+    started, runners = [], []
+    for _ in range(2):
+        mirror = Mirror(body)
+        app = web.Application()
+        app.router.add_get("/feed", mirror.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        mirror.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/feed"
+        started.append(mirror)
+        runners.append(runner)
+    yield started
+    for runner in runners:
+        await runner.cleanup()
+
+
+@pytest.fixture
+async def serve():
+    """Запускает стенд с одним обработчиком /feed и возвращает его URL."""
+    runners = []
+
+    async def start(handler) -> str:
+        app = web.Application()
+        app.router.add_get("/feed", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        runners.append(runner)
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/feed"
+
+    yield start
+    for runner in runners:
+        await runner.cleanup()
+
+
+@pytest.fixture
+async def fetcher():
+    feed_fetcher = FeedFetcher()
+    yield feed_fetcher
+    await feed_fetcher.close()
+
+
+async def test_conditional_requests_skip_unchanged_feed(mirrors, fetcher):
+    first = await fetcher.fetch(mirrors[0].url)
+    second = await fetcher.fetch(mirrors[0].url)
+    assert first.changed and first.body == mirrors[0].body
+    assert second.status == 304 and not second.changed
+    assert fetcher.stats.not_modified == 1
+
+
+async def test_failing_mirror_opens_and_traffic_moves(mirrors, fetcher):
+    primary, backup = mirrors
+    pool = MirrorPool([primary.url, backup.url], failure_threshold=1)
+    primary.down = True
+
+    for _ in range(3):
+        result = await fetcher.fetch_mirrored(pool)
+    assert result.status in (200, 304)
+
+    hosts = {host.url: host for host in pool.hosts}
+    assert hosts[primary.url].state is CircuitState.OPEN
+    assert [host.url for host in pool.candidates()] == [backup.url]
+    # После размыкания основное зеркало больше не опрашивается
+    assert primary.requests == 1
+    assert backup.requests == 3
+
+
+async def test_probe_closes_recovered_mirror(mirrors, fetcher):
+    primary, backup = mirrors
+    pool = MirrorPool([primary.url, backup.url], failure_threshold=1, reset_timeout=0)
+    primary.down = True
+    await fetcher.fetch_mirrored(pool)
+    assert pool.hosts[0].state is CircuitState.OPEN
+
+    await pool.probe_due(fetcher)
+    assert pool.hosts[0].state is CircuitState.OPEN  # всё ещё лежит
+
+    primary.down = False
+    await pool.probe_due(fetcher)
+    assert pool.hosts[0].state is CircuitState.CLOSED
+
+
+async def test_all_mirrors_down_raises(mirrors, fetcher):
+    for mirror in mirrors:
+        mirror.down = True
+    pool = MirrorPool([mirror.url for mirror in mirrors])
+    with pytest.raises(aiohttp.ClientResponseError):
+        await fetcher.fetch_mirrored(pool)
+
+
+async def test_fonbet_polls_through_backup_mirror(mirrors, fetcher):
+    primary, backup = mirrors
+    primary.down = True
+    parser = FonbetParser(EventManager(), url=primary.url, mirrors=[backup.url])
+
+    assert await parser.parse_async(fetcher)
+    assert parser.active_events == {"100"}
+    # Тело не изменилось: разбор пропускается
+    assert not await parser.parse_async(fetcher)
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [("gzip", gzip.compress), ("deflate", zlib.compress), ("deflate", raw_deflate)],
+    ids=["gzip", "deflate", "raw-deflate"],
+)
+async def test_compressed_body_is_decoded(serve, fetcher, encoding, compress):
+    body = json.dumps(fonbet_response([])).encode() * 20
+    wire = compress(body)
+    accepted = []
+
+    async def handle(request: web.Request) -> web.Response:
+        accepted.append(request.headers["Accept-Encoding"])
+        return web.Response(body=wire, headers={"Content-Encoding": encoding})
+
+    result = await fetcher.fetch(await serve(handle))
+    assert result.changed and result.body == body
+    assert "gzip" in accepted[0] and "deflate" in accepted[0]
+    # Учитываются байты, реально пришедшие по сети
+    assert result.wire_bytes == len(wire) < len(body)
+    assert fetcher.stats.full_wire_bytes == len(wire)
+    assert fetcher.stats.decoded_bytes == len(body)
+
+
+async def test_same_body_without_validators_is_unchanged(serve, fetcher):
+    body = json.dumps(fonbet_response([])).encode()
+    requests = []
+
+    async def handle(request: web.Request) -> web.Response:
+        # Ни ETag, ни Last-Modified: 304 невозможен, остаётся сравнение хеша тела
+        requests.append(request.headers.get("If-None-Match"))
+        return web.Response(body=body)
+
+    url = await serve(handle)
+    parser = FonbetParser(EventManager(), url=url)
+    assert await parser.parse_async(fetcher)
+    assert not await parser.parse_async(fetcher)
+
+    assert requests == [None, None]
+    assert fetcher.stats.unchanged == 1 and fetcher.stats.not_modified == 0
+    # Второй ответ 200 не разбирается повторно
+    assert fetcher.stats.parses == 1
+    result = await fetcher.fetch(url, key=parser.mirrors.key)
+    assert (result.status, result.changed, result.body) == (200, False, None)
+
+
+async def test_hanging_mirror_times_out_and_fails_over(serve, mirrors):
+    backup = mirrors[0]
+    released = asyncio.Event()
+    hung = []
+
+    async def hang(request: web.Request) -> web.Response:
+        # Зеркало принимает соединение, но не отвечает
+        hung.append(request.path)
+        await released.wait()
+        return web.Response(status=500)
+
+    hanging = await serve(hang)
+    fetcher = FeedFetcher(timeout=0.2)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await fetcher.fetch(hanging)
+
+        pool = MirrorPool([hanging, backup.url], failure_threshold=1)
+        started = time.monotonic()
+        result = await fetcher.fetch_mirrored(pool)
+        assert result.status == 200 and result.body == backup.body
+        assert 0.2 <= time.monotonic() - started < 1.0
+
+        host = pool.hosts[0]
+        assert host.state is CircuitState.OPEN
+        # Время до таймаута входит в задержку зеркала
+        assert host.failures == 1 and host.latency >= 0.2
+        assert [candidate.url for candidate in pool.candidates()] == [backup.url]
+
+        for _ in range(3):
+            await fetcher.fetch_mirrored(pool)
+        assert len(hung) == 2
+        assert backup.requests == 4
+    finally:
+        released.set()
+        await fetcher.close()
+
+
+async def test_unchanged_fonbet_polls_extend_event_expiry(mirrors, fetcher):
+    manager = EventManager(expiry_grace=60.0)
+    parser = FonbetParser(manager, url=mirrors[0].url)
+    assert await parser.parse_async(fetcher)
+    first_deadline = manager.expiry_deadline(BookmakerName.FONBET, "100")
+
+    # 304 через секунду (шаг колеса сроков): линия не разбирается заново,
+    # но события по-прежнему в ней
+    await asyncio.sleep(1.1)
+    assert not await parser.parse_async(fetcher)
+    assert fetcher.stats.not_modified == 1
+    assert manager.expiry_deadline(BookmakerName.FONBET, "100") >= first_deadline + 1.1
+
+    # Другой парсер истекает события общего менеджера после первого срока
+    assert manager.expire_events(first_deadline + 1.0) == []
+    assert manager.get_event_by_id(BookmakerName.FONBET, "100") is not None
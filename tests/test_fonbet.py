@@ -0,0 +1,67 @@
+import logging
+import time
+
+from forkscan.core.types import EventManager
+from forkscan.parsers.fonbet import FonbetParser
+
+
+def fonbet_response(custom_factors: list) -> dict:
+    start = int(time.time()) + 3600
+    return {
+        "sports": [
+            {"id": 1, "kind": "sport", "alias": "football"},
+            {"id": 2, "kind": "sport", "alias": "curling"},
+            {"id": 10, "kind": "segment", "parentId": 1, "name": "Premier League"},
+            {"id": 20, "kind": "segment", "parentId": 2, "name": "Curling Cup"},
+        ],
+        "events": [
+            {
+                "id": 100,
+                "sportId": 10,
+                "level": 1,
+                "kind": 1,
+                "place": "line",
+                "startTime": start,
+                "team1": "Arsenal",
+                "team2": "Zenit",
+            },
+            {
+                "id": 200,
+                "sportId": 20,
+                "level": 1,
+                "kind": 1,
+                "place": "line",
+                "startTime": start,
+                "team1": "Canada",
+                "team2": "Sweden",
+            },
+        ],
+        "customFactors": custom_factors,
+    }
+
+
+def test_custom_factors_are_processed(caplog):
+    parser = FonbetParser(EventManager())
+    response = fonbet_response(
+        [
+            {"e": 100, "factors": [{"f": 921, "v": 2.1}, {"f": 99999, "v": 1.5}]},
+            {"e": 200, "factors": [{"f": 88888, "v": 1.9}]},
+        ]
+    )
+
+    with caplog.at_level(logging.DEBUG, logger="forkscan.parsers.fonbet"):
+        parser._process_data(*parser._unpack_response(response))
+
+    assert parser.active_events == {"100"}
+    assert len(parser.manager.get_all_events()) == 1
+    unknown = [record.getMessage() for record in caplog.records]
+    assert "[football] Unknown factor_id for event 100: 99999" in unknown
+    # Неподдерживаемый вид спорта не логируется
+    assert not any("88888" in message for message in unknown)
+
+
+def test_custom_factors_are_not_printed(capsys):
+    parser = FonbetParser(EventManager())
+    response = fonbet_response([{"e": 100, "factors": [{"f": 99999, "v": 1.5}]}])
+    parser._process_data(*parser._unpack_response(response))
+    assert capsys.readouterr().out == ""
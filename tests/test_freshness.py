@@ -0,0 +1,103 @@
+import time
+
+from forkscan.core.freshness import FreshnessTracker
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, MarketType, SportType
+from forkscan.services.arbitrage import ArbitrageEngine
+from forkscan.services.lanes import Lane
+from tests.test_lanes import board_with_win_quotes, lane_arbitrage
+
+FONBET, BETBOOM, WINLINE = BookmakerName.FONBET, BookmakerName.BETBOOM, BookmakerName.WINLINE
+EVENT = "alpha|omega"
+
+
+def test_event_from_last_cycle_is_confirmed_by_every_feed_response():
+    tracker = FreshnessTracker()
+    tracker.begin_cycle(FONBET, ts=100.0)
+    tracker.confirm_event(EVENT, FONBET, ts=101.0)
+    tracker.confirm_event("beta|gamma", FONBET, ts=90.0)  # пропало из последнего цикла
+    tracker.confirm_bookmaker(FONBET, ts=102.0)
+
+    # 304 / то же тело: фид жив, данные цикла не изменились
+    tracker.confirm_bookmaker(FONBET, ts=130.0)
+    assert tracker.last_confirmed(FONBET) == 130.0
+    assert tracker.last_confirmed(FONBET, EVENT) == 130.0
+    assert tracker.last_confirmed(FONBET, "beta|gamma") == 90.0
+    assert tracker.event_confirmed(EVENT, FONBET) == 101.0
+    assert tracker.age(FONBET, EVENT, now=135.0) == 5.0
+    assert tracker.age(WINLINE, EVENT) is None
+
+
+def test_event_without_feed_confirmation_keeps_its_own_time():
+    tracker = FreshnessTracker()
+    tracker.confirm_event(EVENT, BETBOOM, ts=50.0)
+    assert tracker.last_confirmed(BETBOOM, EVENT) == 50.0
+    assert tracker.is_fresh(BETBOOM, 10.0, EVENT, now=60.0)
+    assert not tracker.is_fresh(BETBOOM, 10.0, EVENT, now=60.5)
+    assert not tracker.is_fresh(WINLINE, 10.0, EVENT, now=60.0)
+
+
+def test_fresh_and_stale_bookmakers_and_lag():
+    tracker = FreshnessTracker()
+    tracker.confirm_event(EVENT, FONBET, ts=100.0)
+    tracker.confirm_event(EVENT, BETBOOM, ts=70.0)
+    tracker.confirm_bookmaker(FONBET, ts=100.0)
+    tracker.confirm_bookmaker(BETBOOM, ts=70.0)
+
+    assert tracker.fresh_bookmakers(EVENT, 20.0, now=105.0) == {FONBET}
+    assert tracker.fresh_bookmakers(EVENT, 40.0, now=105.0) == {FONBET, BETBOOM}
+    assert tracker.stale_bookmakers(20.0, now=105.0) == {BETBOOM}
+    assert tracker.lag(now=105.0) == {FONBET: 5.0, BETBOOM: 35.0}
+
+    tracker.forget(EVENT, BETBOOM)
+    assert tracker.fresh_bookmakers(EVENT, 40.0, now=105.0) == {FONBET}
+    tracker.forget(EVENT, FONBET)
+    assert tracker.event_confirmed(EVENT, FONBET) is None
+
+
+def test_feeds_round_trip_through_restore():
+    tracker = FreshnessTracker()
+    tracker.begin_cycle(FONBET, ts=10.0)
+    tracker.confirm_bookmaker(FONBET, ts=12.0)
+    tracker.confirm_bookmaker(BETBOOM, ts=11.0)
+
+    restored = FreshnessTracker()
+    for bookmaker, (confirmed, cycle) in tracker.feeds().items():
+        restored.restore_feed(bookmaker, confirmed, cycle)
+    assert restored.feeds() == {FONBET: (12.0, 10.0), BETBOOM: (11.0, None)}
+
+
+def test_engine_drops_bookmakers_with_stale_data():
+    store = OddsStore()
+    store.update(EVENT, MarketType.TOTAL_OVER, 2.5, FONBET, 2.1, 100.0)
+    store.update(EVENT, MarketType.TOTAL_UNDER, 2.5, BETBOOM, 2.1, 100.0)
+    store.update(EVENT, MarketType.TOTAL_UNDER, 2.5, WINLINE, 2.3, 100.0)
+    tracker = FreshnessTracker()
+    for bookmaker in (FONBET, BETBOOM):
+        tracker.confirm_event(EVENT, bookmaker, ts=100.0)
+        tracker.confirm_bookmaker(bookmaker, ts=100.0)
+    tracker.confirm_event(EVENT, WINLINE, ts=90.0)
+    engine = ArbitrageEngine(freshness=tracker, max_data_age=5.0)
+
+    # Лучший коэффициент Winline не подтверждался 14 с: вилка строится без него
+    forks = engine.find_event_forks(store, EVENT, now=104.0)
+    assert [leg.bookmaker for leg in forks[0].legs] == [FONBET, BETBOOM]
+    tracker.confirm_event(EVENT, WINLINE, ts=103.0)
+    forks = engine.find_event_forks(store, EVENT, now=104.0)
+    assert [leg.bookmaker for leg in forks[0].legs] == [FONBET, WINLINE]
+
+    # Свежие данные остались у одного букмекера: вилок нет
+    tracker.confirm_event(EVENT, WINLINE, ts=118.0)
+    assert tracker.fresh_bookmakers(EVENT, 5.0, now=120.0) == {WINLINE}
+    assert engine.find_event_forks(store, EVENT, now=120.0) == []
+
+
+async def test_lane_pass_skips_forks_with_stale_bookmaker():
+    manager, store = await board_with_win_quotes(SportType.TENNIS)
+    arbitrage, found = lane_arbitrage(manager, store)
+    assert len(await arbitrage.run_pass(Lane.PREMATCH)) == 1
+
+    # Winline не подтверждал событие дольше prematch_max_data_age
+    manager.freshness.confirm_event(EVENT, WINLINE, ts=time.time() - 3600)
+    assert await arbitrage.run_pass(Lane.PREMATCH) == []
+    assert len(found) == 1
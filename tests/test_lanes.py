@@ -0,0 +1,114 @@
+import asyncio
+from typing import List, Tuple
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType, SportType
+from forkscan.scanner import Scanner
+from forkscan.services.arbitrage import Fork
+from forkscan.services.lanes import Lane, LaneArbitrage, LaneScheduler
+from tests.fakes import FakeStreamParser, make_event
+
+
+async def board_with_win_quotes(sport_type: SportType):
+    """Два букмекера: П1 2.1 у одного, П2 2.1 у другого, ничьей в котировках нет."""
+    manager, store = EventManager(), OddsStore()
+    first = FakeStreamParser(BookmakerName.FONBET, manager, store)
+    second = FakeStreamParser(BookmakerName.WINLINE, manager, store)
+    await first.track_event(make_event(BookmakerName.FONBET, "f1", "Alpha", "Omega", sport_type))
+    await second.track_event(make_event(BookmakerName.WINLINE, "w1", "Alpha", "Omega", sport_type))
+    manager.publish()
+    first._process([("f1", MarketType.WIN_1, 0.0, 2.1)])
+    second._process([("w1", MarketType.WIN_2, 0.0, 2.1)])
+    return manager, store
+
+
+def lane_arbitrage(manager, store, **kwargs) -> Tuple[LaneArbitrage, List[Fork]]:
+    found: List[Fork] = []
+    arbitrage = LaneArbitrage.from_settings(
+        manager, store, LaneScheduler(), lambda lane, forks: found.extend(forks), **kwargs
+    )
+    return arbitrage, found
+
+
+async def test_two_way_sports_are_detected_per_pass():
+    manager, store = await board_with_win_quotes(SportType.TENNIS)
+    arbitrage, found = lane_arbitrage(manager, store)
+    forks = await arbitrage.run_pass(Lane.PREMATCH)
+    assert [fork.event for fork in forks] == ["alpha|omega"]
+    assert found == forks
+
+
+async def test_win_1_win_2_is_not_a_fork_where_draws_happen():
+    manager, store = await board_with_win_quotes(SportType.FOOTBALL)
+    arbitrage, _ = lane_arbitrage(manager, store)
+    assert await arbitrage.run_pass(Lane.PREMATCH) == []
+
+
+async def test_explicit_two_way_events_reach_the_engines():
+    manager, store = await board_with_win_quotes(SportType.FOOTBALL)
+    arbitrage, _ = lane_arbitrage(manager, store, two_way_events=frozenset({"alpha|omega"}))
+    assert len(await arbitrage.run_pass(Lane.PREMATCH)) == 1
+
+
+class PollingParser:
+    """Опрашиваемый парсер: каждый опрос выставляет котировки теннисного матча."""
+
+    def __init__(self, parser: FakeStreamParser):
+        self.parser = parser
+        self.polls = 0
+
+    async def parse_async(self, fetcher) -> bool:
+        self.polls += 1
+        self.parser._process([("f1", MarketType.WIN_1, 0.0, 2.1)])
+        return True
+
+
+async def test_scanner_runs_polls_lanes_and_notifications():
+    manager, store = await board_with_win_quotes(SportType.TENNIS)
+    poller = PollingParser(FakeStreamParser(BookmakerName.FONBET, manager, store))
+    await poller.parser.track_event(
+        make_event(BookmakerName.FONBET, "f1", "Alpha", "Omega", SportType.TENNIS)
+    )
+    sent: List[Tuple[Lane, Fork]] = []
+
+    async def send(lane: Lane, fork: Fork) -> None:
+        sent.append((lane, fork))
+
+    scanner = Scanner(manager, store, {BookmakerName.FONBET: poller}, send, poll_interval=0.01)
+    await scanner.start()
+    try:
+        for _ in range(200):
+            if sent and poller.polls > 1:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await scanner.stop()
+
+    assert poller.polls > 1
+    assert [(lane, fork.event) for lane, fork in sent] == [(Lane.PREMATCH, "alpha|omega")]
+
+
+async def test_live_job_runs_first_when_both_lanes_are_due():
+    scheduler = LaneScheduler()
+    order: List[str] = []
+
+    def job(name: str):
+        async def run() -> None:
+            order.append(f"{name} start")
+            await asyncio.sleep(0.02)
+            order.append(f"{name} end")
+
+        return run
+
+    # Прематч зарегистрирован первым, но ждёт, пока live-проход не закончится
+    scheduler.add_job(Lane.PREMATCH, "prematch", job("prematch"), 60)
+    scheduler.add_job(Lane.LIVE, "live", job("live"), 60)
+    scheduler.start()
+    for _ in range(100):
+        if len(order) == 4:
+            break
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert order == ["live start", "live end", "prematch start", "prematch end"]
+    assert scheduler.metrics[Lane.PREMATCH].deferred == 1
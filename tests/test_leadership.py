@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.services.leadership import LeaderElector, LeaderLease, LeaseLostError
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def lease(server, owner: str, ttl: float = 5.0) -> LeaderLease:
+    return LeaderLease(FakeRedis(server=server), "test", owner=owner, ttl=ttl)
+
+
+async def test_only_one_instance_holds_the_lease(server):
+    first, second = lease(server, "first"), lease(server, "second")
+    assert await first.acquire()
+    assert not await second.acquire()
+    assert first.is_leader and not second.is_leader
+    assert await first.renew()
+
+    await first.release()
+    assert not first.is_leader
+    assert await second.acquire()
+    assert second.token > 1
+
+
+async def test_renew_fails_after_lease_expired_and_taken(server):
+    first, second = lease(server, "first"), lease(server, "second")
+    await first.acquire()
+    await first.redis.delete(first.key)  # TTL истёк
+    assert await second.acquire()
+
+    assert not await first.renew()
+    assert first.token is None and not first.is_leader
+    # Бывший лидер не может отдать чужую аренду
+    await first.release()
+    assert second.is_leader and await second.renew()
+
+
+async def test_stale_leader_writes_are_fenced(server):
+    first, second = lease(server, "first"), lease(server, "second")
+    await first.acquire()
+    assert await first.xadd("writes", {b"token": first.token}, 100)
+    await first.redis.delete(first.key)
+    await second.acquire()
+
+    with pytest.raises(LeaseLostError):
+        await first.xadd("writes", {b"token": first.token}, 100)
+    with pytest.raises(LeaseLostError):
+        await first.hset("state", {b"owner": b"first"})
+    assert first.token is None
+
+    await second.xadd("writes", {b"token": second.token}, 100)
+    await second.hset("state", {b"owner": b"second"})
+    entries = await second.redis.xrange("writes")
+    assert [int(fields[b"token"]) for _, fields in entries] == [1, 2]
+    assert await second.redis.hget("state", "owner") == b"second"
+
+
+async def stop(*tasks: asyncio.Task) -> None:
+    # В Python < 3.12 asyncio.wait_for внутри redis-py может потерять отмену,
+    # пришедшую одновременно с ответом: отменяем до завершения
+    for task in tasks:
+        while not task.done():
+            task.cancel()
+            await asyncio.wait([task], timeout=0.5)
+
+
+async def wait_for(condition, timeout: float = 3.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_standby_takes_over_after_leader_crash(server):
+    terms = []
+
+    def make_elector(owner: str) -> LeaderElector:
+        async def lead(token: int) -> None:
+            terms.append((owner, token))
+            await asyncio.Event().wait()
+
+        return LeaderElector(lease(server, owner, ttl=0.3), lead, retry_interval=0.02)
+
+    first, second = make_elector("first"), make_elector("second")
+    first_task = asyncio.create_task(first.run())
+    await wait_for(lambda: first.is_leader)
+    second_task = asyncio.create_task(second.run())
+
+    # Падение: процесс исчезает, не отдав аренду; её освобождает только TTL
+    first.lease._lose()
+    await stop(first_task)
+    await wait_for(lambda: second.is_leader)
+
+    assert terms == [("first", 1), ("second", 2)]
+    await stop(second_task)
+
+
+async def test_stopped_leader_releases_the_lease(server):
+    leader = LeaderElector(lease(server, "first"), lambda token: asyncio.Event().wait())
+    task = asyncio.create_task(leader.run())
+    await wait_for(lambda: leader.is_leader)
+    await stop(task)
+
+    # Без ожидания TTL
+    assert await lease(server, "second").acquire()
+
+
+async def test_failed_leader_work_gives_up_the_lease(server):
+    calls = 0
+
+    async def lead(token: int) -> None:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("parser crashed")
+
+    elector = LeaderElector(lease(server, "first"), lead, renew_interval=0.01, retry_interval=0.01)
+    task = asyncio.create_task(elector.run())
+    await wait_for(lambda: calls >= 2)
+    await stop(task)
+    assert elector.terms >= 2
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from forkscan.api.routes.auth import utils
+from forkscan.core.config import settings
+from forkscan.services.passwords import HasherOverloadedError, PasswordHasher, make_context
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(make_context(4), workers=1, max_queue=1)
+    yield hasher
+    hasher.close()
+
+
+async def test_hash_and_verify(hasher):
+    hashed = await hasher.hash("correct horse")
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("correct horse", hashed)
+    assert not await hasher.verify("wrong horse", hashed)
+    assert hasher.completed == 3 and hasher.pending == 0
+
+
+async def test_hash_with_other_cost_is_upgraded(hasher):
+    current = await hasher.hash("correct horse")
+    assert await hasher.verify_and_update("correct horse", current) == (True, None)
+
+    old = make_context(5).hash("correct horse")
+    verified, new_hash = await hasher.verify_and_update("correct horse", old)
+    assert verified and new_hash.startswith("$2b$04$")
+    assert await hasher.verify("correct horse", new_hash)
+    assert await hasher.verify_and_update("wrong horse", old) == (False, None)
+    assert hasher.rehashed == 1
+
+
+async def test_full_queue_is_rejected(hasher):
+    release = threading.Event()
+    # Поток и место в очереди заняты
+    busy = [asyncio.create_task(hasher._run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert hasher.pending == 2
+
+    with pytest.raises(HasherOverloadedError):
+        await hasher.hash("correct horse")
+    assert hasher.rejected == 1
+
+    release.set()
+    await asyncio.gather(*busy)
+    assert hasher.pending == 0
+    assert await hasher.hash("correct horse")
+
+
+async def test_loop_runs_while_hashing(hasher):
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    slow = PasswordHasher(make_context(10), workers=1)
+    ticker = asyncio.create_task(tick())
+    await slow.hash("correct horse")
+    ticker.cancel()
+    slow.close()
+    # bcrypt считается в потоке: цикл событий всё это время обслуживает другие задачи
+    assert ticks > 10
+
+
+async def test_overloaded_hasher_answers_503(monkeypatch):
+    hasher = PasswordHasher(make_context(4), workers=1, max_queue=0)
+    monkeypatch.setattr(utils, "password_hasher", hasher)
+    release = threading.Event()
+    busy = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await utils.hash_password("correct horse")
+    assert error.value.status_code == 503 and error.value.headers == {"Retry-After": "1"}
+    with pytest.raises(HTTPException):
+        await utils.verify_password("correct horse", "$2b$04$")
+    release.set()
+    await busy
+    hasher.close()
+
+
+def test_ban_time_follows_login_guard_settings():
+    assert utils.get_ban_time(settings.ban_threshold - 1) == 0
+    assert utils.get_ban_time(settings.ban_threshold) == settings.initial_ban_time
+    assert utils.get_ban_time(settings.rate_limit_max_requests) == settings.max_ban_time
+    # Первая регистрация сверх лимита банится на 10 минут
+    first_banned = settings.register_min_attempts + 1
+    assert utils.get_ban_time_interval(first_banned, settings.register_min_attempts) == 600
@@ -0,0 +1,127 @@
+import json
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.api.rate_limit import RateLimitMiddleware
+from forkscan.core.config import RateLimitRule
+
+GROUPS = {
+    "default": RateLimitRule(prefixes=[""], capacity=100, refill_rate=100),
+    "auth": RateLimitRule(prefixes=["/auth"], capacity=3, refill_rate=0.01),
+    "register": RateLimitRule(prefixes=["/auth/auth/register"], capacity=1, refill_rate=0.01),
+}
+
+
+class Response:
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.headers: dict = {}
+        self.body = b""
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = dict(message["headers"])
+        else:
+            self.body += message["body"]
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def request(handler, path: str, client: str = "10.0.0.1", **scope) -> Response:
+    response = Response()
+    await handler(
+        {"type": "http", "path": path, "client": (client, 40000), **scope}, None, response.send
+    )
+    return response
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def middleware(server, **kwargs) -> RateLimitMiddleware:
+    return RateLimitMiddleware(
+        endpoint, GROUPS, redis_client=FakeRedis(server=server), enabled=True, **kwargs
+    )
+
+
+async def statuses(app, path: str, count: int, client: str = "10.0.0.1") -> List[int]:
+    return [(await request(app, path, client)).status for _ in range(count)]
+
+
+def test_longest_prefix_wins():
+    limiter = RateLimitMiddleware(endpoint, GROUPS, enabled=True)
+    assert limiter.match("/auth/auth/register")[0] == "register"
+    assert limiter.match("/auth/login")[0] == "auth"
+    assert limiter.match("/events")[0] == "default"
+    assert RateLimitMiddleware(endpoint, {"auth": GROUPS["auth"]}).match("/events") is None
+
+
+async def test_over_limit_gets_429_with_retry_after(server):
+    limiter = middleware(server)
+    assert await statuses(limiter, "/auth/login", 3) == [200, 200, 200]
+
+    response = await request(limiter, "/auth/login")
+    assert response.status == 429
+    assert json.loads(response.body) == {"detail": "Too many requests"}
+    # Токен пополняется за 100 секунд
+    assert 1 <= int(response.headers[b"retry-after"]) <= 100
+    # Другие клиенты и другие группы считаются отдельно
+    assert (await request(limiter, "/auth/login", "10.0.0.2")).status == 200
+    assert (await request(limiter, "/events")).status == 200
+
+
+async def test_empty_local_bucket_rejects_without_redis(server):
+    limiter = middleware(server)
+    await statuses(limiter, "/auth/login", 4)
+    assert limiter.rejected_locally == 1 and limiter.rejected == 0
+    # Локальная копия не обгоняет общее ведро: в нём тоже не осталось токена
+    assert float(await limiter.redis.hget("rate_limit:auth:10.0.0.1", "tokens")) < 1
+
+
+async def test_workers_share_the_bucket(server):
+    workers = [middleware(server), middleware(server)]
+    codes = [(await request(workers[n % 2], "/auth/login")).status for n in range(8)]
+    assert codes.count(200) == 3
+    # Воркер, которому ответил Redis, дальше отказывает сам до Retry-After
+    assert sum(worker.rejected for worker in workers) == 2
+    assert sum(worker.rejected_locally for worker in workers) == 3
+
+
+async def test_redis_failure_lets_requests_through(server):
+    server.connected = False
+    limiter = middleware(server)
+    assert await statuses(limiter, "/auth/login", 3) == [200, 200, 200]
+    # Локальное ведро по-прежнему останавливает поток одного воркера
+    assert (await request(limiter, "/auth/login")).status == 429
+
+
+async def test_redis_of_the_application_is_used(server):
+    limiter = RateLimitMiddleware(endpoint, GROUPS, enabled=True)
+    app = SimpleNamespace(state=SimpleNamespace(redis=FakeRedis(server=server)))
+    for _ in range(3):
+        await request(limiter, "/auth/login", app=app)
+    assert await app.state.redis.exists("rate_limit:auth:10.0.0.1")
+
+
+async def test_passthrough(server):
+    disabled = RateLimitMiddleware(endpoint, GROUPS, redis_client=FakeRedis(server=server))
+    disabled.enabled = False
+    assert await statuses(disabled, "/auth/login", 5) == [200] * 5
+
+    unmatched = RateLimitMiddleware(endpoint, {"auth": GROUPS["auth"]}, enabled=True)
+    assert await statuses(unmatched, "/events", 5) == [200] * 5
+    assert unmatched.checked == 0
+
+    limiter = middleware(server)
+    await limiter({"type": "lifespan"}, None, Response().send)
+    assert limiter.checked == 0
@@ -0,0 +1,43 @@
+import sys
+
+import pytest
+
+import forkscan.parsers
+from forkscan.core.types import BookmakerName
+from forkscan.parsers import registry as registry_module
+from forkscan.parsers.registry import ParserRegistry
+
+
+@pytest.fixture
+def lazy_specs(monkeypatch):
+    specs = {
+        BookmakerName.FONBET: "forkscan.parsers.fonbet:FonbetParser",
+        BookmakerName.LEON: "tests.missing_parser_module:LeonParser",
+    }
+    monkeypatch.setattr(registry_module, "BUILTIN_PARSERS", specs)
+    monkeypatch.setattr(ParserRegistry, "_discover", staticmethod(lambda: {}))
+
+
+def test_modules_are_imported_on_first_use(lazy_specs, monkeypatch):
+    # Модуль мог импортировать другой тест; после теста monkeypatch вернёт прежний
+    monkeypatch.delitem(sys.modules, "forkscan.parsers.fonbet", raising=False)
+    monkeypatch.delattr(forkscan.parsers, "fonbet", raising=False)
+
+    registry = ParserRegistry([BookmakerName.FONBET])
+    # Модуль парсера не импортируется, пока к нему не обратились
+    assert registry.spec(BookmakerName.LEON) == "tests.missing_parser_module:LeonParser"
+    assert registry.available() == {BookmakerName.FONBET, BookmakerName.LEON}
+    assert "forkscan.parsers.fonbet" not in sys.modules
+    with pytest.raises(ModuleNotFoundError):
+        registry.get(BookmakerName.LEON)
+
+    parser_class = registry.get(BookmakerName.FONBET)
+    assert parser_class is sys.modules["forkscan.parsers.fonbet"].FonbetParser
+    assert registry.enabled_parsers() == {BookmakerName.FONBET: parser_class}
+
+
+def test_enabled_without_parser_is_skipped(lazy_specs):
+    registry = ParserRegistry([BookmakerName.WINLINE, BookmakerName.FONBET])
+    assert set(registry.enabled_parsers()) == {BookmakerName.FONBET}
+    with pytest.raises(KeyError):
+        registry.get(BookmakerName.WINLINE)
@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosedOK
+
+from forkscan.infrastructure.replay.recorder import FeedRecorder
+from forkscan.infrastructure.replay.replayer import FeedReplayer
+from forkscan.infrastructure.replay.segments import RecordKind, iter_records, list_segments
+from forkscan.parsers.fetch import FeedFetcher
+
+WS_URL = "wss://ws.example.com/api/tree_ws/v1"
+
+
+class Clock:
+    """Часы рекордера: метки времени записей задаёт тест."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+async def origin():
+    """Исходный фид: каждый ответ — следующая версия линии с ETag."""
+    versions = [b'{"version": 1}', b'{"version": 2}']
+    served = []
+
+    async def handle(request: web.Request) -> web.Response:
+        body = versions[min(len(served), len(versions) - 1)]
+        served.append(body)
+        return web.Response(body=body, content_type="application/json", headers={"ETag": "v"})
+
+    app = web.Application()
+    app.router.add_get("/events/list", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/events/list?lang=ru"
+    await runner.cleanup()
+
+
+async def record_http(directory, origin: str, gap: float) -> None:
+    """Записывает два опроса фида через FeedFetcher с паузой gap в записанном времени."""
+    clock = Clock()
+    with FeedRecorder(directory, clock=clock) as recorder:
+        fetcher = FeedFetcher(recorder=recorder)
+        await fetcher.fetch(origin)
+        clock.now += gap
+        fetcher.reset(origin)
+        await fetcher.fetch(origin)
+        await fetcher.close()
+
+
+def record_ws(directory, gap: float) -> None:
+    clock = Clock()
+    with FeedRecorder(directory, clock=clock) as recorder:
+        recorder.record_ws(WS_URL, b"subscribe", outgoing=True)
+        for number, frame in enumerate([b"\x01", b"\x02", "text", b"\x04"]):
+            clock.now += gap if number else 0.0
+            recorder.record_ws(WS_URL, frame)
+
+
+async def get(session: aiohttp.ClientSession, url: str) -> tuple:
+    async with session.get(url) as response:
+        return response.status, response.headers.get("ETag"), await response.read()
+
+
+async def receive_all(url: str) -> tuple:
+    """Подписывается и читает фреймы до закрытия; возвращает фреймы и время чтения."""
+    frames = []
+    async with connect(url, subprotocols=["protobuf"]) as ws:
+        started = time.perf_counter()
+        await ws.send(b"subscribe")
+        try:
+            while True:
+                frames.append(await ws.recv())
+        except ConnectionClosedOK:
+            pass
+    return frames, time.perf_counter() - started
+
+
+def test_recorder_rotates_and_reads_back(tmp_path):
+    with FeedRecorder(tmp_path, segment_max_records=2) as recorder:
+        for number in range(5):
+            recorder.record_ws(WS_URL, bytes([number]))
+    assert [path.name for path in list_segments(tmp_path)] == [
+        "000000.seg.gz",
+        "000001.seg.gz",
+        "000002.seg.gz",
+    ]
+    assert [record.payload for record in iter_records(tmp_path)] == [bytes([n]) for n in range(5)]
+
+
+def test_recorder_does_not_reuse_deleted_segment_names(tmp_path):
+    with FeedRecorder(tmp_path, segment_max_records=1) as recorder:
+        for number in range(3):
+            recorder.record_ws(WS_URL, bytes([number]))
+    # Самый старый сегмент удалён по ротации: сегментов два, но 000002 занят
+    list_segments(tmp_path)[0].unlink()
+
+    with FeedRecorder(tmp_path) as recorder:
+        recorder.record_ws(WS_URL, b"\x03")
+    assert [path.name for path in list_segments(tmp_path)] == [
+        "000001.seg.gz",
+        "000002.seg.gz",
+        "000003.seg.gz",
+    ]
+    assert [record.payload for record in iter_records(tmp_path)] == [b"\x01", b"\x02", b"\x03"]
+
+
+async def test_http_replay_as_fast_as_possible(tmp_path, origin):
+    await record_http(tmp_path, origin, gap=60.0)
+    records = list(iter_records(tmp_path, RecordKind.HTTP))
+    assert [record.meta["headers"]["etag"] for record in records] == ["v", "v"]
+
+    async with FeedReplayer(tmp_path, speed=None) as replayer:
+        async with aiohttp.ClientSession() as session:
+            url = replayer.http_url(origin)
+            responses = [await get(session, url) for _ in range(3)]
+            missing = await get(session, replayer.http_url("https://line.example.com/other"))
+    # Каждый запрос получает следующий записанный ответ, после последнего — снова его
+    assert responses == [
+        (200, "v", b'{"version": 1}'),
+        (200, "v", b'{"version": 2}'),
+        (200, "v", b'{"version": 2}'),
+    ]
+    assert missing[0] == 404
+    assert replayer.http_requests == 3
+
+
+async def test_http_replay_in_real_time(tmp_path, origin):
+    await record_http(tmp_path, origin, gap=0.3)
+
+    async with FeedReplayer(tmp_path, speed=1.0) as replayer:
+        async with aiohttp.ClientSession() as session:
+            url = replayer.http_url(origin)
+            # Ответ определяется записанным временем, а не числом запросов
+            first = [(await get(session, url))[2] for _ in range(2)]
+            await asyncio.sleep(0.4)
+            second = (await get(session, url))[2]
+    assert first == [b'{"version": 1}', b'{"version": 1}']
+    assert second == b'{"version": 2}'
+
+
+async def test_ws_replay_as_fast_as_possible(tmp_path):
+    record_ws(tmp_path, gap=0.2)
+
+    async with FeedReplayer(tmp_path, speed=None) as replayer:
+        frames, elapsed = await receive_all(replayer.ws_url(WS_URL))
+    # Исходящая подписка не воспроизводится, текстовый фрейм остаётся текстом
+    assert frames == [b"\x01", b"\x02", "text", b"\x04"]
+    assert replayer.ws_frames_sent == 4
+    assert elapsed < 0.3
+
+
+async def test_ws_replay_in_real_time(tmp_path):
+    record_ws(tmp_path, gap=0.2)
+
+    async with FeedReplayer(tmp_path, speed=1.0) as replayer:
+        frames, elapsed = await receive_all(replayer.ws_url(WS_URL))
+    assert frames == [b"\x01", b"\x02", "text", b"\x04"]
+    # Последний фрейм записан через 0.6 с после первого
+    assert elapsed >= 0.5
@@ -0,0 +1,159 @@
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.core.config import settings
+from forkscan.core.types import BookmakerName, EventKey, EventManager, event_id
+from forkscan.services.arbitrage import Fork
+from forkscan.services.lanes import Lane
+from forkscan.services.leadership import LeaderLease
+from forkscan.services.replication import BoardPublisher, BoardReplica
+from tests.fakes import make_event
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def events_of(board):
+    return {key: dict(value) for key, value in board.events.items()}
+
+
+def add(manager: EventManager, bookmaker_id: str, team1: str, team2: str, bookmaker=None):
+    manager.add_event(make_event(bookmaker or BookmakerName.FONBET, bookmaker_id, team1, team2))
+
+
+async def test_replica_follows_publisher(server):
+    manager = EventManager()
+    add(manager, "1", "Alpha", "Omega")
+    manager.publish()
+    publisher = BoardPublisher(FakeRedis(server=server), manager)
+    await publisher.publish_once()
+
+    replica = BoardReplica(FakeRedis(server=server), block=10)
+    assert await replica.load_snapshot()
+    assert events_of(replica.board) == events_of(manager.snapshot())
+
+    add(manager, "2", "Beta", "Gamma")
+    manager.publish()
+    manager.remove_event_by_id(BookmakerName.FONBET, "1")
+    manager.publish()
+    await publisher.publish_once()
+    assert await replica.poll() == 1
+
+    assert replica.board.version == manager.snapshot().version
+    assert events_of(replica.board) == events_of(manager.snapshot())
+
+
+async def test_replica_builds_one_version_per_read(server):
+    manager = EventManager()
+    publisher = BoardPublisher(FakeRedis(server=server), manager)
+    await publisher.publish_once()
+    replica = BoardReplica(FakeRedis(server=server), block=10)
+    await replica.load_snapshot()
+    before = replica.board
+
+    for number in range(5):
+        add(manager, str(number), f"team{number}a", f"team{number}b")
+        manager.publish()
+        await publisher.publish_once()
+    assert await replica.poll() == 5
+
+    # Дельты применены на месте, прежняя версия не изменилась
+    assert len(before) == 0 and before.version == 0
+    assert replica.board.version == 5 and len(replica.board) == 5
+    assert replica.board.events is not before.events
+
+
+async def test_replica_reloads_snapshot_after_scanner_restart(server):
+    manager = EventManager()
+    add(manager, "1", "Alpha", "Omega")
+    manager.publish()
+    await BoardPublisher(FakeRedis(server=server), manager).publish_once()
+    replica = BoardReplica(FakeRedis(server=server), block=10)
+    await replica.load_snapshot()
+
+    # Новый запуск сканера: новая эпоха и версии с начала
+    restarted = EventManager()
+    add(restarted, "2", "Beta", "Gamma")
+    restarted.publish()
+    publisher = BoardPublisher(FakeRedis(server=server), restarted)
+    await publisher.publish_once()
+    add(restarted, "3", "Delta", "Sigma")
+    restarted.publish()
+    await publisher.publish_once()
+
+    await replica.poll()
+    await replica.poll()
+    assert replica.resyncs == 2
+    assert events_of(replica.board) == events_of(restarted.snapshot())
+
+
+async def test_forks_are_replicated(server):
+    manager = EventManager()
+    publisher = BoardPublisher(FakeRedis(server=server), manager)
+    replica = BoardReplica(FakeRedis(server=server), block=10)
+    await publisher.publish_once()
+    await replica.load_snapshot()
+
+    fork = Fork("alpha|omega", (), 1.5, 1_700_000_000.0)
+    publisher.submit_forks(Lane.LIVE, [fork])
+    await publisher.publish_once()
+    await replica.poll()
+    assert list(replica.forks) == [(Lane.LIVE, fork)]
+
+
+async def test_groups_use_their_own_streams(server):
+    fonbet, winline = EventManager(), EventManager()
+    add(fonbet, "1", "Alpha", "Omega")
+    add(winline, "2", "Alpha", "Omega", BookmakerName.WINLINE)
+    publishers = []
+    for group, manager in (("FONBET", fonbet), ("WINLINE", winline)):
+        manager.publish()
+        lease = LeaderLease(FakeRedis(server=server), group)
+        assert await lease.acquire()
+        publishers.append(BoardPublisher.from_settings(FakeRedis(server=server), manager, lease))
+    assert publishers[0].stream == f"{settings.board_stream}:FONBET"
+    assert publishers[0].snapshot_key != publishers[1].snapshot_key
+
+    replicas = [
+        BoardReplica.from_settings(FakeRedis(server=server), g) for g in ("FONBET", "WINLINE")
+    ]
+    for replica in replicas:
+        replica.block = 10
+    for publisher in publishers:
+        await publisher.publish_once()
+    for replica in replicas:
+        await replica.load_snapshot()
+
+    # Версии групп идут независимо, реплики не перечитывают снимок по чужим дельтам
+    for number in range(3):
+        add(fonbet, str(10 + number), f"team{number}a", f"team{number}b")
+        fonbet.publish()
+        await publishers[0].publish_once()
+    add(winline, "20", "Beta", "Gamma", BookmakerName.WINLINE)
+    winline.publish()
+    await publishers[1].publish_once()
+    for replica in replicas:
+        await replica.poll()
+
+    assert [replica.resyncs for replica in replicas] == [1, 1]
+    assert events_of(replicas[0].board) == events_of(fonbet.snapshot())
+    assert events_of(replicas[1].board) == events_of(winline.snapshot())
+
+
+async def test_restore_into_manager(server):
+    manager = EventManager()
+    add(manager, "1", "Alpha", "Omega")
+    add(manager, "2", "Alpha", "Omega", BookmakerName.WINLINE)
+    manager.publish()
+    await BoardPublisher(FakeRedis(server=server), manager).publish_once()
+    replica = BoardReplica(FakeRedis(server=server), block=10)
+    await replica.load_snapshot()
+
+    standby = EventManager()
+    assert replica.restore_into(standby) == 2
+    assert events_of(standby.snapshot()) == events_of(manager.snapshot())
+    key = EventKey.create("Alpha", "Omega")
+    assert standby.freshness.event_confirmed(event_id(key), BookmakerName.FONBET) is None
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+import uuid
+from multiprocessing import shared_memory
+from typing import List
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.core.config import settings
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from forkscan.infrastructure.board.file import BoardCheckpointer
+from forkscan.infrastructure.board.shared import SharedBoardWriter
+from forkscan.parsers import registry as registry_module
+from forkscan.parsers.betboom import BetboomParser
+from forkscan.parsers.fonbet import FonbetParser
+from forkscan.scanner import Scanner, run_elected
+from forkscan.services.coalescing import UpdateCoalescer, store_consumer
+from tests.fakes import FakeStreamParser, make_event
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def stop(task: asyncio.Task) -> None:
+    # В Python < 3.12 asyncio.wait_for внутри redis-py может потерять отмену,
+    # пришедшую одновременно с ответом: отменяем до завершения
+    while not task.done():
+        task.cancel()
+        await asyncio.wait([task], timeout=0.5)
+
+
+async def test_standby_scanner_takes_over_with_replicated_board():
+    server = FakeServer()
+    scanners: List[Scanner] = []
+
+    def make_scanner(*events) -> Scanner:
+        manager = EventManager()
+        for event in events:
+            manager.add_event(event)
+        manager.publish()
+        scanner = Scanner(manager, OddsStore(), {})
+        scanners.append(scanner)
+        return scanner
+
+    event = make_event(BookmakerName.FONBET, "1", "Alpha", "Omega")
+    first = asyncio.create_task(run_elected(FakeRedis(server=server), lambda: make_scanner(event)))
+    await wait_for(lambda: scanners and scanners[0].publisher is not None)
+    # Парсер лидера находит ещё одно событие: оно уходит дельтой
+    scanners[0].manager.add_event(make_event(BookmakerName.WINLINE, "2", "Alpha", "Omega"))
+    scanners[0].manager.publish()
+    await wait_for(lambda: scanners[0].publisher.published)
+
+    second = asyncio.create_task(run_elected(FakeRedis(server=server), make_scanner))
+    await asyncio.sleep(0.3)  # резерв: реплика догоняет линию лидера
+    assert len(scanners) == 1
+
+    # Лидер останавливается и отдаёт аренду: резерв начинает с реплики
+    await stop(first)
+    await wait_for(lambda: len(scanners) == 2)
+
+    takeover = scanners[1].manager
+    assert takeover.get_event_by_id(BookmakerName.FONBET, "1") is not None
+    assert takeover.get_event_by_id(BookmakerName.WINLINE, "2") is not None
+    await stop(second)
+
+
+def test_streaming_parsers_share_the_scanner_coalescer(monkeypatch):
+    monkeypatch.setattr(
+        registry_module,
+        "BUILTIN_PARSERS",
+        {
+            BookmakerName.FONBET: "forkscan.parsers.fonbet:FonbetParser",
+            BookmakerName.BETBOOM: "forkscan.parsers.betboom:BetboomParser",
+        },
+    )
+    monkeypatch.setattr(
+        settings, "enabled_bookmakers", [BookmakerName.FONBET, BookmakerName.BETBOOM]
+    )
+    monkeypatch.setattr(settings, "coalesce_window", 0.05)
+
+    scanner = Scanner.from_settings()
+    betboom = scanner.parsers[BookmakerName.BETBOOM]
+    assert isinstance(betboom, BetboomParser)
+    assert isinstance(scanner.parsers[BookmakerName.FONBET], FonbetParser)
+    assert scanner.coalescer is not None and scanner.coalescer.window == 0.05
+    assert betboom.coalescer is scanner.coalescer
+
+    monkeypatch.setattr(settings, "coalesce_window", 0)
+    assert Scanner.from_settings().coalescer is None
+    assert scanner.checkpointer.path == settings.board_snapshot_path
+
+
+async def test_coalesced_updates_reach_the_store():
+    manager, store = EventManager(), OddsStore()
+    coalescer = UpdateCoalescer(store_consumer(store), window=60)
+    parser = FakeStreamParser(BookmakerName.BETBOOM, manager, store, coalescer=coalescer)
+    await parser.track_event(make_event(BookmakerName.BETBOOM, "b1", "Alpha", "Omega"))
+    event = parser.active_events["b1"]
+    scanner = Scanner(manager, store, {BookmakerName.BETBOOM: parser}, coalescer=coalescer)
+
+    await scanner.start()
+    parser._process([("b1", MarketType.WIN_1, 0.0, 1.9), ("b1", MarketType.WIN_1, 0.0, 2.0)])
+    await wait_for(lambda: store.event_markets(event))
+    # Следующее окно не наступит до остановки: остаток отдаёт stop()
+    parser._process([("b1", MarketType.WIN_2, 0.0, 1.8)])
+    await scanner.stop()
+
+    quotes = store.event_markets(event)
+    assert quotes[(MarketType.WIN_1, 0.0)][BookmakerName.BETBOOM].price == 2.0
+    assert quotes[(MarketType.WIN_2, 0.0)][BookmakerName.BETBOOM].price == 1.8
+    assert coalescer.stats()["merged"] == 1
+
+
+async def test_stats_log_reports_feed_lag(caplog):
+    manager = EventManager()
+    manager.freshness.confirm_bookmaker(BookmakerName.FONBET, ts=time.time() - 30)
+    scanner = Scanner(manager, OddsStore(), {})
+
+    with caplog.at_level(logging.INFO, logger="forkscan.scanner"):
+        task = asyncio.create_task(scanner.run(stats_interval=0.01))
+        await wait_for(lambda: "feed lag" in caplog.text)
+        await stop(task)
+
+    assert "feed lag: {'FONBET': 30." in caplog.text
+
+
+async def test_run_restores_and_checkpoints_the_board(tmp_path):
+    path = tmp_path / "board.snapshot"
+
+    def make_scanner(manager: EventManager) -> Scanner:
+        store = OddsStore()
+        checkpointer = BoardCheckpointer(manager, store, path, interval=0.05)
+        return Scanner(manager, store, {}, checkpointer=checkpointer)
+
+    first = make_scanner(EventManager())
+    task = asyncio.create_task(first.run(stats_interval=None))
+    first.manager.add_event(make_event(BookmakerName.FONBET, "1", "Alpha", "Omega"))
+    # Снимок пишется, пока сканер работает, а не только при остановке
+    await wait_for(path.exists)
+    await stop(task)
+
+    restarted = make_scanner(EventManager())
+    task = asyncio.create_task(restarted.run(stats_interval=None))
+    await wait_for(lambda: restarted.manager.get_event_by_id(BookmakerName.FONBET, "1"))
+    await stop(task)
+
+
+async def test_scanner_publishes_shared_board_while_running():
+    writer = SharedBoardWriter(f"forkscan-test-{uuid.uuid4().hex[:12]}", 2**20)
+    manager = EventManager()
+    manager.add_event(make_event(BookmakerName.FONBET, "1", "Alpha", "Omega"))
+    scanner = Scanner(manager, OddsStore(), {}, shared_board=writer, shared_board_interval=0.01)
+
+    await scanner.start()
+    await wait_for(lambda: writer.generation >= 4)
+    await scanner.stop()
+
+    # Сегмент удалён вместе со сканером
+    assert scanner.shared_board is None
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=writer.name)
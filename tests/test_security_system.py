@@ -0,0 +1,286 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from forkscan.api import security_system
+from forkscan.api.security_system import BanCache, SecuritySystem
+from forkscan.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def login_limits(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_window", 300)
+    monkeypatch.setattr(settings, "rate_limit_max_requests", 3)
+    monkeypatch.setattr(settings, "ban_threshold", 3)
+    monkeypatch.setattr(settings, "initial_ban_time", 10)
+    monkeypatch.setattr(settings, "ban_multiplier", 2.0)
+    monkeypatch.setattr(settings, "max_ban_time", 100)
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+async def security(server):
+    security = SecuritySystem(FakeRedis(server=server, decode_responses=True), BanCache(100))
+    yield security
+    await security.close()
+
+
+async def test_attempts_within_limit_are_allowed(security):
+    results = [await security.check_attempt("10.0.0.1") for _ in range(3)]
+    assert all(result.success for result in results)
+    assert [result.remaining_attempts for result in results] == [2, 1, 0]
+    # Окно попыток задано с первой попытки
+    assert 0 < await security.redis.ttl("rate:10.0.0.1") <= 300
+
+
+async def test_attempt_over_limit_bans(security):
+    for _ in range(3):
+        await security.check_attempt("10.0.0.1")
+    banned = await security.check_attempt("10.0.0.1")
+    assert banned.is_banned and not banned.success
+    # 4 попытки при пороге 3: 10 секунд * 4/3
+    assert banned.ban_time == 13
+    assert 0 < await security.redis.ttl("ban:10.0.0.1") <= 13
+
+    again = await security.check_attempt("10.0.0.1")
+    assert again.is_banned and "try again" in again.message
+    # Попытки под баном не считаются
+    assert int(await security.redis.get("rate:10.0.0.1")) == 4
+    assert (await security.check_attempt("10.0.0.2")).success
+
+
+async def test_repeated_bans_escalate(security):
+    for _ in range(4):
+        await security.check_attempt("10.0.0.1")
+    await security.redis.delete("ban:10.0.0.1", "rate:10.0.0.1")  # первый бан истёк
+    for _ in range(3):
+        await security.check_attempt("10.0.0.1")
+    banned = await security.check_attempt("10.0.0.1")
+    assert banned.ban_time == 26  # удвоение за прежний бан
+    assert await security.redis.get("ban_history:10.0.0.1") == "2"
+
+
+async def test_ban_time_is_capped(security, monkeypatch):
+    monkeypatch.setattr(settings, "initial_ban_time", 1000)
+    for _ in range(4):
+        banned = await security.check_attempt("10.0.0.1")
+    assert banned.ban_time == 100
+
+
+async def test_counter_without_window_gets_one(security):
+    # Счётчик без срока, например от старого клиента, не должен жить вечно
+    await security.redis.set("rate:10.0.0.1", 1)
+    await security.check_attempt("10.0.0.1")
+    assert await security.redis.ttl("rate:10.0.0.1") > 0
+
+
+async def test_reset_attempts_lifts_ban(security):
+    for _ in range(4):
+        await security.check_attempt("10.0.0.1")
+    await security.reset_attempts("10.0.0.1", "user@example.com")
+    assert (await security.check_attempt("10.0.0.1")).success
+    # История банов остаётся: следующий бан будет дольше
+    assert await security.redis.get("ban_history:10.0.0.1") == "1"
+
+
+async def test_security_status(security):
+    for _ in range(4):
+        await security.check_attempt("10.0.0.1")
+    status = await security.get_security_status("10.0.0.1")
+    assert status["is_banned"] and status["total_bans"] == 1
+    assert status["current_attempts"] == 4 and status["remaining_attempts"] == 0
+
+
+async def test_redis_failure_rejects_login(monkeypatch):
+    security = SecuritySystem(FakeRedis(server=FakeServer(), decode_responses=True), BanCache(0))
+    monkeypatch.setattr(settings, "captcha_required", False)
+    security.redis.connection_pool.connection_kwargs["server"].connected = False
+    result = await security.handle_login_attempt("10.0.0.1", None)
+    assert not result.success and result.message == "Security check error occurred"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(security_system.time, "monotonic", clock)
+    return clock
+
+
+def test_ban_cache_keeps_bans_until_they_expire(clock):
+    cache = BanCache(10)
+    cache.add("10.0.0.1", 30)
+    clock.now += 10
+    assert cache.get("10.0.0.1") == 20
+    clock.now += 20
+    assert cache.get("10.0.0.1") is None and len(cache) == 0
+
+
+def test_ban_cache_evicts_expired_then_oldest(clock):
+    cache = BanCache(3)
+    cache.add("a", 5)
+    cache.add("b", 100)
+    cache.add("c", 100)
+    clock.now += 10
+    cache.add("d", 100)  # вытесняет истёкший a
+    assert [cache.get(key) is not None for key in "bcd"] == [True, True, True]
+    cache.add("e", 100)  # истёкших нет: вытесняется самый старый b
+    assert cache.get("b") is None and len(cache) == 3
+
+
+def test_ban_cache_disabled():
+    cache = BanCache(0)
+    cache.add("10.0.0.1", 30)
+    assert cache.get("10.0.0.1") is None
+
+
+async def wait_for(condition, timeout: float = 3.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def subscribed(security: SecuritySystem, listeners: int = 1) -> None:
+    security.start()
+    for _attempt in range(300):
+        [(_channel, count)] = await security.redis.pubsub_numsub(
+            security_system.BAN_INVALIDATION_CHANNEL
+        )
+        if count >= listeners:
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError("ban invalidation listener did not subscribe")
+
+
+async def test_known_ban_is_answered_locally(security):
+    await subscribed(security)
+    for _ in range(4):
+        await security.check_attempt("10.0.0.1")
+    assert security.banned.get("10.0.0.1") is not None
+
+    result = await security.handle_login_attempt("10.0.0.1", None)  # ответ до проверки CAPTCHA
+    assert result.is_banned and result.ban_time == 13
+    assert int(await security.redis.get("rate:10.0.0.1")) == 4
+
+
+async def test_cache_is_not_used_without_listener(security):
+    for _ in range(4):
+        await security.check_attempt("10.0.0.1")
+    assert security.banned.get("10.0.0.1") is not None
+    # Бан, снятый другим воркером, иначе остался бы в кеше
+    await security.redis.delete("ban:10.0.0.1", "rate:10.0.0.1")
+    assert (await security.check_attempt("10.0.0.1")).success
+
+
+async def test_reset_lifts_ban_in_other_workers(server, security):
+    other = SecuritySystem(FakeRedis(server=server, decode_responses=True))
+    try:
+        await subscribed(security)
+        await subscribed(other, listeners=2)
+        for _ in range(4):
+            await security.check_attempt("10.0.0.1")
+        assert (await other.check_attempt("10.0.0.1")).is_banned
+        assert other.banned.get("10.0.0.1") is not None
+
+        await security.reset_attempts("10.0.0.1")
+        await wait_for(lambda: other.banned.get("10.0.0.1") is None)
+        assert (await other.check_attempt("10.0.0.1")).success
+    finally:
+        await other.close()
+
+
+@pytest.fixture
+async def captcha(monkeypatch):
+    """Замена сервиса проверки CAPTCHA: токены "ok..." верны, "hang" не отвечает."""
+    calls = []
+    release = asyncio.Event()
+
+    async def siteverify(request: web.Request) -> web.Response:
+        form = await request.post()
+        calls.append(form["response"])
+        if form["response"] == "hang":
+            await release.wait()
+        return web.json_response({"success": form["response"].startswith("ok")})
+
+    app = web.Application()
+    app.router.add_post("/siteverify", siteverify)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(settings, "captcha_verify_url", f"http://127.0.0.1:{port}/siteverify")
+    monkeypatch.setattr(settings, "captcha_secret_key", "secret")
+    monkeypatch.setattr(settings, "captcha_required", True)
+    monkeypatch.setattr(settings, "captcha_cache_ttl", 120)
+    yield calls
+    release.set()
+    await runner.cleanup()
+
+
+async def test_captcha_is_required(security, captcha):
+    result = await security.handle_login_attempt("10.0.0.1", None)
+    assert not result.success and "required" in result.message
+    assert captcha == [] and not await security.redis.exists("rate:10.0.0.1")
+
+
+async def test_verified_captcha_counts_the_attempt(security, captcha):
+    result = await security.handle_login_attempt("10.0.0.1", "ok-token")
+    assert result.success and result.remaining_attempts == 2
+    assert captcha == ["ok-token"]
+
+
+async def test_failed_captcha_rejects_login(security, captcha):
+    result = await security.handle_login_attempt("10.0.0.1", "bad-token")
+    assert not result.success and "failed" in result.message
+    assert not await security.redis.exists("rate:10.0.0.1")
+    # Неверный токен не кешируется
+    assert not await security.verify_captcha("bad-token")
+    assert captcha == ["bad-token", "bad-token"]
+
+
+async def test_verified_token_is_accepted_again(security, captcha):
+    assert await security.verify_captcha("ok-token")
+    # Сервис принимает токен один раз: повторный вход берёт ответ из Redis
+    assert await security.verify_captcha("ok-token")
+    assert captcha == ["ok-token"]
+
+    settings.captcha_cache_ttl = 0
+    assert await security.verify_captcha("ok-other")
+    assert await security.verify_captcha("ok-other")
+    assert captcha == ["ok-token", "ok-other", "ok-other"]
+
+
+async def test_captcha_timeout_fails_verification(server, captcha, monkeypatch):
+    monkeypatch.setattr(settings, "captcha_timeout", 0.1)
+    async with aiohttp.ClientSession() as session:
+        security = SecuritySystem(FakeRedis(server=server), BanCache(0), http_session=session)
+        started = asyncio.get_running_loop().time()
+        assert not await security.verify_captcha("hang")
+        assert asyncio.get_running_loop().time() - started < 1
+        await security.close()
+        # Общая сессия принадлежит приложению и остаётся открытой
+        assert not session.closed
+
+
+async def test_captcha_without_secret_fails(security, captcha, monkeypatch):
+    monkeypatch.setattr(settings, "captcha_secret_key", None)
+    assert not await security.verify_captcha("ok-token")
+    assert captcha == []
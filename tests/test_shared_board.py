@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from forkscan.api.deps import get_shared_board
+from forkscan.core.config import settings
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventKey, EventManager, MarketType, event_id
+from forkscan.infrastructure.board.layout import encode_board
+from forkscan.infrastructure.board.shared import SharedBoardReader, SharedBoardWriter
+from tests.fakes import make_event
+
+KEY = EventKey.create("Alpha", "Omega")
+
+# Читатель открывает сегмент с SharedMemory(track=False), это есть с Python 3.13
+requires_track = pytest.mark.skipif(
+    sys.version_info < (3, 13), reason="SharedMemory(track=...) needs Python 3.13"
+)
+
+
+@pytest.fixture
+def writer():
+    writer = SharedBoardWriter(f"forkscan-test-{uuid.uuid4().hex[:12]}", 2**20)
+    yield writer
+    writer.close()
+
+
+def build_board():
+    manager, store = EventManager(), OddsStore()
+    manager.add_event(make_event(BookmakerName.FONBET, "1", "Alpha", "Omega"))
+    manager.add_event(make_event(BookmakerName.WINLINE, "2", "Alpha", "Omega"))
+    store.update(event_id(KEY), MarketType.WIN_1, 0.0, BookmakerName.FONBET, 2.1, time.time())
+    manager.publish()
+    return manager, store
+
+
+@requires_track
+def test_reader_sees_empty_board_before_first_publication(writer):
+    reader = SharedBoardReader(writer.name)
+    try:
+        assert reader.version() == 0
+        assert reader.get_same_events(KEY) == {}
+    finally:
+        reader.close()
+
+
+@requires_track
+def test_reader_sees_published_board(writer):
+    manager, store = build_board()
+    assert writer.publish_board(manager, store, manager.snapshot()) == 2
+
+    reader = SharedBoardReader(writer.name)
+    try:
+        assert reader.version() == manager.snapshot().version
+        same_events = reader.get_same_events(KEY)
+        assert set(same_events) == {BookmakerName.FONBET, BookmakerName.WINLINE}
+        assert reader.event_markets(event_id(KEY)) == store.event_markets(event_id(KEY))
+
+        manager.add_event(make_event(BookmakerName.FONBET, "3", "Beta", "Gamma"))
+        writer.publish_board(manager, store, manager.publish())
+        assert reader.get_same_events(EventKey.create("Beta", "Gamma"))
+    finally:
+        reader.close()
+
+
+@requires_track
+def test_read_retries_when_slot_is_overwritten(writer):
+    manager, store = build_board()
+    tables = encode_board(manager, store, manager.snapshot())
+    writer.publish(tables)
+    reader = SharedBoardReader(writer.name)
+    calls = []
+
+    def read(board):
+        calls.append(board.version)
+        if len(calls) == 1:
+            # Две публикации за время чтения: прочитанный слот перезаписан
+            writer.publish(tables)
+            writer.publish(tables)
+        return len(board)
+
+    try:
+        assert reader.read(read) == 2
+        assert len(calls) == 2 and reader.retries == 1
+    finally:
+        reader.close()
+
+
+def test_snapshot_larger_than_slot_is_rejected(writer):
+    manager, store = build_board()
+    tables = encode_board(manager, store, manager.snapshot())
+    small = SharedBoardWriter(f"forkscan-test-{uuid.uuid4().hex[:12]}", 64)
+    try:
+        with pytest.raises(ValueError):
+            small.publish(tables)
+        assert small.generation == 0
+    finally:
+        small.close()
+
+
+@requires_track
+def test_reader_rejects_foreign_segment():
+    from multiprocessing import shared_memory
+
+    segment = shared_memory.SharedMemory(
+        name=f"forkscan-test-{uuid.uuid4().hex[:12]}", create=True, size=128
+    )
+    try:
+        with pytest.raises(ValueError):
+            SharedBoardReader(segment.name)
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+@requires_track
+async def test_run_publishes_version_on_loop_thread(writer):
+    manager, store = build_board()
+    threads = []
+    manager.add_listener(lambda board, changed: threads.append(threading.current_thread()))
+    manager.add_event(make_event(BookmakerName.FONBET, "3", "Beta", "Gamma"))
+
+    task = asyncio.create_task(writer.run(manager, store, interval=3600))
+    while writer.generation == 0:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert threads == [threading.current_thread()]
+    reader = SharedBoardReader(writer.name)
+    try:
+        assert reader.version() == manager.snapshot().version
+        assert reader.get_same_events(EventKey.create("Beta", "Gamma"))
+    finally:
+        reader.close()
+
+
+@requires_track
+async def test_api_dependency_opens_segment_on_first_use(writer, monkeypatch):
+    manager, store = build_board()
+    writer.publish_board(manager, store)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(shared_board=None)))
+
+    monkeypatch.setattr(settings, "shared_board_name", None)
+    with pytest.raises(RuntimeError):
+        await get_shared_board(request)
+
+    monkeypatch.setattr(settings, "shared_board_name", writer.name)
+    board = await get_shared_board(request)
+    try:
+        assert request.app.state.shared_board is board
+        assert await get_shared_board(request) is board
+        assert board.version() == manager.snapshot().version
+    finally:
+        board.close()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from types import MappingProxyType
+
+import pytest
+
+from forkscan.core.types import BookmakerName, EventManager
+from tests.fakes import make_event
+
+
+def add(manager: EventManager, number: int, bookmaker=BookmakerName.FONBET):
+    manager.add_event(make_event(bookmaker, str(number), f"team{number}a", f"team{number}b"))
+
+
+def test_published_version_does_not_change():
+    manager = EventManager()
+    add(manager, 1)
+    first = manager.publish()
+    key = next(iter(first.get_all_events()))
+
+    add(manager, 2)
+    manager.remove_event_by_id(BookmakerName.FONBET, "1")
+    second = manager.publish()
+
+    assert len(first) == 1 and key in first.events
+    assert len(second) == 1 and key not in second.events
+    assert second.version == first.version + 1
+    with pytest.raises(TypeError):
+        first.events[key] = MappingProxyType({})  # type: ignore[index]
+    with pytest.raises(TypeError):
+        first.get_same_events(key)[BookmakerName.WINLINE] = None  # type: ignore[index]
+
+
+def test_publish_without_changes_keeps_version():
+    manager = EventManager()
+    add(manager, 1)
+    board = manager.publish()
+    assert manager.publish() is board
+    assert manager.snapshot() is board
+
+
+def test_listeners_see_every_version_in_order():
+    manager = EventManager()
+    seen = []
+    manager.add_listener(lambda board, changed: seen.append((board.version, len(changed))))
+    add(manager, 1)
+    add(manager, 2)
+    manager.publish()
+    manager.remove_event_by_id(BookmakerName.FONBET, "1")
+    manager.publish()
+    assert seen == [(1, 2), (2, 1)]
+
+
+async def test_readers_iterate_while_writers_publish():
+    manager = EventManager()
+    for number in range(500):
+        add(manager, number)
+    manager.publish()
+    stop = threading.Event()
+
+    def writer(seed: int) -> None:
+        number = 0
+        bookmaker = [BookmakerName.FONBET, BookmakerName.WINLINE][seed]
+        while not stop.is_set():
+            number = (number + 7) % 1000
+            if number % 2:
+                add(manager, number, bookmaker)
+            else:
+                manager.remove_event_by_id(bookmaker, str(number))
+            if number % 10 == 0:
+                manager.publish()
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(2)]
+    for thread in threads:
+        thread.start()
+    reads = 0
+    try:
+        # Обход снимка никогда не видит словарь, меняющийся под итерацией
+        for _ in range(200):
+            board = manager.snapshot()
+            for key, bookmaker_events in board.get_all_events().items():
+                assert len(bookmaker_events) > 0
+            reads += 1
+            await asyncio.sleep(0)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    manager.publish()
+    board = manager.snapshot()
+    assert reads == 200
+    assert {key: dict(events) for key, events in board.get_all_events().items()} == {
+        key: dict(events) for key, events in manager.get_all_events().items()
+    }
@@ -0,0 +1,104 @@
+import asyncio
+
+from forkscan.core.odds import OddsStore
+from forkscan.core.types import BookmakerName, EventManager, MarketType
+from tests.fakes import FakeStreamParser, make_event
+
+
+class FailingConnectParser(FakeStreamParser):
+    """Подключение падает не сетевой ошибкой."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attempts = 0
+
+    async def connect(self):
+        self.attempts += 1
+        raise RuntimeError("bad handshake payload")
+
+
+async def tracked_parser(sink=None) -> FakeStreamParser:
+    parser = FakeStreamParser(BookmakerName.FONBET, EventManager(), OddsStore())
+    if sink is not None:
+        parser.sink = sink
+    await parser.track_event(make_event(BookmakerName.FONBET, "f1", "Arsenal", "Zenit"))
+    return parser
+
+
+async def test_sink_error_loses_one_update(caplog):
+    applied = []
+
+    def sink(tick):
+        if tick.price == 1.5:
+            raise ValueError("store rejected tick")
+        applied.append(tick.price)
+
+    parser = await tracked_parser(sink)
+    parser._process([("f1", MarketType.WIN_1, 0.0, 1.5), ("f1", MarketType.WIN_2, 0.0, 2.5)])
+
+    assert applied == [2.5]
+    assert parser.apply_errors == 1
+    assert parser.stats()["apply_errors"] == 1
+    assert any(record.exc_info for record in caplog.records)
+
+
+async def test_worker_survives_sink_errors():
+    applied = []
+
+    def sink(tick):
+        if tick.price < 2:
+            raise ValueError("store rejected tick")
+        applied.append(tick.price)
+
+    parser = await tracked_parser(sink)
+    await parser.start()
+    try:
+        parser.submit([("f1", MarketType.WIN_1, 0.0, 1.5)])
+        await asyncio.sleep(0.01)
+        parser.submit([("f1", MarketType.WIN_1, 0.0, 2.5)])
+        await asyncio.sleep(0.01)
+        assert not parser._worker.done()
+        assert applied == [2.5]
+    finally:
+        await parser.stop()
+
+
+async def test_connection_retries_after_unexpected_error(caplog):
+    parser = FailingConnectParser(
+        BookmakerName.FONBET,
+        EventManager(),
+        OddsStore(),
+    )
+    parser.backoff_initial = parser.backoff_max = 0.001
+    await parser.start()
+    try:
+        for _ in range(100):
+            if parser.attempts >= 3:
+                break
+            await asyncio.sleep(0.01)
+        connection = parser._connections[0]
+        assert parser.attempts >= 3
+        assert not connection.task.done()
+        assert connection.reconnects >= 2
+    finally:
+        await parser.stop()
+    assert any("failed, reconnecting" in record.message for record in caplog.records)
+
+
+async def test_stop_discards_queued_frames():
+    applied = []
+    parser = await tracked_parser(lambda tick: applied.append(tick.price))
+    # Разбор не запущен: фреймы копятся в очереди
+    parser.submit([("f1", MarketType.WIN_1, 0.0, 1.5)])
+    parser.submit([("f1", MarketType.WIN_1, 0.0, 1.6)])
+    await parser.stop()
+    assert parser.stats()["queue_depth"] == 0
+
+    await parser.start()
+    parser.submit([("f1", MarketType.WIN_1, 0.0, 1.7)])
+    for _ in range(100):
+        if applied:
+            break
+        await asyncio.sleep(0.01)
+    await parser.stop()
+    assert applied == [1.7]